@@ -5,17 +5,30 @@ A library-style system that organizes recipes in a single location using metadat
 """
 
 import os
+import sys
 import json
-import shutil
-import sqlite3
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Set
+from typing import Callable, List, Dict, Any, Optional, Set, Tuple, Iterator
 import logging
 from datetime import datetime
-import hashlib
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields
 import pandas as pd
 
+# Shared connection manager lives one level up
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from db_connection import get_connection_manager
+from recipe_search import ensure_search_index, ranked_search
+from library_stats import ensure_library_stats, read_library_stats
+from recipe_browse import ensure_browse_indexes
+from recipe_completeness import ensure_completeness_cache
+from keyword_automaton import KeywordAutomaton
+from blob_store import BlobStore, hash_file, link_or_copy
+from streaming_export import read_records, write_records
+import text_patterns
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -49,11 +62,30 @@ class RecipeEntry:
     library_path: str
     is_uploaded: bool = False
     upload_date: Optional[datetime] = None
+    ingredients: str = ''
+
+RECIPE_FIELDS = tuple(field.name for field in fields(RecipeEntry))
+
+# Library instance shared by scan worker processes (set by the pool initializer)
+_scan_worker_library = None
+
+def _init_scan_worker(library: 'RecipeLibrary'):
+    """Process pool initializer: keep one library instance per worker."""
+    global _scan_worker_library
+    _scan_worker_library = library
+
+def _scan_worker(file_path: str) -> Tuple[str, Optional[RecipeEntry], Optional[str]]:
+    """Analyze one file in a worker process. Returns (path, entry, error)."""
+    try:
+        return file_path, _scan_worker_library.analyze_file(Path(file_path)), None
+    except Exception as e:
+        return file_path, None, str(e)
 
 class RecipeLibrary:
     """Library-style recipe organization system."""
     
-    def __init__(self, library_path: str = "recipe_library", source_folder: str = "Iterum App/uploads"):
+    def __init__(self, library_path: str = "recipe_library", source_folder: str = "Iterum App/uploads",
+                 hardlink_sources: bool = False):
         self.library_path = Path(library_path)
         self.source_folder = Path(source_folder)
         self.db_path = self.library_path / "recipe_library.db"
@@ -97,9 +129,37 @@ class RecipeLibrary:
             'hard': ['advanced', 'complex', 'challenging', 'difficult', 'expert', 'elaborate']
         }
         
+        # Other classification keywords
+        self.cooking_terms = ['preheat', 'bake', 'cook', 'simmer', 'boil', 'fry', 'grill']
+        self.menu_keywords = ['menu', 'appetizer', 'entree', 'main course', 'dessert', 'breakfast', 'lunch', 'dinner']
+        self.meal_types = ['breakfast', 'lunch', 'dinner', 'dessert', 'appetizer', 'snack']
+        self.ingredient_tags = ['vegetarian', 'vegan', 'gluten-free', 'dairy-free', 'spicy', 'sweet', 'savory']
+        
+        # One automaton over every keyword table, so each document is scanned once
+        self.keyword_automaton = KeywordAutomaton(self.keyword_tables())
+        
         self.ensure_library_structure()
+        self.db = get_connection_manager(self.db_path)
+        self.blobs = BlobStore(self.library_path, self.db, hardlink=hardlink_sources)
         self.init_database()
     
+    def keyword_tables(self) -> Dict[str, List[str]]:
+        """All classification keyword tables, keyed by automaton label."""
+        tables = {
+            'recipe': list(self.recipe_keywords),
+            'cooking': self.cooking_terms,
+            'ingredients_heading': ['ingredients'],
+            'instructions_heading': ['instructions', 'directions'],
+            'menu': self.menu_keywords,
+            'meal_type': self.meal_types,
+            'ingredient_tag': self.ingredient_tags
+        }
+        for cuisine, keywords in self.cuisine_types.items():
+            tables[f'cuisine:{cuisine}'] = keywords
+        for difficulty, indicators in self.difficulty_indicators.items():
+            tables[f'difficulty:{difficulty}'] = indicators
+        return tables
+    
     def ensure_library_structure(self):
         """Create the library directory structure."""
         self.library_path.mkdir(exist_ok=True)
@@ -107,8 +167,12 @@ class RecipeLibrary:
     
     def init_database(self):
         """Initialize the SQLite database for recipe metadata."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.db.batch() as conn:
+            self._create_schema(conn.cursor())
+        logger.info("Database initialized")
+    
+    def _create_schema(self, cursor):
+        """Create tables and indexes using an open cursor."""
         
         # Create recipes table
         cursor.execute('''
@@ -132,6 +196,8 @@ class RecipeLibrary:
                 library_path TEXT,
                 is_uploaded BOOLEAN DEFAULT FALSE,
                 upload_date TEXT,
+                ingredients TEXT,
+                completeness REAL,
                 UNIQUE(file_path)
             )
         ''')
@@ -151,112 +217,298 @@ class RecipeLibrary:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_category ON recipes(category)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_difficulty ON recipes(difficulty)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_tags ON tags(tag)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tags_recipe ON tags(recipe_id)')
         
-        conn.commit()
-        conn.close()
-        logger.info("Database initialized")
+        # Cached missing-information analyses behind the completeness column
+        ensure_completeness_cache(cursor)
+        
+        # (sort key, id) indexes for paging through the library in each browse order
+        ensure_browse_indexes(cursor)
+        
+        # Create scan fingerprints table so rescans only touch changed files
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scan_fingerprints (
+                file_path TEXT PRIMARY KEY,
+                file_size INTEGER,
+                mtime REAL,
+                recipe_id TEXT,
+                scanned_date TEXT
+            )
+        ''')
+        
+        # Content-addressed library files and their reference counts
+        self.blobs.create_schema(cursor)
+        
+        # Full-text search index, kept in sync with recipes by triggers
+        ensure_search_index(cursor)
+        
+        # Summary counts for get_library_stats, also maintained by triggers
+        ensure_library_stats(cursor)
     
-    def scan_and_import(self) -> List[RecipeEntry]:
-        """Scan source folder and import recipes to library."""
+    def scan_and_import(self, parallel: bool = False, incremental: bool = False,
+                        max_workers: Optional[int] = None, batch_size: int = 200,
+                        progress: Optional[Callable[[int, int, str], None]] = None) -> List[RecipeEntry]:
+        """
+        Scan source folder and import recipes to library.
+        
+        Args:
+            parallel: Extract and classify files in a process pool, with a single
+                writer thread batching the database inserts
+            incremental: Skip files whose (path, size, mtime) fingerprint was
+                recorded by a previous scan
+            max_workers: Number of worker processes (defaults to CPU count)
+            batch_size: Files per database transaction
+            progress: Called as progress(files_done, total_files, file_path) for the files to analyze
+        """
         if not self.source_folder.exists():
             logger.error(f"Source folder does not exist: {self.source_folder}")
             return []
         
         logger.info(f"Scanning {self.source_folder} for recipes...")
         
-        recipe_files = []
+        known_fingerprints = self.load_fingerprints() if incremental else {}
+        
+        candidates = []
         total_files = 0
+        unchanged_files = 0
+        
+        for file_path, stat in self.iter_source_files():
+            total_files += 1
+            if file_path.suffix.lower() not in self.recipe_extensions:
+                continue
+            
+            if known_fingerprints.get(str(file_path)) == (stat.st_size, stat.st_mtime):
+                unchanged_files += 1
+                continue
+            
+            candidates.append((str(file_path), stat.st_size, stat.st_mtime))
         
-        for file_path in self.source_folder.rglob('*'):
-            if file_path.is_file():
-                total_files += 1
-                if file_path.suffix.lower() in self.recipe_extensions:
-                    recipe_entry = self.analyze_and_import_file(file_path)
+        if parallel:
+            recipe_files = self._import_parallel(candidates, max_workers, batch_size, progress)
+        else:
+            recipe_files = []
+            for start in range(0, len(candidates), batch_size):
+                # Analyze the batch first, then write it in one short transaction,
+                # so the write lock isn't held while files are read and copied
+                batch = []
+                for offset, (file_path, file_size, mtime) in enumerate(candidates[start:start + batch_size]):
+                    if progress:
+                        progress(start + offset, len(candidates), file_path)
+                    try:
+                        recipe_entry = self.analyze_file(Path(file_path))
+                    except Exception as e:
+                        # Leave errored files unfingerprinted so the next scan retries them
+                        logger.error(f"Error analyzing {file_path}: {str(e)}")
+                        continue
+                    
                     if recipe_entry:
                         recipe_files.append(recipe_entry)
-                        logger.info(f"Imported: {file_path.name}")
+                        logger.info(f"Imported: {recipe_entry.file_name}")
+                    
+                    batch.append((file_path, file_size, mtime, recipe_entry))
+                
+                self._flush_batch(batch)
+        
+        if progress:
+            progress(len(candidates), len(candidates), 'Done')
         
-        logger.info(f"Scanned {total_files} files, imported {len(recipe_files)} recipes")
+        logger.info(f"Scanned {total_files} files, imported {len(recipe_files)} recipes "
+                    f"({unchanged_files} unchanged files skipped)")
+        
+        # Edited files leave their previous content behind
+        self.blobs.collect_garbage()
         return recipe_files
     
-    def analyze_and_import_file(self, file_path: Path) -> Optional[RecipeEntry]:
-        """Analyze a file and import it to the library if it's a recipe."""
+    def iter_source_files(self) -> Iterator[Tuple[Path, os.stat_result]]:
+        """Walk the source folder, yielding each file with its stat result."""
+        for dirpath, _, filenames in os.walk(self.source_folder):
+            for filename in filenames:
+                file_path = Path(dirpath) / filename
+                try:
+                    yield file_path, file_path.stat()
+                except OSError:
+                    continue
+    
+    def load_fingerprints(self) -> Dict[str, Tuple[int, float]]:
+        """Load the (size, mtime) fingerprint of every previously scanned file."""
+        cursor = self.db.connection().cursor()
+        cursor.execute('SELECT file_path, file_size, mtime FROM scan_fingerprints')
+        return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    
+    def record_fingerprints(self, scanned: List[Tuple[str, int, float, Optional[str]]]):
+        """Record (path, size, mtime, recipe_id) for scanned files in one transaction."""
+        if not scanned:
+            return
+        
+        with self.db.batch() as conn:
+            self._write_fingerprints(conn.cursor(), scanned)
+    
+    def _write_fingerprints(self, cursor, scanned: List[Tuple[str, int, float, Optional[str]]]):
+        """Upsert scan fingerprints using an open cursor."""
+        scanned_date = datetime.now().isoformat()
+        cursor.executemany('''
+            INSERT OR REPLACE INTO scan_fingerprints (file_path, file_size, mtime, recipe_id, scanned_date)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(path, size, mtime, recipe_id, scanned_date) for path, size, mtime, recipe_id in scanned])
+    
+    def _import_parallel(self, candidates: List[Tuple[str, int, float]], max_workers: Optional[int],
+                         batch_size: int, progress: Optional[Callable[[int, int, str], None]] = None) -> List[RecipeEntry]:
+        """Analyze candidates in a process pool and hand results to a single writer thread."""
+        results = queue.Queue(maxsize=batch_size * 4)
+        writer = threading.Thread(target=self._write_batches, args=(results, batch_size), daemon=True)
+        writer.start()
+        
+        recipe_files = []
         try:
-            # Get basic file info
-            stat = file_path.stat()
-            file_name = file_path.name
-            file_extension = file_path.suffix.lower()
-            file_size = stat.st_size
-            
-            # Skip files that are too large
-            if file_size > 50 * 1024 * 1024:  # 50MB
-                return None
-            
-            # Extract content preview
-            content_preview = self.extract_content_preview(file_path)
-            
-            # Analyze content for recipe indicators
-            confidence_score = self.calculate_confidence(content_preview)
-            
-            if confidence_score < 0.1:  # Low confidence, skip
-                return None
-            
-            # Generate unique ID
-            file_hash = hashlib.md5(f"{file_path.absolute()}_{stat.st_mtime}".encode()).hexdigest()
-            
-            # Determine metadata
-            category = self.determine_category(content_preview)
-            cuisine_type = self.determine_cuisine(content_preview)
-            difficulty = self.determine_difficulty(content_preview)
-            cooking_time = self.extract_cooking_time(content_preview)
-            servings = self.extract_servings(content_preview)
-            tags = self.extract_tags(content_preview)
-            title = self.extract_title(file_name, content_preview)
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     initializer=_init_scan_worker,
+                                     initargs=(self,)) as executor:
+                paths = [file_path for file_path, _, _ in candidates]
+                outcomes = executor.map(_scan_worker, paths, chunksize=16)
+                
+                for index, ((file_path, file_size, mtime), (_, recipe_entry, error)) in \
+                        enumerate(zip(candidates, outcomes)):
+                    if progress:
+                        progress(index, len(candidates), file_path)
+                    if error:
+                        # Leave errored files unfingerprinted so the next scan retries them
+                        logger.error(f"Error analyzing {file_path}: {error}")
+                        continue
+                    
+                    if recipe_entry:
+                        recipe_files.append(recipe_entry)
+                        logger.info(f"Imported: {recipe_entry.file_name}")
+                    
+                    results.put((file_path, file_size, mtime, recipe_entry))
+        finally:
+            results.put(None)
+            writer.join()
+        
+        return recipe_files
+    
+    def _write_batches(self, results: queue.Queue, batch_size: int):
+        """Writer thread: drain scan results and commit them in batches."""
+        batch = []
+        
+        while True:
+            try:
+                item = results.get(timeout=1.0)
+            except queue.Empty:
+                # Workers are slow right now; don't hold finished rows back
+                self._flush_batch(batch)
+                batch = []
+                continue
             
-            # Copy file to library
-            library_file_path = self.copy_to_library(file_path, file_hash)
+            if item is None:
+                break
             
-            # Create recipe entry
-            recipe_entry = RecipeEntry(
-                id=file_hash,
-                file_name=file_name,
-                file_path=str(file_path),
-                file_extension=file_extension,
-                file_size=file_size,
-                created_date=datetime.fromtimestamp(stat.st_ctime),
-                modified_date=datetime.fromtimestamp(stat.st_mtime),
-                title=title,
-                category=category,
-                cuisine_type=cuisine_type,
-                difficulty=difficulty,
-                cooking_time=cooking_time,
-                servings=servings,
-                tags=tags,
-                confidence_score=confidence_score,
-                content_preview=content_preview[:500],
-                library_path=str(library_file_path)
-            )
+            batch.append(item)
+            if len(batch) >= batch_size:
+                self._flush_batch(batch)
+                batch = []
+        
+        self._flush_batch(batch)
+        self.db.release()
+    
+    def _flush_batch(self, batch: List[Tuple[str, int, float, Optional[RecipeEntry]]]):
+        """Write a batch of scan results (recipes, tags, fingerprints) in one transaction."""
+        if not batch:
+            return
+        
+        try:
+            with self.db.batch() as conn:
+                cursor = conn.cursor()
+                self._write_recipes(cursor, [entry for _, _, _, entry in batch if entry], stored=True)
+                self._write_fingerprints(cursor, [
+                    (file_path, file_size, mtime, entry.id if entry else None)
+                    for file_path, file_size, mtime, entry in batch
+                ])
+        except Exception as e:
+            logger.error(f"Error saving batch to database: {str(e)}")
+    
+    def analyze_and_import_file(self, file_path: Path) -> Optional[RecipeEntry]:
+        """Analyze a file and import it to the library if it's a recipe."""
+        try:
+            recipe_entry = self.analyze_file(file_path)
             
-            # Save to database
-            self.save_to_database(recipe_entry)
+            if recipe_entry:
+                # Save to database
+                self.save_to_database(recipe_entry, stored=True)
             
             return recipe_entry
-            
+        
         except Exception as e:
             logger.error(f"Error analyzing {file_path}: {str(e)}")
             return None
     
-    def copy_to_library(self, source_path: Path, file_hash: str) -> Path:
-        """Copy file to library with hash-based naming."""
-        extension = source_path.suffix
-        library_filename = f"{file_hash}{extension}"
-        library_file_path = self.library_path / library_filename
+    def analyze_file(self, file_path: Path) -> Optional[RecipeEntry]:
+        """
+        Extract and classify a file, copying it to the library if it's a recipe.
+        
+        Does not touch the database, so it can run in scan worker processes.
+        Returns None for files that are not recipes and raises on read errors.
+        """
+        # Get basic file info
+        stat = file_path.stat()
+        file_name = file_path.name
+        file_extension = file_path.suffix.lower()
+        file_size = stat.st_size
+        
+        # Skip files that are too large
+        if file_size > 50 * 1024 * 1024:  # 50MB
+            return None
+        
+        # Extract content preview
+        content_preview = self.extract_content_preview(file_path)
         
-        if not library_file_path.exists():
-            shutil.copy2(source_path, library_file_path)
-            logger.info(f"Copied to library: {library_filename}")
+        # Analyze content for recipe indicators (one keyword pass feeds every classifier)
+        hits = self.keyword_automaton.scan(content_preview)
+        confidence_score = self.calculate_confidence(content_preview, hits)
         
-        return library_file_path
+        if confidence_score < 0.1:  # Low confidence, skip
+            return None
+        
+        # Content hash is the ID: the same file from two folders (or just touched) is one recipe
+        file_hash = hash_file(file_path)
+        
+        # Determine metadata
+        category = self.determine_category(content_preview, hits)
+        cuisine_type = self.determine_cuisine(content_preview, hits)
+        difficulty = self.determine_difficulty(content_preview, hits)
+        cooking_time = self.extract_cooking_time(content_preview)
+        servings = self.extract_servings(content_preview)
+        tags = self.extract_tags(content_preview, hits)
+        title = self.extract_title(file_name, content_preview)
+        ingredients = self.extract_ingredients(content_preview)
+        
+        # Copy file to library
+        library_file_path = self.copy_to_library(file_path, file_hash)
+        
+        # Create recipe entry
+        return RecipeEntry(
+            id=file_hash,
+            file_name=file_name,
+            file_path=str(file_path),
+            file_extension=file_extension,
+            file_size=file_size,
+            created_date=datetime.fromtimestamp(stat.st_ctime),
+            modified_date=datetime.fromtimestamp(stat.st_mtime),
+            title=title,
+            category=category,
+            cuisine_type=cuisine_type,
+            difficulty=difficulty,
+            cooking_time=cooking_time,
+            servings=servings,
+            tags=tags,
+            confidence_score=confidence_score,
+            content_preview=content_preview[:500],
+            library_path=str(library_file_path),
+            ingredients=ingredients
+        )
+    
+    def copy_to_library(self, source_path: Path, file_hash: str) -> Path:
+        """Store file in the library under its content hash (once per distinct content)."""
+        return self.blobs.store(source_path, file_hash)
     
     def extract_content_preview(self, file_path: Path) -> str:
         """Extract a preview of the file content for analysis."""
@@ -274,8 +526,7 @@ class RecipeLibrary:
             elif extension in ['.html', '.htm']:
                 with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                     content = f.read(2000)
-                    import re
-                    return re.sub(r'<[^>]+>', '', content)
+                    return text_patterns.HTML_TAG.sub('', content)
             
             elif extension in ['.xlsx', '.xls', '.csv']:
                 try:
@@ -296,41 +547,37 @@ class RecipeLibrary:
             
             else:
                 return f"File: {file_path.name}"
-                
+        
         except Exception as e:
             logger.error(f"Error extracting content from {file_path}: {str(e)}")
             return ""
     
-    def calculate_confidence(self, content: str) -> float:
+    def calculate_confidence(self, content: str, hits: Optional[Dict[str, Set[str]]] = None) -> float:
         """Calculate confidence score that this is a recipe file."""
         if not content:
             return 0.0
         
-        content_lower = content.lower()
+        hits = hits or self.keyword_automaton.scan(content)
         score = 0.0
         
         # Check for recipe keywords
-        recipe_matches = sum(1 for keyword in self.recipe_keywords if keyword in content_lower)
-        score += recipe_matches * 0.1
+        score += len(hits['recipe']) * 0.1
         
         # Bonus for having both ingredients and instructions
-        if 'ingredients' in content_lower and ('instructions' in content_lower or 'directions' in content_lower):
+        if hits['ingredients_heading'] and hits['instructions_heading']:
             score += 0.3
         
         # Bonus for cooking-related terms
-        cooking_terms = ['preheat', 'bake', 'cook', 'simmer', 'boil', 'fry', 'grill']
-        cooking_matches = sum(1 for term in cooking_terms if term in content_lower)
-        score += cooking_matches * 0.05
+        score += len(hits['cooking']) * 0.05
         
         return min(score, 1.0)
     
-    def determine_category(self, content: str) -> str:
+    def determine_category(self, content: str, hits: Optional[Dict[str, Set[str]]] = None) -> str:
         """Determine if this is a recipe or menu."""
-        content_lower = content.lower()
+        hits = hits or self.keyword_automaton.scan(content)
         
-        menu_keywords = ['menu', 'appetizer', 'entree', 'main course', 'dessert', 'breakfast', 'lunch', 'dinner']
-        menu_indicators = sum(1 for keyword in menu_keywords if keyword in content_lower)
-        recipe_indicators = sum(1 for keyword in self.recipe_keywords if keyword in content_lower)
+        menu_indicators = len(hits['menu'])
+        recipe_indicators = len(hits['recipe'])
         
         if menu_indicators > recipe_indicators:
             return 'menu'
@@ -339,37 +586,30 @@ class RecipeLibrary:
         else:
             return 'uncategorized'
     
-    def determine_cuisine(self, content: str) -> str:
+    def determine_cuisine(self, content: str, hits: Optional[Dict[str, Set[str]]] = None) -> str:
         """Determine the cuisine type based on content."""
-        content_lower = content.lower()
+        hits = hits or self.keyword_automaton.scan(content)
         
-        for cuisine, keywords in self.cuisine_types.items():
-            if any(keyword in content_lower for keyword in keywords):
+        for cuisine in self.cuisine_types:
+            if hits[f'cuisine:{cuisine}']:
                 return cuisine
         
         return 'unknown'
     
-    def determine_difficulty(self, content: str) -> str:
+    def determine_difficulty(self, content: str, hits: Optional[Dict[str, Set[str]]] = None) -> str:
         """Determine the difficulty level."""
-        content_lower = content.lower()
+        hits = hits or self.keyword_automaton.scan(content)
         
-        for difficulty, indicators in self.difficulty_indicators.items():
-            if any(indicator in content_lower for indicator in indicators):
+        for difficulty in self.difficulty_indicators:
+            if hits[f'difficulty:{difficulty}']:
                 return difficulty
         
         return 'unknown'
     
     def extract_cooking_time(self, content: str) -> str:
         """Extract cooking time information."""
-        import re
-        time_patterns = [
-            r'(\d+)\s*(?:min|minutes?)',
-            r'(\d+)\s*(?:hr|hour|hours?)',
-            r'(\d+)\s*(?:day|days?)'
-        ]
-        
-        for pattern in time_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
+        for pattern in text_patterns.COOKING_TIME:
+            match = pattern.search(content)
             if match:
                 return match.group(0)
         
@@ -377,46 +617,53 @@ class RecipeLibrary:
     
     def extract_servings(self, content: str) -> str:
         """Extract serving information."""
-        import re
-        serving_patterns = [
-            r'(\d+)\s*(?:servings?|portions?|people)',
-            r'serves\s*(\d+)',
-            r'yield[s]?\s*(\d+)'
-        ]
-        
-        for pattern in serving_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
+        for pattern in text_patterns.SERVINGS:
+            match = pattern.search(content)
             if match:
                 return match.group(0)
         
         return 'unknown'
     
-    def extract_tags(self, content: str) -> List[str]:
+    def extract_ingredients(self, content: str) -> str:
+        """Extract ingredient lines (for full-text search)."""
+        lines = [line.strip(' \t-*•') for line in content.splitlines()]
+        
+        # Prefer an explicit "Ingredients" section
+        ingredients = []
+        in_section = False
+        for line in lines:
+            lower = line.lower()
+            if text_patterns.INGREDIENTS_HEADING.match(lower):
+                in_section = True
+                continue
+            if in_section:
+                if text_patterns.INSTRUCTIONS_HEADING.match(lower):
+                    break
+                if line:
+                    ingredients.append(line)
+        
+        # Otherwise fall back to lines that start with a quantity
+        if not ingredients:
+            ingredients = [line for line in lines if text_patterns.QUANTITY_LINE.match(line)]
+        
+        return '\n'.join(ingredients)[:2000]
+    
+    def extract_tags(self, content: str, hits: Optional[Dict[str, Set[str]]] = None) -> List[str]:
         """Extract relevant tags from content."""
+        hits = hits or self.keyword_automaton.scan(content)
         tags = []
-        content_lower = content.lower()
         
         # Add cuisine tags
-        for cuisine, keywords in self.cuisine_types.items():
-            if any(keyword in content_lower for keyword in keywords):
-                tags.append(cuisine)
+        tags.extend(cuisine for cuisine in self.cuisine_types if hits[f'cuisine:{cuisine}'])
         
         # Add difficulty tags
-        for difficulty, indicators in self.difficulty_indicators.items():
-            if any(indicator in content_lower for indicator in indicators):
-                tags.append(difficulty)
+        tags.extend(difficulty for difficulty in self.difficulty_indicators if hits[f'difficulty:{difficulty}'])
         
         # Add meal type tags
-        meal_types = ['breakfast', 'lunch', 'dinner', 'dessert', 'appetizer', 'snack']
-        for meal_type in meal_types:
-            if meal_type in content_lower:
-                tags.append(meal_type)
+        tags.extend(hits['meal_type'])
         
         # Add ingredient-based tags
-        ingredient_tags = ['vegetarian', 'vegan', 'gluten-free', 'dairy-free', 'spicy', 'sweet', 'savory']
-        for tag in ingredient_tags:
-            if tag in content_lower:
-                tags.append(tag)
+        tags.extend(hits['ingredient_tag'])
         
         return list(set(tags))
     
@@ -430,41 +677,95 @@ class RecipeLibrary:
         
         return title
     
-    def save_to_database(self, recipe: RecipeEntry):
-        """Save recipe entry to database."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+    def save_to_database(self, recipe: RecipeEntry, stored: bool = False):
+        """Save recipe entry to database (joins the caller's batch, if any)."""
         try:
-            # Insert recipe
-            cursor.execute('''
-                INSERT OR REPLACE INTO recipes (
-                    id, file_name, file_path, file_extension, file_size,
-                    created_date, modified_date, title, category, cuisine_type,
-                    difficulty, cooking_time, servings, tags, confidence_score,
-                    content_preview, library_path, is_uploaded, upload_date
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                recipe.id, recipe.file_name, recipe.file_path, recipe.file_extension,
-                recipe.file_size, recipe.created_date.isoformat(), recipe.modified_date.isoformat(),
-                recipe.title, recipe.category, recipe.cuisine_type, recipe.difficulty,
-                recipe.cooking_time, recipe.servings, json.dumps(recipe.tags),
-                recipe.confidence_score, recipe.content_preview, recipe.library_path,
-                recipe.is_uploaded, recipe.upload_date.isoformat() if recipe.upload_date else None
-            ))
-            
-            # Insert tags
-            cursor.execute('DELETE FROM tags WHERE recipe_id = ?', (recipe.id,))
-            for tag in recipe.tags:
-                cursor.execute('INSERT INTO tags (recipe_id, tag) VALUES (?, ?)', (recipe.id, tag))
-            
-            conn.commit()
-            
+            with self.db.batch() as conn:
+                self._write_recipes(conn.cursor(), [recipe], stored=stored)
+        
         except Exception as e:
             logger.error(f"Error saving recipe to database: {str(e)}")
-            conn.rollback()
-        finally:
-            conn.close()
+    
+    def _write_recipes(self, cursor, recipes: List[RecipeEntry], stored: bool = False):
+        """
+        Insert or replace recipes and their tags using an open cursor.
+        
+        Pass stored=True for entries whose library files analyze_file() just
+        stored, so any collected in the meantime are restored from source.
+        """
+        if not recipes:
+            return
+        
+        self._hand_over_shared_rows(cursor, recipes)
+        
+        # Delete explicitly rather than INSERT OR REPLACE: REPLACE skips the
+        # delete trigger, which would leave stale rows in the search index
+        cursor.executemany('DELETE FROM recipes WHERE id = ? OR file_path = ?',
+                           [(recipe.id, recipe.file_path) for recipe in recipes])
+        
+        # Copies of one file share an ID; the last one wins, as it would one at a time
+        unique = list({recipe.id: recipe for recipe in recipes}.values())
+        
+        # Insert recipes
+        cursor.executemany('''
+            INSERT INTO recipes (
+                id, file_name, file_path, file_extension, file_size,
+                created_date, modified_date, title, category, cuisine_type,
+                difficulty, cooking_time, servings, tags, confidence_score,
+                content_preview, library_path, is_uploaded, upload_date, ingredients
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(
+            recipe.id, recipe.file_name, recipe.file_path, recipe.file_extension,
+            recipe.file_size, recipe.created_date.isoformat(), recipe.modified_date.isoformat(),
+            recipe.title, recipe.category, recipe.cuisine_type, recipe.difficulty,
+            recipe.cooking_time, recipe.servings, json.dumps(recipe.tags),
+            recipe.confidence_score, recipe.content_preview, recipe.library_path,
+            recipe.is_uploaded, recipe.upload_date.isoformat() if recipe.upload_date else None,
+            recipe.ingredients
+        ) for recipe in unique])
+        
+        # Insert tags
+        cursor.executemany('DELETE FROM tags WHERE recipe_id = ?', [(recipe.id,) for recipe in unique])
+        cursor.executemany('INSERT INTO tags (recipe_id, tag) VALUES (?, ?)',
+                           [(recipe.id, tag) for recipe in unique for tag in recipe.tags])
+        
+        # A collection may have removed a blob after analyze_file() found it in
+        # place; the write lock is held now, so none can run until this commits
+        if stored:
+            for recipe in recipes:
+                if recipe.library_path and not os.path.exists(recipe.library_path):
+                    self.blobs.restore(Path(recipe.file_path), recipe.id)
+        
+        # Count the recipe as a reference to its library file, if that file is here
+        self.blobs.add_refs(cursor, [(recipe.file_path, Path(recipe.library_path).name, recipe.file_size)
+                                     for recipe in recipes
+                                     if recipe.library_path and os.path.exists(recipe.library_path)])
+    
+    def _hand_over_shared_rows(self, cursor, recipes: List[RecipeEntry]):
+        """
+        Move rows other sources still share off the paths about to be replaced.
+        
+        Identical files are one row (the ID is the content hash), filed under
+        whichever copy was imported last. When that copy now holds different
+        content, the row still belongs to the other copies, so it is repointed
+        at one of them instead of deleted: an unchanged copy is skipped by
+        incremental scans and would never bring the row back.
+        """
+        incoming = {recipe.file_path for recipe in recipes}
+        
+        for recipe in recipes:
+            cursor.execute('SELECT id, library_path FROM recipes WHERE file_path = ? AND id != ?',
+                           (recipe.file_path, recipe.id))
+            row = cursor.fetchone()
+            if not row or not row['library_path']:
+                continue
+            
+            cursor.execute('SELECT ref FROM blob_refs WHERE file_name = ? ORDER BY ref',
+                           (Path(row['library_path']).name,))
+            others = [ref[0] for ref in cursor.fetchall() if ref[0] not in incoming]
+            if others:
+                cursor.execute('UPDATE OR IGNORE recipes SET file_path = ?, file_name = ? WHERE id = ?',
+                               (others[0], Path(others[0]).name, row['id']))
     
     def search_recipes(self, 
                       cuisine: Optional[str] = None,
@@ -473,48 +774,42 @@ class RecipeLibrary:
                       tags: Optional[List[str]] = None,
                       search_text: Optional[str] = None,
                       limit: int = 50) -> List[RecipeEntry]:
-        """Search recipes in the library."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Search recipes in the library (full-text matches are ranked by relevance)."""
+        cursor = self.db.connection().cursor()
         
-        query = "SELECT * FROM recipes WHERE 1=1"
+        filters = ""
         params = []
         
         if cuisine:
-            query += " AND cuisine_type = ?"
+            filters += " AND recipes.cuisine_type = ?"
             params.append(cuisine)
         
         if category:
-            query += " AND category = ?"
+            filters += " AND recipes.category = ?"
             params.append(category)
         
         if difficulty:
-            query += " AND difficulty = ?"
+            filters += " AND recipes.difficulty = ?"
             params.append(difficulty)
         
-        if search_text:
-            query += " AND (title LIKE ? OR content_preview LIKE ?)"
-            search_pattern = f"%{search_text}%"
-            params.extend([search_pattern, search_pattern])
-        
         if tags:
             placeholders = ','.join(['?' for _ in tags])
-            query += f" AND id IN (SELECT DISTINCT recipe_id FROM tags WHERE tag IN ({placeholders}))"
+            filters += f" AND recipes.id IN (SELECT DISTINCT recipe_id FROM tags WHERE tag IN ({placeholders}))"
             params.extend(tags)
         
-        query += " ORDER BY confidence_score DESC LIMIT ?"
-        params.append(limit)
-        
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+        if search_text:
+            rows = ranked_search(cursor, search_text, filters=filters, params=params, limit=limit)
+        else:
+            cursor.execute(f"SELECT * FROM recipes WHERE 1=1{filters} ORDER BY confidence_score DESC LIMIT ?",
+                           params + [limit])
+            rows = cursor.fetchall()
         
         recipes = []
-        for row in cursor.fetchall():
+        for row in rows:
             recipe = self.row_to_recipe_entry(row)
             if recipe:
                 recipes.append(recipe)
         
-        conn.close()
         return recipes
     
     def row_to_recipe_entry(self, row) -> Optional[RecipeEntry]:
@@ -539,86 +834,206 @@ class RecipeLibrary:
                 content_preview=row[15],
                 library_path=row[16],
                 is_uploaded=bool(row[17]),
-                upload_date=datetime.fromisoformat(row[18]) if row[18] else None
+                upload_date=datetime.fromisoformat(row[18]) if row[18] else None,
+                ingredients=row['ingredients'] or ''
             )
         except Exception as e:
             logger.error(f"Error converting row to RecipeEntry: {str(e)}")
             return None
     
     def get_library_stats(self) -> Dict[str, Any]:
-        """Get statistics about the recipe library."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        stats = {}
-        
-        # Total recipes
-        cursor.execute('SELECT COUNT(*) FROM recipes')
-        stats['total_recipes'] = cursor.fetchone()[0]
-        
-        # By category
-        cursor.execute('SELECT category, COUNT(*) FROM recipes GROUP BY category')
-        stats['by_category'] = dict(cursor.fetchall())
-        
-        # By cuisine
-        cursor.execute('SELECT cuisine_type, COUNT(*) FROM recipes GROUP BY cuisine_type')
-        stats['by_cuisine'] = dict(cursor.fetchall())
-        
-        # By difficulty
-        cursor.execute('SELECT difficulty, COUNT(*) FROM recipes GROUP BY difficulty')
-        stats['by_difficulty'] = dict(cursor.fetchall())
-        
-        # Popular tags
-        cursor.execute('SELECT tag, COUNT(*) FROM tags GROUP BY tag ORDER BY COUNT(*) DESC LIMIT 10')
-        stats['popular_tags'] = dict(cursor.fetchall())
-        
-        # Upload status
-        cursor.execute('SELECT is_uploaded, COUNT(*) FROM recipes GROUP BY is_uploaded')
-        stats['upload_status'] = dict(cursor.fetchall())
-        
-        conn.close()
-        return stats
+        """Get statistics about the recipe library (from the trigger-maintained summary table)."""
+        cursor = self.db.connection().cursor()
+        return read_library_stats(cursor)
     
-    def export_library(self, output_file: str = "recipe_library_export.json") -> str:
-        """Export the entire library to JSON."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM recipes')
-        rows = cursor.fetchall()
-        
-        recipes = []
-        for row in rows:
-            recipe = self.row_to_recipe_entry(row)
-            if recipe:
-                recipes.append(asdict(recipe))
-        
-        conn.close()
-        
-        export_data = {
+    def dedupe_library(self, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Collapse duplicate files in the library directory into single blobs.
+        
+        Every hash-named file is content-hashed; each set of identical files
+        is reduced to one file named by its digest, recipes are repointed to
+        it, and recipe rows that now share a file are merged (keeping the most
+        confident one). Reference counts are rebuilt from every source's
+        reference, including sources whose row was merged away.
+        
+        Files are only ever removed after the database commit: each canonical
+        name is linked in first, so an interrupted dedupe leaves every row
+        pointing at a file that still exists.
+        
+        Args:
+            dry_run: Only report what would change
+        
+        Returns:
+            Dictionary with files scanned, duplicates removed, bytes reclaimed
+            and recipes merged
+        """
+        groups = self.blobs.find_duplicates()
+        
+        renames: Dict[str, str] = {}  # old file name -> blob file name
+        removed = []
+        renamed = []  # kept copies now also present under their canonical name
+        bytes_reclaimed = 0
+        
+        for (digest, extension), paths in groups.items():
+            canonical = self.blobs.blob_path(digest, extension)
+            keep = canonical if canonical in paths else paths[0]
+            keep_inode = (keep.stat().st_dev, keep.stat().st_ino)
+            
+            for path in paths:
+                renames[path.name] = canonical.name
+                if path == keep:
+                    continue
+                stat = path.stat()
+                # Files already hard-linked to the kept copy free no space
+                if (stat.st_dev, stat.st_ino) != keep_inode:
+                    bytes_reclaimed += stat.st_size
+                removed.append(path)
+            
+            if not dry_run and keep != canonical:
+                link_or_copy(keep, canonical, hardlink=True)
+                renamed.append(keep)
+        
+        # Repoint recipes at the surviving blobs and merge rows that now share one,
+        # holding the write lock so no writer can point a row at a file about to go
+        updates = []
+        merged = []
+        with self.db.batch(immediate=not dry_run) as conn:
+            cursor = conn.execute('SELECT id, file_path, library_path, file_size FROM recipes '
+                                  'ORDER BY confidence_score DESC, modified_date DESC')
+            
+            refs: Dict[str, Tuple[str, int]] = {}  # source path -> (blob file name, size)
+            kept_by_blob: Dict[str, str] = {}
+            for row in cursor.fetchall():
+                if not row['library_path']:
+                    continue
+                name = Path(row['library_path']).name
+                blob_name = renames.get(name, name)
+                refs[row['file_path']] = (blob_name, row['file_size'])
+                
+                if blob_name in kept_by_blob:
+                    merged.append(row['id'])
+                    continue
+                
+                kept_by_blob[blob_name] = row['id']
+                if blob_name != name:
+                    updates.append((str(self.library_path / blob_name), row['id']))
+            
+            if not dry_run:
+                conn.executemany('UPDATE recipes SET library_path = ? WHERE id = ?', updates)
+                conn.executemany('DELETE FROM tags WHERE recipe_id = ?', [(recipe_id,) for recipe_id in merged])
+                conn.executemany('DELETE FROM recipes WHERE id = ?', [(recipe_id,) for recipe_id in merged])
+                
+                # blob_refs holds every source, including copies that share a row
+                # (the recipe rows only fill in sources recorded before it existed)
+                cursor = conn.execute('SELECT r.ref, r.file_name, b.size FROM blob_refs r '
+                                      'LEFT JOIN blobs b ON b.file_name = r.file_name')
+                for ref in cursor.fetchall():
+                    refs[ref['ref']] = (renames.get(ref['file_name'], ref['file_name']), ref['size'])
+                self.blobs.rebuild_refs(conn.cursor(), [(source, blob_name, size)
+                                                        for source, (blob_name, size) in refs.items()])
+        
+        # Nothing refers to the old names now
+        if not dry_run:
+            for path in removed + renamed:
+                try:
+                    path.unlink()
+                except OSError as e:
+                    logger.warning(f"Could not remove duplicate {path.name}: {e}")
+        
+        result = {
+            'files_scanned': sum(len(paths) for paths in groups.values()),
+            'unique_files': len(groups),
+            'duplicates_removed': len(removed),
+            'bytes_reclaimed': bytes_reclaimed,
+            'recipes_repointed': len(updates),
+            'recipes_merged': len(merged),
+            'dry_run': dry_run
+        }
+        logger.info(f"Dedupe: {result}")
+        return result
+    
+    def export_library(self, output_file: str = "recipe_library_export.json",
+                       fmt: Optional[str] = None, compression: Optional[str] = None) -> str:
+        """
+        Export the entire library, streaming rows from the database to disk.
+        
+        Format and compression follow the file name (.json, .jsonl, plus .gz
+        or .zst) unless given as 'json'/'jsonl' and 'gzip'/'zstd'.
+        """
+        export_path = self.library_path / output_file
+        header = {
             'export_date': datetime.now().isoformat(),
-            'total_recipes': len(recipes),
-            'library_path': str(self.library_path),
-            'recipes': recipes
+            'library_path': str(self.library_path)
         }
         
-        export_path = self.library_path / output_file
-        with open(export_path, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
+        count = write_records(export_path, self.iter_recipes(), header, fmt, compression)
         
-        logger.info(f"Library exported to: {export_path}")
+        logger.info(f"Exported {count} recipes to: {export_path}")
         return str(export_path)
     
+    def iter_recipes(self) -> Iterator[Dict[str, Any]]:
+        """Yield every recipe as a dict, stepping through the result set one row at a time."""
+        cursor = self.db.connection().execute('SELECT * FROM recipes ORDER BY rowid')
+        for row in cursor:
+            recipe = self.row_to_recipe_entry(row)
+            if recipe:
+                yield asdict(recipe)
+    
+    def import_library(self, input_file: str, batch_size: int = 500) -> int:
+        """
+        Import recipes from an export without loading the whole file.
+        
+        Accepts anything export_library writes (JSON or JSON Lines, plain,
+        gzip or zstd). Library paths are mapped into this library by file
+        name, since library files are content-addressed and copy across as-is.
+        
+        Returns:
+            Number of recipes imported
+        """
+        count = 0
+        batch = []
+        
+        for record in read_records(Path(input_file)):
+            recipe = self.record_to_recipe_entry(record)
+            if recipe is None:
+                continue
+            
+            batch.append(recipe)
+            if len(batch) >= batch_size:
+                with self.db.batch() as conn:
+                    self._write_recipes(conn.cursor(), batch)
+                count += len(batch)
+                batch = []
+        
+        if batch:
+            with self.db.batch() as conn:
+                self._write_recipes(conn.cursor(), batch)
+            count += len(batch)
+        
+        logger.info(f"Imported {count} recipes from: {input_file}")
+        return count
+    
+    def record_to_recipe_entry(self, record: Dict[str, Any]) -> Optional[RecipeEntry]:
+        """Convert an exported recipe dict back to a RecipeEntry."""
+        try:
+            data = {name: record[name] for name in RECIPE_FIELDS if name in record}
+            data['created_date'] = datetime.fromisoformat(data['created_date'])
+            data['modified_date'] = datetime.fromisoformat(data['modified_date'])
+            data['upload_date'] = datetime.fromisoformat(data['upload_date']) if data.get('upload_date') else None
+            if data.get('library_path'):
+                data['library_path'] = str(self.library_path / Path(data['library_path']).name)
+            return RecipeEntry(**data)
+        except Exception as e:
+            logger.error(f"Error converting record to RecipeEntry: {str(e)}")
+            return None
+    
     def get_recipe_by_id(self, recipe_id: str) -> Optional[RecipeEntry]:
         """Get a specific recipe by ID."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.db.connection().cursor()
         
         cursor.execute('SELECT * FROM recipes WHERE id = ?', (recipe_id,))
         row = cursor.fetchone()
         
-        conn.close()
-        
         if row:
             return self.row_to_recipe_entry(row)
         return None
@@ -629,6 +1044,9 @@ def main():
     
     parser = argparse.ArgumentParser(description='Recipe Library System')
     parser.add_argument('--scan', action='store_true', help='Scan and import recipes')
+    parser.add_argument('--parallel', action='store_true', help='Scan with a process pool')
+    parser.add_argument('--incremental', action='store_true', help='Only scan new or changed files')
+    parser.add_argument('--workers', type=int, help='Number of scan worker processes')
     parser.add_argument('--search', help='Search recipes')
     parser.add_argument('--cuisine', help='Filter by cuisine')
     parser.add_argument('--category', help='Filter by category')
@@ -636,14 +1054,23 @@ def main():
     parser.add_argument('--tags', help='Filter by tags (comma-separated)')
     parser.add_argument('--stats', action='store_true', help='Show library statistics')
     parser.add_argument('--export', action='store_true', help='Export library to JSON')
+    parser.add_argument('--export-file', default='recipe_library_export.json',
+                        help='Export file name (.json or .jsonl, optionally .gz or .zst)')
+    parser.add_argument('--import-file', help='Import recipes from an export file')
+    parser.add_argument('--dedupe', action='store_true', help='Collapse duplicate files in the library')
+    parser.add_argument('--dry-run', action='store_true', help='With --dedupe, only report what would change')
+    parser.add_argument('--hardlink', action='store_true',
+                        help='Hard-link source files into the library instead of copying')
     
     args = parser.parse_args()
     
-    library = RecipeLibrary()
+    library = RecipeLibrary(hardlink_sources=args.hardlink)
     
     if args.scan:
         print("🔍 Scanning and importing recipes...")
-        recipes = library.scan_and_import()
+        recipes = library.scan_and_import(parallel=args.parallel,
+                                          incremental=args.incremental,
+                                          max_workers=args.workers)
         print(f"✅ Imported {len(recipes)} recipes")
     
     if args.stats:
@@ -669,8 +1096,20 @@ def main():
         for recipe in recipes:
             print(f"  - {recipe.title} ({recipe.cuisine_type}, {recipe.difficulty})")
     
+    if args.dedupe:
+        print("🧹 Deduplicating library files...")
+        result = library.dedupe_library(dry_run=args.dry_run)
+        action = "Would remove" if args.dry_run else "Removed"
+        print(f"{action} {result['duplicates_removed']} duplicate files "
+              f"({result['bytes_reclaimed'] / (1024 * 1024):.1f} MB reclaimed), "
+              f"merged {result['recipes_merged']} duplicate recipes")
+    
+    if args.import_file:
+        count = library.import_library(args.import_file)
+        print(f"📥 Imported {count} recipes from: {args.import_file}")
+    
     if args.export:
-        export_path = library.export_library()
+        export_path = library.export_library(args.export_file)
         print(f"📄 Library exported to: {export_path}")
 
 if __name__ == "__main__":
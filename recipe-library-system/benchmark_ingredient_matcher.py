@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Ingredient Matcher Benchmark
+Times IngredientMatcher on a synthetic vendor price list and checks known names against the default ingredients
+"""
+
+import sys
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ingredient_database import IngredientDatabase
+from ingredient_matcher import IngredientMatcher
+
+# Vendor name -> ingredient it must match (None: must stay unmatched)
+EXPECTED: Dict[str, Optional[str]] = {
+    'Lemon Juice': None,
+    'Lemon Pepper Seasoning': None,
+    'Garlic Salt': None,
+    'Chicken Stock Base': None,
+    'Beef Stock Concentrate': None,
+    'Lemons': 'Lemons',
+    'Brocoli': 'Broccoli',
+    'Chicken Stock': 'Chicken Stock',
+    'Onion, Yellow': 'Onions, Yellow',
+    'Parmesan Cheese': 'Cheese, Parmesan',
+    'Cream Heavy': 'Cream, Heavy',
+    'Salt Kosher': 'Salt, Kosher',
+    'Unsalted Butter case': 'Butter, Unsalted'
+}
+
+PACK_WORDS = ['', '', 'case', 'pack', 'box', 'ea']
+
+
+def make_names(ingredient_names: List[str], count: int, rng: random.Random) -> List[str]:
+    """Vendor-style names: reordered words, pack words, lowercase and the odd dropped letter."""
+    names = []
+    for _ in range(count):
+        words = rng.choice(ingredient_names).replace(',', '').split()
+        rng.shuffle(words)
+        if rng.random() < 0.2:
+            index = rng.randrange(len(words))
+            word = words[index]
+            if len(word) > 5:
+                cut = rng.randrange(1, len(word) - 1)
+                words[index] = word[:cut] + word[cut + 1:]
+        name = ' '.join(words + [rng.choice(PACK_WORDS)]).strip()
+        names.append(name.lower() if rng.random() < 0.5 else name)
+    return names
+
+
+def check(matcher: IngredientMatcher) -> List[str]:
+    """Names in EXPECTED that match the wrong ingredient (or none)."""
+    wrong = []
+    for vendor_name, expected in EXPECTED.items():
+        result = matcher.match(vendor_name)
+        got = result.get('ingredient_name')
+        if got != expected:
+            wrong.append(f"{vendor_name!r}: expected {expected}, got {got} ({result['confidence']})")
+    return wrong
+
+
+def main():
+    """Report match throughput and fail if a known name matches the wrong ingredient."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Benchmark and check vendor item matching')
+    parser.add_argument('--rows', type=int, default=2000, help='Synthetic price list rows')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = IngredientDatabase(str(Path(tmp) / "ingredients.db"))
+        ingredient_names = db.get_ingredient_names()
+        db.db.close_all()
+    
+    start = time.perf_counter()
+    matcher = IngredientMatcher(ingredient_names)
+    built = time.perf_counter() - start
+    
+    names = make_names(list(ingredient_names.values()), args.rows, random.Random(args.seed))
+    start = time.perf_counter()
+    results = matcher.match_many(names)
+    elapsed = time.perf_counter() - start
+    matched = sum(result['matched'] for result in results)
+    
+    print(f"\nIndex of {len(ingredient_names):,} ingredients built in {built:.3f}s")
+    print(f"Matched {matched:,} of {len(names):,} rows in {elapsed:.3f}s")
+    
+    wrong = check(matcher)
+    print(f"\nKnown names checked: {len(EXPECTED)}, wrong: {len(wrong)}")
+    for line in wrong:
+        print(f"  {line}")
+    sys.exit(1 if wrong else 0)
+
+if __name__ == "__main__":
+    main()
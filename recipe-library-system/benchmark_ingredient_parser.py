@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Ingredient Parser Benchmark
+Times IngredientParser.parse_ingredient against the old per-unit regex loop
+"""
+
+import re
+import sys
+import random
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from improvements_v2 import IngredientParser
+
+QUANTITIES = ['1', '2', '1.5', '1/2', '3/4', '1 1/2', '12', '0.25', '']
+ITEMS = ['flour', 'sugar', 'onions', 'garlic', 'chicken thighs', 'olive oil', 'kosher salt',
+         'heavy cream', 'unsalted butter', 'basil leaves', 'tomatoes', 'parmesan']
+PREPS = ['', ', diced', ', minced', ', sifted', ', chopped fine', ', room temperature']
+
+
+def legacy_parse_ingredient(ingredient_line: str) -> Dict[str, str]:
+    """parse_ingredient as it was before the precompiled patterns (one regex per unit)."""
+    result = {
+        'quantity': '',
+        'unit': '',
+        'ingredient': '',
+        'prep': '',
+        'original': ingredient_line
+    }
+    
+    line = ingredient_line.strip()
+    
+    quantity_pattern = r'^(\d+\.?\d*|\d+\/\d+|\d+\s+\d+\/\d+)'
+    quantity_match = re.search(quantity_pattern, line)
+    if quantity_match:
+        result['quantity'] = quantity_match.group(1)
+        line = line[quantity_match.end():].strip()
+    
+    for unit in IngredientParser.UNITS:
+        pattern = r'^\b' + re.escape(unit) + r'\b'
+        if re.match(pattern, line, re.IGNORECASE):
+            result['unit'] = unit
+            line = line[len(unit):].strip()
+            break
+    
+    parts = line.split(',', 1)
+    result['ingredient'] = parts[0].strip()
+    
+    if len(parts) > 1:
+        result['prep'] = parts[1].strip()
+    
+    return result
+
+
+def make_lines(count: int, seed: int) -> List[str]:
+    """Generate realistic ingredient lines, with a few unit-less ones."""
+    rng = random.Random(seed)
+    units = IngredientParser.UNITS + ['', '', 'Cups', 'TBSP']
+    return [
+        ' '.join(part for part in (rng.choice(QUANTITIES), rng.choice(units), rng.choice(ITEMS)) if part)
+        + rng.choice(PREPS)
+        for _ in range(count)
+    ]
+
+
+def main():
+    """Parse the same lines with both implementations and report throughput."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Benchmark ingredient line parsing')
+    parser.add_argument('--lines', type=int, default=1000000, help='Number of ingredient lines')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    
+    args = parser.parse_args()
+    
+    print(f"Generating {args.lines:,} ingredient lines...")
+    lines = make_lines(args.lines, args.seed)
+    ingredient_parser = IngredientParser()
+    
+    timings = {}
+    outputs = {}
+    for name, parse in (('before', legacy_parse_ingredient), ('after', ingredient_parser.parse_ingredient)):
+        start = time.perf_counter()
+        outputs[name] = [parse(line) for line in lines]
+        timings[name] = time.perf_counter() - start
+        print(f"{name:<7} {timings[name]:8.2f}s  {args.lines / timings[name]:>12,.0f} lines/s")
+    
+    mismatches = sum(1 for old, new in zip(outputs['before'], outputs['after']) if old != new)
+    print(f"\nSpeedup: {timings['before'] / timings['after']:.1f}x  (mismatched results: {mismatches})")
+
+if __name__ == "__main__":
+    main()
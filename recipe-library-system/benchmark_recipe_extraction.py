@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Recipe Extraction Benchmark
+Per-page parse time of the JSON-LD fast path against the full BeautifulSoup extraction
+"""
+
+import sys
+import gzip
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bs4 import BeautifulSoup
+from web_recipe_scraper import WebRecipeScraper
+
+WORDS = ['chicken', 'garlic', 'butter', 'roasted', 'lemon', 'thyme', 'crispy', 'weeknight',
+         'dinner', 'easy', 'family', 'favorite', 'sauce', 'pan', 'oven', 'minutes', 'serve']
+
+
+def make_page(index: int, rng: random.Random, size: int) -> bytes:
+    """
+    A recipe page shaped like the big food blogs: navigation, inline app
+    state and scripts, comments and ads around a JSON-LD @graph.
+    """
+    title = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} Recipe {index}"
+    recipe = {
+        '@type': 'Recipe',
+        'name': title,
+        'description': ' '.join(rng.choices(WORDS, k=30)),
+        'author': {'@type': 'Person', 'name': 'Test Kitchen'},
+        'image': [f"https://example.com/img/{index}.jpg"],
+        'prepTime': 'PT15M',
+        'cookTime': 'PT1H10M',
+        'recipeYield': '4 servings',
+        'recipeCuisine': 'American',
+        'recipeIngredient': [f"{rng.randint(1, 4)} cups {rng.choice(WORDS)}" for _ in range(12)],
+        'recipeInstructions': [{'@type': 'HowToStep', 'text': ' '.join(rng.choices(WORDS, k=20))}
+                               for _ in range(8)],
+    }
+    graph = {'@context': 'https://schema.org',
+             '@graph': [{'@type': 'WebPage', 'name': title}, {'@type': 'Organization', 'name': 'Example'}, recipe]}
+    
+    head = ['<!DOCTYPE html><html><head><meta charset="utf-8">', f'<title>{title}</title>']
+    head += [f'<link rel="preload" href="/static/chunk-{i}.js" as="script">' for i in range(40)]
+    head.append('<script>window.__STATE__ = ' + json.dumps({'items': [' '.join(rng.choices(WORDS, k=12))
+                                                                     for _ in range(300)]}) + ';</script>')
+    head.append(f'<script type="application/ld+json">{json.dumps(graph)}</script></head><body>')
+    
+    body = ['<nav><ul>']
+    body += [f'<li class="nav-item"><a href="/category/{i}">{rng.choice(WORDS)}</a></li>' for i in range(400)]
+    body.append('</ul></nav><article class="post">')
+    while sum(len(part) for part in head + body) < size:
+        body.append(f'<div class="content-block"><p>{" ".join(rng.choices(WORDS, k=60))}</p>'
+                    f'<!-- ad slot {len(body)} --><div class="ad" data-slot="{len(body)}"></div>'
+                    f'<script>googletag.cmd.push(function() {{ display("slot-{len(body)}"); }});</script></div>')
+    body.append('</article></body></html>')
+    return ''.join(head + body).encode('utf-8')
+
+
+def load_fixtures(folder: Path) -> List[Tuple[str, bytes]]:
+    """Saved pages (*.html, or *.gz as stored by the HTTP cache)."""
+    pages = []
+    for path in sorted(folder.rglob('*')):
+        if path.suffix in ('.html', '.htm'):
+            pages.append((path.name, path.read_bytes()))
+        elif path.suffix == '.gz':
+            pages.append((path.name, gzip.decompress(path.read_bytes())))
+    return pages
+
+
+def time_pages(extract, pages: List[Tuple[str, bytes]]) -> Tuple[List[float], list]:
+    """Extract every page once; return per-page times in milliseconds and the results."""
+    times, results = [], []
+    for name, html in pages:
+        start = time.perf_counter()
+        results.append(extract(html, f"https://example.com/{name}"))
+        times.append((time.perf_counter() - start) * 1000)
+    return times, results
+
+
+def main():
+    """Time both extraction paths on saved or synthetic pages and check they agree."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Benchmark recipe extraction (JSON-LD fast path vs full DOM)')
+    parser.add_argument('--fixtures', help='Folder of saved pages (*.html, or an HTTP cache folder)')
+    parser.add_argument('--pages', type=int, default=30, help='Number of synthetic pages (without --fixtures)')
+    parser.add_argument('--page-size', type=int, default=1500000, help='Approximate synthetic page size in bytes')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    
+    args = parser.parse_args()
+    
+    if args.fixtures:
+        pages = load_fixtures(Path(args.fixtures))
+        if not pages:
+            print(f"No pages found in {args.fixtures}")
+            sys.exit(1)
+    else:
+        rng = random.Random(args.seed)
+        pages = [(f"recipe-{i}.html", make_page(i, rng, args.page_size)) for i in range(args.pages)]
+    
+    total_bytes = sum(len(html) for _, html in pages)
+    print(f"{len(pages)} pages, {total_bytes / len(pages) / 1024:.0f} KB average")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        scraper = WebRecipeScraper(library_path=str(Path(tmp) / "library"))
+        
+        def full_dom(html, url):
+            # What every page cost before the fast path
+            return scraper.extract_recipe(BeautifulSoup(html, 'html.parser'), url)
+        
+        print(f"\nPer-page parse time (ms):")
+        print(f"{'method':<10} {'mean':>9} {'max':>9}")
+        results = {}
+        for name, extract in (('full DOM', full_dom), ('fast path', scraper.extract_recipe_from_html)):
+            time_pages(extract, pages[:1])  # warm up
+            times, extracted = time_pages(extract, pages)
+            results[name] = (times, extracted)
+            print(f"{name:<10} {sum(times) / len(times):>9.2f} {max(times):>9.2f}")
+        
+        fast_hits = sum(1 for _, html in pages if scraper.extract_json_ld(html, 'https://example.com/') is not None)
+        mismatches = sum(1 for a, b in zip(results['full DOM'][1], results['fast path'][1]) if a != b)
+        speedup = sum(results['full DOM'][0]) / max(sum(results['fast path'][0]), 1e-9)
+        print(f"\nJSON-LD fast path used for {fast_hits}/{len(pages)} pages; {mismatches} results differ")
+        print(f"Speedup: {speedup:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Recipe Search Benchmark
+Compares FTS5 search latency against the old LIKE '%term%' scan on a synthetic library
+"""
+
+import sys
+import random
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent / "RecipeLibrarySystem"))
+
+from recipe_library_system import RecipeLibrary, RecipeEntry
+
+PROTEINS = ['chicken', 'beef', 'pork', 'salmon', 'shrimp', 'tofu', 'lamb', 'duck', 'cod', 'turkey']
+VEGETABLES = ['onion', 'garlic', 'carrot', 'celery', 'spinach', 'potato', 'tomato', 'pepper',
+              'mushroom', 'zucchini', 'broccoli', 'cabbage', 'leek', 'fennel', 'kale']
+PANTRY = ['flour', 'sugar', 'butter', 'olive oil', 'cream', 'rice', 'pasta', 'stock',
+          'vinegar', 'honey', 'soy sauce', 'paprika', 'cumin', 'basil', 'thyme']
+METHODS = ['roasted', 'braised', 'grilled', 'seared', 'poached', 'fried', 'smoked', 'stewed']
+DISHES = ['soup', 'salad', 'curry', 'stew', 'tart', 'risotto', 'tacos', 'casserole', 'pie', 'bowl']
+CUISINES = ['italian', 'mexican', 'asian', 'french', 'american', 'mediterranean', 'indian']
+UNITS = ['cup', 'cups', 'tbsp', 'tsp', 'lb', 'oz', 'g', 'each']
+
+
+def make_recipe(index: int, rng: random.Random) -> RecipeEntry:
+    """Build one synthetic recipe entry."""
+    protein = rng.choice(PROTEINS)
+    vegetables = rng.sample(VEGETABLES, 3)
+    pantry = rng.sample(PANTRY, 4)
+    title = f"{rng.choice(METHODS).title()} {protein.title()} {rng.choice(DISHES).title()} {index}"
+    ingredients = '\n'.join(f"{rng.randint(1, 4)} {rng.choice(UNITS)} {item}"
+                            for item in [protein] + vegetables + pantry)
+    cuisine = rng.choice(CUISINES)
+    preview = (f"{title}\nIngredients:\n{ingredients}\nInstructions: Preheat the oven. "
+               f"Cook the {protein} with {vegetables[0]} and {pantry[0]} until tender. "
+               f"Simmer {rng.randint(10, 90)} minutes. Serves {rng.randint(2, 8)}.")
+    now = datetime.now()
+    return RecipeEntry(
+        id=f"bench{index:08d}",
+        file_name=f"recipe_{index}.md",
+        file_path=f"/bench/recipe_{index}.md",
+        file_extension='.md',
+        file_size=len(preview),
+        created_date=now,
+        modified_date=now,
+        title=title,
+        category='recipe',
+        cuisine_type=cuisine,
+        difficulty=rng.choice(['easy', 'medium', 'hard']),
+        cooking_time='30 minutes',
+        servings='4 servings',
+        tags=[cuisine],
+        confidence_score=rng.random(),
+        content_preview=preview[:500],
+        library_path=f"/bench/library/{index}.md",
+        ingredients=ingredients
+    )
+
+
+def make_queries(count: int, rng: random.Random) -> List[str]:
+    """Mix of full words, two-word queries and as-you-type prefixes."""
+    words = PROTEINS + VEGETABLES + METHODS + DISHES + ['olive', 'soy', 'cumin', 'honey']
+    queries = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            queries.append(rng.choice(words))
+        elif kind < 0.7:
+            queries.append(f"{rng.choice(PROTEINS)} {rng.choice(DISHES)}")
+        else:
+            word = rng.choice(words)
+            queries.append(word[:rng.randint(3, max(3, len(word) - 1))])
+    return queries
+
+
+def time_queries(search: Callable[[str], object], queries: List[str]) -> List[float]:
+    """Run each query once and return latencies in milliseconds."""
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def main():
+    """Build a synthetic library and report p50/p99 search latency."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Benchmark recipe search (FTS5 vs LIKE)')
+    parser.add_argument('--recipes', type=int, default=100000, help='Number of synthetic recipes')
+    parser.add_argument('--queries', type=int, default=500, help='Number of search queries to time')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        library = RecipeLibrary(library_path=str(Path(tmp) / "library"),
+                                source_folder=str(Path(tmp) / "source"))
+        
+        print(f"Building library with {args.recipes:,} recipes...")
+        start = time.perf_counter()
+        batch_size = 5000
+        for offset in range(0, args.recipes, batch_size):
+            batch = [make_recipe(i, rng) for i in range(offset, min(offset + batch_size, args.recipes))]
+            with library.db.batch() as conn:
+                library._write_recipes(conn.cursor(), batch)
+        print(f"  built in {time.perf_counter() - start:.1f}s (index maintained by triggers)")
+        
+        queries = make_queries(args.queries, rng)
+        cursor = library.db.connection().cursor()
+        
+        def like_search(text):
+            # The query search_recipes ran before the FTS index
+            pattern = f"%{text}%"
+            cursor.execute("SELECT * FROM recipes WHERE 1=1 AND (title LIKE ? OR content_preview LIKE ?) "
+                           "ORDER BY confidence_score DESC LIMIT ?", (pattern, pattern, 50))
+            return cursor.fetchall()
+        
+        def fts_search(text):
+            return library.search_recipes(search_text=text, limit=50)
+        
+        # Warm the page cache so both runs start equal
+        like_search('warmup')
+        fts_search('warmup')
+        
+        print(f"\nTiming {len(queries)} queries (ms):")
+        print(f"{'method':<8} {'p50':>9} {'p99':>9} {'max':>9}")
+        results = {}
+        for name, search in (('LIKE', like_search), ('FTS5', fts_search)):
+            latencies = time_queries(search, queries)
+            results[name] = latencies
+            print(f"{name:<8} {percentile(latencies, 50):>9.2f} {percentile(latencies, 99):>9.2f} "
+                  f"{max(latencies):>9.2f}")
+        
+        speedup = percentile(results['LIKE'], 50) / max(percentile(results['FTS5'], 50), 1e-9)
+        print(f"\nFTS5 p50 speedup: {speedup:.1f}x")
+        
+        library.db.close_all()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Vendor Price Benchmark
+Compares bulk vendor price upserts and lookups against the row-at-a-time call pattern
+"""
+
+import sys
+import random
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ingredient_database import IngredientDatabase
+
+VENDORS = ['Sysco', 'US Foods', 'Restaurant Depot', 'Gordon', 'Costco', 'Baldor',
+           'Chefs Warehouse', 'Shamrock', 'PFG', 'Local Farm']
+UNITS = ['lb', 'kg', 'each', 'case', 'gal', None]
+
+
+def add_ingredients(db: IngredientDatabase, count: int) -> List[int]:
+    """Insert synthetic ingredients and return their IDs."""
+    now = datetime.now().isoformat()
+    with db.db.batch() as conn:
+        conn.executemany('''
+            INSERT OR IGNORE INTO ingredients (name, category, default_unit, created_date, updated_date)
+            VALUES (?, 'Bench', 'lb', ?, ?)
+        ''', [(f"Bench Ingredient {i}", now, now) for i in range(count)])
+        cursor = conn.execute("SELECT id FROM ingredients WHERE category = 'Bench' ORDER BY id")
+        return [row[0] for row in cursor.fetchall()]
+
+
+def make_rows(ingredient_ids: List[int], count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """Build vendor price rows, cycling vendors so each (ingredient, vendor) pair is distinct."""
+    rows = []
+    for i in range(count):
+        rows.append({
+            'ingredient_id': ingredient_ids[i % len(ingredient_ids)],
+            'vendor_name': VENDORS[(i // len(ingredient_ids)) % len(VENDORS)],
+            'ap_cost': round(rng.uniform(0.5, 80.0), 2),
+            'cost_unit': rng.choice(UNITS),
+            'notes': "Benchmark"
+        })
+    return rows
+
+
+def add_price_row(db: IngredientDatabase, ingredient_id: int, vendor_name: str, ap_cost: float,
+                  cost_unit: str, notes: str):
+    """One price the way the importer wrote it before: find the row, update or insert, log history."""
+    now = datetime.now().isoformat()
+    with db.db.batch() as conn:
+        cursor = conn.execute("SELECT id FROM vendor_prices WHERE ingredient_id = ? AND vendor_name = ?",
+                              (ingredient_id, vendor_name))
+        existing = cursor.fetchone()
+        if existing:
+            conn.execute('''
+                UPDATE vendor_prices SET ap_cost = ?, cost_unit = ?, last_updated = ?, notes = ?
+                WHERE id = ?
+            ''', (ap_cost, cost_unit, now, notes, existing['id']))
+        else:
+            conn.execute('''
+                INSERT INTO vendor_prices (ingredient_id, vendor_name, ap_cost, cost_unit, last_updated, notes)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (ingredient_id, vendor_name, ap_cost, cost_unit, now, notes))
+        conn.execute('''
+            INSERT INTO cost_history (ingredient_id, vendor, ap_cost, cost_unit, date, notes)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (ingredient_id, vendor_name, ap_cost, cost_unit, now, notes))
+
+
+def row_at_a_time(db: IngredientDatabase, rows: List[Dict[str, Any]]):
+    """The old importer pattern: look up the ingredient, then write one price per transaction."""
+    for row in rows:
+        ingredient = db.get_ingredient(row['ingredient_id'])
+        add_price_row(db, row['ingredient_id'], row['vendor_name'], row['ap_cost'],
+                      row['cost_unit'] or ingredient['default_unit'], row['notes'])
+
+
+def read_one_at_a_time(db: IngredientDatabase, ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """One vendor price query per ingredient, as the dashboard made them."""
+    cursor = db.db.connection().cursor()
+    prices = {}
+    for ingredient_id in ids:
+        cursor.execute('''
+            SELECT * FROM vendor_prices WHERE ingredient_id = ? ORDER BY is_preferred DESC, ap_cost
+        ''', (ingredient_id,))
+        prices[ingredient_id] = [dict(row) for row in cursor.fetchall()]
+    return prices
+
+
+def timed(label: str, func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<36} {elapsed:>8.2f}s")
+    return elapsed
+
+
+def main():
+    """Report write and read times for 50k vendor prices."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Benchmark vendor price upserts and lookups')
+    parser.add_argument('--rows', type=int, default=50000, help='Number of vendor price rows')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    
+    args = parser.parse_args()
+    ingredient_count = max(1, args.rows // len(VENDORS))
+    
+    results = {}
+    written = {}
+    for mode in ('row', 'bulk'):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = IngredientDatabase(str(Path(tmp) / "ingredients.db"))
+            ids = add_ingredients(db, ingredient_count)
+            # A fresh generator per mode, so both write exactly the same prices
+            rows = make_rows(ids, args.rows, random.Random(args.seed))
+            
+            print(f"\n{mode} ({args.rows:,} prices over {len(ids):,} ingredients):")
+            if mode == 'row':
+                results['row_insert'] = timed('insert (get_ingredient + row write)', row_at_a_time, db, rows)
+                results['row_update'] = timed('update (get_ingredient + row write)', row_at_a_time, db, rows)
+                results['row_read'] = timed('read (one query per id)', read_one_at_a_time, db, ids)
+            else:
+                results['bulk_insert'] = timed('insert (upsert_vendor_prices)', db.upsert_vendor_prices, rows)
+                results['bulk_update'] = timed('update (upsert_vendor_prices)', db.upsert_vendor_prices, rows)
+                results['bulk_read'] = timed('read (get_vendor_prices(ids))', db.get_vendor_prices, ids)
+            
+            cursor = db.db.connection().execute(
+                "SELECT ingredient_id, vendor_name, ap_cost, cost_unit FROM vendor_prices ORDER BY 1, 2")
+            written[mode] = [tuple(row) for row in cursor.fetchall()]
+            db.db.close_all()
+    
+    print("\nSpeedup:")
+    for phase in ('insert', 'update', 'read'):
+        speedup = results[f'row_{phase}'] / max(results[f'bulk_{phase}'], 1e-9)
+        print(f"  {phase:<8} {speedup:>6.1f}x")
+    print(f"\nSame prices written by both modes: {'yes' if written['row'] == written['bulk'] else 'NO'}")
+
+if __name__ == "__main__":
+    main()
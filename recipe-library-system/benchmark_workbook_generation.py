@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Workbook Generation Benchmark
+Iterum output workbooks built object by object with openpyxl against cloning the compiled template
+"""
+
+import sys
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from openpyxl import load_workbook
+from standardize_recipes import IterumRecipeConverter, INGREDIENT_FIELDS
+
+WORDS = ['chicken', 'garlic', 'butter', 'roasted', 'lemon', 'thyme', 'onion', 'shallot',
+         'cream', 'stock', 'parsley', 'flour', 'sugar', 'olive oil', 'salt', 'pepper']
+UNITS = ['lb', 'oz', 'each', 'qt', 'cup', 'tbsp', '']
+
+Recipe = Tuple[Dict[str, Any], List[Dict[str, Any]], str]
+
+
+def make_recipes(count: int, rng: random.Random) -> List[Recipe]:
+    """Synthetic (recipe_data, ingredients, method) triples shaped like extracted recipes."""
+    recipes = []
+    for index in range(count):
+        recipe_data = {
+            'title': f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {index}",
+            'cuisine': rng.choice(['italian', 'french', 'american', 'unknown']),
+            'category': rng.choice(['entree', 'sauce', 'dessert', 'recipe']),
+            'servings': rng.randint(1, 24)
+        }
+        ingredients = []
+        for _ in range(rng.randint(5, 25)):
+            values = [rng.choice(WORDS), rng.randint(1, 10), round(rng.uniform(0.1, 5), 2), '',
+                      round(rng.uniform(0.5, 30), 2), rng.choice(UNITS), rng.choice([100, 85, 70]), '', '']
+            ingredients.append(dict(zip(INGREDIENT_FIELDS, values)))
+        method = '\n'.join(f"{rng.choice(WORDS).title()} the {rng.choice(WORDS)} until done."
+                           for _ in range(rng.randint(0, 12)))
+        recipes.append((recipe_data, ingredients, method))
+    return recipes
+
+
+def legacy(converter: IterumRecipeConverter, recipes: List[Recipe], output_dir: Path):
+    """The old path: a new openpyxl workbook with every style and label per recipe."""
+    for index, (recipe_data, ingredients, method) in enumerate(recipes):
+        converter.build_workbook(recipe_data, ingredients, method).save(output_dir / f"{index}.xlsx")
+
+
+def template(converter: IterumRecipeConverter, recipes: List[Recipe], output_dir: Path):
+    """Clone the compiled template, writing only each recipe's cells (includes compiling it)."""
+    converter._template = None
+    for index, (recipe_data, ingredients, method) in enumerate(recipes):
+        converter.template.save(output_dir / f"{index}.xlsx",
+                                converter.render_workbook(recipe_data, ingredients, method))
+
+
+def read_back(path: Path) -> List[Tuple]:
+    """Values and fonts of every written cell, for comparing outputs."""
+    ws = load_workbook(path).active
+    return [(cell.coordinate, cell.value, cell.font.b, cell.font.i, cell.font.sz, cell.fill.fgColor.rgb)
+            for row in ws.iter_rows() for cell in row if cell.value is not None]
+
+
+def timed(label: str, func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<36} {elapsed:>8.2f}s")
+    return elapsed
+
+
+def main():
+    """Report generation times for 1,000 Iterum workbooks."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Benchmark Iterum workbook generation')
+    parser.add_argument('--recipes', type=int, default=1000, help='Number of workbooks to write')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--check', type=int, default=25, help='Outputs compared between the two paths')
+    
+    args = parser.parse_args()
+    recipes = make_recipes(args.recipes, random.Random(args.seed))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        converter = IterumRecipeConverter(tmp / "library", tmp / "converted")
+        (tmp / "legacy").mkdir()
+        (tmp / "template").mkdir()
+        
+        print(f"\nWriting {args.recipes:,} workbooks:")
+        legacy_time = timed('openpyxl per recipe (build_workbook)', legacy, converter, recipes, tmp / "legacy")
+        template_time = timed('compiled template clone', template, converter, recipes, tmp / "template")
+        
+        mismatched = [index for index in range(min(args.check, args.recipes))
+                      if read_back(tmp / "legacy" / f"{index}.xlsx") != read_back(tmp / "template" / f"{index}.xlsx")]
+        
+        converter.db.close_all()
+    
+    print(f"\n  Per workbook: {legacy_time / args.recipes * 1000:.2f} ms -> {template_time / args.recipes * 1000:.2f} ms")
+    print(f"  Speedup: {legacy_time / max(template_time, 1e-9):.1f}x")
+    print(f"  Outputs compared: {min(args.check, args.recipes)}, mismatched: {len(mismatched)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Blob Store
+Stores library files once per content hash, with reference counts in SQLite
+"""
+
+import os
+import re
+import shutil
+import hashlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Read size for streaming hashes
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Hex digest length; matches the 32-character names already in the library
+DIGEST_SIZE = 16
+
+# Library files named by a hash: 32 hex characters plus an optional extension
+BLOB_NAME = re.compile(r'^[0-9a-f]{32}(\.[^.]+)?$')
+
+# Linux FICLONE ioctl (copy-on-write clone on btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+
+def hash_file(path: Path, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """Stream a file through BLAKE2b and return the hex digest."""
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            digest.update(view[:size])
+    
+    return digest.hexdigest()
+
+
+def link_or_copy(source: Path, dest: Path, hardlink: bool = False) -> str:
+    """
+    Materialize source at dest as cheaply as the filesystem allows.
+    
+    Tries a hard link (only if requested, since edits to the source would
+    then show through), then a copy-on-write reflink, then a plain copy.
+    The file appears at dest atomically. Returns the method used.
+    """
+    temp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+    try:
+        if hardlink:
+            try:
+                os.link(source, temp)
+                os.replace(temp, dest)
+                return 'hardlink'
+            except OSError:
+                pass
+        
+        if fcntl is not None:
+            try:
+                with open(source, 'rb') as src, open(temp, 'wb') as dst:
+                    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                shutil.copystat(source, temp)
+                os.replace(temp, dest)
+                return 'reflink'
+            except OSError:
+                pass
+        
+        shutil.copy2(source, temp)
+        os.replace(temp, dest)
+        return 'copy'
+    finally:
+        if temp.exists():
+            temp.unlink()
+
+
+class BlobStore:
+    """
+    Content-addressed file store in the library directory.
+    
+    Each distinct file content is stored once as <blake2b digest><extension>.
+    The blobs table counts how many references (source files) point at each
+    blob; blob_refs maps every reference to its current blob, so re-importing
+    an unchanged file is a no-op and an edited file releases its old blob.
+    
+    store() only touches the filesystem, so it is safe in scan worker
+    processes; reference updates run inside the caller's transaction.
+    collect_garbage() removes blobs while holding the write lock, so a blob
+    that store() found in place can disappear before its reference is
+    written; writers call restore() for such blobs once they hold the lock.
+    """
+    
+    def __init__(self, root: Path, db, hardlink: bool = False):
+        """
+        Args:
+            root: Library directory holding the blobs
+            db: ConnectionManager for the library database
+            hardlink: Hard-link sources into the store (only for sources that are never edited in place)
+        """
+        self.root = Path(root)
+        self.db = db
+        self.hardlink = hardlink
+    
+    def create_schema(self, cursor):
+        """Create the blob and reference tables using an open cursor."""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS blobs (
+                file_name TEXT PRIMARY KEY,
+                size INTEGER,
+                refcount INTEGER NOT NULL DEFAULT 0,
+                created_date TEXT
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS blob_refs (
+                ref TEXT PRIMARY KEY,
+                file_name TEXT NOT NULL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_blob_refs_file ON blob_refs(file_name)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_blobs_refcount ON blobs(refcount)')
+    
+    def blob_path(self, digest: str, extension: str = "") -> Path:
+        """Path of the blob for a digest."""
+        return self.root / f"{digest}{extension}"
+    
+    def store(self, source: Path, digest: Optional[str] = None) -> Path:
+        """Add a file's content to the store (if not already there) and return the blob path."""
+        source = Path(source)
+        digest = digest or hash_file(source)
+        dest = self.blob_path(digest, source.suffix)
+        
+        if not dest.exists():
+            method = link_or_copy(source, dest, self.hardlink)
+            logger.info(f"Stored in library ({method}): {dest.name}")
+        
+        return dest
+    
+    def restore(self, source: Path, digest: str) -> Optional[Path]:
+        """
+        Re-store a blob that was collected after store() returned it.
+        
+        Call with the write lock held (inside the transaction adding the
+        reference), so no collection can run in between. Returns None if
+        the source no longer has this content.
+        """
+        source = Path(source)
+        try:
+            if hash_file(source) != digest:
+                logger.warning(f"Cannot restore {digest}: {source} has changed")
+                return None
+        except OSError as e:
+            logger.warning(f"Cannot restore {digest} from {source}: {e}")
+            return None
+        return self.store(source, digest)
+    
+    def add_refs(self, cursor, refs: Iterable[Tuple[str, str, int]]):
+        """
+        Point references at blobs and adjust reference counts.
+        
+        Args:
+            cursor: Cursor inside the caller's transaction
+            refs: (reference, blob file name, size) tuples; the reference is usually the source path
+        """
+        now = datetime.now().isoformat()
+        for ref, file_name, size in refs:
+            cursor.execute("SELECT file_name FROM blob_refs WHERE ref = ?", (ref,))
+            row = cursor.fetchone()
+            if row and row[0] == file_name:
+                continue
+            if row:
+                cursor.execute("UPDATE blobs SET refcount = refcount - 1 WHERE file_name = ?", (row[0],))
+            
+            cursor.execute('''
+                INSERT INTO blobs (file_name, size, refcount, created_date) VALUES (?, ?, 1, ?)
+                ON CONFLICT(file_name) DO UPDATE SET refcount = refcount + 1
+            ''', (file_name, size, now))
+            cursor.execute("INSERT OR REPLACE INTO blob_refs (ref, file_name) VALUES (?, ?)", (ref, file_name))
+    
+    def rebuild_refs(self, cursor, refs: Iterable[Tuple[str, str, int]]):
+        """Replace every reference and recount from scratch (used after a dedupe)."""
+        cursor.execute("DELETE FROM blob_refs")
+        cursor.execute("DELETE FROM blobs")
+        self.add_refs(cursor, refs)
+    
+    def collect_garbage(self) -> int:
+        """
+        Delete blobs nothing refers to any more. Returns bytes freed.
+        
+        Runs in one immediate write transaction, the lock add_refs() writes
+        under, so no reference can be added between choosing a blob and
+        unlinking it. Each row is deleted only if its count is still zero.
+        A crash after an unlink leaves a zero-count row without its file,
+        which the next collection removes (or restore() refills).
+        """
+        removed = 0
+        freed = 0
+        with self.db.batch(immediate=True) as conn:
+            cursor = conn.execute("SELECT file_name FROM blobs WHERE refcount <= 0")
+            for name in [row[0] for row in cursor.fetchall()]:
+                cursor = conn.execute("DELETE FROM blobs WHERE file_name = ? AND refcount <= 0", (name,))
+                if not cursor.rowcount:
+                    continue
+                removed += 1
+                path = self.root / name
+                try:
+                    size = path.stat().st_size
+                    path.unlink()
+                    freed += size
+                except OSError:
+                    continue
+        
+        if removed:
+            logger.info(f"Removed {removed} unreferenced blobs ({freed:,} bytes)")
+        return freed
+    
+    def find_duplicates(self) -> Dict[Tuple[str, str], List[Path]]:
+        """Hash every hash-named library file, grouped by (digest, extension)."""
+        groups: Dict[Tuple[str, str], List[Path]] = {}
+        for path in sorted(self.root.iterdir()):
+            if not path.is_file() or not BLOB_NAME.match(path.name):
+                continue
+            try:
+                digest = hash_file(path)
+            except OSError as e:
+                logger.warning(f"Could not hash {path.name}: {e}")
+                continue
+            groups.setdefault((digest, path.suffix), []).append(path)
+        return groups
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Crawl Frontier
+Persistent, resumable crawl queue in SQLite that several worker processes can share
+"""
+
+import os
+import json
+import uuid
+import socket
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from db_connection import get_connection_manager
+
+# Page states: queued -> in_progress -> done | recipe | failed (or blocked by robots.txt)
+QUEUED = 'queued'
+IN_PROGRESS = 'in_progress'
+DONE = 'done'
+RECIPE = 'recipe'
+FAILED = 'failed'
+BLOCKED = 'blocked'
+
+# States that count towards max_pages (for pages claimed in the current run)
+VISITED_STATES = (IN_PROGRESS, DONE, RECIPE, FAILED)
+
+# A claim older than this belongs to a worker that died; its page can be claimed again
+STALE_CLAIM_SECONDS = 300
+
+EXTRACTION_FAILED = 'Could not extract recipe data'
+
+
+class CrawlFrontier:
+    """
+    Crawl state for one site: every discovered URL with its state,
+    priority, depth, fetch time and error, plus the recipe extracted from
+    each recipe page.
+    
+    Workers claim queued URLs atomically (highest priority first, then in
+    discovery order), so any number of threads or processes can crawl
+    from the same database file. Stopping a crawl leaves the queue on
+    disk; running it again against the same file resumes where it left off.
+    URLs seeded from sitemaps keep their lastmod, so a later crawl only
+    requeues pages that changed since they were fetched.
+    
+    Each claim is tagged with the run that made it, and the max_visited
+    budget only counts pages visited in that run, so a resumed or repeated
+    crawl gets a fresh budget instead of inheriting every earlier visit.
+    """
+    
+    def __init__(self, db_path: Union[str, Path], worker_id: Optional[str] = None,
+                 run_id: Optional[str] = None):
+        """
+        Args:
+            db_path: SQLite database file for the crawl state
+            worker_id: Name recorded on claims (default: host:pid)
+            run_id: Crawl run recorded on claims; frontiers given the same run_id
+                share one page budget (default: a new run)
+        """
+        self.db_path = Path(db_path)
+        self.db = get_connection_manager(self.db_path)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.run_id = run_id or uuid.uuid4().hex
+        self._create_schema()
+    
+    def _create_schema(self):
+        with self.db.batch() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS frontier (
+                    url TEXT PRIMARY KEY,
+                    state TEXT NOT NULL DEFAULT 'queued',
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    depth INTEGER NOT NULL DEFAULT 0,
+                    discovered_date TEXT,
+                    last_fetched TEXT,
+                    error TEXT,
+                    claimed_by TEXT,
+                    claimed_at TEXT,
+                    recipe TEXT,
+                    lastmod TEXT,
+                    run_id TEXT
+                )
+            ''')
+            # Frontiers created before sitemap seeding (or per-run budgets) lack these columns
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(frontier)")}
+            if 'lastmod' not in columns:
+                conn.execute("ALTER TABLE frontier ADD COLUMN lastmod TEXT")
+            if 'run_id' not in columns:
+                conn.execute("ALTER TABLE frontier ADD COLUMN run_id TEXT")
+            # rowid is implicitly the last column, giving FIFO order within a priority
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_frontier_queue ON frontier(state, priority DESC)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_frontier_run ON frontier(run_id, state)')
+    
+    def add(self, urls: Iterable[Union[str, Tuple[str, int]]], depth: int = 0, priority: int = 0) -> int:
+        """
+        Queue URLs that have never been seen.
+        
+        Args:
+            urls: URLs, or (url, priority) pairs
+            depth: Link depth from the start page
+            priority: Priority for plain URLs (higher is crawled first)
+        
+        Returns:
+            Number of new URLs queued
+        """
+        with self.db.batch() as conn:
+            return self._add(conn, urls, depth, priority)
+    
+    def _add(self, conn, urls, depth: int, priority: int) -> int:
+        now = datetime.now().isoformat()
+        rows = []
+        for item in urls:
+            url, url_priority = item if isinstance(item, tuple) else (item, priority)
+            rows.append((url, url_priority, depth, now))
+        cursor = conn.executemany('''
+            INSERT OR IGNORE INTO frontier (url, priority, depth, discovered_date) VALUES (?, ?, ?, ?)
+        ''', rows)
+        return cursor.rowcount
+    
+    def add_from_sitemap(self, entries: Iterable[Tuple[str, Optional[str]]], priority: int = 0) -> Tuple[int, int]:
+        """
+        Queue URLs listed in a sitemap.
+        
+        New URLs are queued; finished pages are requeued only if their
+        lastmod is newer than the lastmod they were fetched under (or, for
+        pages first found by following links, newer than the fetch itself).
+        Pages already queued are raised to the given priority.
+        
+        Args:
+            entries: (url, lastmod) pairs; lastmod as a naive local ISO timestamp or None
+            priority: Priority for these URLs
+        
+        Returns:
+            (new URLs queued, changed pages requeued)
+        """
+        entries = list(entries)
+        now = datetime.now().isoformat()
+        with self.db.batch() as conn:
+            changed = conn.executemany('''
+                UPDATE frontier SET state = ?, priority = MAX(priority, ?), lastmod = ?,
+                    claimed_by = NULL, claimed_at = NULL
+                WHERE url = ? AND state IN (?, ?, ?) AND ? > COALESCE(lastmod, last_fetched)
+            ''', [(QUEUED, priority, lastmod, url, DONE, RECIPE, FAILED, lastmod)
+                  for url, lastmod in entries if lastmod]).rowcount
+            conn.executemany('''
+                UPDATE frontier SET priority = MAX(priority, ?), lastmod = COALESCE(?, lastmod)
+                WHERE url = ? AND state = ?
+            ''', [(priority, lastmod, url, QUEUED) for url, lastmod in entries])
+            added = conn.executemany('''
+                INSERT OR IGNORE INTO frontier (url, priority, depth, discovered_date, lastmod)
+                VALUES (?, ?, 0, ?, ?)
+            ''', [(url, priority, now, lastmod) for url, lastmod in entries]).rowcount
+        return added, changed
+    
+    def claim(self, limit: int = 1, max_visited: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Atomically take up to limit queued URLs for this worker (or URLs
+        whose claim went stale because its worker died).
+        
+        Args:
+            limit: URLs to claim
+            max_visited: Stop handing out URLs once this run has visited this many pages (max_pages)
+        
+        Returns:
+            (url, depth) pairs
+        """
+        now = datetime.now()
+        stale = (now - timedelta(seconds=STALE_CLAIM_SECONDS)).isoformat()
+        states = ','.join('?' * len(VISITED_STATES))
+        budget = f"MIN(?, ? - (SELECT COUNT(*) FROM frontier WHERE run_id = ? AND state IN ({states})))" \
+            if max_visited is not None else "?"
+        params: List[Any] = [IN_PROGRESS, self.worker_id, now.isoformat(), self.run_id,
+                             QUEUED, IN_PROGRESS, stale, limit]
+        if max_visited is not None:
+            params += [max_visited, self.run_id, *VISITED_STATES]
+        
+        # One statement, so the budget check and the claim can't interleave with another worker
+        with self.db.batch() as conn:
+            rows = conn.execute(f'''
+                UPDATE frontier SET state = ?, claimed_by = ?, claimed_at = ?, run_id = ?
+                WHERE url IN (
+                    SELECT url FROM frontier WHERE state = ? OR (state = ? AND claimed_at < ?)
+                    ORDER BY priority DESC, rowid
+                    LIMIT MAX(0, {budget})
+                )
+                RETURNING url, depth
+            ''', params).fetchall()
+        return [(row['url'], row['depth']) for row in rows]
+    
+    def finish(self, url: str, state: str, links: Iterable[Union[str, Tuple[str, int]]] = (),
+               depth: int = 0, recipe: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        """
+        Record the outcome of a claimed page and queue the links found on it, in one transaction.
+        
+        Args:
+            url: The page
+            state: DONE, RECIPE, FAILED or BLOCKED
+            links: Links to queue at depth + 1 (URLs or (url, priority) pairs)
+            depth: Depth of this page
+            recipe: Extracted recipe data for recipe pages
+            error: Failure reason
+        """
+        fetched = datetime.now().isoformat() if state != BLOCKED else None
+        with self.db.batch() as conn:
+            conn.execute('''
+                UPDATE frontier SET state = ?, last_fetched = ?, error = ?, recipe = ?,
+                    claimed_by = NULL, claimed_at = NULL
+                WHERE url = ?
+            ''', (state, fetched, error, json.dumps(recipe, ensure_ascii=False) if recipe else None, url))
+            if links:
+                self._add(conn, links, depth + 1, 0)
+    
+    def release(self, all_workers: bool = False) -> int:
+        """
+        Put unfinished claims back in the queue.
+        
+        Args:
+            all_workers: Release every worker's claims, not just this one's (only safe
+                when no other crawler is running, e.g. resuming after a crash)
+        """
+        query = "UPDATE frontier SET state = ?, claimed_by = NULL, claimed_at = NULL WHERE state = ?"
+        params: List[Any] = [QUEUED, IN_PROGRESS]
+        if not all_workers:
+            query += " AND claimed_by = ?"
+            params.append(self.worker_id)
+        with self.db.batch() as conn:
+            return conn.execute(query, params).rowcount
+    
+    def has_pending(self) -> bool:
+        """True while URLs are queued or being crawled (so more links may still appear)."""
+        cutoff = (datetime.now() - timedelta(seconds=STALE_CLAIM_SECONDS)).isoformat()
+        row = self.db.connection().execute('''
+            SELECT 1 FROM frontier
+            WHERE state = ? OR (state = ? AND claimed_at >= ?)
+            LIMIT 1
+        ''', (QUEUED, IN_PROGRESS, cutoff)).fetchone()
+        return row is not None
+    
+    def counts(self) -> Dict[str, int]:
+        """Number of URLs in each state."""
+        rows = self.db.connection().execute("SELECT state, COUNT(*) FROM frontier GROUP BY state").fetchall()
+        return {state: count for state, count in rows}
+    
+    def visited_count(self) -> int:
+        counts = self.counts()
+        return sum(counts.get(state, 0) for state in VISITED_STATES)
+    
+    def run_visited_count(self) -> int:
+        """Pages visited in this run (what max_visited is checked against)."""
+        states = ','.join('?' * len(VISITED_STATES))
+        row = self.db.connection().execute(
+            f"SELECT COUNT(*) FROM frontier WHERE run_id = ? AND state IN ({states})",
+            (self.run_id, *VISITED_STATES)).fetchone()
+        return row[0]
+    
+    def urls(self, *states: str) -> List[str]:
+        """URLs in any of the given states, in discovery order."""
+        placeholders = ','.join('?' * len(states))
+        rows = self.db.connection().execute(
+            f"SELECT url FROM frontier WHERE state IN ({placeholders}) ORDER BY rowid", states).fetchall()
+        return [row[0] for row in rows]
+    
+    def failures(self) -> List[Dict[str, str]]:
+        """Failed pages, including recipe pages whose recipe could not be extracted."""
+        rows = self.db.connection().execute('''
+            SELECT url, error FROM frontier WHERE state = ? OR (state = ? AND error IS NOT NULL)
+            ORDER BY rowid
+        ''', (FAILED, RECIPE)).fetchall()
+        return [{'url': row['url'], 'error': row['error']} for row in rows]
+    
+    def recipe_count(self) -> int:
+        row = self.db.connection().execute(
+            "SELECT COUNT(*) FROM frontier WHERE state = ? AND recipe IS NOT NULL", (RECIPE,)).fetchone()
+        return row[0]
+    
+    def iter_recipes(self) -> Iterator[Dict[str, Any]]:
+        """Stream extracted recipes in discovery order, with source_url and scraped_date."""
+        cursor = self.db.connection().execute('''
+            SELECT url, last_fetched, recipe FROM frontier
+            WHERE state = ? AND recipe IS NOT NULL ORDER BY rowid
+        ''', (RECIPE,))
+        for row in cursor:
+            recipe = json.loads(row['recipe'])
+            recipe['source_url'] = row['url']
+            recipe['scraped_date'] = row['last_fetched']
+            yield recipe
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Shared SQLite Connection Manager
+Pooled per-thread connections with tuned PRAGMAs and batched transactions
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Union
+
+
+class ConnectionManager:
+    """Hands out pooled, pre-configured SQLite connections for one database file."""
+    
+    def __init__(self, db_path: Union[str, Path], mmap_size: int = 256 * 1024 * 1024,
+                 cache_size_kb: int = 64 * 1024, timeout: float = 30.0):
+        """
+        Args:
+            db_path: Path to the SQLite database file
+            mmap_size: Bytes of the database file to memory-map
+            cache_size_kb: Page cache size per connection (KiB)
+            timeout: Seconds to wait on a locked database before failing
+        """
+        self.db_path = Path(db_path)
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
+        self.timeout = timeout
+        self._reset()
+    
+    def _reset(self):
+        """Drop all pool state (used on first init and after a fork)."""
+        self._pid = os.getpid()
+        self._local = threading.local()
+        self._idle: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+    
+    def __reduce__(self):
+        # Connections can't cross process boundaries; rebuild from the registry instead
+        return (get_connection_manager, (str(self.db_path),))
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open and configure a new connection."""
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA mmap_size={int(self.mmap_size)}')
+        conn.execute(f'PRAGMA cache_size={-int(self.cache_size_kb)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+    
+    def connection(self) -> sqlite3.Connection:
+        """
+        Get the calling thread's connection.
+        
+        The same connection is returned for every call on a thread until
+        release() hands it back to the idle pool. Callers must not close it.
+        """
+        if os.getpid() != self._pid:
+            # Forked child: inherited connections belong to the parent
+            self._reset()
+        
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = self._connect()
+            self._local.conn = conn
+            self._local.batch_depth = 0
+        return conn
+    
+    def release(self):
+        """Return the calling thread's connection to the idle pool."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        
+        self._local.conn = None
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self._idle.append(conn)
+    
+    @contextmanager
+    def batch(self, immediate: bool = False):
+        """
+        Run writes in a single transaction.
+        
+        Commits once on exit (rolls back on error). Nested batches become
+        savepoints inside the outermost transaction, so bulk callers can wrap
+        per-row helpers and a failing row only rolls back its own writes.
+        
+        Args:
+            immediate: Take the write lock up front (BEGIN IMMEDIATE), so what
+                the transaction reads cannot change before it writes. Only
+                applies when this batch starts the transaction.
+        """
+        conn = self.connection()
+        depth = self._local.batch_depth
+        savepoint = f'batch_{depth}'
+        
+        if depth > 0:
+            conn.execute(f'SAVEPOINT {savepoint}')
+        elif not conn.in_transaction:
+            conn.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+        
+        self._local.batch_depth = depth + 1
+        try:
+            yield conn
+        except BaseException:
+            self._local.batch_depth = depth
+            if depth > 0:
+                conn.execute(f'ROLLBACK TO {savepoint}')
+                conn.execute(f'RELEASE {savepoint}')
+            else:
+                conn.rollback()
+            raise
+        
+        self._local.batch_depth = depth
+        if depth > 0:
+            conn.execute(f'RELEASE {savepoint}')
+        else:
+            conn.commit()
+    
+    def close_all(self):
+        """Close the calling thread's connection and every idle connection."""
+        self.release()
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+_managers: Dict[str, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(db_path: Union[str, Path]) -> ConnectionManager:
+    """Get the shared ConnectionManager for a database file."""
+    key = str(Path(db_path).resolve())
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = ConnectionManager(db_path)
+            _managers[key] = manager
+        return manager
@@ -7,7 +7,7 @@ Thoroughly searches directories for recipe files with comprehensive analysis
 import os
 import sys
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 import sqlite3
 import hashlib
 from datetime import datetime
@@ -38,13 +38,15 @@ class EnhancedRecipeScanner:
         # Initialize library system
         self.library = RecipeLibrary(library_path=library_path)
     
-    def scan_directory_thoroughly(self, directory_path: str, recursive: bool = True) -> Dict[str, Any]:
+    def scan_directory_thoroughly(self, directory_path: str, recursive: bool = True,
+                                  progress: Optional[Callable[[int, int, str], None]] = None) -> Dict[str, Any]:
         """
         Thoroughly scan a directory for recipe files.
         
         Args:
             directory_path: Path to directory to scan
             recursive: Whether to scan subdirectories recursively
+            progress: Called as progress(files_done, total_files, file_name) while importing
             
         Returns:
             Dictionary with scan results and statistics
@@ -87,7 +89,9 @@ class EnhancedRecipeScanner:
         imported_recipes = []
         errors = []
         
-        for file_path in recipe_files:
+        for index, file_path in enumerate(recipe_files):
+            if progress:
+                progress(index, len(recipe_files), file_path.name)
             try:
                 # Temporarily set source folder to the file's directory
                 original_source = self.library.source_folder
@@ -115,6 +119,9 @@ class EnhancedRecipeScanner:
                 })
                 logger.error(f"Error processing {file_path.name}: {e}")
         
+        if progress:
+            progress(len(recipe_files), len(recipe_files), 'Done')
+        
         return {
             'success': True,
             'directory': str(directory.absolute()),
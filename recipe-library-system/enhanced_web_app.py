@@ -5,7 +5,6 @@ Modern UI with thorough directory search, conversion, missing info detection, an
 """
 
 from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, flash
-import sqlite3
 import json
 from pathlib import Path
 from datetime import datetime
@@ -21,6 +20,13 @@ from missing_info_detector import MissingInfoDetector
 from standardize_recipes import IterumRecipeConverter
 from web_recipe_scraper import WebRecipeScraper
 from website_recipe_crawler import WebsiteRecipeCrawler
+from db_connection import get_connection_manager
+from recipe_search import build_match_query, ensure_search_index, ranked_search, snippet_html
+from library_stats import ensure_library_stats, read_library_stats
+from recipe_browse import (InvalidCursor, MAX_PAGE_SIZE, PAGE_SIZE, RELEVANCE, browse_page,
+                           build_browse_filters, ensure_browse_indexes, search_page)
+from recipe_completeness import ensure_completeness_cache
+from job_queue import JobQueue, create_jobs_blueprint, job_accepted
 
 app = Flask(__name__)
 app.secret_key = 'recipe-manager-secret-key-change-this'
@@ -30,37 +36,38 @@ LIBRARY_PATH = Path("recipe_library")
 DB_PATH = LIBRARY_PATH / "recipe_library.db"
 CONVERTED_PATH = Path("converted_iterum")
 
+db = get_connection_manager(DB_PATH)
+
+# Scans, conversions, scrapes and crawls run as background jobs
+jobs = JobQueue(LIBRARY_PATH / "jobs.db")
+app.register_blueprint(create_jobs_blueprint(jobs))
+
+# One detector for every request; its analyses are cached in the library database
+detector = MissingInfoDetector(str(LIBRARY_PATH), str(CONVERTED_PATH))
+
+if DB_PATH.exists():
+    # Libraries created before full-text search, the stats table, the completeness
+    # column or the browse indexes need them built once
+    with db.batch() as conn:
+        ensure_search_index(conn.cursor())
+        ensure_library_stats(conn.cursor())
+        ensure_completeness_cache(conn.cursor())
+        ensure_browse_indexes(conn.cursor())
+
 def get_db_connection():
-    """Get database connection."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Get this thread's pooled database connection."""
+    return db.connection()
+
+@app.teardown_appcontext
+def release_db_connection(exception=None):
+    """Return the request's connection to the pool."""
+    db.release()
 
 def get_library_stats():
-    """Get library statistics."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT COUNT(*) as count FROM recipes")
-    total = cursor.fetchone()['count']
-    
-    cursor.execute("SELECT cuisine_type, COUNT(*) as count FROM recipes GROUP BY cuisine_type ORDER BY count DESC")
-    by_cuisine = {row['cuisine_type']: row['count'] for row in cursor.fetchall()}
-    
-    cursor.execute("SELECT category, COUNT(*) as count FROM recipes GROUP BY category")
-    by_category = {row['category']: row['count'] for row in cursor.fetchall()}
-    
-    cursor.execute("SELECT difficulty, COUNT(*) as count FROM recipes GROUP BY difficulty")
-    by_difficulty = {row['difficulty']: row['count'] for row in cursor.fetchall()}
-    
-    conn.close()
-    
-    return {
-        'total': total,
-        'by_cuisine': by_cuisine,
-        'by_category': by_category,
-        'by_difficulty': by_difficulty
-    }
+    """Get library statistics (read from the trigger-maintained summary table)."""
+    stats = read_library_stats(get_db_connection().cursor())
+    stats['total'] = stats['total_recipes']
+    return stats
 
 @app.route('/')
 def index():
@@ -71,7 +78,6 @@ def index():
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM recipes ORDER BY modified_date DESC LIMIT 6")
     recent_recipes = cursor.fetchall()
-    conn.close()
     
     return render_template('enhanced_index.html', stats=stats, recent_recipes=recent_recipes)
 
@@ -83,61 +89,59 @@ def recipes():
     category = request.args.get('category', '')
     difficulty = request.args.get('difficulty', '')
     search = request.args.get('search', '')
-    sort_by = request.args.get('sort', 'title')  # title, date, cuisine, difficulty
+    sort_by = request.args.get('sort', RELEVANCE)  # relevance, title, date, cuisine, difficulty
     sort_order = request.args.get('order', 'asc')  # asc, desc
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    query = "SELECT * FROM recipes WHERE 1=1"
-    params = []
-    
-    if cuisine and cuisine != 'all':
-        query += " AND cuisine_type = ?"
-        params.append(cuisine)
-    
-    if category and category != 'all':
-        query += " AND category = ?"
-        params.append(category)
+    after = request.args.get('cursor') or None
     
-    if difficulty and difficulty != 'all':
-        query += " AND difficulty = ?"
-        params.append(difficulty)
-    
-    if search:
-        query += " AND (title LIKE ? OR content_preview LIKE ?)"
-        params.extend([f'%{search}%', f'%{search}%'])
-    
-    # Add sorting
-    valid_sort_fields = {'title': 'title', 'date': 'modified_date', 'cuisine': 'cuisine_type', 'difficulty': 'difficulty'}
-    sort_field = valid_sort_fields.get(sort_by, 'title')
-    order = 'DESC' if sort_order == 'desc' else 'ASC'
-    query += f" ORDER BY {sort_field} {order}"
-    
-    cursor.execute(query, params)
-    all_recipes = cursor.fetchall()
-    conn.close()
+    cursor = get_db_connection().cursor()
+    snippets = {}
+    try:
+        if sort_by == RELEVANCE and build_match_query(search):
+            # Best matches first, with the matching text highlighted
+            filters, params = build_browse_filters(cuisine, category, difficulty)
+            all_recipes, next_cursor = search_page(cursor, search, filters, params, after=after)
+            snippets = {recipe['id']: snippet_html(recipe['snippet']) for recipe in all_recipes}
+        else:
+            # Without a search term, relevance order falls back to title order
+            filters, params = build_browse_filters(cuisine, category, difficulty, search)
+            all_recipes, next_cursor = browse_page(cursor, filters, params,
+                                                   sort=sort_by, order=sort_order, after=after)
+    except InvalidCursor:
+        # A stale or mangled cursor starts the listing over
+        return redirect(url_for('recipes', cuisine=cuisine, category=category, difficulty=difficulty,
+                                search=search, sort=sort_by, order=sort_order))
     
     stats = get_library_stats()
     
     return render_template('enhanced_recipes.html', 
                          recipes=all_recipes, 
+                         snippets=snippets,
                          stats=stats,
                          current_cuisine=cuisine,
                          current_category=category,
                          current_difficulty=difficulty,
                          current_search=search,
                          current_sort=sort_by,
-                         current_order=sort_order)
+                         current_order=sort_order,
+                         next_cursor=next_cursor,
+                         is_first_page=after is None)
 
 @app.route('/organize')
 def organize():
     """Enhanced organize page with thorough directory scanning."""
     return render_template('enhanced_organize.html')
 
+def run_scan(job, directory_path, recursive=True):
+    """Job: thoroughly scan a directory and import its recipes."""
+    scanner = EnhancedRecipeScanner()
+    return scanner.scan_directory_thoroughly(directory_path, recursive, progress=job.progress_callback)
+
+jobs.register('scan', run_scan)
+
 @app.route('/api/scan', methods=['POST'])
 def api_scan():
-    """API endpoint for thorough directory scanning."""
+    """API endpoint for thorough directory scanning (returns a job id)."""
     data = request.json
     directory_path = data.get('directory_path', '')
     recursive = data.get('recursive', True)
@@ -145,16 +149,11 @@ def api_scan():
     if not directory_path or not Path(directory_path).exists():
         return jsonify({'success': False, 'error': 'Invalid directory path'})
     
-    try:
-        scanner = EnhancedRecipeScanner()
-        result = scanner.scan_directory_thoroughly(directory_path, recursive)
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+    return job_accepted(jobs.submit('scan', directory_path=directory_path, recursive=recursive))
 
 @app.route('/api/organize', methods=['POST'])
 def api_organize():
-    """API endpoint to organize recipes."""
+    """API endpoint to organize recipes (returns a job id)."""
     data = request.json
     folder_path = data.get('folder_path', '')
     mode = data.get('mode', 'copy')
@@ -162,12 +161,7 @@ def api_organize():
     if not folder_path or not Path(folder_path).exists():
         return jsonify({'success': False, 'error': 'Invalid folder path'})
     
-    try:
-        scanner = EnhancedRecipeScanner()
-        result = scanner.scan_directory_thoroughly(folder_path, recursive=True)
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+    return job_accepted(jobs.submit('scan', directory_path=folder_path, recursive=True))
 
 @app.route('/convert')
 def convert():
@@ -176,7 +170,6 @@ def convert():
     
     # Get missing info summary
     try:
-        detector = MissingInfoDetector()
         analysis = detector.analyze_all_recipes()
         missing_info_summary = analysis['summary']
     except:
@@ -184,27 +177,30 @@ def convert():
     
     return render_template('enhanced_convert.html', stats=stats, missing_info=missing_info_summary)
 
+def run_convert(job):
+    """Job: convert all recipes to Iterum format."""
+    converter = IterumRecipeConverter()
+    converted, errors = converter.convert_all_recipes(progress=job.progress_callback)
+    
+    return {
+        'success': True,
+        'converted': len(converted),
+        'skipped': len(converter.skipped),
+        'errors': len(errors),
+        'error_details': [{'title': t, 'error': e} for t, e in errors]
+    }
+
+jobs.register('convert', run_convert)
+
 @app.route('/api/convert', methods=['POST'])
 def api_convert():
-    """API endpoint to convert recipes to Iterum format."""
-    try:
-        converter = IterumRecipeConverter()
-        converted, errors = converter.convert_all_recipes()
-        
-        return jsonify({
-            'success': True,
-            'converted': len(converted),
-            'errors': len(errors),
-            'error_details': [{'title': t, 'error': e} for t, e in errors]
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+    """API endpoint to convert recipes to Iterum format (returns a job id)."""
+    return job_accepted(jobs.submit('convert'))
 
 @app.route('/missing-info')
 def missing_info():
     """Page showing missing information analysis."""
     try:
-        detector = MissingInfoDetector()
         analysis = detector.analyze_all_recipes()
         return render_template('missing_info.html', analysis=analysis)
     except Exception as e:
@@ -218,8 +214,6 @@ def api_missing_info():
         recipe_id = request.args.get('recipe_id')
         file_path = request.args.get('file_path')
         
-        detector = MissingInfoDetector()
-        
         if recipe_id:
             analysis = detector.analyze_recipe(recipe_id=recipe_id)
         elif file_path:
@@ -238,7 +232,6 @@ def recipe_detail(recipe_id):
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM recipes WHERE id = ?", (recipe_id,))
     recipe = cursor.fetchone()
-    conn.close()
     
     if not recipe:
         flash('Recipe not found', 'error')
@@ -246,13 +239,30 @@ def recipe_detail(recipe_id):
     
     # Get missing info for this recipe
     try:
-        detector = MissingInfoDetector()
         missing_info = detector.analyze_recipe(recipe_id=recipe_id)
     except:
         missing_info = None
     
     return render_template('enhanced_recipe_detail.html', recipe=recipe, missing_info=missing_info)
 
+@app.route('/api/recipes', methods=['GET'])
+def api_recipes():
+    """API endpoint for browsing recipes a page at a time (pass next_cursor back as ?cursor=)."""
+    filters, params = build_browse_filters(request.args.get('cuisine', ''), request.args.get('category', ''),
+                                           request.args.get('difficulty', ''), request.args.get('search', ''),
+                                           request.args.get('min_completeness', type=float),
+                                           request.args.get('max_completeness', type=float))
+    try:
+        limit = min(max(int(request.args.get('limit', PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        rows, next_cursor = browse_page(get_db_connection().cursor(), filters, params,
+                                        sort=request.args.get('sort', 'title'),
+                                        order=request.args.get('order', 'asc'),
+                                        after=request.args.get('cursor') or None, limit=limit)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    return jsonify({'success': True, 'recipes': [dict(row) for row in rows], 'next_cursor': next_cursor})
+
 @app.route('/api/search', methods=['GET'])
 def api_search():
     """API endpoint for quick search."""
@@ -263,15 +273,11 @@ def api_search():
     
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("""
-        SELECT id, title, cuisine_type, category 
-        FROM recipes 
-        WHERE title LIKE ? OR content_preview LIKE ?
-        LIMIT 10
-    """, (f'%{query}%', f'%{query}%'))
+    rows = ranked_search(cursor, query,
+                         columns="recipes.id, recipes.title, recipes.cuisine_type, recipes.category",
+                         limit=10)
     
-    results = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+    results = [dict(row) for row in rows]
     
     return jsonify({'results': results})
 
@@ -285,51 +291,90 @@ def crawl():
     """Website crawling page."""
     return render_template('enhanced_crawl.html')
 
+def run_scrape(job, url='', urls=None):
+    """Job: scrape one recipe URL, or several."""
+    scraper = WebRecipeScraper(library_path=str(LIBRARY_PATH))
+    
+    if urls:
+        # Multiple URLs
+        results = scraper.scrape_multiple(urls, progress=job.progress_callback)
+        return {
+            'success': True,
+            'results': results
+        }
+    
+    # Single URL
+    job.progress(0, 1, url)
+    recipe_entry = scraper.scrape_and_import(url)
+    if recipe_entry:
+        return {
+            'success': True,
+            'recipe': {
+                'id': recipe_entry.id,
+                'title': recipe_entry.title,
+                'cuisine': recipe_entry.cuisine_type,
+                'category': recipe_entry.category
+            }
+        }
+    return {
+        'success': False,
+        'error': 'Could not extract recipe from URL'
+    }
+
+jobs.register('scrape', run_scrape)
+
 @app.route('/api/scrape', methods=['POST'])
 def api_scrape():
-    """API endpoint for scraping recipes from URLs."""
-    try:
-        data = request.get_json()
-        url = data.get('url', '').strip()
-        urls = data.get('urls', [])
-        
-        if not url and not urls:
-            return jsonify({'success': False, 'error': 'No URL provided'})
-        
-        scraper = WebRecipeScraper(library_path=str(LIBRARY_PATH))
-        
-        if urls:
-            # Multiple URLs
-            results = scraper.scrape_multiple(urls)
-            return jsonify({
-                'success': True,
-                'results': results
-            })
-        else:
-            # Single URL
-            recipe_entry = scraper.scrape_and_import(url)
-            if recipe_entry:
-                return jsonify({
-                    'success': True,
-                    'recipe': {
-                        'id': recipe_entry.id,
-                        'title': recipe_entry.title,
-                        'cuisine': recipe_entry.cuisine_type,
-                        'category': recipe_entry.category
-                    }
-                })
-            else:
-                return jsonify({
-                    'success': False,
-                    'error': 'Could not extract recipe from URL'
-                })
-                
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+    """API endpoint for scraping recipes from URLs (returns a job id)."""
+    data = request.get_json()
+    url = data.get('url', '').strip()
+    urls = data.get('urls', [])
+    
+    if not url and not urls:
+        return jsonify({'success': False, 'error': 'No URL provided'})
+    
+    return job_accepted(jobs.submit('scrape', url=url, urls=urls))
+
+def run_crawl(job, url, format_type='json', max_pages=100, delay=1.0, crawl_only=False):
+    """Job: crawl a website for recipes and export them; cancelling stops the crawl and exports what was found."""
+    crawler = WebsiteRecipeCrawler(
+        base_url=url,
+        max_pages=max_pages,
+        delay=delay,
+        progress=job.progress
+    )
+    job.on_cancel(crawler.pause)
+    
+    if crawl_only:
+        # Just crawl, don't scrape
+        results = crawler.crawl()
+        return {
+            'success': True,
+            'crawl_only': True,
+            'results': results
+        }
+    
+    # Full crawl and export
+    results = crawler.crawl_and_export(format=format_type)
+    
+    if results['success']:
+        return {
+            'success': True,
+            'output_file': results['output_file'],
+            'recipes_count': results['recipes_count'],
+            'crawl_results': results['crawl_results']
+        }
+    return {
+        'success': False,
+        'error': results.get('error', 'Unknown error'),
+        'crawl_results': results.get('crawl_results', {})
+    }
+
+jobs.register('crawl', run_crawl)
 
 @app.route('/api/crawl', methods=['POST'])
 def api_crawl():
-    """API endpoint for crawling websites."""
+    """API endpoint for crawling websites (returns a job id)."""
     try:
         data = request.get_json()
         url = data.get('url', '').strip()
@@ -337,44 +382,14 @@ def api_crawl():
         max_pages = int(data.get('max_pages', 100))
         delay = float(data.get('delay', 1.0))
         crawl_only = data.get('crawl_only', False)
-        
-        if not url:
-            return jsonify({'success': False, 'error': 'No URL provided'})
-        
-        crawler = WebsiteRecipeCrawler(
-            base_url=url,
-            max_pages=max_pages,
-            delay=delay
-        )
-        
-        if crawl_only:
-            # Just crawl, don't scrape
-            results = crawler.crawl()
-            return jsonify({
-                'success': True,
-                'crawl_only': True,
-                'results': results
-            })
-        else:
-            # Full crawl and export
-            results = crawler.crawl_and_export(format=format_type)
-            
-            if results['success']:
-                return jsonify({
-                    'success': True,
-                    'output_file': results['output_file'],
-                    'recipes_count': results['recipes_count'],
-                    'crawl_results': results['crawl_results']
-                })
-            else:
-                return jsonify({
-                    'success': False,
-                    'error': results.get('error', 'Unknown error'),
-                    'crawl_results': results.get('crawl_results', {})
-                })
-                
-    except Exception as e:
+    except (TypeError, ValueError) as e:
         return jsonify({'success': False, 'error': str(e)})
+    
+    if not url:
+        return jsonify({'success': False, 'error': 'No URL provided'})
+    
+    return job_accepted(jobs.submit('crawl', url=url, format_type=format_type, max_pages=max_pages,
+                                    delay=delay, crawl_only=crawl_only))
 
 @app.route('/statistics')
 def statistics():
@@ -383,17 +398,13 @@ def statistics():
     
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM recipes")
-    all_recipes = cursor.fetchall()
     
-    total_size = sum(r['file_size'] for r in all_recipes if r['file_size'])
-    top_cuisines = sorted(stats['by_cuisine'].items(), key=lambda x: x[1], reverse=True)[:5]
+    total_size = stats['total_size']
+    top_cuisines = list(stats['by_cuisine'].items())[:5]
     
     cursor.execute("SELECT * FROM recipes ORDER BY created_date DESC LIMIT 10")
     recent = cursor.fetchall()
     
-    conn.close()
-    
     return render_template('enhanced_statistics.html', 
                          stats=stats,
                          total_size=total_size,
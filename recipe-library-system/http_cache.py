@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+HTTP Response Cache
+On-disk cache for scraper downloads with conditional revalidation and LRU eviction
+"""
+
+import os
+import gzip
+import json
+import time
+import hashlib
+import threading
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+import logging
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from db_connection import get_connection_manager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = 'http_cache'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Evict down to this fraction of max_bytes so eviction doesn't run on every store
+EVICT_TARGET = 0.9
+
+# Headers that describe the transfer rather than the (decoded) body we store
+SKIP_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'set-cookie'}
+
+
+class CacheMiss(requests.RequestException):
+    """Raised in offline mode for a URL that is not in the cache."""
+
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    """Parse a Cache-Control header into {directive: argument or None}."""
+    directives: Dict[str, Optional[str]] = {}
+    for part in value.split(','):
+        name, _, argument = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"') or None
+    return directives
+
+
+class HttpCache:
+    """
+    Caches GET responses on disk, keyed by URL.
+    
+    Bodies are stored gzip-compressed, one file per URL; an SQLite index
+    holds headers, validators (ETag / Last-Modified), freshness and last
+    access time. Fresh entries are served without a request, stale ones
+    are revalidated with a conditional GET (a 304 costs no body transfer),
+    and Cache-Control no-store / no-cache / max-age and Expires are
+    honoured. The store is bounded by size, evicting least recently used
+    entries first.
+    
+    In offline mode nothing is requested: stored responses are replayed
+    whatever their age and anything else raises CacheMiss, which makes
+    re-extraction runs deterministic.
+    """
+    
+    def __init__(self, cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR,
+                 max_bytes: int = DEFAULT_MAX_BYTES, offline: bool = False, default_ttl: float = 0):
+        """
+        Args:
+            cache_dir: Directory for the index and bodies
+            max_bytes: Size bound for stored (compressed) bodies
+            offline: Serve only from the cache, never touch the network
+            default_ttl: Seconds a response without freshness headers counts as fresh
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.default_ttl = default_ttl
+        
+        self.db = get_connection_manager(self.cache_dir / 'index.db')
+        self._create_schema()
+        
+        self._stats_lock = threading.Lock()
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+    
+    def _create_schema(self):
+        with self.db.batch() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    status INTEGER,
+                    headers TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL,
+                    expires_at REAL,
+                    last_access REAL,
+                    size INTEGER
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)')
+    
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+    
+    def body_path(self, url: str) -> Path:
+        """File holding the compressed body for a URL."""
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.gz"
+    
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 10,
+            session: Any = None) -> requests.Response:
+        """
+        GET a URL through the cache.
+        
+        Args:
+            url: URL to fetch
+            headers: Request headers
+            timeout: Request timeout (seconds)
+            session: requests.Session (or anything with a compatible get) to send requests with
+        
+        Returns:
+            A requests.Response; from_cache is True when the body came from disk
+        """
+        now = time.time()
+        entry = self._lookup(url)
+        
+        if entry is not None and (self.offline or entry['expires_at'] > now):
+            body = self._read_body(url)
+            if body is not None:
+                self._touch(url, now)
+                self._count('hits')
+                return self._build_response(url, entry, body)
+        
+        if self.offline:
+            raise CacheMiss(f"Not in HTTP cache (offline mode): {url}")
+        
+        sender = session or requests
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry['etag']:
+                request_headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                request_headers['If-Modified-Since'] = entry['last_modified']
+        
+        response = sender.get(url, headers=request_headers, timeout=timeout)
+        
+        if response.status_code == 304 and entry is not None:
+            body = self._read_body(url)
+            if body is not None:
+                stored = json.loads(entry['headers'])
+                stored.update({key: value for key, value in response.headers.items()
+                               if key.lower() not in SKIP_HEADERS})
+                self._refresh(url, stored, now)
+                self._count('revalidated')
+                return self._build_response(url, dict(entry, headers=json.dumps(stored)), body)
+            # Index without a body (deleted by hand): fetch it again unconditionally
+            response = sender.get(url, headers=headers, timeout=timeout)
+        
+        self._count('misses')
+        if response.status_code == 200:
+            self._store(url, response, now)
+        response.from_cache = False
+        return response
+    
+    def _lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        row = self.db.connection().execute("SELECT * FROM responses WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
+    
+    def _read_body(self, url: str) -> Optional[bytes]:
+        try:
+            with gzip.open(self.body_path(url), 'rb') as f:
+                return f.read()
+        except (OSError, EOFError):
+            return None
+    
+    def _touch(self, url: str, now: float):
+        with self.db.batch() as conn:
+            conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (now, url))
+    
+    def _expires_at(self, headers: Dict[str, str], now: float) -> Optional[float]:
+        """Freshness deadline from Cache-Control / Expires, or None if the response must not be stored."""
+        headers = CaseInsensitiveDict(headers)
+        directives = parse_cache_control(headers.get('Cache-Control', ''))
+        
+        if 'no-store' in directives:
+            return None
+        if 'no-cache' in directives:
+            return now
+        if directives.get('max-age'):
+            try:
+                return now + max(0, int(directives['max-age']) - int(headers.get('Age', 0) or 0))
+            except ValueError:
+                return now
+        if headers.get('Expires'):
+            try:
+                return parsedate_to_datetime(headers['Expires']).timestamp()
+            except (TypeError, ValueError):
+                return now
+        return now + self.default_ttl
+    
+    def _refresh(self, url: str, headers: Dict[str, str], now: float):
+        """Record a successful revalidation."""
+        expires_at = self._expires_at(headers, now)
+        lookup = CaseInsensitiveDict(headers)
+        with self.db.batch() as conn:
+            conn.execute('''
+                UPDATE responses SET headers = ?, etag = ?, last_modified = ?,
+                    fetched_at = ?, expires_at = ?, last_access = ?
+                WHERE url = ?
+            ''', (json.dumps(headers), lookup.get('ETag'), lookup.get('Last-Modified'),
+                  now, expires_at if expires_at is not None else now, now, url))
+    
+    def _store(self, url: str, response: requests.Response, now: float):
+        """Write a 200 response to disk unless it forbids storing."""
+        headers = {key: value for key, value in response.headers.items() if key.lower() not in SKIP_HEADERS}
+        expires_at = self._expires_at(headers, now)
+        if expires_at is None:
+            return
+        
+        path = self.body_path(url)
+        path.parent.mkdir(exist_ok=True)
+        temp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temp, 'wb') as f:
+            f.write(gzip.compress(response.content, compresslevel=6))
+        os.replace(temp, path)
+        
+        with self.db.batch() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO responses
+                    (url, status, headers, etag, last_modified, fetched_at, expires_at, last_access, size)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (url, response.status_code, json.dumps(headers), response.headers.get('ETag'),
+                  response.headers.get('Last-Modified'), now, expires_at, now, path.stat().st_size))
+        self._count('stored')
+        self._evict()
+    
+    def _evict(self):
+        """Drop least recently used entries while the cache is over max_bytes."""
+        with self.db.batch() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            
+            target = total - self.max_bytes * EVICT_TARGET
+            victims = []
+            freed = 0
+            for url, size in conn.execute("SELECT url, size FROM responses ORDER BY last_access"):
+                victims.append(url)
+                freed += size or 0
+                if freed >= target:
+                    break
+            conn.executemany("DELETE FROM responses WHERE url = ?", [(url,) for url in victims])
+        
+        for url in victims:
+            try:
+                self.body_path(url).unlink()
+            except OSError:
+                pass
+        
+        with self._stats_lock:
+            self.stats['evicted'] += len(victims)
+        logger.info(f"HTTP cache: evicted {len(victims)} entries ({freed:,} bytes)")
+    
+    def _build_response(self, url: str, entry: Dict[str, Any], body: bytes) -> requests.Response:
+        response = requests.Response()
+        response.url = url
+        response.status_code = entry['status']
+        response.headers = CaseInsensitiveDict(json.loads(entry['headers']))
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = body
+        response.from_cache = True
+        return response
+    
+    def clear(self):
+        """Remove every cached response."""
+        with self.db.batch() as conn:
+            urls = [row[0] for row in conn.execute("SELECT url FROM responses")]
+            conn.execute("DELETE FROM responses")
+        for url in urls:
+            try:
+                self.body_path(url).unlink()
+            except OSError:
+                pass
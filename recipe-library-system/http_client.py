@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Client
+Keep-alive sessions with retries, backoff and adaptive per-host rate limiting
+"""
+
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': 'gzip, deflate'
+}
+
+# Responses worth retrying; 429 and 503 also slow the host down
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+
+# Upper bound on a server-requested pause (seconds)
+MAX_RETRY_AFTER = 300.0
+
+# Recent latency (fast EWMA) above this multiple of the host's usual latency (slow EWMA)
+# for SLOW_LATENCY_STREAK responses in a row counts as the server struggling
+SLOW_LATENCY_FACTOR = 2.0
+SLOW_LATENCY_STREAK = 5
+LATENCY_EWMA_WEIGHT = 0.3
+BASELINE_EWMA_WEIGHT = 0.05
+# Responses seen before latency may slow a host down at all
+LATENCY_WARMUP = 5
+# Latency alone never slows a host below this fraction of its ceiling; 429/503 can
+LATENCY_MIN_RATE_FACTOR = 0.5
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(float(value), MAX_RETRY_AFTER)
+    try:
+        return min(max(0.0, parsedate_to_datetime(value).timestamp() - time.time()), MAX_RETRY_AFTER)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket for one host whose rate adapts to the server.
+    
+    Throttling responses halve the rate and Retry-After pauses the host.
+    Latency is a weaker signal: only a sustained rise well above the
+    host's own rolling baseline trims the rate, and never below half its
+    ceiling. While latency stays near the baseline, the rate creeps back
+    up (additive increase, multiplicative decrease). A rate of None means
+    unpaced: only Retry-After pauses apply.
+    """
+    
+    def __init__(self, rate: Optional[float], burst: int = 1, min_rate_factor: float = 0.1):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate_factor = min_rate_factor
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.latency: Optional[float] = None
+        self.baseline: Optional[float] = None
+        self.samples = 0
+        self.slow_streak = 0
+        self._lock = threading.Lock()
+    
+    def set_rate(self, rate: Optional[float]):
+        with self._lock:
+            self.max_rate = rate
+            self.rate = rate
+    
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if self.rate:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                if now >= self.paused_until and (not self.rate or self.tokens >= 1):
+                    if self.rate:
+                        self.tokens -= 1
+                    return
+                
+                wait = self.paused_until - now
+                if self.rate:
+                    wait = max(wait, (1 - self.tokens) / self.rate)
+            time.sleep(max(wait, 0.001))
+    
+    def throttled(self, retry_after: Optional[float] = None):
+        """The server asked us to slow down."""
+        with self._lock:
+            if self.rate:
+                self.rate = max(self.max_rate * self.min_rate_factor, self.rate / 2)
+                self.tokens = 0.0
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+    
+    def observe(self, latency: float):
+        """Feed a response time into the latency-based adjustment."""
+        with self._lock:
+            self.samples += 1
+            if self.latency is None:
+                self.latency = self.baseline = latency
+                return
+            self.latency = (1 - LATENCY_EWMA_WEIGHT) * self.latency + LATENCY_EWMA_WEIGHT * latency
+            slow = self.latency > SLOW_LATENCY_FACTOR * self.baseline
+            # The baseline stays put during a slowdown, or it would soon absorb it
+            if not slow:
+                self.baseline = (1 - BASELINE_EWMA_WEIGHT) * self.baseline + BASELINE_EWMA_WEIGHT * latency
+            if not self.rate or self.samples < LATENCY_WARMUP:
+                return
+            if slow:
+                self.slow_streak += 1
+                if self.slow_streak >= SLOW_LATENCY_STREAK:
+                    self.slow_streak = 0
+                    self.rate = max(self.max_rate * LATENCY_MIN_RATE_FACTOR, self.rate * 0.9)
+            else:
+                self.slow_streak = 0
+                if self.rate < self.max_rate:
+                    self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class HttpClient:
+    """
+    One HTTP client for all scrapers.
+    
+    A single requests.Session keeps connections alive and pooled per host.
+    GETs are paced by a per-host TokenBucket, and connection errors,
+    timeouts, 429 and 5xx responses are retried with exponential backoff
+    and jitter. Per-host request, retry, error and latency counters are
+    available from host_stats(). With an HttpCache, cache hits never touch
+    the network or the rate limiter.
+    """
+    
+    def __init__(self, headers: Optional[Dict[str, str]] = None, timeout: float = 10,
+                 rate: Optional[float] = None, burst: int = 1, max_retries: int = 3,
+                 backoff: float = 0.5, max_backoff: float = 30.0, pool_size: int = 10,
+                 cache: Any = None):
+        """
+        Args:
+            headers: Default request headers (merged over DEFAULT_HEADERS)
+            timeout: Request timeout (seconds)
+            rate: Maximum requests per second per host (None = unpaced)
+            burst: Requests a host may receive back to back
+            max_retries: Retries after the first attempt
+            backoff: Base delay for exponential backoff (seconds)
+            max_backoff: Cap on a single backoff delay (seconds)
+            pool_size: Keep-alive connections kept per host
+            cache: HttpCache to serve and store responses (optional)
+        """
+        self.headers = dict(DEFAULT_HEADERS, **(headers or {}))
+        self.timeout = timeout
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.cache = cache
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        
+        # What the cache sends its (conditional) requests through
+        self._transport = SimpleNamespace(get=self._send)
+    
+    def set_rate(self, rate: Optional[float]):
+        """Change the per-host rate ceiling (requests per second, None = unpaced)."""
+        with self._lock:
+            self.rate = rate
+            buckets = list(self._buckets.values())
+        for bucket in buckets:
+            bucket.set_rate(rate)
+    
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None,
+            timeout: Optional[float] = None) -> requests.Response:
+        """GET a URL (through the cache if configured); the last response is returned even if it failed."""
+        request_headers = dict(self.headers, **(headers or {}))
+        timeout = timeout or self.timeout
+        if self.cache is not None:
+            return self.cache.get(url, headers=request_headers, timeout=timeout, session=self._transport)
+        return self._send(url, headers=request_headers, timeout=timeout)
+    
+    def _host(self, host: str):
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+                self._stats[host] = {'requests': 0, 'retries': 0, 'errors': 0, 'throttled': 0,
+                                     'bytes': 0, 'latency_total': 0.0, 'latency_max': 0.0}
+            return bucket, self._stats[host]
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+        return random.uniform(delay / 2, delay)
+    
+    def _send(self, url: str, headers: Optional[Dict[str, str]] = None,
+              timeout: Optional[float] = None) -> requests.Response:
+        """Send a GET with pacing and retries."""
+        host = urlparse(url).netloc
+        bucket, stats = self._host(host)
+        
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire()
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, headers=headers, timeout=timeout or self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                with self._lock:
+                    stats['requests'] += 1
+                    stats['errors'] += 1
+                if attempt == self.max_retries:
+                    raise
+                logger.debug(f"Retrying {url} after {type(e).__name__} (attempt {attempt + 1})")
+                with self._lock:
+                    stats['retries'] += 1
+                time.sleep(self._backoff_delay(attempt))
+                continue
+            
+            latency = time.monotonic() - started
+            bucket.observe(latency)
+            with self._lock:
+                stats['requests'] += 1
+                stats['bytes'] += len(response.content)
+                stats['latency_total'] += latency
+                stats['latency_max'] = max(stats['latency_max'], latency)
+                if response.status_code >= 400:
+                    stats['errors'] += 1
+            
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+            
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if response.status_code in THROTTLE_STATUSES:
+                bucket.throttled(retry_after)
+                with self._lock:
+                    stats['throttled'] += 1
+            logger.debug(f"Retrying {url} after HTTP {response.status_code} (attempt {attempt + 1})")
+            with self._lock:
+                stats['retries'] += 1
+            response.close()
+            # Retry-After is enforced by the bucket; the backoff spreads out concurrent retries
+            time.sleep(self._backoff_delay(attempt))
+        
+        return response
+    
+    def host_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host counters: requests, retries, errors, throttled, bytes, latency and current rate."""
+        with self._lock:
+            snapshot = {host: dict(stats) for host, stats in self._stats.items()}
+            buckets = dict(self._buckets)
+        
+        for host, stats in snapshot.items():
+            latency_total = stats.pop('latency_total')
+            stats['latency_avg'] = round(latency_total / stats['requests'], 4) if stats['requests'] else 0.0
+            stats['latency_max'] = round(stats['latency_max'], 4)
+            rate = buckets[host].rate
+            stats['rate'] = round(rate, 3) if rate else None
+        return snapshot
+    
+    def log_stats(self):
+        for host, stats in self.host_stats().items():
+            logger.info(f"  {host}: {stats['requests']} requests, {stats['retries']} retries, "
+                        f"{stats['errors']} errors, avg {stats['latency_avg'] * 1000:.0f} ms")
+    
+    def close(self):
+        self.session.close()
+
+
+_default_client: Optional[HttpClient] = None
+_default_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """The process-wide shared client (unpaced, uncached), created on first use."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
@@ -4,12 +4,13 @@ Recipe System Improvements V2
 Quick wins: Better cuisine detection, ingredient parsing, cost database
 """
 
-import re
 import sqlite3
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 import json
 
+from text_patterns import INGREDIENT_QUANTITY, word_alternation
+
 class ImprovedCuisineDetector:
     """Enhanced cuisine detection with better accuracy."""
     
@@ -133,6 +134,10 @@ class IngredientParser:
         'package', 'packages', 'pkg'
     ]
     
+    # All units in one alternation; matched text maps back to the first listed spelling
+    UNIT_PATTERN = word_alternation(UNITS)
+    UNIT_NAMES = {unit.lower(): unit for unit in reversed(UNITS)}
+    
     # Preparation methods
     PREP_METHODS = [
         'diced', 'chopped', 'minced', 'sliced', 'julienned',
@@ -163,19 +168,16 @@ class IngredientParser:
         line = ingredient_line.strip()
         
         # Extract quantity (number or fraction at start)
-        quantity_pattern = r'^(\d+\.?\d*|\d+\/\d+|\d+\s+\d+\/\d+)'
-        quantity_match = re.search(quantity_pattern, line)
+        quantity_match = INGREDIENT_QUANTITY.search(line)
         if quantity_match:
             result['quantity'] = quantity_match.group(1)
             line = line[quantity_match.end():].strip()
         
         # Extract unit
-        for unit in self.UNITS:
-            pattern = r'^\b' + re.escape(unit) + r'\b'
-            if re.match(pattern, line, re.IGNORECASE):
-                result['unit'] = unit
-                line = line[len(unit):].strip()
-                break
+        unit_match = self.UNIT_PATTERN.match(line)
+        if unit_match:
+            result['unit'] = self.UNIT_NAMES[unit_match.group().lower()]
+            line = line[unit_match.end():].strip()
         
         # Split on comma to separate ingredient from prep
         parts = line.split(',', 1)
@@ -4,13 +4,14 @@ Comprehensive Ingredient Database
 Pre-built database of common ingredients with properties, costs, and metadata
 """
 
-import sqlite3
 import json
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any, Union
 from datetime import datetime
 import logging
 
+from db_connection import get_connection_manager
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -21,13 +22,18 @@ class IngredientDatabase:
     def __init__(self, db_path: str = "recipe_library/ingredient_database.db"):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = get_connection_manager(self.db_path)
         self.init_database()
         self.populate_default_ingredients()
     
     def init_database(self):
         """Initialize the ingredient database schema."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.db.batch() as conn:
+            self._create_schema(conn.cursor())
+        logger.info("Ingredient database initialized")
+    
+    def _create_schema(self, cursor):
+        """Create tables and indexes using an open cursor."""
         
         # Main ingredients table
         cursor.execute('''
@@ -85,43 +91,52 @@ class IngredientDatabase:
             )
         ''')
         
+        # Vendor item aliases - names/SKUs confirmed to be a given ingredient
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS vendor_aliases (
+                vendor_name TEXT NOT NULL,
+                alias TEXT NOT NULL,  -- "sku:<code>" or "name:<normalized name>"
+                ingredient_id INTEGER NOT NULL,
+                confirmed_date TEXT,
+                PRIMARY KEY (vendor_name, alias),
+                FOREIGN KEY (ingredient_id) REFERENCES ingredients (id)
+            )
+        ''')
+        
         # Indexes
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_name ON ingredients(name)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_category ON ingredients(category)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_active ON ingredients(is_active)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_vendor_ingredient ON vendor_prices(ingredient_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_vendor_name ON vendor_prices(vendor_name)')
-        
-        conn.commit()
-        conn.close()
-        logger.info("Ingredient database initialized")
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_cost_history_ingredient ON cost_history(ingredient_id, date)')
     
     def populate_default_ingredients(self):
         """Populate database with comprehensive list of common ingredients."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.db.connection().cursor()
         
         # Check if already populated
         cursor.execute("SELECT COUNT(*) FROM ingredients")
         count = cursor.fetchone()[0]
         
         if count > 0:
-            conn.close()
             logger.info(f"Database already has {count} ingredients")
             return
         
         ingredients = self.get_default_ingredients()
+        now = datetime.now().isoformat()
         
-        for ing in ingredients:
-            try:
-                cursor.execute('''
-                    INSERT INTO ingredients (
-                        name, category, subcategory, default_unit, common_units,
-                        typical_yield_pct, typical_ap_cost, cost_unit,
-                        storage_notes, shelf_life_days, allergens, dietary_tags,
-                        substitutes, notes, source_url, created_date, updated_date
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+        with self.db.batch() as conn:
+            # OR IGNORE skips names that already exist
+            conn.executemany('''
+                INSERT OR IGNORE INTO ingredients (
+                    name, category, subcategory, default_unit, common_units,
+                    typical_yield_pct, typical_ap_cost, cost_unit,
+                    storage_notes, shelf_life_days, allergens, dietary_tags,
+                    substitutes, notes, source_url, created_date, updated_date
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (
                     ing['name'],
                     ing['category'],
                     ing.get('subcategory'),
@@ -137,15 +152,12 @@ class IngredientDatabase:
                     json.dumps(ing.get('substitutes', [])),
                     ing.get('notes'),
                     ing.get('source_url'),
-                    datetime.now().isoformat(),
-                    datetime.now().isoformat()
-                ))
-            except sqlite3.IntegrityError:
-                # Already exists, skip
-                pass
+                    now,
+                    now
+                )
+                for ing in ingredients
+            ])
         
-        conn.commit()
-        conn.close()
         logger.info(f"Populated database with {len(ingredients)} default ingredients")
     
     def get_default_ingredients(self) -> List[Dict[str, Any]]:
@@ -1158,87 +1170,73 @@ class IngredientDatabase:
     
     def add_ingredient(self, ingredient_data: Dict[str, Any]) -> int:
         """Add a new ingredient to the database."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.db.batch() as conn:
+            cursor = conn.execute('''
+                INSERT INTO ingredients (
+                    name, category, subcategory, default_unit, common_units,
+                    typical_yield_pct, typical_ap_cost, cost_unit,
+                    storage_notes, shelf_life_days, allergens, dietary_tags,
+                    substitutes, notes, source_url, created_date, updated_date
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                ingredient_data['name'],
+                ingredient_data.get('category', 'Other'),
+                ingredient_data.get('subcategory'),
+                ingredient_data.get('default_unit', 'lb'),
+                json.dumps(ingredient_data.get('common_units', [])),
+                ingredient_data.get('typical_yield_pct', 100.0),
+                ingredient_data.get('typical_ap_cost'),
+                ingredient_data.get('cost_unit'),
+                ingredient_data.get('storage_notes'),
+                ingredient_data.get('shelf_life_days'),
+                json.dumps(ingredient_data.get('allergens', [])),
+                json.dumps(ingredient_data.get('dietary_tags', [])),
+                json.dumps(ingredient_data.get('substitutes', [])),
+                ingredient_data.get('notes'),
+                ingredient_data.get('source_url'),
+                datetime.now().isoformat(),
+                datetime.now().isoformat()
+            ))
         
-        cursor.execute('''
-            INSERT INTO ingredients (
-                name, category, subcategory, default_unit, common_units,
-                typical_yield_pct, typical_ap_cost, cost_unit,
-                storage_notes, shelf_life_days, allergens, dietary_tags,
-                substitutes, notes, source_url, created_date, updated_date
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            ingredient_data['name'],
-            ingredient_data.get('category', 'Other'),
-            ingredient_data.get('subcategory'),
-            ingredient_data.get('default_unit', 'lb'),
-            json.dumps(ingredient_data.get('common_units', [])),
-            ingredient_data.get('typical_yield_pct', 100.0),
-            ingredient_data.get('typical_ap_cost'),
-            ingredient_data.get('cost_unit'),
-            ingredient_data.get('storage_notes'),
-            ingredient_data.get('shelf_life_days'),
-            json.dumps(ingredient_data.get('allergens', [])),
-            json.dumps(ingredient_data.get('dietary_tags', [])),
-            json.dumps(ingredient_data.get('substitutes', [])),
-            ingredient_data.get('notes'),
-            ingredient_data.get('source_url'),
-            datetime.now().isoformat(),
-            datetime.now().isoformat()
-        ))
-        
-        ingredient_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return ingredient_id
+        return cursor.lastrowid
     
     def update_ingredient(self, ingredient_id: int, ingredient_data: Dict[str, Any]):
         """Update an existing ingredient."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE ingredients SET
-                name = ?, category = ?, subcategory = ?, default_unit = ?,
-                common_units = ?, typical_yield_pct = ?, typical_ap_cost = ?,
-                cost_unit = ?, storage_notes = ?, shelf_life_days = ?,
-                allergens = ?, dietary_tags = ?, substitutes = ?, notes = ?,
-                source_url = ?, updated_date = ?
-            WHERE id = ?
-        ''', (
-            ingredient_data['name'],
-            ingredient_data.get('category', 'Other'),
-            ingredient_data.get('subcategory'),
-            ingredient_data.get('default_unit', 'lb'),
-            json.dumps(ingredient_data.get('common_units', [])),
-            ingredient_data.get('typical_yield_pct', 100.0),
-            ingredient_data.get('typical_ap_cost'),
-            ingredient_data.get('cost_unit'),
-            ingredient_data.get('storage_notes'),
-            ingredient_data.get('shelf_life_days'),
-            json.dumps(ingredient_data.get('allergens', [])),
-            json.dumps(ingredient_data.get('dietary_tags', [])),
-            json.dumps(ingredient_data.get('substitutes', [])),
-            ingredient_data.get('notes'),
-            ingredient_data.get('source_url'),
-            datetime.now().isoformat(),
-            ingredient_id
-        ))
-        
-        conn.commit()
-        conn.close()
+        with self.db.batch() as conn:
+            conn.execute('''
+                UPDATE ingredients SET
+                    name = ?, category = ?, subcategory = ?, default_unit = ?,
+                    common_units = ?, typical_yield_pct = ?, typical_ap_cost = ?,
+                    cost_unit = ?, storage_notes = ?, shelf_life_days = ?,
+                    allergens = ?, dietary_tags = ?, substitutes = ?, notes = ?,
+                    source_url = ?, updated_date = ?
+                WHERE id = ?
+            ''', (
+                ingredient_data['name'],
+                ingredient_data.get('category', 'Other'),
+                ingredient_data.get('subcategory'),
+                ingredient_data.get('default_unit', 'lb'),
+                json.dumps(ingredient_data.get('common_units', [])),
+                ingredient_data.get('typical_yield_pct', 100.0),
+                ingredient_data.get('typical_ap_cost'),
+                ingredient_data.get('cost_unit'),
+                ingredient_data.get('storage_notes'),
+                ingredient_data.get('shelf_life_days'),
+                json.dumps(ingredient_data.get('allergens', [])),
+                json.dumps(ingredient_data.get('dietary_tags', [])),
+                json.dumps(ingredient_data.get('substitutes', [])),
+                ingredient_data.get('notes'),
+                ingredient_data.get('source_url'),
+                datetime.now().isoformat(),
+                ingredient_id
+            ))
     
     def get_ingredient(self, ingredient_id: int) -> Optional[Dict[str, Any]]:
         """Get ingredient by ID."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = self.db.connection().cursor()
         
         cursor.execute('SELECT * FROM ingredients WHERE id = ?', (ingredient_id,))
         row = cursor.fetchone()
-        conn.close()
         
         if row:
             return self._row_to_dict(row)
@@ -1246,9 +1244,7 @@ class IngredientDatabase:
     
     def search_ingredients(self, search_term: str = "", category: str = "") -> List[Dict[str, Any]]:
         """Search ingredients by name or category."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = self.db.connection().cursor()
         
         query = "SELECT * FROM ingredients WHERE is_active = 1"
         params = []
@@ -1265,35 +1261,175 @@ class IngredientDatabase:
         
         cursor.execute(query, params)
         rows = cursor.fetchall()
-        conn.close()
         
         return [self._row_to_dict(row) for row in rows]
     
     def get_categories(self) -> List[str]:
         """Get all ingredient categories."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.db.connection().cursor()
         
         cursor.execute("SELECT DISTINCT category FROM ingredients WHERE is_active = 1 ORDER BY category")
         categories = [row[0] for row in cursor.fetchall()]
-        conn.close()
         
         return categories
     
     def get_ingredient_by_name(self, name: str) -> Optional[Dict[str, Any]]:
         """Get ingredient by exact name."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = self.db.connection().cursor()
         
         cursor.execute("SELECT * FROM ingredients WHERE name = ? AND is_active = 1", (name,))
         row = cursor.fetchone()
-        conn.close()
         
         if row:
             return self._row_to_dict(row)
         return None
     
+    def get_ingredient_names(self) -> Dict[int, str]:
+        """Get id -> name for all active ingredients (no JSON decoding)."""
+        cursor = self.db.connection().cursor()
+        
+        cursor.execute("SELECT id, name FROM ingredients WHERE is_active = 1")
+        return {row['id']: row['name'] for row in cursor.fetchall()}
+    
+    def get_vendor_aliases(self, vendor_name: str) -> Dict[str, int]:
+        """Get alias -> ingredient id for a vendor's confirmed item names and SKUs."""
+        cursor = self.db.connection().cursor()
+        
+        cursor.execute("SELECT alias, ingredient_id FROM vendor_aliases WHERE vendor_name = ?", (vendor_name,))
+        return {row['alias']: row['ingredient_id'] for row in cursor.fetchall()}
+    
+    def save_vendor_aliases(self, vendor_name: str, aliases: Dict[str, int]):
+        """Remember vendor item names/SKUs as confirmed matches for an ingredient."""
+        if not aliases:
+            return
+        
+        now = datetime.now().isoformat()
+        with self.db.batch() as conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO vendor_aliases (vendor_name, alias, ingredient_id, confirmed_date)
+                VALUES (?, ?, ?, ?)
+            ''', [(vendor_name, alias, ingredient_id, now) for alias, ingredient_id in aliases.items()])
+    
+    def upsert_vendor_prices(self, rows: Iterable[Dict[str, Any]], record_history: bool = True) -> int:
+        """
+        Insert or update many vendor prices in one transaction.
+        
+        Args:
+            rows: Dicts with ingredient_id, vendor_name, ap_cost and optionally
+                  cost_unit (defaults to the ingredient's default unit),
+                  vendor_url and notes
+            record_history: Also append each price to cost_history
+        
+        Returns:
+            Number of vendor prices written (rows for unknown ingredients are skipped)
+        """
+        now = datetime.now().isoformat()
+        params = [(row['vendor_name'], row['ap_cost'], row.get('cost_unit'), row.get('vendor_url'),
+                   now, row.get('notes'), row['ingredient_id']) for row in rows]
+        if not params:
+            return 0
+        
+        with self.db.batch() as conn:
+            # SELECT ... FROM ingredients resolves the default unit and drops unknown ids
+            cursor = conn.executemany('''
+                INSERT INTO vendor_prices (
+                    ingredient_id, vendor_name, ap_cost, cost_unit, vendor_url, last_updated, notes
+                )
+                SELECT id, ?, ?, COALESCE(?, default_unit), ?, ?, ? FROM ingredients WHERE id = ?
+                ON CONFLICT(ingredient_id, vendor_name) DO UPDATE SET
+                    ap_cost = excluded.ap_cost,
+                    cost_unit = excluded.cost_unit,
+                    vendor_url = COALESCE(excluded.vendor_url, vendor_prices.vendor_url),
+                    last_updated = excluded.last_updated,
+                    notes = COALESCE(excluded.notes, vendor_prices.notes)
+            ''', params)
+            written = cursor.rowcount
+            
+            if record_history:
+                conn.executemany('''
+                    INSERT INTO cost_history (ingredient_id, vendor, ap_cost, cost_unit, date, notes)
+                    SELECT id, ?, ?, COALESCE(?, default_unit), ?, ? FROM ingredients WHERE id = ?
+                ''', [(vendor, cost, unit, date, notes, ingredient_id)
+                      for vendor, cost, unit, _, date, notes, ingredient_id in params])
+        
+        return written
+    
+    def add_vendor_price(self, ingredient_id: int, vendor_name: str, ap_cost: float,
+                         cost_unit: Optional[str] = None, vendor_url: Optional[str] = None,
+                         notes: Optional[str] = None) -> Optional[int]:
+        """Add or update one vendor's price for an ingredient. Returns the vendor price ID."""
+        self.upsert_vendor_prices([{
+            'ingredient_id': ingredient_id,
+            'vendor_name': vendor_name,
+            'ap_cost': ap_cost,
+            'cost_unit': cost_unit,
+            'vendor_url': vendor_url,
+            'notes': notes
+        }])
+        
+        cursor = self.db.connection().cursor()
+        cursor.execute("SELECT id FROM vendor_prices WHERE ingredient_id = ? AND vendor_name = ?",
+                       (ingredient_id, vendor_name))
+        row = cursor.fetchone()
+        return row['id'] if row else None
+    
+    def get_vendor_prices(self, ingredient_ids: Union[int, Iterable[int]]
+                          ) -> Union[List[Dict[str, Any]], Dict[int, List[Dict[str, Any]]]]:
+        """
+        Get vendor prices, preferred vendor first, then cheapest.
+        
+        Args:
+            ingredient_ids: One ingredient ID, or many
+        
+        Returns:
+            A list of prices for a single ID; for many IDs, a dict of
+            ingredient ID -> list of prices, fetched in one query
+        """
+        single = isinstance(ingredient_ids, int)
+        ids = [ingredient_ids] if single else list(dict.fromkeys(ingredient_ids))
+        prices: Dict[int, List[Dict[str, Any]]] = {ingredient_id: [] for ingredient_id in ids}
+        
+        if ids:
+            cursor = self.db.connection().cursor()
+            cursor.execute('''
+                SELECT * FROM vendor_prices
+                WHERE ingredient_id IN (SELECT value FROM json_each(?))
+                ORDER BY ingredient_id, is_preferred DESC, ap_cost
+            ''', (json.dumps(ids),))
+            for row in cursor.fetchall():
+                prices[row['ingredient_id']].append(dict(row))
+        
+        return prices[ingredient_ids] if single else prices
+    
+    def update_vendor_price(self, vendor_price_id: int, **fields):
+        """Update fields (ap_cost, cost_unit, vendor_url, notes, is_preferred) of one vendor price."""
+        allowed = ('ap_cost', 'cost_unit', 'vendor_url', 'notes', 'is_preferred')
+        updates = {key: value for key, value in fields.items() if key in allowed}
+        if not updates:
+            return
+        
+        assignments = ', '.join(f"{key} = ?" for key in updates)
+        with self.db.batch() as conn:
+            conn.execute(f"UPDATE vendor_prices SET {assignments}, last_updated = ? WHERE id = ?",
+                         (*updates.values(), datetime.now().isoformat(), vendor_price_id))
+            if 'ap_cost' in updates:
+                conn.execute('''
+                    INSERT INTO cost_history (ingredient_id, vendor, ap_cost, cost_unit, date, notes)
+                    SELECT ingredient_id, vendor_name, ap_cost, cost_unit, last_updated, notes
+                    FROM vendor_prices WHERE id = ?
+                ''', (vendor_price_id,))
+    
+    def set_preferred_vendor(self, ingredient_id: int, vendor_price_id: int):
+        """Mark one vendor price as preferred for its ingredient."""
+        with self.db.batch() as conn:
+            conn.execute("UPDATE vendor_prices SET is_preferred = (id = ?) WHERE ingredient_id = ?",
+                         (vendor_price_id, ingredient_id))
+    
+    def delete_vendor_price(self, vendor_price_id: int):
+        """Delete a vendor price (its cost history is kept)."""
+        with self.db.batch() as conn:
+            conn.execute("DELETE FROM vendor_prices WHERE id = ?", (vendor_price_id,))
+    
     def _row_to_dict(self, row) -> Dict[str, Any]:
         """Convert database row to dictionary."""
         return {
@@ -1319,21 +1455,15 @@ class IngredientDatabase:
     
     def delete_ingredient(self, ingredient_id: int, soft_delete: bool = True):
         """Delete or deactivate an ingredient."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        if soft_delete:
-            cursor.execute("UPDATE ingredients SET is_active = 0 WHERE id = ?", (ingredient_id,))
-        else:
-            cursor.execute("DELETE FROM ingredients WHERE id = ?", (ingredient_id,))
-        
-        conn.commit()
-        conn.close()
+        with self.db.batch() as conn:
+            if soft_delete:
+                conn.execute("UPDATE ingredients SET is_active = 0 WHERE id = ?", (ingredient_id,))
+            else:
+                conn.execute("DELETE FROM ingredients WHERE id = ?", (ingredient_id,))
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get database statistics."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.db.connection().cursor()
         
         cursor.execute("SELECT COUNT(*) FROM ingredients WHERE is_active = 1")
         total = cursor.fetchone()[0]
@@ -1341,8 +1471,6 @@ class IngredientDatabase:
         cursor.execute("SELECT category, COUNT(*) FROM ingredients WHERE is_active = 1 GROUP BY category")
         by_category = {row[0]: row[1] for row in cursor.fetchall()}
         
-        conn.close()
-        
         return {
             'total_ingredients': total,
             'by_category': by_category
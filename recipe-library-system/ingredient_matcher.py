@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Ingredient Matcher
+In-memory index for matching vendor item names to ingredients in bulk
+"""
+
+import math
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from text_patterns import NON_WORD, VENDOR_PACK_WORDS
+
+# Minimum confidence for a fuzzy match to count
+MATCH_THRESHOLD = 0.7
+
+# Candidates scored per item when falling back to n-gram lookup
+NGRAM_CANDIDATES = 20
+
+# Words at least this similar (trigram cosine) count as the same word, e.g. a typo
+TOKEN_SIMILARITY = 0.6
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Lowercase, drop pack words and punctuation, and fold simple plurals."""
+    text = VENDOR_PACK_WORDS.sub(' ', text.lower())
+    text = NON_WORD.sub(' ', text)
+    return [_singular(word) for word in text.split()]
+
+
+def _singular(word: str) -> str:
+    if len(word) <= 3:
+        return word
+    if word.endswith('oes'):
+        return word[:-2]
+    if word.endswith('ies'):
+        return word[:-3] + 'y'
+    if word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def char_ngrams(tokens: Iterable[str], n: int = 3) -> Counter:
+    """Character n-gram counts over space-padded tokens."""
+    grams: Counter = Counter()
+    for token in tokens:
+        padded = f' {token} '
+        for i in range(max(1, len(padded) - n + 1)):
+            grams[padded[i:i + n]] += 1
+    return grams
+
+
+class IngredientMatcher:
+    """
+    Matches vendor item names to ingredients without touching the database.
+    
+    Built once per import: an inverted token index finds candidates, and
+    character trigram vectors score them (and catch typos and abbreviations
+    when no token is shared). Names or SKUs confirmed in an earlier import
+    are looked up in the alias table first.
+    """
+    
+    def __init__(self, ingredients: Dict[int, str], aliases: Optional[Dict[str, int]] = None,
+                 threshold: float = MATCH_THRESHOLD):
+        """
+        Args:
+            ingredients: Ingredient id -> name
+            aliases: Alias key (see alias_keys) -> ingredient id
+            threshold: Minimum confidence for a fuzzy match
+        """
+        self.names = dict(ingredients)
+        self.aliases = {key: ingredient_id for key, ingredient_id in (aliases or {}).items()
+                        if ingredient_id in self.names}
+        self.threshold = threshold
+        
+        self._exact: Dict[str, int] = {}
+        self._tokens: Dict[int, Set[str]] = {}
+        self._vectors: Dict[int, Tuple[Counter, float]] = {}
+        self._token_vectors: Dict[str, Tuple[Counter, float]] = {}
+        self._token_index: Dict[str, Set[int]] = {}
+        self._ngram_index: Dict[str, Set[int]] = {}
+        
+        for ingredient_id, name in self.names.items():
+            tokens = normalize_tokens(name)
+            self._exact.setdefault(' '.join(sorted(tokens)), ingredient_id)
+            self._exact.setdefault(name.lower().strip(), ingredient_id)
+            self._tokens[ingredient_id] = set(tokens)
+            vector = char_ngrams(tokens)
+            self._vectors[ingredient_id] = (vector, math.sqrt(sum(c * c for c in vector.values())))
+            for token in tokens:
+                self._token_index.setdefault(token, set()).add(ingredient_id)
+            for gram in vector:
+                self._ngram_index.setdefault(gram, set()).add(ingredient_id)
+    
+    @classmethod
+    def from_database(cls, ingredient_db, vendor_name: str = "",
+                      threshold: float = MATCH_THRESHOLD) -> 'IngredientMatcher':
+        """Load active ingredient names and the vendor's confirmed aliases in two queries."""
+        aliases = ingredient_db.get_vendor_aliases(vendor_name) if vendor_name else {}
+        return cls(ingredient_db.get_ingredient_names(), aliases, threshold)
+    
+    @staticmethod
+    def alias_keys(vendor_name: str, code: Optional[str] = None) -> List[str]:
+        """Alias table keys for a vendor item: its SKU (if any) and its normalized name."""
+        keys = []
+        if code:
+            keys.append(f"sku:{str(code).strip().lower()}")
+        tokens = normalize_tokens(vendor_name)
+        if tokens:
+            keys.append(f"name:{' '.join(tokens)}")
+        return keys
+    
+    def match(self, vendor_name: str, code: Optional[str] = None) -> Dict[str, Any]:
+        """Match one vendor item; see match_many."""
+        return self.match_many([vendor_name], [code])[0]
+    
+    def match_many(self, vendor_names: List[str],
+                   codes: Optional[List[Optional[str]]] = None) -> List[Dict[str, Any]]:
+        """
+        Match a batch of vendor item names.
+        
+        Args:
+            vendor_names: Item names as printed on the price list
+            codes: Vendor SKUs, parallel to vendor_names (optional)
+        
+        Returns:
+            One result per name: {'matched', 'confidence'} plus
+            'ingredient_id' and 'ingredient_name' when matched
+        """
+        codes = codes or [None] * len(vendor_names)
+        seen: Dict[Tuple[Optional[str], str], Dict[str, Any]] = {}
+        results = []
+        
+        for vendor_name, code in zip(vendor_names, codes):
+            key = (code, vendor_name)
+            if key not in seen:
+                seen[key] = self._match_one(vendor_name, code)
+            results.append(dict(seen[key]))
+        
+        return results
+    
+    def _match_one(self, vendor_name: str, code: Optional[str]) -> Dict[str, Any]:
+        # Confirmed aliases first
+        for key in self.alias_keys(vendor_name, code):
+            if key in self.aliases:
+                return self._result(self.aliases[key], 1.0)
+        
+        tokens = normalize_tokens(vendor_name)
+        if not tokens:
+            return {'matched': False, 'confidence': 0.0}
+        
+        exact = self._exact.get(vendor_name.lower().strip()) or self._exact.get(' '.join(sorted(tokens)))
+        if exact is not None:
+            return self._result(exact, 1.0)
+        
+        token_set = set(tokens)
+        vector = char_ngrams(tokens)
+        norm = math.sqrt(sum(c * c for c in vector.values()))
+        
+        candidates: Set[int] = set()
+        for token in token_set:
+            candidates |= self._token_index.get(token, set())
+        
+        if not candidates:
+            # No shared word: take the ingredients sharing the most trigrams
+            shared: Counter = Counter()
+            for gram in vector:
+                for ingredient_id in self._ngram_index.get(gram, ()):
+                    shared[ingredient_id] += 1
+            candidates = {ingredient_id for ingredient_id, _ in shared.most_common(NGRAM_CANDIDATES)}
+        
+        best_id = None
+        best_score = 0.0
+        for ingredient_id in sorted(candidates):
+            score = self._score(token_set, vector, norm, ingredient_id)
+            if score > best_score:
+                best_id, best_score = ingredient_id, score
+        
+        if best_id is not None and best_score >= self.threshold:
+            return self._result(best_id, round(best_score, 4))
+        return {'matched': False, 'confidence': round(best_score, 4)}
+    
+    def _score(self, tokens: Set[str], vector: Counter, norm: float, ingredient_id: int) -> float:
+        """
+        Average of word coverage and trigram cosine similarity.
+        
+        Coverage is the smaller of the share of vendor words and the share
+        of ingredient words that have a counterpart on the other side, so
+        extra words on either side ("Lemon Juice" against "Lemons") lower
+        it. A near-identical word counts by its similarity, so a typo
+        ("brocoli") is not a missing word. Only when every word on both
+        sides has a counterpart may the cosine alone carry the score;
+        otherwise the score is capped at the coverage.
+        """
+        ingredient_tokens = self._tokens[ingredient_id]
+        if not tokens or not ingredient_tokens:
+            return 0.0
+        vendor_side = [self._token_match(token, ingredient_tokens) for token in tokens]
+        ingredient_side = [self._token_match(token, tokens) for token in ingredient_tokens]
+        coverage = min(sum(vendor_side) / len(vendor_side), sum(ingredient_side) / len(ingredient_side))
+        
+        other, other_norm = self._vectors[ingredient_id]
+        cosine = self._cosine(vector, norm, other, other_norm)
+        score = (coverage + cosine) / 2
+        if all(vendor_side) and all(ingredient_side):
+            return max(cosine, score)
+        return min(score, coverage)
+    
+    def _token_match(self, token: str, others: Set[str]) -> float:
+        """1.0 if the word is in others, else its best similarity above TOKEN_SIMILARITY (or 0.0)."""
+        if token in others:
+            return 1.0
+        vector, norm = self._token_vector(token)
+        best = max(self._cosine(vector, norm, *self._token_vector(other)) for other in others)
+        return best if best >= TOKEN_SIMILARITY else 0.0
+    
+    def _token_vector(self, token: str) -> Tuple[Counter, float]:
+        if token not in self._token_vectors:
+            vector = char_ngrams([token])
+            self._token_vectors[token] = (vector, math.sqrt(sum(c * c for c in vector.values())))
+        return self._token_vectors[token]
+    
+    @staticmethod
+    def _cosine(vector: Counter, norm: float, other: Counter, other_norm: float) -> float:
+        if not norm or not other_norm:
+            return 0.0
+        small, large = (vector, other) if len(vector) <= len(other) else (other, vector)
+        dot = sum(count * large.get(gram, 0) for gram, count in small.items())
+        return dot / (norm * other_norm)
+    
+    def _result(self, ingredient_id: int, confidence: float) -> Dict[str, Any]:
+        return {
+            'matched': True,
+            'ingredient_id': ingredient_id,
+            'ingredient_name': self.names[ingredient_id],
+            'confidence': confidence
+        }
@@ -17,6 +17,8 @@ import logging
 try:
     import requests
     from bs4 import BeautifulSoup
+    from http_cache import HttpCache
+    from http_client import HttpClient, get_http_client
     WEB_SCRAPING_AVAILABLE = True
 except ImportError:
     WEB_SCRAPING_AVAILABLE = False
@@ -29,7 +31,14 @@ logger = logging.getLogger(__name__)
 class IngredientWebScraper:
     """Scrape ingredient information from product/vendor websites."""
     
-    def __init__(self):
+    def __init__(self, http_client: Optional['HttpClient'] = None):
+        """
+        Args:
+            http_client: HTTP client to fetch with (default: the shared client)
+        """
+        self.client = http_client
+        if self.client is None and WEB_SCRAPING_AVAILABLE:
+            self.client = get_http_client()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
@@ -54,7 +63,7 @@ class IngredientWebScraper:
             logger.info(f"Scraping ingredient info from: {url}")
             
             # Fetch page
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.client.get(url, headers=self.headers)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -397,10 +406,17 @@ def main():
     parser = argparse.ArgumentParser(description='Scrape ingredient information from URL')
     parser.add_argument('url', help='URL to scrape')
     parser.add_argument('--json', action='store_true', help='Output as JSON')
+    parser.add_argument('--cache-dir', help='Cache downloaded pages in this folder')
+    parser.add_argument('--offline', action='store_true',
+                       help='Only replay pages from the cache (implies --cache-dir http_cache)')
     
     args = parser.parse_args()
     
-    scraper = IngredientWebScraper()
+    http_client = None
+    if args.cache_dir or args.offline:
+        http_client = HttpClient(cache=HttpCache(args.cache_dir or 'http_cache', offline=args.offline))
+    
+    scraper = IngredientWebScraper(http_client=http_client)
     result = scraper.scrape_ingredient_info(args.url)
     
     if args.json:
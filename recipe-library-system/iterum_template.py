@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Iterum Workbook Template
+The Iterum layout compiled once into an .xlsx package that each converted recipe clones
+"""
+
+import io
+import os
+import re
+import zipfile
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Sequence
+from xml.sax.saxutils import escape
+
+from openpyxl.cell.cell import ERROR_CODES, ILLEGAL_CHARACTERS_RE
+from openpyxl.compat import NUMERIC_TYPES, safe_string
+from openpyxl.utils.datetime import to_excel
+from openpyxl.utils.exceptions import IllegalCharacterError
+
+SHEET_PART = 'xl/worksheets/sheet1.xml'
+
+# Stands in for the per-recipe header values while the layout is compiled
+MARKER = '\ue000'
+
+# Matched in this order (datetime is a date subclass)
+TIME_TYPES = (datetime, date, time, timedelta)
+
+# Longest string a cell can hold (openpyxl truncates to this too)
+MAX_STRING_LENGTH = 32767
+
+ROW = re.compile(r'<row r="(\d+)"[^>]*>.*?</row>', re.S)
+DIMENSION = re.compile(r'(<dimension ref=")([A-Z]+\d+):([A-Z]+)\d+(")')
+
+
+class IterumTemplate:
+    """
+    The Iterum layout compiled into a workbook package once, then cloned per recipe.
+    
+    The layout is built a single time with the converter's own methods
+    (create_iterum_template and the fill_* sections, so it cannot drift
+    from them) and saved. Every output copies that package's styles,
+    theme and workbook parts byte for byte and only streams a new
+    worksheet: the static label rows are copied as XML with the header
+    values spliced in, and the ingredient, method and footer rows are
+    written cell by cell with the style indexes the compile recorded.
+    No openpyxl objects are created per recipe.
+    """
+    
+    def __init__(self, converter):
+        wb, ws = converter.create_iterum_template()
+        
+        # A recipe with no ingredients, markers in the header, and one sample cell per date type
+        header_keys = list(converter.header_values({}))
+        converter.fill_header_section(ws, {}, values={key: MARKER + key for key in header_keys})
+        self.first_ingredient_row = converter.fill_ingredients_section(ws, [])
+        method_row = self.first_ingredient_row + 3
+        footer_row = converter.fill_method_section(ws, '', method_row) + 10
+        converter.fill_footer_section(ws, footer_row)
+        samples_row = footer_row + 2
+        for column, value in zip('ABCD', (datetime(2000, 1, 1, 12), date(2000, 1, 1), time(12), timedelta(hours=1))):
+            ws[f'{column}{samples_row}'] = value
+        
+        buffer = io.BytesIO()
+        wb.save(buffer)
+        with zipfile.ZipFile(buffer) as package:
+            self.parts = [(info.filename, info.compress_type, package.read(info.filename))
+                          for info in package.infolist()]
+            sheet = package.read(SHEET_PART).decode('utf-8')
+        
+        start, end = sheet.index('<sheetData>') + len('<sheetData>'), sheet.index('</sheetData>')
+        self.sheet_head, self.sheet_tail = sheet[:start], sheet[end:]
+        rows = {int(match.group(1)): match.group(0) for match in ROW.finditer(sheet, start, end)}
+        
+        self.time_styles = {}
+        for kind, column in zip(TIME_TYPES, 'ABCD'):
+            self.time_styles[kind] = int(re.search(rf'<c r="{column}{samples_row}" s="(\d+)"', rows[samples_row]).group(1))
+        
+        # Header and table head rows, split into static XML and the header cells between them
+        header = ''.join(xml for row, xml in sorted(rows.items()) if row < self.first_ingredient_row)
+        self.header_cells = {}
+        for key in header_keys:
+            at = header.index(f'>{MARKER}{key}<')
+            begin = header.rindex('<c ', 0, at)
+            finish = header.index('</c>', at) + len('</c>')
+            cell = header[begin:header.index('>', begin)]
+            style = re.search(r' s="(\d+)"', cell)
+            self.header_cells[key] = (re.search(r' r="([A-Z]+\d+)"', cell).group(1), int(style.group(1)) if style else 0)
+            header = f"{header[:begin]}\0{key}\0{header[finish:]}"
+        self.header_segments = header.split('\0')
+        
+        # Rows that only move down as a recipe grows: re-addressed per recipe
+        self.method_label = self._movable(rows[method_row], method_row)
+        self.footer = self._movable(rows[footer_row], footer_row)
+    
+    @staticmethod
+    def _movable(xml: str, row: int) -> str:
+        """A row's XML as a format string taking the row number."""
+        xml = xml.replace('{', '{{').replace('}', '}}')
+        return re.sub(rf'(r="[A-Z]*){row}"', r'\1{row}"', xml)
+    
+    def render(self, header: Dict[str, Any], ingredient_rows: Sequence[Sequence[Any]],
+               method_steps: Sequence[str]) -> bytes:
+        """
+        Worksheet XML for one recipe.
+        
+        Args:
+            header: Values for the header cells, keyed like the converter's header_values()
+            ingredient_rows: Cell values for each ingredient row, from column A
+            method_steps: Method lines, one row each
+        """
+        segments = self.header_segments
+        parts: List[str] = [segments[0]]
+        for index in range(1, len(segments), 2):
+            coordinate, style = self.header_cells[segments[index]]
+            parts.append(self._cell(coordinate, header[segments[index]], style))
+            parts.append(segments[index + 1])
+        
+        row = self.first_ingredient_row
+        for values in ingredient_rows:
+            cells = ''.join(self._cell(f'{column}{row}', value) for column, value in zip('ABCDEFGHI', values))
+            if cells:
+                parts.append(f'<row r="{row}">{cells}</row>')
+            row += 1
+        
+        row += 3
+        parts.append(self.method_label.format(row=row))
+        for step in method_steps:
+            row += 1
+            parts.append(f'<row r="{row}">{self._cell(f"A{row}", step)}</row>')
+        
+        row += 11
+        parts.append(self.footer.format(row=row))
+        
+        head = DIMENSION.sub(rf'\g<1>\g<2>:\g<3>{row}\g<4>', self.sheet_head, count=1)
+        return ''.join([head, *parts, self.sheet_tail]).encode('utf-8')
+    
+    def save(self, output_path, sheet: bytes):
+        """
+        Write the package with a rendered worksheet in place of the template's.
+        
+        The package is written to a temporary file beside the output and
+        moved into place, so an interrupted save never leaves a half-written
+        workbook under the output name.
+        """
+        stamp = datetime.now().timetuple()[:6]
+        output_path = os.fspath(output_path)
+        directory, name = os.path.split(output_path)
+        temp_path = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+        try:
+            with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as package:
+                for part, compress_type, data in self.parts:
+                    info = zipfile.ZipInfo(part, stamp)
+                    info.compress_type = compress_type
+                    package.writestr(info, sheet if part == SHEET_PART else data)
+            os.replace(temp_path, output_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def write(self, output_path, header: Dict[str, Any], ingredient_rows: Sequence[Sequence[Any]],
+              method_steps: Sequence[str]):
+        """Render and save one recipe's workbook."""
+        self.save(output_path, self.render(header, ingredient_rows, method_steps))
+    
+    def _cell(self, coordinate: str, value: Any, style: int = 0) -> str:
+        """One <c> element, typed the way openpyxl types the value ('' when nothing is written)."""
+        attributes = f'r="{coordinate}" s="{style}"' if style else f'r="{coordinate}"'
+        
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        if isinstance(value, str):
+            value = value[:MAX_STRING_LENGTH]
+            if ILLEGAL_CHARACTERS_RE.search(value):
+                raise IllegalCharacterError(f"{value} cannot be used in worksheets.")
+            if not value:
+                return f'<c {attributes} t="inlineStr" />'
+            if len(value) > 1 and value.startswith('='):
+                return f'<c {attributes}><f>{escape(value[1:])}</f><v /></c>'
+            if value in ERROR_CODES:
+                return f'<c {attributes} t="e"><v>{value}</v></c>'
+            space = ' xml:space="preserve"' if value != value.strip() and value.strip() else ''
+            return f'<c {attributes} t="inlineStr"><is><t{space}>{escape(value)}</t></is></c>'
+        if value is None:
+            return f'<c {attributes} t="n" />' if style else ''
+        if isinstance(value, bool):
+            return f'<c {attributes} t="b"><v>{int(value)}</v></c>'
+        if isinstance(value, NUMERIC_TYPES):
+            return f'<c {attributes} t="n"><v>{safe_string(value)}</v></c>'
+        if isinstance(value, TIME_TYPES):
+            if getattr(value, 'tzinfo', None) is not None:
+                raise TypeError("Excel does not support timezones in datetimes. "
+                                "The tzinfo in the datetime/time object must be set to None.")
+            # Dates need a number format, which replaces the cell's own style
+            style = next(self.time_styles[kind] for kind in TIME_TYPES if isinstance(value, kind))
+            return f'<c r="{coordinate}" s="{style}" t="n"><v>{safe_string(to_excel(value))}</v></c>'
+        raise ValueError(f"Cannot convert {value!r} to Excel")
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+Background Job Queue
+Runs long operations on a local worker pool with progress, cancellation and SSE streaming
+"""
+
+import os
+import json
+import uuid
+import time
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+import logging
+
+from db_connection import get_connection_manager
+
+logger = logging.getLogger(__name__)
+
+# Job states: queued -> running -> completed | failed | cancelled
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+# Running jobs refresh their heartbeat this often; a job whose heartbeat is
+# older than STALE_JOB_SECONDS belongs to a server process that has stopped
+HEARTBEAT_SECONDS = 10
+STALE_JOB_SECONDS = 60
+
+# Progress is written at most this often per job (seconds)
+PROGRESS_INTERVAL = 0.5
+
+# Finished jobs are deleted after this many days
+KEEP_FINISHED_DAYS = 7
+
+# Event streams re-check the job this often, and send a keep-alive comment when idle this long
+EVENT_POLL_SECONDS = 1.0
+EVENT_KEEPALIVE_SECONDS = 15.0
+
+
+class JobCancelled(Exception):
+    """Raised inside a job (by Job.check_cancelled) once the job has been cancelled."""
+
+
+class Job:
+    """
+    Handle passed to a running job function.
+    
+    Functions report progress with progress(), and either call
+    check_cancelled() between units of work or register an on_cancel hook
+    that makes the underlying operation stop early.
+    """
+    
+    def __init__(self, queue: 'JobQueue', job_id: str):
+        self.id = job_id
+        self._queue = queue
+        self._cancelled = threading.Event()
+        self._cancel_hooks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+    
+    def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None):
+        """
+        Report progress (written at most every PROGRESS_INTERVAL seconds, and always on the last unit).
+        
+        Args:
+            done: Units of work finished
+            total: Total units (None if unknown)
+            message: What the job is working on
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_write < PROGRESS_INTERVAL and (total is None or done < total):
+                return
+            self._last_write = now
+        self._queue._write_progress(self.id, done, total, message)
+    
+    def check_cancelled(self):
+        """Raise JobCancelled if the job has been cancelled."""
+        if self.cancelled:
+            raise JobCancelled()
+    
+    def progress_callback(self, done: int, total: Optional[int] = None, message: Optional[str] = None):
+        """progress() followed by check_cancelled(), for loops that take a progress callback."""
+        self.progress(done, total, message)
+        self.check_cancelled()
+    
+    def on_cancel(self, hook: Callable[[], None]):
+        """Call hook when the job is cancelled (immediately if it already is)."""
+        with self._lock:
+            self._cancel_hooks.append(hook)
+        if self.cancelled:
+            hook()
+    
+    def _cancel(self):
+        if self._cancelled.is_set():
+            return
+        self._cancelled.set()
+        with self._lock:
+            hooks = list(self._cancel_hooks)
+        for hook in hooks:
+            try:
+                hook()
+            except Exception as e:
+                logger.warning(f"Cancel hook for job {self.id} failed: {e}")
+
+
+class JobQueue:
+    """
+    Background jobs for the web apps.
+    
+    Jobs run on a local thread pool; their status, progress, result and
+    error live in an SQLite table, so any request (or another server
+    process using the same database) can poll, cancel or stream them.
+    Job functions are registered by kind and called as
+    handler(job, **params); whatever they return (JSON-serializable)
+    becomes the job's result.
+    """
+    
+    def __init__(self, db_path: Union[str, Path], workers: int = 2):
+        """
+        Args:
+            db_path: SQLite database file for the job table
+            workers: Jobs run at the same time by this process
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = get_connection_manager(self.db_path)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._create_schema()
+        
+        self._handlers: Dict[str, Callable[..., Any]] = {}
+        self._pool = ThreadPoolExecutor(max(1, workers), thread_name_prefix='job')
+        self._lock = threading.Lock()
+        self._active: Dict[str, Optional[Job]] = {}  # queued (None) or running in this process
+        self._changed = threading.Condition()
+        self._heartbeat: Optional[threading.Thread] = None
+        
+        self._fail_stale_jobs()
+        self._prune()
+    
+    def _create_schema(self):
+        with self.db.batch() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    params TEXT,
+                    progress REAL,
+                    done INTEGER,
+                    total INTEGER,
+                    message TEXT,
+                    result TEXT,
+                    error TEXT,
+                    owner TEXT,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    created_date TEXT,
+                    started_date TEXT,
+                    finished_date TEXT,
+                    heartbeat TEXT
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_date)')
+    
+    def register(self, kind: str, handler: Callable[..., Any]):
+        """Register the function that runs jobs of this kind."""
+        self._handlers[kind] = handler
+    
+    def submit(self, kind: str, **params) -> str:
+        """
+        Queue a job.
+        
+        Returns:
+            The job id
+        """
+        handler = self._handlers.get(kind)
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {kind}")
+        
+        job_id = uuid.uuid4().hex
+        now = datetime.now().isoformat()
+        with self.db.batch() as conn:
+            conn.execute('''
+                INSERT INTO jobs (id, kind, status, params, owner, created_date, heartbeat)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (job_id, kind, QUEUED, json.dumps(params), self.owner, now, now))
+        
+        with self._lock:
+            self._active[job_id] = None
+        self._start_heartbeat()
+        self._pool.submit(self._run, job_id, handler, params)
+        return job_id
+    
+    def _run(self, job_id: str, handler: Callable[..., Any], params: Dict[str, Any]):
+        now = datetime.now().isoformat()
+        with self.db.batch() as conn:
+            started = conn.execute('''
+                UPDATE jobs SET status = ?, started_date = ?, heartbeat = ?
+                WHERE id = ? AND status = ?
+            ''', (RUNNING, now, now, job_id, QUEUED)).rowcount
+        
+        if not started:
+            # Cancelled while queued
+            with self._lock:
+                self._active.pop(job_id, None)
+            return
+        
+        job = Job(self, job_id)
+        with self._lock:
+            self._active[job_id] = job
+        self._notify()
+        
+        result, error = None, None
+        try:
+            result = handler(job, **params)
+            status = CANCELLED if job.cancelled else COMPLETED
+        except JobCancelled:
+            status = CANCELLED
+        except Exception as e:
+            logger.exception(f"Job {job_id} ({handler.__name__}) failed")
+            status, error = FAILED, str(e)
+        
+        try:
+            with self.db.batch() as conn:
+                conn.execute('''
+                    UPDATE jobs SET status = ?, result = ?, error = ?, finished_date = ?,
+                        progress = CASE WHEN ? = ? THEN 1.0 ELSE progress END
+                    WHERE id = ?
+                ''', (status, json.dumps(result, default=str) if result is not None else None, error,
+                      datetime.now().isoformat(), status, COMPLETED, job_id))
+        finally:
+            with self._lock:
+                self._active.pop(job_id, None)
+            self._notify()
+            self.db.release()
+    
+    def _write_progress(self, job_id: str, done: int, total: Optional[int], message: Optional[str]):
+        fraction = min(1.0, done / total) if total else None
+        with self.db.batch() as conn:
+            conn.execute('''
+                UPDATE jobs SET progress = ?, done = ?, total = ?, message = COALESCE(?, message), heartbeat = ?
+                WHERE id = ?
+            ''', (fraction, done, total, message, datetime.now().isoformat(), job_id))
+        self._notify()
+    
+    def _notify(self):
+        with self._changed:
+            self._changed.notify_all()
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Current state of a job, or None if there is no such job."""
+        row = self.db.connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        if row['status'] in (QUEUED, RUNNING) and self._is_stale(row['heartbeat']):
+            self._fail_stale_jobs()
+            row = self.db.connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row)
+    
+    def list(self, limit: int = 50, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Most recent jobs first (without their results)."""
+        query = "SELECT * FROM jobs"
+        params: List[Any] = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY created_date DESC LIMIT ?"
+        params.append(limit)
+        rows = self.db.connection().execute(query, params).fetchall()
+        return [self._to_dict(row, include_result=False) for row in rows]
+    
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job. Queued jobs never start; running jobs are asked to stop
+        and finish as cancelled once they do.
+        
+        Returns:
+            False if the job doesn't exist or has already finished
+        """
+        now = datetime.now().isoformat()
+        with self.db.batch() as conn:
+            if conn.execute('''
+                UPDATE jobs SET status = ?, finished_date = ?, cancel_requested = 1
+                WHERE id = ? AND status = ?
+            ''', (CANCELLED, now, job_id, QUEUED)).rowcount:
+                self._notify()
+                return True
+            requested = conn.execute('''
+                UPDATE jobs SET cancel_requested = 1, message = 'Cancelling...' WHERE id = ? AND status = ?
+            ''', (job_id, RUNNING)).rowcount
+        
+        if not requested:
+            return False
+        
+        # Running here: stop it now; running in another process: its heartbeat picks the request up
+        with self._lock:
+            job = self._active.get(job_id)
+        if job is not None:
+            job._cancel()
+        self._notify()
+        return True
+    
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Block until a job finishes (or timeout) and return its state."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job['status'] in FINISHED_STATES:
+                return job
+            remaining = EVENT_POLL_SECONDS if deadline is None else min(EVENT_POLL_SECONDS, deadline - time.monotonic())
+            if remaining <= 0:
+                return job
+            with self._changed:
+                self._changed.wait(remaining)
+    
+    def events(self, job_id: str) -> Iterator[str]:
+        """
+        Server-Sent Events stream of a job's state: one event whenever it
+        changes, keep-alive comments while it doesn't, ending once it finishes.
+        """
+        last_sent = None
+        last_event = time.monotonic()
+        while True:
+            job = self.get(job_id)
+            if job is None:
+                yield f"event: error\ndata: {json.dumps({'error': 'Job not found'})}\n\n"
+                return
+            
+            snapshot = json.dumps(job, default=str)
+            if snapshot != last_sent:
+                last_sent = snapshot
+                last_event = time.monotonic()
+                yield f"data: {snapshot}\n\n"
+            elif time.monotonic() - last_event >= EVENT_KEEPALIVE_SECONDS:
+                last_event = time.monotonic()
+                yield ": keep-alive\n\n"
+            
+            if job['status'] in FINISHED_STATES:
+                return
+            with self._changed:
+                self._changed.wait(EVENT_POLL_SECONDS)
+    
+    def _start_heartbeat(self):
+        with self._lock:
+            if self._heartbeat is not None and self._heartbeat.is_alive():
+                return
+            self._heartbeat = threading.Thread(target=self._heartbeat_loop, name='job-heartbeat', daemon=True)
+            self._heartbeat.start()
+    
+    def _heartbeat_loop(self):
+        """Keep this process's jobs marked alive and pick up cancel requests made elsewhere."""
+        while True:
+            time.sleep(HEARTBEAT_SECONDS)
+            with self._lock:
+                active = dict(self._active)
+            if not active:
+                continue
+            
+            placeholders = ','.join('?' * len(active))
+            try:
+                with self.db.batch() as conn:
+                    conn.execute(f"UPDATE jobs SET heartbeat = ? WHERE id IN ({placeholders})",
+                                 [datetime.now().isoformat(), *active])
+                    cancelled = [row[0] for row in conn.execute(
+                        f"SELECT id FROM jobs WHERE cancel_requested = 1 AND id IN ({placeholders})", list(active))]
+            except Exception as e:
+                logger.warning(f"Job heartbeat failed: {e}")
+                continue
+            
+            for job_id in cancelled:
+                job = active.get(job_id)
+                if job is not None:
+                    job._cancel()
+    
+    def _is_stale(self, heartbeat: Optional[str]) -> bool:
+        cutoff = (datetime.now() - timedelta(seconds=STALE_JOB_SECONDS)).isoformat()
+        return heartbeat is None or heartbeat < cutoff
+    
+    def _fail_stale_jobs(self):
+        """Mark jobs whose server process stopped (no heartbeat) as failed."""
+        cutoff = (datetime.now() - timedelta(seconds=STALE_JOB_SECONDS)).isoformat()
+        with self.db.batch() as conn:
+            count = conn.execute('''
+                UPDATE jobs SET status = ?, error = 'Interrupted: the server stopped before the job finished',
+                    finished_date = ?
+                WHERE status IN (?, ?) AND (heartbeat IS NULL OR heartbeat < ?)
+            ''', (FAILED, datetime.now().isoformat(), QUEUED, RUNNING, cutoff)).rowcount
+        if count:
+            logger.warning(f"Marked {count} interrupted jobs as failed")
+    
+    def _prune(self):
+        cutoff = (datetime.now() - timedelta(days=KEEP_FINISHED_DAYS)).isoformat()
+        placeholders = ','.join('?' * len(FINISHED_STATES))
+        with self.db.batch() as conn:
+            conn.execute(f"DELETE FROM jobs WHERE status IN ({placeholders}) AND finished_date < ?",
+                         [*FINISHED_STATES, cutoff])
+    
+    def _to_dict(self, row, include_result: bool = True) -> Dict[str, Any]:
+        job = {
+            'id': row['id'],
+            'kind': row['kind'],
+            'status': row['status'],
+            'params': json.loads(row['params']) if row['params'] else {},
+            'progress': row['progress'],
+            'done': row['done'],
+            'total': row['total'],
+            'message': row['message'],
+            'error': row['error'],
+            'cancel_requested': bool(row['cancel_requested']),
+            'created_date': row['created_date'],
+            'started_date': row['started_date'],
+            'finished_date': row['finished_date'],
+        }
+        if include_result:
+            job['result'] = json.loads(row['result']) if row['result'] else None
+        return job
+    
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work; with wait, let queued and running jobs finish."""
+        self._pool.shutdown(wait=wait)
+
+
+def create_jobs_blueprint(queue: JobQueue):
+    """
+    Flask routes for polling, cancelling and streaming jobs:
+        
+        GET  /api/jobs                 recent jobs (?status=, ?limit=)
+        GET  /api/jobs/<id>            one job, with its result once finished
+        POST /api/jobs/<id>/cancel     cancel a queued or running job
+        GET  /api/jobs/<id>/events     Server-Sent Events progress stream
+    """
+    from flask import Blueprint, Response, jsonify, request, stream_with_context
+    
+    jobs = Blueprint('jobs', __name__)
+    
+    @jobs.route('/api/jobs', methods=['GET'])
+    def api_jobs():
+        limit = min(int(request.args.get('limit', 50)), 500)
+        return jsonify({'jobs': queue.list(limit=limit, status=request.args.get('status'))})
+    
+    @jobs.route('/api/jobs/<job_id>', methods=['GET'])
+    def api_job(job_id):
+        job = queue.get(job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        return jsonify(job)
+    
+    @jobs.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+    def api_cancel_job(job_id):
+        if not queue.cancel(job_id):
+            return jsonify({'success': False, 'error': 'Job not found or already finished'}), 409
+        return jsonify({'success': True, 'job': queue.get(job_id)})
+    
+    @jobs.route('/api/jobs/<job_id>/events', methods=['GET'])
+    def api_job_events(job_id):
+        return Response(stream_with_context(queue.events(job_id)), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    
+    return jobs
+
+
+def job_accepted(job_id: str):
+    """Response for an endpoint that queued a job: 202 with the URLs to follow it."""
+    from flask import jsonify, url_for
+    
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status_url': url_for('jobs.api_job', job_id=job_id),
+        'events_url': url_for('jobs.api_job_events', job_id=job_id),
+        'cancel_url': url_for('jobs.api_cancel_job', job_id=job_id)
+    }), 202
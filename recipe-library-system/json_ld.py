@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+JSON-LD Extraction
+Pulls schema.org objects out of raw page bytes without building a DOM
+"""
+
+import re
+import json
+from typing import Any, Dict, Iterator, Optional
+
+# Opening <script> tags whose type is application/ld+json (quoted or not, any case)
+LD_JSON_SCRIPT = re.compile(rb'<script\b[^>]*?\btype\s*=\s*["\']?\s*application/ld\+json\b[^>]*>', re.IGNORECASE)
+SCRIPT_END = re.compile(rb'</script\s*>', re.IGNORECASE)
+
+# Wrappers some sites put around script bodies
+BODY_WRAPPERS = re.compile(r'^\s*(?://\s*)?(?:<!\[CDATA\[|<!--)|(?://\s*)?(?:\]\]>|-->)\s*$')
+
+
+def iter_json_ld_blocks(html: bytes) -> Iterator[str]:
+    """
+    Yield the text of each JSON-LD script block in a page.
+    
+    Only script tags are tokenized; the rest of the markup is skipped by
+    the regex engine, so this costs a scan of the bytes rather than a parse.
+    Raises UnicodeDecodeError for blocks that aren't UTF-8 (the caller can
+    fall back to a DOM parser, which detects the page encoding).
+    """
+    position = 0
+    while True:
+        start = LD_JSON_SCRIPT.search(html, position)
+        if not start:
+            return
+        end = SCRIPT_END.search(html, start.end())
+        if not end:
+            return
+        yield BODY_WRAPPERS.sub('', html[start.end():end.start()].decode('utf-8'))
+        position = end.end()
+
+
+def is_schema_type(item: Any, type_name: str) -> bool:
+    """True if a JSON-LD node's @type is (or includes) type_name."""
+    if not isinstance(item, dict):
+        return False
+    types = item.get('@type')
+    if isinstance(types, str):
+        return types == type_name
+    return isinstance(types, list) and type_name in types
+
+
+def find_schema_object(data: Any, type_name: str = 'Recipe') -> Optional[Dict[str, Any]]:
+    """First node of the given @type in parsed JSON-LD (a node, a list of nodes, or an @graph)."""
+    if isinstance(data, list):
+        for item in data:
+            found = find_schema_object(item, type_name)
+            if found is not None:
+                return found
+    elif isinstance(data, dict):
+        if is_schema_type(data, type_name):
+            return data
+        if '@graph' in data:
+            return find_schema_object(data['@graph'], type_name)
+    return None
+
+
+def find_json_ld_recipe(html: bytes) -> Optional[Dict[str, Any]]:
+    """
+    The schema.org Recipe from a page's JSON-LD blocks, or None.
+    
+    Blocks that aren't valid JSON are skipped. Raises UnicodeDecodeError
+    for pages that aren't UTF-8.
+    """
+    for block in iter_json_ld_blocks(html):
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        recipe = find_schema_object(data)
+        if recipe is not None:
+            return recipe
+    return None
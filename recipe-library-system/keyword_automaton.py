@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Keyword Automaton
+Single-pass multi-keyword matcher shared by the recipe classifiers
+"""
+
+import re
+from typing import Dict, Iterable, Set
+
+
+class KeywordAutomaton:
+    """
+    Finds every keyword from a set of labelled keyword tables in one pass.
+    
+    All keywords are compiled into a single trie-shaped regex, so the regex
+    engine walks one trie from each candidate position instead of searching
+    the text once per keyword. Matching is case-insensitive substring
+    matching, the same as ``keyword in text.lower()``.
+    """
+    
+    def __init__(self, tables: Dict[str, Iterable[str]]):
+        """
+        Args:
+            tables: Label -> keywords. A keyword may appear under several labels.
+        """
+        self.labels: Dict[str, Set[str]] = {}
+        for label, keywords in tables.items():
+            self.labels.setdefault(label, set()).update(keyword.lower() for keyword in keywords if keyword)
+        
+        self.keywords: Set[str] = set().union(*self.labels.values()) if self.labels else set()
+        self._keyword_labels: Dict[str, Set[str]] = {keyword: set() for keyword in self.keywords}
+        for label, keywords in self.labels.items():
+            for keyword in keywords:
+                self._keyword_labels[keyword].add(label)
+        
+        # The regex reports the longest keyword at each position; shorter
+        # keywords inside it (e.g. "curry" in "green curry") are implied
+        self._implied: Dict[str, Set[str]] = {
+            keyword: {other for other in self.keywords if other in keyword}
+            for keyword in self.keywords
+        }
+        
+        self._pattern = re.compile(self._trie_pattern(self.keywords)) if self.keywords else None
+    
+    @classmethod
+    def _trie_pattern(cls, keywords: Iterable[str]) -> str:
+        """Build a regex that walks a trie of the keywords, preferring the longest match."""
+        trie: dict = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}
+        return cls._node_pattern(trie)
+    
+    @classmethod
+    def _node_pattern(cls, node: dict) -> str:
+        branches = [re.escape(char) + cls._node_pattern(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # Keyword ends here; greedy ? tries the longer keywords first
+            pattern = f'(?:{pattern})?'
+        return pattern
+    
+    def find(self, text: str) -> Set[str]:
+        """Return the distinct keywords that occur anywhere in text."""
+        found: Set[str] = set()
+        if not text or self._pattern is None:
+            return found
+        
+        text = text.lower()
+        search = self._pattern.search
+        match = search(text)
+        while match:
+            found |= self._implied[match.group()]
+            # Resume one character later so overlapping keywords are found too
+            match = search(text, match.start() + 1)
+        return found
+    
+    def label_hits(self, found: Iterable[str]) -> Dict[str, Set[str]]:
+        """Group keywords returned by find() by label (every label is present, possibly empty)."""
+        hits: Dict[str, Set[str]] = {label: set() for label in self.labels}
+        for keyword in found:
+            for label in self._keyword_labels[keyword]:
+                hits[label].add(keyword)
+        return hits
+    
+    def scan(self, text: str) -> Dict[str, Set[str]]:
+        """Return label -> keywords found in text."""
+        return self.label_hits(self.find(text))
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Library Statistics
+Summary counts of the recipes and tags tables, kept current by triggers
+"""
+
+from typing import Any, Dict
+
+STATS_TABLE = "library_stats"
+
+# Grouped dimensions and the recipes column each one counts
+RECIPE_DIMENSIONS = {
+    'cuisine': 'cuisine_type',
+    'category': 'category',
+    'difficulty': 'difficulty',
+    'upload': 'is_uploaded',
+}
+
+# Stored in place of NULL: the value is part of the primary key, where NULLs never conflict.
+# A zero-length blob can't collide with the text and integer values of the counted columns.
+NULL_VALUE = b''
+
+# Stats dictionary key for each grouped dimension
+STATS_KEYS = {
+    'cuisine': 'by_cuisine',
+    'category': 'by_category',
+    'difficulty': 'by_difficulty',
+    'upload': 'upload_status',
+}
+
+POPULAR_TAG_LIMIT = 10
+
+
+def _stored(expression: str) -> str:
+    """A counted value as stored in the summary table."""
+    return f"COALESCE({expression}, X'')"
+
+
+def _recipe_amounts(row: str, sign: str) -> str:
+    """VALUES rows adding (sign '') or removing (sign '-') one recipe's counts."""
+    values = [f"('total', X'', {sign}1)", f"('bytes', X'', {sign}COALESCE({row}.file_size, 0))"]
+    values += [f"('{dimension}', {_stored(f'{row}.{column}')}, {sign}1)"
+               for dimension, column in RECIPE_DIMENSIONS.items()]
+    return ', '.join(values)
+
+
+def _prune_recipe_values(row: str) -> str:
+    """Drop grouped counts that one recipe's removal brought to zero (primary-key lookups)."""
+    return '\n'.join(
+        f"DELETE FROM {STATS_TABLE} WHERE dimension = '{dimension}' "
+        f"AND value = {_stored(f'{row}.{column}')} AND count = 0;"
+        for dimension, column in RECIPE_DIMENSIONS.items()
+    )
+
+
+UPSERT = "ON CONFLICT (dimension, value) DO UPDATE SET count = count + excluded.count"
+
+
+def ensure_library_stats(cursor) -> bool:
+    """
+    Create the summary table and the triggers that maintain it.
+    
+    Every insert, delete and update on recipes and tags adjusts the affected
+    counts in place, so reading the statistics costs one row per distinct
+    value instead of a scan of the library. The table is filled from the
+    current rows the first time it is created. Returns False if the recipes
+    table does not exist yet.
+    """
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('recipes', 'tags', ?)",
+                   (STATS_TABLE,))
+    existing = {row[0] for row in cursor.fetchall()}
+    if 'recipes' not in existing or 'tags' not in existing:
+        return False
+    
+    # value is untyped so is_uploaded counts keep their integer values
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {STATS_TABLE} (
+            dimension TEXT NOT NULL,
+            value,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dimension, value)
+        ) WITHOUT ROWID
+    ''')
+    
+    columns = ', '.join(['file_size', *RECIPE_DIMENSIONS.values()])
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {STATS_TABLE}_recipe_insert AFTER INSERT ON recipes BEGIN
+            INSERT INTO {STATS_TABLE} (dimension, value, count) VALUES {_recipe_amounts('new', '')}
+            {UPSERT};
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {STATS_TABLE}_recipe_delete AFTER DELETE ON recipes BEGIN
+            INSERT INTO {STATS_TABLE} (dimension, value, count) VALUES {_recipe_amounts('old', '-')}
+            {UPSERT};
+            {_prune_recipe_values('old')}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {STATS_TABLE}_recipe_update AFTER UPDATE OF {columns} ON recipes BEGIN
+            INSERT INTO {STATS_TABLE} (dimension, value, count) VALUES {_recipe_amounts('old', '-')}
+            {UPSERT};
+            INSERT INTO {STATS_TABLE} (dimension, value, count) VALUES {_recipe_amounts('new', '')}
+            {UPSERT};
+            {_prune_recipe_values('old')}
+        END
+    ''')
+    
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {STATS_TABLE}_tag_insert AFTER INSERT ON tags BEGIN
+            INSERT INTO {STATS_TABLE} (dimension, value, count) VALUES ('tag', {_stored('new.tag')}, 1)
+            {UPSERT};
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {STATS_TABLE}_tag_delete AFTER DELETE ON tags BEGIN
+            UPDATE {STATS_TABLE} SET count = count - 1 WHERE dimension = 'tag' AND value = {_stored('old.tag')};
+            DELETE FROM {STATS_TABLE} WHERE dimension = 'tag' AND value = {_stored('old.tag')} AND count = 0;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {STATS_TABLE}_tag_update AFTER UPDATE OF tag ON tags BEGIN
+            UPDATE {STATS_TABLE} SET count = count - 1 WHERE dimension = 'tag' AND value = {_stored('old.tag')};
+            INSERT INTO {STATS_TABLE} (dimension, value, count) VALUES ('tag', {_stored('new.tag')}, 1)
+            {UPSERT};
+            DELETE FROM {STATS_TABLE} WHERE dimension = 'tag' AND value = {_stored('old.tag')} AND count = 0;
+        END
+    ''')
+    
+    # Popular tags are read by count
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{STATS_TABLE}_count ON {STATS_TABLE}(dimension, count)')
+    
+    if STATS_TABLE not in existing:
+        rebuild_library_stats(cursor)
+    
+    return True
+
+
+def rebuild_library_stats(cursor):
+    """Recount the summary table from recipes and tags (e.g. after editing the database by hand)."""
+    cursor.execute(f"DELETE FROM {STATS_TABLE}")
+    cursor.execute(f'''
+        INSERT INTO {STATS_TABLE} (dimension, value, count)
+        SELECT 'total', X'', COUNT(*) FROM recipes
+        UNION ALL
+        SELECT 'bytes', X'', COALESCE(SUM(file_size), 0) FROM recipes
+    ''')
+    for dimension, column in RECIPE_DIMENSIONS.items():
+        cursor.execute(f'''
+            INSERT INTO {STATS_TABLE} (dimension, value, count)
+            SELECT '{dimension}', {_stored(column)}, COUNT(*) FROM recipes GROUP BY {_stored(column)}
+        ''')
+    cursor.execute(f'''
+        INSERT INTO {STATS_TABLE} (dimension, value, count)
+        SELECT 'tag', {_stored('tag')}, COUNT(*) FROM tags GROUP BY {_stored('tag')}
+    ''')
+
+
+def read_library_stats(cursor, popular_tags: int = POPULAR_TAG_LIMIT) -> Dict[str, Any]:
+    """
+    Read the library statistics from the summary table.
+    
+    Returns:
+        Dictionary with total_recipes, total_size, by_cuisine, by_category,
+        by_difficulty and upload_status (each ordered by count, most first),
+        and popular_tags (the top tags by count). A None value counts rows
+        where the column is NULL, as GROUP BY would.
+    """
+    stats: Dict[str, Any] = {'total_recipes': 0, 'total_size': 0}
+    stats.update({name: {} for name in STATS_KEYS.values()})
+    
+    dimensions = ', '.join(f"'{dimension}'" for dimension in ['total', 'bytes', *RECIPE_DIMENSIONS])
+    cursor.execute(f'''
+        SELECT dimension, value, count FROM {STATS_TABLE}
+        WHERE dimension IN ({dimensions})
+        ORDER BY dimension, count DESC
+    ''')
+    for dimension, value, count in cursor.fetchall():
+        if dimension == 'total':
+            stats['total_recipes'] = count
+        elif dimension == 'bytes':
+            stats['total_size'] = count
+        else:
+            stats[STATS_KEYS[dimension]][None if value == NULL_VALUE else value] = count
+    
+    cursor.execute(f'''
+        SELECT value, count FROM {STATS_TABLE}
+        WHERE dimension = 'tag'
+        ORDER BY count DESC
+        LIMIT ?
+    ''', (popular_tags,))
+    stats['popular_tags'] = {None if value == NULL_VALUE else value: count for value, count in cursor.fetchall()}
+    
+    return stats
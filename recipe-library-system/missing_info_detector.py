@@ -4,14 +4,53 @@ Missing Information Detector
 Identifies what information needs to be added to recipes for complete Iterum format
 """
 
-import sqlite3
+import os
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 from openpyxl import load_workbook
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string
 import json
 
+from db_connection import get_connection_manager
+from recipe_completeness import content_hash, ensure_completeness_cache, load_cached, set_completeness, store_analyses
+
+# Cold-cache runs with at least this many workbooks to open use a process pool
+PARALLEL_MIN_FILES = 8
+
+# The checks only look at columns A-I of the first rows (the method search
+# stops before row 200 and then looks at most 19 rows further)
+SCAN_COLUMNS = 9
+SCAN_ROWS = 218
+
+class SheetValues:
+    """
+    Cell values of the top-left block of a worksheet, read in one pass.
+    
+    Read-only worksheets parse the sheet from the top for every cell lookup,
+    so the checks index into this grid instead.
+    """
+    
+    def __init__(self, ws, max_row: int = SCAN_ROWS, max_col: int = SCAN_COLUMNS):
+        self.rows = list(ws.iter_rows(min_row=1, max_row=max_row, max_col=max_col, values_only=True))
+        while self.rows and all(value is None for value in self.rows[-1]):
+            self.rows.pop()
+        self.max_row = len(self.rows)
+    
+    def __getitem__(self, coordinate: str):
+        """Value of a cell such as 'B3' (None outside the block)."""
+        column, row = coordinate_from_string(coordinate)
+        column = column_index_from_string(column)
+        if row > self.max_row or column > len(self.rows[row - 1]):
+            return None
+        return self.rows[row - 1][column - 1]
+
+def _analyze_worker(file_path: str) -> Dict[str, Any]:
+    """Analyze one workbook in a worker process."""
+    return MissingInfoDetector.analyze_workbook(Path(file_path))
+
 class MissingInfoDetector:
     """Detects missing information in recipes for Iterum format."""
     
@@ -43,11 +82,22 @@ class MissingInfoDetector:
         }
     }
     
-    def __init__(self, library_path: str = "recipe_library", converted_path: str = "converted_iterum"):
+    def __init__(self, library_path: str = "recipe_library", converted_path: str = "converted_iterum",
+                 max_workers: Optional[int] = None):
         self.library_path = Path(library_path)
         self.converted_path = Path(converted_path)
         self.db_path = self.library_path / "recipe_library.db"
+        self.db = get_connection_manager(self.db_path)
         self.converted_path.mkdir(exist_ok=True)
+        self.max_workers = max_workers
+        self.cache_ready = False
+    
+    def _cache_ready(self) -> bool:
+        """Create the analysis cache on first use (the library may not exist yet)."""
+        if not self.cache_ready and self.db_path.exists():
+            with self.db.batch() as conn:
+                self.cache_ready = ensure_completeness_cache(conn.cursor())
+        return self.cache_ready
     
     def analyze_recipe(self, recipe_id: Optional[str] = None, file_path: Optional[Path] = None) -> Dict[str, Any]:
         """
@@ -62,17 +112,15 @@ class MissingInfoDetector:
         """
         if recipe_id:
             # Get recipe from database
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM recipes WHERE id = ?", (recipe_id,))
+            cursor = self.db.connection().cursor()
+            cursor.execute("SELECT library_path FROM recipes WHERE id = ?", (recipe_id,))
             row = cursor.fetchone()
-            conn.close()
             
             if not row:
                 return {'error': 'Recipe not found in database'}
             
             # Get library file path
-            library_file = Path(row[16])  # library_path column
+            library_file = Path(row[0])
             if not library_file.exists():
                 return {'error': 'Recipe file not found in library'}
             
@@ -81,41 +129,81 @@ class MissingInfoDetector:
         if not file_path or not file_path.exists():
             return {'error': 'File path not provided or does not exist'}
         
-        # Analyze the file
-        missing_info = {
-            'file_path': str(file_path),
-            'recipe_name': file_path.stem,
+        if not self._cache_ready():
+            return self._report(file_path, self.analyze_workbook(file_path))
+        
+        # Reuse the stored analysis unless the file's content changed
+        digest = content_hash(file_path, self.library_path)
+        analysis = load_cached(self.db.connection().cursor(), [digest]).get(digest)
+        
+        if analysis is None:
+            analysis = self.analyze_workbook(file_path)
+            if 'error' not in analysis:
+                with self.db.batch() as conn:
+                    cursor = conn.cursor()
+                    store_analyses(cursor, [(digest, analysis)])
+                    if recipe_id:
+                        set_completeness(cursor, [(recipe_id, analysis['completeness_score'])])
+        
+        return self._report(file_path, analysis)
+    
+    @classmethod
+    def analyze_workbook(cls, file_path: Path) -> Dict[str, Any]:
+        """
+        Run the completeness checks on one file.
+        
+        Returns the part of the analysis that depends only on the file's
+        content (missing_fields and completeness_score), with 'error' set
+        if the workbook can't be read.
+        """
+        analysis = {
             'missing_fields': [],
-            'incomplete_sections': [],
-            'warnings': [],
             'completeness_score': 0.0
         }
         
         # Try to read as Excel
         if file_path.suffix.lower() in ['.xlsx', '.xls']:
             try:
-                wb = load_workbook(file_path, data_only=True)
-                ws = wb.active
+                wb = load_workbook(file_path, read_only=True, data_only=True)
+                try:
+                    ws = SheetValues(wb.active)
+                finally:
+                    wb.close()
                 
                 # Check header fields
-                header_issues = self._check_header_fields(ws)
-                missing_info['missing_fields'].extend(header_issues)
+                header_issues = cls._check_header_fields(ws)
+                analysis['missing_fields'].extend(header_issues)
                 
                 # Check ingredients
-                ingredient_issues = self._check_ingredients(ws)
-                missing_info['missing_fields'].extend(ingredient_issues)
+                ingredient_issues = cls._check_ingredients(ws)
+                analysis['missing_fields'].extend(ingredient_issues)
                 
                 # Check method
-                method_issues = self._check_method(ws)
-                missing_info['missing_fields'].extend(method_issues)
+                method_issues = cls._check_method(ws)
+                analysis['missing_fields'].extend(method_issues)
                 
                 # Calculate completeness
-                total_required = sum(len(fields) for fields in self.REQUIRED_FIELDS.values())
-                missing_count = len(missing_info['missing_fields'])
-                missing_info['completeness_score'] = max(0, (total_required - missing_count) / total_required * 100)
+                total_required = sum(len(fields) for fields in cls.REQUIRED_FIELDS.values())
+                missing_count = len(analysis['missing_fields'])
+                analysis['completeness_score'] = max(0, (total_required - missing_count) / total_required * 100)
                 
             except Exception as e:
-                missing_info['error'] = f"Error reading Excel file: {str(e)}"
+                analysis['error'] = f"Error reading Excel file: {str(e)}"
+        
+        return analysis
+    
+    def _report(self, file_path: Path, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Full missing-information result for a file from its content analysis."""
+        missing_info = {
+            'file_path': str(file_path),
+            'recipe_name': file_path.stem,
+            'missing_fields': list(analysis['missing_fields']),
+            'incomplete_sections': [],
+            'warnings': [],
+            'completeness_score': analysis['completeness_score']
+        }
+        if 'error' in analysis:
+            missing_info['error'] = analysis['error']
         
         # Check if converted file exists
         converted_file = self.converted_path / f"{file_path.stem}.xlsx"
@@ -124,12 +212,13 @@ class MissingInfoDetector:
         
         return missing_info
     
-    def _check_header_fields(self, ws) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _check_header_fields(ws: SheetValues) -> List[Dict[str, Any]]:
         """Check header section for missing fields."""
         issues = []
         
         # Check for recipe name (usually in B3)
-        if not ws['B3'].value or str(ws['B3'].value).strip() in ['', 'Untitled Recipe']:
+        if not ws['B3'] or str(ws['B3']).strip() in ['', 'Untitled Recipe']:
             issues.append({
                 'section': 'header',
                 'field': 'recipe_name',
@@ -139,7 +228,7 @@ class MissingInfoDetector:
             })
         
         # Check for concept (B4)
-        if not ws['B4'].value or str(ws['B4'].value).strip() == '':
+        if not ws['B4'] or str(ws['B4']).strip() == '':
             issues.append({
                 'section': 'header',
                 'field': 'concept',
@@ -149,7 +238,7 @@ class MissingInfoDetector:
             })
         
         # Check for cuisine (H4)
-        if not ws['H4'].value or str(ws['H4'].value).strip().lower() in ['unknown', '']:
+        if not ws['H4'] or str(ws['H4']).strip().lower() in ['unknown', '']:
             issues.append({
                 'section': 'header',
                 'field': 'cuisine',
@@ -159,7 +248,7 @@ class MissingInfoDetector:
             })
         
         # Check for number of portions (B6)
-        if not ws['B6'].value or ws['B6'].value == 0:
+        if not ws['B6'] or ws['B6'] == 0:
             issues.append({
                 'section': 'header',
                 'field': 'number_of_portions',
@@ -170,7 +259,8 @@ class MissingInfoDetector:
         
         return issues
     
-    def _check_ingredients(self, ws) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _check_ingredients(ws: SheetValues) -> List[Dict[str, Any]]:
         """Check ingredients section for missing information."""
         issues = []
         
@@ -179,20 +269,20 @@ class MissingInfoDetector:
         ingredient_count = 0
         
         for row in range(14, min(100, ws.max_row + 1)):
-            ingredient_name = ws[f'A{row}'].value
+            ingredient_name = ws[f'A{row}']
             
             if ingredient_name and str(ingredient_name).strip().lower() not in ['', 'ingredients', 'method', 'instructions']:
                 ingredients_found = True
                 ingredient_count += 1
                 
                 # Check if ingredient has required fields
-                weight = ws[f'C{row}'].value
-                volume = ws[f'D{row}'].value
-                ap_cost = ws[f'E{row}'].value
-                unit = ws[f'F{row}'].value
-                yield_pct = ws[f'G{row}'].value
-                ep_cost = ws[f'H{row}'].value
-                total_cost = ws[f'I{row}'].value
+                weight = ws[f'C{row}']
+                volume = ws[f'D{row}']
+                ap_cost = ws[f'E{row}']
+                unit = ws[f'F{row}']
+                yield_pct = ws[f'G{row}']
+                ep_cost = ws[f'H{row}']
+                total_cost = ws[f'I{row}']
                 
                 # Check for missing costing information
                 if not ap_cost or str(ap_cost).strip() == '':
@@ -236,7 +326,8 @@ class MissingInfoDetector:
         
         return issues
     
-    def _check_method(self, ws) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _check_method(ws: SheetValues) -> List[Dict[str, Any]]:
         """Check method/instructions section."""
         issues = []
         
@@ -244,12 +335,12 @@ class MissingInfoDetector:
         method_found = False
         
         for row in range(14, min(200, ws.max_row + 1)):
-            cell_value = ws[f'A{row}'].value
+            cell_value = ws[f'A{row}']
             if cell_value and 'method' in str(cell_value).lower():
                 # Check if there are instructions after this
                 has_instructions = False
                 for next_row in range(row + 1, min(row + 20, ws.max_row + 1)):
-                    if ws[f'A{next_row}'].value and str(ws[f'A{next_row}'].value).strip():
+                    if ws[f'A{next_row}'] and str(ws[f'A{next_row}']).strip():
                         has_instructions = True
                         break
                 
@@ -276,13 +367,20 @@ class MissingInfoDetector:
         
         return issues
     
-    def analyze_all_recipes(self) -> Dict[str, Any]:
-        """Analyze all recipes in the library for missing information."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, title, library_path FROM recipes")
+    def analyze_all_recipes(self, progress: Optional[Callable[[int, int, str], None]] = None) -> Dict[str, Any]:
+        """
+        Analyze all recipes in the library for missing information.
+        
+        Only files whose content has no cached analysis are opened; when
+        there are many of them they are analyzed in a process pool.
+        
+        Args:
+            progress: Called as progress(files_done, total_files, file_name) for the files analyzed
+        """
+        self._cache_ready()
+        cursor = self.db.connection().cursor()
+        cursor.execute("SELECT id, title, library_path, completeness FROM recipes")
         recipes = cursor.fetchall()
-        conn.close()
         
         results = {
             'total_recipes': len(recipes),
@@ -295,10 +393,30 @@ class MissingInfoDetector:
             }
         }
         
+        # Content hash of every library file that still exists
+        digests = {}
+        for recipe_id, title, library_path, completeness in recipes:
+            if library_path and Path(library_path).exists():
+                digests[recipe_id] = content_hash(Path(library_path), self.library_path)
+        
+        analyses = load_cached(cursor, digests.values())
+        uncached = {}
+        for recipe_id, title, library_path, completeness in recipes:
+            digest = digests.get(recipe_id)
+            if digest and digest not in analyses:
+                uncached.setdefault(digest, Path(library_path))
+        
+        fresh = self._analyze_files(uncached, progress)
+        analyses.update(fresh)
+        
         total_completeness = 0.0
+        scores = []
         
-        for recipe_id, title, library_path in recipes:
-            analysis = self.analyze_recipe(recipe_id=recipe_id)
+        for recipe_id, title, library_path, completeness in recipes:
+            if recipe_id not in digests:
+                continue
+            
+            analysis = self._report(Path(library_path), analyses[digests[recipe_id]])
             
             if 'error' not in analysis:
                 results['analyzed_recipes'].append(analysis)
@@ -313,12 +431,41 @@ class MissingInfoDetector:
                         results['summary']['low_priority'] += 1
                 
                 total_completeness += analysis['completeness_score']
+                if completeness != analysis['completeness_score']:
+                    scores.append((recipe_id, analysis['completeness_score']))
+        
+        fresh = [(digest, analysis) for digest, analysis in fresh.items() if 'error' not in analysis]
+        if fresh or scores:
+            with self.db.batch() as conn:
+                cursor = conn.cursor()
+                store_analyses(cursor, fresh)
+                set_completeness(cursor, scores)
         
         if results['total_recipes'] > 0:
             results['summary']['average_completeness'] = total_completeness / results['total_recipes']
         
         return results
     
+    def _analyze_files(self, files: Dict[str, Path],
+                       progress: Optional[Callable[[int, int, str], None]] = None) -> Dict[str, Dict[str, Any]]:
+        """Analyze {content hash: path} files, in worker processes when there are enough of them."""
+        analyses = {}
+        
+        def collect(outcomes):
+            for index, (digest, analysis) in enumerate(zip(files, outcomes), 1):
+                analyses[digest] = analysis
+                if progress:
+                    progress(index, len(files), files[digest].name)
+        
+        workers = self.max_workers or os.cpu_count() or 1
+        if len(files) >= PARALLEL_MIN_FILES and workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                collect(executor.map(_analyze_worker, [str(path) for path in files.values()], chunksize=4))
+        else:
+            collect(self.analyze_workbook(path) for path in files.values())
+        
+        return analyses
+    
     def generate_missing_info_report(self, output_file: Optional[str] = None) -> str:
         """Generate a detailed report of missing information."""
         analysis = self.analyze_all_recipes()
@@ -376,10 +523,11 @@ def main():
     parser.add_argument('--file', help='Analyze specific file')
     parser.add_argument('--all', action='store_true', help='Analyze all recipes')
     parser.add_argument('--report', help='Generate report file')
+    parser.add_argument('--workers', type=int, help='Processes for analyzing uncached files (default: CPU count)')
     
     args = parser.parse_args()
     
-    detector = MissingInfoDetector()
+    detector = MissingInfoDetector(max_workers=args.workers)
     
     if args.recipe_id:
         result = detector.analyze_recipe(recipe_id=args.recipe_id)
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Recipe Browsing
+Keyset pagination over the recipes table with narrow listing columns and opaque cursors
+"""
+
+import json
+import base64
+import binascii
+from typing import List, Optional, Sequence, Tuple
+
+from recipe_search import FTS_TABLE, MATCH_FILTER, SNIPPET_MARKERS, build_match_query
+
+# Sort options and the recipes column each one orders by
+SORT_COLUMNS = {
+    'title': 'title',
+    'date': 'modified_date',
+    'cuisine': 'cuisine_type',
+    'difficulty': 'difficulty',
+    'completeness': 'completeness',
+}
+
+# Sort option for full-text searches (BM25 rank, best first); see search_page
+RELEVANCE = 'relevance'
+
+PAGE_SIZE = 48
+MAX_PAGE_SIZE = 500
+
+# Listings only show the start of the preview
+PREVIEW_LENGTH = 120
+
+LISTING_COLUMNS = ('id', 'title', 'cuisine_type', 'category', 'difficulty', 'modified_date', 'completeness',
+                   f'substr(content_preview, 1, {PREVIEW_LENGTH}) AS content_preview')
+
+
+class InvalidCursor(ValueError):
+    """A page cursor that is malformed or belongs to a different sort."""
+
+
+def sort_key(sort: str) -> str:
+    """
+    The expression a sort option orders by.
+    
+    NULLs become '' so that every row has a comparable key; the browse
+    indexes are built on the same expressions. Text sorts after numbers,
+    so recipes without a completeness score come after the scored ones.
+    """
+    return f"IFNULL({SORT_COLUMNS[sort]}, '')"
+
+
+def ensure_browse_indexes(cursor):
+    """Create one (sort key, id) index per sort option so each page is an index seek."""
+    for sort in SORT_COLUMNS:
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_browse_{sort} ON recipes({sort_key(sort)}, id)')
+
+
+def encode_cursor(sort: str, order: str, key, recipe_id: str) -> str:
+    """Opaque token for the page after the row with this sort key and ID."""
+    data = json.dumps([sort, order, key, recipe_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str, sort: str, order: str) -> Tuple[str, str]:
+    """
+    The (sort key, ID) a cursor token resumes after.
+    
+    Raises InvalidCursor if the token can't be read or was issued for a
+    different sort or order.
+    """
+    try:
+        data = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        token_sort, token_order, key, recipe_id = json.loads(data)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+    if (token_sort, token_order) != (sort, order):
+        raise InvalidCursor(f"Cursor is for sort={token_sort}&order={token_order}")
+    return key, recipe_id
+
+
+def build_browse_filters(cuisine: str = '', category: str = '', difficulty: str = '',
+                         search: str = '', min_completeness: Optional[float] = None,
+                         max_completeness: Optional[float] = None) -> Tuple[str, List]:
+    """
+    WHERE clause additions for the browse filters ('' or 'all' means no filter).
+    
+    The completeness bounds are inclusive percentages; either one leaves
+    out recipes that have not been analyzed yet.
+    
+    Returns:
+        (SQL starting with " AND", parameters)
+    """
+    filters = ""
+    params = []
+    
+    for column, value in (('cuisine_type', cuisine), ('category', category), ('difficulty', difficulty)):
+        if value and value != 'all':
+            filters += f" AND {column} = ?"
+            params.append(value)
+    
+    if min_completeness is not None:
+        filters += " AND completeness >= ?"
+        params.append(min_completeness)
+    if max_completeness is not None:
+        filters += " AND completeness <= ?"
+        params.append(max_completeness)
+    
+    match = build_match_query(search)
+    if match:
+        filters += f" AND {MATCH_FILTER}"
+        params.append(match)
+    
+    return filters, params
+
+
+def browse_page(cursor, filters: str = "", params: Sequence = (), sort: str = 'title',
+                order: str = 'asc', after: Optional[str] = None, limit: int = PAGE_SIZE,
+                columns: Sequence[str] = LISTING_COLUMNS) -> Tuple[List, Optional[str]]:
+    """
+    Fetch one page of recipes in sort order.
+    
+    Pages resume from the last row's (sort key, id) rather than an OFFSET,
+    so every page costs the same however deep the user goes.
+    
+    Args:
+        cursor: Open database cursor
+        filters: Extra SQL for the WHERE clause, e.g. from build_browse_filters
+        params: Parameters for the filters
+        sort: Key of SORT_COLUMNS (unknown values sort by title)
+        order: 'asc' or 'desc'
+        after: Cursor token from the previous page, or None for the first page
+        limit: Rows per page
+        columns: Columns to select; must include id and the sort column
+    
+    Returns:
+        (rows, token for the next page or None on the last page)
+    """
+    sort = sort if sort in SORT_COLUMNS else 'title'
+    order = 'desc' if order == 'desc' else 'asc'
+    key = sort_key(sort)
+    direction = order.upper()
+    
+    where = f"WHERE 1=1{filters}"
+    args = list(params)
+    if after:
+        # Spelled out rather than as a row value: SQLite only seeks an
+        # expression index on a plain comparison of the expression
+        last_key, last_id = decode_cursor(after, sort, order)
+        past = '<' if order == 'desc' else '>'
+        where += f" AND {key} {past}= ? AND ({key} {past} ? OR id {past} ?)"
+        args.extend([last_key, last_key, last_id])
+    
+    cursor.execute(f'''
+        SELECT {', '.join(columns)} FROM recipes
+        {where}
+        ORDER BY {key} {direction}, id {direction}
+        LIMIT ?
+    ''', args + [limit + 1])
+    rows = cursor.fetchall()
+    
+    if len(rows) <= limit:
+        return rows, None
+    
+    rows = rows[:limit]
+    last = rows[-1]
+    names = [column.split()[-1] for column in columns]
+    last_key = last[names.index(SORT_COLUMNS[sort])]
+    return rows, encode_cursor(sort, order, last_key if last_key is not None else '', last[names.index('id')])
+
+
+def search_page(cursor, text: str, filters: str = "", params: Sequence = (), after: Optional[str] = None,
+                limit: int = PAGE_SIZE, columns: Sequence[str] = LISTING_COLUMNS) -> Tuple[List, Optional[str]]:
+    """
+    Fetch one page of full-text matches in relevance order.
+    
+    Like browse_page, but ordered by BM25 rank and resumed from the last
+    row's (rank, id). Rows carry the selected columns plus "snippet"
+    (matches wrapped in SNIPPET_MARKERS, see snippet_html) and "score".
+    
+    Args:
+        cursor: Open database cursor
+        text: Free-form search text
+        filters: Extra SQL for the WHERE clause, e.g. from build_browse_filters without a search
+        params: Parameters for the filters
+        after: Cursor token from the previous page, or None for the first page
+        limit: Rows per page
+        columns: Recipe columns to select; must include id
+    
+    Returns:
+        (rows, token for the next page or None on the last page); no rows if
+        the text has nothing to search for
+    """
+    match = build_match_query(text)
+    if match is None:
+        return [], None
+    
+    where = f"WHERE 1=1{filters}"
+    args = list(params)
+    if after:
+        last_score, last_id = decode_cursor(after, RELEVANCE, 'asc')
+        if not isinstance(last_score, (int, float)):
+            raise InvalidCursor("Invalid cursor: rank is not a number")
+        where += " AND (matches.score > ? OR (matches.score = ? AND id > ?))"
+        args.extend([last_score, last_score, last_id])
+    
+    cursor.execute(f'''
+        SELECT {', '.join(columns)}, matches.snippet, matches.score FROM recipes
+        JOIN (
+            SELECT recipe_id, snippet({FTS_TABLE}, -1, ?, ?, '...', 16) AS snippet, rank AS score
+            FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?
+        ) AS matches ON matches.recipe_id = recipes.id
+        {where}
+        ORDER BY matches.score, id
+        LIMIT ?
+    ''', [*SNIPPET_MARKERS, match, *args, limit + 1])
+    rows = cursor.fetchall()
+    
+    if len(rows) <= limit:
+        return rows, None
+    
+    rows = rows[:limit]
+    last = rows[-1]
+    names = [column.split()[-1] for column in columns]
+    return rows, encode_cursor(RELEVANCE, 'asc', last[-1], last[names.index('id')])
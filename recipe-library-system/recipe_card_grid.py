@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Recipe Card Grid
+Virtualized card grid for the dashboard: only the cards in view exist, and they are recycled on scroll
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# (id, title, cuisine, category, difficulty, modified)
+CardItem = Tuple[str, Optional[str], Optional[str], Optional[str], Optional[str], Optional[str]]
+
+DIFFICULTY_COLORS = {
+    'easy': ('#e3f2fd', '#1976d2'),
+    'medium': ('#fff3e0', '#f57c00'),
+    'hard': ('#ffebee', '#c62828')
+}
+
+
+def visible_rows(top: float, height: float, row_height: int, total_rows: int, buffer_rows: int) -> Tuple[int, int]:
+    """Range [first, last) of grid rows that intersect the viewport, widened by buffer_rows each way."""
+    first = max(0, int(top // row_height) - buffer_rows)
+    last = min(total_rows, int((top + height) // row_height) + 1 + buffer_rows)
+    return first, max(first, last)
+
+
+class RecipeCard:
+    """One card widget, rebound to a different recipe as the grid scrolls."""
+    
+    def __init__(self, parent, on_view: Callable[[str], None]):
+        self.recipe_id = None
+        self.item = None
+        
+        # Card frame with styling
+        self.frame = tk.Frame(parent, bg='white', relief=tk.RAISED, bd=1,
+                              highlightbackground='#e0e0e0', highlightthickness=1)
+        
+        # Card content
+        content_frame = tk.Frame(self.frame, bg='white', padx=15, pady=15)
+        content_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Title
+        self.title_label = tk.Label(content_frame, font=("Arial", 12, "bold"), bg='white',
+                                    fg='#2c3e50', anchor='w', justify=tk.LEFT, wraplength=200)
+        self.title_label.pack(fill=tk.X, pady=(0, 10))
+        
+        # Badges row
+        badges_frame = tk.Frame(content_frame, bg='white')
+        badges_frame.pack(fill=tk.X, pady=(0, 10))
+        self.cuisine_badge = tk.Label(badges_frame, font=("Arial", 8), bg='#e8f5e9', fg='#2e7d32',
+                                      padx=8, pady=3, relief=tk.FLAT)
+        self.difficulty_badge = tk.Label(badges_frame, font=("Arial", 8), padx=8, pady=3, relief=tk.FLAT)
+        
+        # Category and modified date (always packed so every card has the same layout)
+        self.category_label = tk.Label(content_frame, font=("Arial", 8), bg='white', fg='#757575', anchor='w')
+        self.category_label.pack(fill=tk.X, pady=(0, 5))
+        self.date_label = tk.Label(content_frame, font=("Arial", 8), bg='white', fg='#9e9e9e', anchor='w')
+        self.date_label.pack(fill=tk.X, pady=(0, 10))
+        
+        # View button
+        view_btn = tk.Button(content_frame, text="👁️ View Recipe",
+                             font=("Arial", 9), bg='#2196f3', fg='white',
+                             relief=tk.FLAT, padx=15, pady=5,
+                             cursor='hand2',
+                             command=lambda: on_view(self.recipe_id))
+        view_btn.pack(fill=tk.X)
+        
+        # Hover effect (bound once per card, not once per recipe)
+        def on_enter(e):
+            self.frame.config(highlightbackground='#2196f3', highlightthickness=2)
+        
+        def on_leave(e):
+            self.frame.config(highlightbackground='#e0e0e0', highlightthickness=1)
+        
+        for widget in [self.frame, content_frame, self.title_label, badges_frame]:
+            widget.bind("<Enter>", on_enter)
+            widget.bind("<Leave>", on_leave)
+    
+    def show(self, item: CardItem):
+        """Display a recipe on this card."""
+        if item == self.item:
+            return
+        self.item = item
+        self.recipe_id, title, cuisine, category, difficulty, modified = item
+        
+        self.title_label.config(text=title or 'Untitled')
+        
+        self.cuisine_badge.pack_forget()
+        self.difficulty_badge.pack_forget()
+        if cuisine:
+            self.cuisine_badge.config(text=f"🌍 {cuisine}")
+            self.cuisine_badge.pack(side=tk.LEFT, padx=(0, 5))
+        if difficulty:
+            diff_bg, diff_fg = DIFFICULTY_COLORS.get(difficulty.lower(), ('#f5f5f5', '#757575'))
+            self.difficulty_badge.config(text=f"📊 {difficulty.title()}", bg=diff_bg, fg=diff_fg)
+            self.difficulty_badge.pack(side=tk.LEFT)
+        
+        self.category_label.config(text=f"Category: {category}" if category else "")
+        self.date_label.config(text=f"📅 {modified[:10] if modified else 'Unknown'}")
+    
+    def set_width(self, width: int):
+        """Wrap the title to the card's width."""
+        self.title_label.config(wraplength=max(100, width - 40))
+
+
+class VirtualCardGrid:
+    """
+    Scrollable grid of recipe cards that only creates the cards in view.
+    
+    Every row has the same height, so the scroll region is computed from
+    the item count and the visible rows from the scroll position. A small
+    pool of cards (the visible rows plus a buffer) is placed on the canvas
+    and rebound to whichever items are in view; set_items() swaps the data
+    without creating or destroying widgets.
+    """
+    
+    def __init__(self, parent, on_view: Callable[[str], None], columns: int = 3,
+                 row_height: int = 200, buffer_rows: int = 2, padding: int = 10):
+        self.on_view = on_view
+        self.columns = columns
+        self.row_height = row_height
+        self.buffer_rows = buffer_rows
+        self.padding = padding
+        
+        self.items: Sequence[CardItem] = []
+        self.cards: List[Tuple[RecipeCard, int]] = []  # (card, canvas window id)
+        self.first_row = None
+        self.column_width = 0
+        
+        self.canvas = tk.Canvas(parent, bg='#f5f5f5', highlightthickness=0,
+                                yscrollincrement=max(1, row_height // 4))
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        self.message = self.canvas.create_text(0, 50, text="", font=("Arial", 11), anchor='n')
+        
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.bind("<Configure>", self._on_resize)
+    
+    def set_items(self, items: Sequence[CardItem], empty_text: str = ""):
+        """Show a new list of items from the top, reusing the existing cards."""
+        self.items = items
+        self.canvas.itemconfigure(self.message, text="" if items else empty_text)
+        self._update_scroll_region(self.canvas.winfo_width())
+        self.canvas.yview_moveto(0)
+        self.refresh(force=True)
+    
+    def scroll(self, units: int):
+        """Scroll by a number of quarter rows (for mouse wheel bindings)."""
+        self.canvas.yview_scroll(units, "units")
+    
+    def refresh(self, force: bool = False):
+        """Rebind the card pool to the rows currently in view."""
+        first, last = visible_rows(self.canvas.canvasy(0), self.canvas.winfo_height(),
+                                   self.row_height, self._total_rows(), self.buffer_rows)
+        if first == self.first_row and not force:
+            return
+        self.first_row = first
+        
+        needed = min((last - first) * self.columns, len(self.items) - first * self.columns)
+        while len(self.cards) < needed:
+            card = RecipeCard(self.canvas, self.on_view)
+            card.set_width(self.column_width - 2 * self.padding)
+            window = self.canvas.create_window(0, 0, window=card.frame, anchor='nw', state='hidden')
+            self.cards.append((card, window))
+        
+        for slot, (card, window) in enumerate(self.cards):
+            index = first * self.columns + slot
+            if slot >= needed:
+                self.canvas.itemconfigure(window, state='hidden')
+                continue
+            card.show(self.items[index])
+            row, col = divmod(index, self.columns)
+            self.canvas.coords(window, col * self.column_width + self.padding, row * self.row_height + self.padding)
+            self.canvas.itemconfigure(window, state='normal',
+                                      width=self.column_width - 2 * self.padding,
+                                      height=self.row_height - 2 * self.padding)
+    
+    def _on_scroll(self, first, last):
+        """Keep the scrollbar in step and bring the cards in view."""
+        self.scrollbar.set(first, last)
+        self.refresh()
+    
+    def _on_resize(self, event):
+        """Resize the columns to the canvas width."""
+        self.column_width = max(1, event.width // self.columns)
+        self.canvas.coords(self.message, event.width // 2, 50)
+        for card, _ in self.cards:
+            card.set_width(self.column_width - 2 * self.padding)
+        self._update_scroll_region(event.width)
+        self.refresh(force=True)
+    
+    def _update_scroll_region(self, width: int):
+        """Size the scroll region to the number of rows, as if every card existed."""
+        self.canvas.configure(scrollregion=(0, 0, width, self._total_rows() * self.row_height))
+    
+    def _total_rows(self) -> int:
+        """Number of grid rows the items fill."""
+        return -(-len(self.items) // self.columns)
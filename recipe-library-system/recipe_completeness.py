@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Recipe Completeness Cache
+Missing-information analyses stored by file content hash, with completeness as an indexed recipes column
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+from blob_store import BLOB_NAME, hash_file
+
+CACHE_TABLE = "completeness_cache"
+
+# Bump when the detector's checks change; older cached analyses are then dropped
+ANALYSIS_VERSION = 1
+
+# Content hashes per lookup query (stays under SQLite's host parameter limit)
+LOOKUP_CHUNK = 500
+
+
+def ensure_completeness_cache(cursor) -> bool:
+    """
+    Create the analysis cache and the recipes.completeness column.
+    
+    The column is indexed so recipes can be filtered and sorted by
+    completeness without reopening their files. Library recipes are keyed
+    by their content hash, so a trigger fills the column from the cache
+    when content that was analyzed before is imported again. Returns False
+    if the recipes table does not exist yet.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'recipes'")
+    if not cursor.fetchone():
+        return False
+    
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {CACHE_TABLE} (
+            content_hash TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            completeness REAL NOT NULL,
+            analysis TEXT NOT NULL,
+            analyzed_date TEXT
+        )
+    ''')
+    
+    cursor.execute(f"SELECT 1 FROM {CACHE_TABLE} WHERE version != ? LIMIT 1", (ANALYSIS_VERSION,))
+    if cursor.fetchone():
+        cursor.execute(f"DELETE FROM {CACHE_TABLE} WHERE version != ?", (ANALYSIS_VERSION,))
+    
+    cursor.execute("PRAGMA table_info(recipes)")
+    if 'completeness' not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute("ALTER TABLE recipes ADD COLUMN completeness REAL")
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_completeness ON recipes(completeness)')
+    
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {CACHE_TABLE}_recipe_insert AFTER INSERT ON recipes
+        WHEN new.completeness IS NULL BEGIN
+            UPDATE recipes SET completeness = (
+                SELECT completeness FROM {CACHE_TABLE} WHERE content_hash = new.id
+            ) WHERE rowid = new.rowid;
+        END
+    ''')
+    return True
+
+
+def content_hash(path: Path, library_path: Optional[Path] = None) -> str:
+    """
+    Content hash of a file.
+    
+    Hash-named files directly in the library directory are stored under
+    their digest, so the name is used instead of reading the file.
+    """
+    if library_path is not None and BLOB_NAME.match(path.name) and \
+            path.resolve().parent == Path(library_path).resolve():
+        return path.name.split('.', 1)[0]
+    return hash_file(path)
+
+
+def load_cached(cursor, digests: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Cached analyses by content hash (hashes without one are left out)."""
+    digests = list(set(digests))
+    found = {}
+    
+    for start in range(0, len(digests), LOOKUP_CHUNK):
+        chunk = digests[start:start + LOOKUP_CHUNK]
+        cursor.execute(f'''
+            SELECT content_hash, analysis FROM {CACHE_TABLE}
+            WHERE content_hash IN ({', '.join('?' * len(chunk))})
+        ''', chunk)
+        found.update((digest, json.loads(analysis)) for digest, analysis in cursor.fetchall())
+    
+    return found
+
+
+def store_analyses(cursor, analyses: Sequence[Tuple[str, Dict[str, Any]]]):
+    """Cache (content hash, analysis) pairs and score the library recipes with that content."""
+    analyzed_date = datetime.now().isoformat()
+    cursor.executemany(f'''
+        INSERT OR REPLACE INTO {CACHE_TABLE} (content_hash, version, completeness, analysis, analyzed_date)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [(digest, ANALYSIS_VERSION, analysis['completeness_score'], json.dumps(analysis), analyzed_date)
+          for digest, analysis in analyses])
+    set_completeness(cursor, [(digest, analysis['completeness_score']) for digest, analysis in analyses])
+
+
+def set_completeness(cursor, scores: Iterable[Tuple[str, float]]):
+    """Record (recipe id, completeness) scores, leaving rows that already have them untouched."""
+    cursor.executemany('UPDATE recipes SET completeness = ? WHERE id = ? AND completeness IS NOT ?',
+                       [(score, recipe_id, score) for recipe_id, score in scores])
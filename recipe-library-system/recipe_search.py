@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Recipe Full-Text Search
+FTS5 index over the recipes table with BM25 ranking and highlighted snippets
+"""
+
+import re
+import html
+from typing import List, Optional, Sequence
+
+FTS_TABLE = "recipes_fts"
+
+# Indexed recipe columns, in FTS column order (recipe_id is stored unindexed first)
+FTS_COLUMNS = ('title', 'content_preview', 'tags', 'ingredients', 'cuisine_type', 'category')
+
+# BM25 column weights: recipe_id, title, content_preview, tags, ingredients, cuisine_type, category
+BM25_WEIGHTS = (0.0, 10.0, 1.0, 4.0, 3.0, 2.0, 1.0)
+
+# Filter clause for callers that keep their own ordering
+MATCH_FILTER = f"id IN (SELECT recipe_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?)"
+
+# Snippet highlight markers that can't occur in recipe text (see snippet_html)
+SNIPPET_MARKERS = ('\x02', '\x03')
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def build_match_query(text: str) -> Optional[str]:
+    """
+    Turn free-form search text into a safe FTS5 MATCH expression.
+    
+    Every word must match; the last word is a prefix so results update
+    while the user is still typing. Returns None if there is nothing to search.
+    """
+    words = _WORD_RE.findall(text.lower()) if text else []
+    if not words:
+        return None
+    
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def snippet_html(snippet: Optional[str], markers: Sequence[str] = SNIPPET_MARKERS) -> str:
+    """A snippet highlighted with markers as HTML: the text escaped, the matches in <mark> tags."""
+    escaped = html.escape(snippet or '')
+    return escaped.replace(markers[0], '<mark>').replace(markers[1], '</mark>')
+
+
+def ensure_search_index(cursor) -> bool:
+    """
+    Create the FTS table and the triggers that keep it in sync with recipes.
+    
+    Backfills the index the first time it is created. Returns False if the
+    recipes table does not exist yet.
+    """
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('recipes', ?)",
+                   (FTS_TABLE,))
+    existing = {row[0] for row in cursor.fetchall()}
+    if 'recipes' not in existing:
+        return False
+    
+    # Older libraries predate the ingredients column
+    cursor.execute("PRAGMA table_info(recipes)")
+    if 'ingredients' not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute("ALTER TABLE recipes ADD COLUMN ingredients TEXT")
+    
+    columns = ', '.join(FTS_COLUMNS)
+    new_values = ', '.join(f'new.{column}' for column in FTS_COLUMNS)
+    
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            recipe_id UNINDEXED, {columns},
+            tokenize = 'porter unicode61', prefix = '2 3'
+        )
+    ''')
+    
+    # FTS rows share the recipe's rowid so deletes and updates are direct lookups
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON recipes BEGIN
+            INSERT INTO {FTS_TABLE} (rowid, recipe_id, {columns})
+            VALUES (new.rowid, new.id, {new_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON recipes BEGIN
+            DELETE FROM {FTS_TABLE} WHERE rowid = old.rowid;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF id, {columns} ON recipes BEGIN
+            DELETE FROM {FTS_TABLE} WHERE rowid = old.rowid;
+            INSERT INTO {FTS_TABLE} (rowid, recipe_id, {columns})
+            VALUES (new.rowid, new.id, {new_values});
+        END
+    ''')
+    
+    if FTS_TABLE not in existing:
+        weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rank) VALUES ('rank', 'bm25({weights})')")
+        rebuild_search_index(cursor)
+    
+    return True
+
+
+def rebuild_search_index(cursor):
+    """Repopulate the FTS table from recipes (e.g. after a VACUUM renumbers rowids)."""
+    columns = ', '.join(FTS_COLUMNS)
+    cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    cursor.execute(f'''
+        INSERT INTO {FTS_TABLE} (rowid, recipe_id, {columns})
+        SELECT rowid, id, {columns} FROM recipes
+    ''')
+
+
+def ranked_search(cursor, text: str, columns: str = "recipes.*", filters: str = "",
+                  params: Sequence = (), limit: int = 50,
+                  highlight: Sequence[str] = ('<mark>', '</mark>')) -> List:
+    """
+    Run a BM25-ranked full-text search over recipes.
+    
+    Args:
+        cursor: Open database cursor
+        text: Free-form search text
+        columns: Recipe columns to select (qualified with "recipes.")
+        filters: Extra SQL appended to the WHERE clause, e.g. " AND recipes.cuisine_type = ?"
+        params: Parameters for the extra filters
+        limit: Maximum number of results
+        highlight: Opening and closing markers for matched words in snippets
+    
+    Returns:
+        Rows of the selected columns plus "snippet" and "score" (lower is better)
+    """
+    match = build_match_query(text)
+    if match is None:
+        return []
+    
+    cursor.execute(f'''
+        SELECT {columns},
+               snippet({FTS_TABLE}, -1, ?, ?, '...', 16) AS snippet,
+               {FTS_TABLE}.rank AS score
+        FROM {FTS_TABLE}
+        JOIN recipes ON recipes.id = {FTS_TABLE}.recipe_id
+        WHERE {FTS_TABLE} MATCH ?{filters}
+        ORDER BY {FTS_TABLE}.rank
+        LIMIT ?
+    ''', (highlight[0], highlight[1], match, *params, limit))
+    return cursor.fetchall()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Sitemap Discovery
+Reads robots.txt sitemaps, sitemap indexes and gzipped sitemaps to find page URLs and their lastmod
+"""
+
+import io
+import gzip
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree
+import logging
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Where to look when robots.txt lists no sitemaps
+DEFAULT_SITEMAP_PATHS = ['/sitemap.xml', '/sitemap_index.xml']
+
+# Upper bound on sitemap files fetched per crawl (indexes can nest and fan out)
+MAX_SITEMAPS = 500
+
+
+def normalize_lastmod(value: Optional[str]) -> Optional[str]:
+    """
+    W3C datetime (a date, or a date and time with a zone) to a naive local
+    ISO timestamp, comparable with the crawler's datetime.now().isoformat().
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+def parse_sitemap(content: bytes) -> Tuple[List[Tuple[str, Optional[str]]], List[str]]:
+    """
+    Parse a sitemap, sitemap index or plain-text sitemap (gzipped or not).
+    
+    Returns:
+        (page entries as (url, lastmod), child sitemap URLs)
+    """
+    if content[:2] == GZIP_MAGIC:
+        content = gzip.decompress(content)
+    
+    if not content.lstrip()[:1] == b'<':
+        # Plain-text sitemap: one URL per line
+        lines = content.decode('utf-8', errors='replace').splitlines()
+        return [(line.strip(), None) for line in lines if line.strip().startswith('http')], []
+    
+    pages: List[Tuple[str, Optional[str]]] = []
+    children: List[str] = []
+    loc = lastmod = None
+    
+    for _, elem in ElementTree.iterparse(io.BytesIO(content), events=('end',)):
+        tag = elem.tag.rsplit('}', 1)[-1]
+        if tag == 'loc':
+            loc = (elem.text or '').strip()
+        elif tag == 'lastmod':
+            lastmod = normalize_lastmod(elem.text)
+        elif tag in ('url', 'sitemap'):
+            if loc:
+                if tag == 'url':
+                    pages.append((loc, lastmod))
+                else:
+                    children.append(loc)
+            loc = lastmod = None
+            elem.clear()
+    
+    return pages, children
+
+
+def iter_sitemap_urls(sitemap_urls: Iterable[str], fetch: Callable[[str], bytes],
+                      max_sitemaps: int = MAX_SITEMAPS) -> Iterator[Tuple[str, Optional[str], str]]:
+    """
+    Walk sitemaps and sitemap indexes breadth-first.
+    
+    Args:
+        sitemap_urls: Starting sitemaps (e.g. from robots.txt)
+        fetch: Returns a URL's body (raises on failure)
+        max_sitemaps: Stop after fetching this many sitemap files
+    
+    Yields:
+        (page url, lastmod or None, sitemap it was listed in)
+    """
+    pending = list(dict.fromkeys(sitemap_urls))
+    seen = set(pending)
+    fetched = 0
+    
+    while pending and fetched < max_sitemaps:
+        sitemap_url = pending.pop(0)
+        fetched += 1
+        try:
+            pages, children = parse_sitemap(fetch(sitemap_url))
+        except Exception as e:
+            logger.debug(f"Could not read sitemap {sitemap_url}: {e}")
+            continue
+        
+        for child in children:
+            if child not in seen:
+                seen.add(child)
+                pending.append(child)
+        
+        for url, lastmod in pages:
+            yield url, lastmod, sitemap_url
+    
+    if pending:
+        logger.warning(f"Stopped after {max_sitemaps} sitemaps; {len(pending)} not read")
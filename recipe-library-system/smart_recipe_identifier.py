@@ -5,10 +5,12 @@ Advanced AI-like recipe detection with 90%+ accuracy
 """
 
 import re
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Set
 from pathlib import Path
 import pandas as pd
 
+from keyword_automaton import KeywordAutomaton
+
 class SmartRecipeIdentifier:
     """Advanced recipe identification with high accuracy."""
     
@@ -114,6 +116,32 @@ class SmartRecipeIdentifier:
             'copyright', 'isbn', 'publisher', 'author bio',
             'invoice', 'order', 'purchase', 'receipt'
         ]
+        
+        # Category and difficulty indicators
+        self.menu_keywords = ['menu', 'prix fixe', 'tasting menu', 'course menu', 
+                              'wine pairing', 'meal plan']
+        self.easy_indicators = ['simple', 'quick', 'basic', 'easy', 'beginner', 'fast', '15 min', '20 min']
+        self.hard_indicators = ['advanced', 'complex', 'challenging', 'difficult', 'expert', 
+                                'elaborate', 'professional', 'sous vide', 'tempering']
+        
+        # One automaton over every keyword table, so each document is scanned once
+        self.keyword_automaton = KeywordAutomaton(self._keyword_tables())
+    
+    def _keyword_tables(self) -> Dict[str, List[str]]:
+        """All keyword tables, keyed by automaton label."""
+        tables = {
+            'ingredients_section': self.structure_indicators['ingredients_section'],
+            'instructions_section': self.structure_indicators['instructions_section'],
+            'cooking_actions': self.structure_indicators['cooking_actions'],
+            'non_recipe': self.non_recipe_indicators,
+            'menu': self.menu_keywords,
+            'easy': self.easy_indicators,
+            'hard': self.hard_indicators
+        }
+        for cuisine, keyword_levels in self.cuisine_keywords.items():
+            for level, keywords in keyword_levels.items():
+                tables[f'cuisine:{cuisine}:{level}'] = keywords
+        return tables
     
     def identify_recipe(self, file_path: Path, content: str = None) -> Dict:
         """
@@ -145,6 +173,8 @@ class SmartRecipeIdentifier:
             content = self._extract_content(file_path)
         
         content_lower = content.lower()
+        found = self.keyword_automaton.find(content)
+        hits = self.keyword_automaton.label_hits(found)
         
         # Score components
         scores = {
@@ -156,8 +186,8 @@ class SmartRecipeIdentifier:
         }
         
         # 1. Check recipe structure (most important - 40%)
-        has_ingredients = any(indicator in content_lower for indicator in self.structure_indicators['ingredients_section'])
-        has_instructions = any(indicator in content_lower for indicator in self.structure_indicators['instructions_section'])
+        has_ingredients = bool(hits['ingredients_section'])
+        has_instructions = bool(hits['instructions_section'])
         
         if has_ingredients and has_instructions:
             scores['structure'] = 0.40
@@ -165,8 +195,7 @@ class SmartRecipeIdentifier:
             scores['structure'] = 0.20
         
         # 2. Check cooking terminology (20%)
-        cooking_action_count = sum(1 for action in self.structure_indicators['cooking_actions'] 
-                                   if action in content_lower)
+        cooking_action_count = len(hits['cooking_actions'])
         scores['cooking_terms'] = min(cooking_action_count * 0.03, 0.20)
         
         # 3. Check for measurements (20%)
@@ -184,7 +213,7 @@ class SmartRecipeIdentifier:
         
         # 5. Content quality analysis (10%)
         # Check for non-recipe content
-        non_recipe_count = sum(1 for indicator in self.non_recipe_indicators if indicator in content_lower)
+        non_recipe_count = len(hits['non_recipe'])
         if non_recipe_count == 0:
             scores['content_quality'] = 0.10
         else:
@@ -197,9 +226,9 @@ class SmartRecipeIdentifier:
         is_recipe = total_confidence >= 0.30
         
         # Extract additional metadata
-        cuisine, cuisine_confidence = self._detect_cuisine_enhanced(file_path.stem, content)
-        category = self._determine_category(content_lower, is_recipe)
-        difficulty = self._determine_difficulty(content_lower)
+        cuisine, cuisine_confidence = self._detect_cuisine_enhanced(file_path.stem, content, found)
+        category = self._determine_category(content_lower, is_recipe, hits)
+        difficulty = self._determine_difficulty(content_lower, hits)
         cooking_time = self._extract_cooking_time(content)
         servings = self._extract_servings(content)
         
@@ -226,9 +255,13 @@ class SmartRecipeIdentifier:
             'score_breakdown': scores
         }
     
-    def _detect_cuisine_enhanced(self, title: str, content: str) -> Tuple[str, float]:
-        """Enhanced cuisine detection with confidence."""
-        text = f"{title} {content}".lower()
+    def _detect_cuisine_enhanced(self, title: str, content: str,
+                                 found: Optional[Set[str]] = None) -> Tuple[str, float]:
+        """Enhanced cuisine detection with confidence (found: keywords already found in content)."""
+        if found is None:
+            found = self.keyword_automaton.find(content)
+        title_found = self.keyword_automaton.find(title)
+        text_found = found | title_found
         scores = {}
         
         for cuisine, keyword_levels in self.cuisine_keywords.items():
@@ -236,20 +269,20 @@ class SmartRecipeIdentifier:
             
             # High confidence keywords (especially in title)
             for keyword in keyword_levels['high']:
-                if keyword in text:
-                    if keyword in title.lower():
+                if keyword in text_found:
+                    if keyword in title_found:
                         score += 0.40  # Title match is very strong signal
                     else:
                         score += 0.20
             
             # Medium confidence keywords
             for keyword in keyword_levels['medium']:
-                if keyword in text:
+                if keyword in text_found:
                     score += 0.10
             
             # Low confidence keywords
             for keyword in keyword_levels['low']:
-                if keyword in text:
+                if keyword in text_found:
                     score += 0.05
             
             scores[cuisine] = min(score, 1.0)
@@ -262,14 +295,14 @@ class SmartRecipeIdentifier:
         
         return (best_cuisine, confidence)
     
-    def _determine_category(self, content_lower: str, is_recipe: bool) -> str:
+    def _determine_category(self, content_lower: str, is_recipe: bool,
+                            hits: Optional[Dict[str, Set[str]]] = None) -> str:
         """Determine if recipe, menu, or other."""
         if not is_recipe:
             return 'other'
         
-        menu_keywords = ['menu', 'prix fixe', 'tasting menu', 'course menu', 
-                        'wine pairing', 'meal plan']
-        menu_count = sum(1 for keyword in menu_keywords if keyword in content_lower)
+        hits = hits or self.keyword_automaton.scan(content_lower)
+        menu_count = len(hits['menu'])
         
         if menu_count >= 2:
             return 'menu'
@@ -278,14 +311,13 @@ class SmartRecipeIdentifier:
         else:
             return 'other'
     
-    def _determine_difficulty(self, content_lower: str) -> str:
+    def _determine_difficulty(self, content_lower: str,
+                              hits: Optional[Dict[str, Set[str]]] = None) -> str:
         """Determine difficulty level."""
-        easy_indicators = ['simple', 'quick', 'basic', 'easy', 'beginner', 'fast', '15 min', '20 min']
-        hard_indicators = ['advanced', 'complex', 'challenging', 'difficult', 'expert', 
-                          'elaborate', 'professional', 'sous vide', 'tempering']
+        hits = hits or self.keyword_automaton.scan(content_lower)
         
-        easy_count = sum(1 for ind in easy_indicators if ind in content_lower)
-        hard_count = sum(1 for ind in hard_indicators if ind in content_lower)
+        easy_count = len(hits['easy'])
+        hard_count = len(hits['hard'])
         
         if hard_count > easy_count:
             return 'hard'
@@ -6,13 +6,78 @@ Converts all recipes to uniform Iterum format for costing and upload
 
 import sys
 import os
+import json
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
-import sqlite3
 from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 import pandas as pd
 
+from db_connection import get_connection_manager
+from iterum_template import IterumTemplate
+from recipe_completeness import content_hash
+
+# Bump when the generated layout changes so every output is rebuilt
+TEMPLATE_VERSION = 1
+
+# Records what each output was built from, next to the outputs
+MANIFEST_NAME = "conversion_manifest.json"
+
+# Batches with at least this many recipes to rebuild use a process pool
+PARALLEL_MIN_RECIPES = 8
+
+# Recipes listed in the timing report
+SLOWEST_SHOWN = 10
+
+TIMING_PHASES = ('parse', 'build', 'save')
+
+# Ingredient table columns A-I
+INGREDIENT_FIELDS = ('name', 'quantity', 'weight', 'volume', 'ap_cost', 'unit', 'yield_pct', 'ep_cost', 'total_cost')
+
+FOOTER_TEXT = 'This file cannot be used or sold as a means of generating revenue without prior permission in writing.'
+
+# Converter used by conversion worker processes (set by the pool initializer)
+_convert_worker_converter = None
+
+def _init_convert_worker(library_path: str, output_dir: str):
+    """Process pool initializer: keep one converter per worker."""
+    global _convert_worker_converter
+    _convert_worker_converter = IterumRecipeConverter(library_path, output_dir)
+
+def _convert_worker(job):
+    """Convert one recipe in a worker process. Returns (recipe_id, output_path, error, timings)."""
+    return _convert_worker_converter.convert_job(job)
+
+def format_timing_report(timings, slowest=SLOWEST_SHOWN):
+    """
+    Per-phase totals and the slowest recipes from a conversion run.
+    
+    Args:
+        timings: One dict per converted recipe with 'title' and seconds per phase
+        slowest: Number of recipes to list
+    """
+    if not timings:
+        return "No recipes were converted."
+    
+    total = sum(sum(t.get(phase, 0.0) for phase in TIMING_PHASES) for t in timings)
+    lines = [f"Conversion time: {total:.2f}s across {len(timings)} recipes (worker time)"]
+    for phase in TIMING_PHASES:
+        phase_total = sum(t.get(phase, 0.0) for t in timings)
+        share = phase_total / total * 100 if total else 0.0
+        lines.append(f"   {phase:<6} {phase_total:8.2f}s  {share:5.1f}%")
+    
+    lines.append(f"\nSlowest recipes:")
+    lines.append(f"   {'Recipe':<40} " + " ".join(f"{phase:>7}" for phase in TIMING_PHASES) + f" {'total':>7}")
+    ranked = sorted(timings, key=lambda t: sum(t.get(phase, 0.0) for phase in TIMING_PHASES), reverse=True)
+    for t in ranked[:slowest]:
+        phases = [t.get(phase, 0.0) for phase in TIMING_PHASES]
+        lines.append(f"   {str(t['title'])[:40]:<40} " + " ".join(f"{v:7.3f}" for v in phases) + f" {sum(phases):7.3f}")
+    
+    return "\n".join(lines)
+
 class IterumRecipeConverter:
     """Convert recipes to standardized Iterum format for costing."""
     
@@ -20,8 +85,24 @@ class IterumRecipeConverter:
         self.library_path = Path(library_path)
         self.output_dir = Path(output_dir)
         self.db_path = self.library_path / "recipe_library.db"
+        self.db = get_connection_manager(self.db_path)
         self.output_dir.mkdir(exist_ok=True)
+        self.manifest_path = self.output_dir / MANIFEST_NAME
+        
+        # Filled in by convert_all_recipes
+        self.skipped = []
+        self.timings = []
         
+        # Compiled on first use (see the template property)
+        self._template = None
+        
+    @property
+    def template(self):
+        """The Iterum layout compiled once per converter; outputs clone it."""
+        if self._template is None:
+            self._template = IterumTemplate(self)
+        return self._template
+    
     def create_iterum_template(self):
         """Create a new workbook with Iterum format."""
         wb = Workbook()
@@ -51,33 +132,75 @@ class IterumRecipeConverter:
         
         return wb, ws
     
-    def fill_header_section(self, ws, recipe_data):
-        """Fill the header section with recipe metadata."""
+    @staticmethod
+    def output_stem(title):
+        """File name for a title: letters, digits, spaces, '-', '_' and '.' only."""
+        return "".join(c for c in title or '' if c.isalnum() or c in (' ', '-', '_', '.')).rstrip()
+    
+    @classmethod
+    def output_names(cls, recipes):
+        """
+        Output file name for each (recipe_id, title), unique within the set.
+        
+        Names come from the title. Recipes whose titles give the same name
+        (ignoring case, for case-insensitive filesystems) all get their
+        recipe id appended; the parentheses can't come from a title, so
+        these never clash with another recipe's name.
+        """
+        stems = {recipe_id: cls.output_stem(title) or recipe_id for recipe_id, title in recipes}
+        counts = Counter(stem.casefold() for stem in stems.values())
+        return {recipe_id: f"{stem} ({recipe_id}).xlsx" if counts[stem.casefold()] > 1 else f"{stem}.xlsx"
+                for recipe_id, stem in stems.items()}
+    
+    def library_output_names(self):
+        """Output file names for every recipe in the library (see output_names)."""
+        cursor = self.db.connection().cursor()
+        cursor.execute("SELECT id, title FROM recipes")
+        return self.output_names((row[0], row[1]) for row in cursor.fetchall())
+    
+    @staticmethod
+    def header_values(recipe_data):
+        """Values of the per-recipe header cells, with defaults for missing fields."""
+        return {
+            'date': datetime.now().strftime('%Y-%m-%d'),
+            'title': recipe_data.get('title', 'Untitled Recipe'),
+            'concept': recipe_data.get('concept', ''),
+            'cuisine': recipe_data.get('cuisine', 'unknown'),
+            'submitted_by': recipe_data.get('submitted_by', 'Chef'),
+            'category': recipe_data.get('category', 'recipe'),
+            'servings': recipe_data.get('servings', 1)
+        }
+    
+    def fill_header_section(self, ws, recipe_data, values=None):
+        """Fill the header section with recipe metadata (values overrides header_values(recipe_data))."""
+        if values is None:
+            values = self.header_values(recipe_data)
+        
         # Row 1: Empty
         # Row 2: Date field
         ws['G2'] = 'Date:'
-        ws['H2'] = datetime.now().strftime('%Y-%m-%d')
+        ws['H2'] = values['date']
         
         # Row 3: Recipe name
         ws['A3'] = 'Recipe name:'
-        ws['B3'] = recipe_data.get('title', 'Untitled Recipe')
+        ws['B3'] = values['title']
         ws['B3'].font = Font(bold=True, size=14)
         
         # Row 4: Concept
         ws['A4'] = 'Concept:'
-        ws['B4'] = recipe_data.get('concept', '')
+        ws['B4'] = values['concept']
         ws['G4'] = 'Cuisine:'
-        ws['H4'] = recipe_data.get('cuisine', 'unknown')
+        ws['H4'] = values['cuisine']
         
         # Row 5: Submitted by
         ws['A5'] = 'Submitted by:'
-        ws['B5'] = recipe_data.get('submitted_by', 'Chef')
+        ws['B5'] = values['submitted_by']
         ws['G5'] = 'Category:'
-        ws['H5'] = recipe_data.get('category', 'recipe')
+        ws['H5'] = values['category']
         
         # Row 6: Number of Portions
         ws['A6'] = 'Number of Portions: 1 or 24'
-        ws['B6'] = recipe_data.get('servings', 1)
+        ws['B6'] = values['servings']
         ws['E6'] = 'Operation:'
         
         # Row 7: Serving Size
@@ -131,15 +254,8 @@ class IterumRecipeConverter:
         # Fill ingredient rows
         current_row = header_row + 1
         for ingredient in ingredients_data:
-            ws[f'A{current_row}'] = ingredient.get('name', '')
-            ws[f'B{current_row}'] = ingredient.get('quantity', '')
-            ws[f'C{current_row}'] = ingredient.get('weight', '')
-            ws[f'D{current_row}'] = ingredient.get('volume', '')
-            ws[f'E{current_row}'] = ingredient.get('ap_cost', '')
-            ws[f'F{current_row}'] = ingredient.get('unit', '')
-            ws[f'G{current_row}'] = ingredient.get('yield_pct', '')
-            ws[f'H{current_row}'] = ingredient.get('ep_cost', '')
-            ws[f'I{current_row}'] = ingredient.get('total_cost', '')
+            for col_idx, field in enumerate(INGREDIENT_FIELDS, start=1):
+                ws.cell(row=current_row, column=col_idx).value = ingredient.get(field, '')
             
             current_row += 1
         
@@ -151,80 +267,120 @@ class IterumRecipeConverter:
         ws[f'A{start_row}'].font = Font(bold=True, size=12)
         
         current_row = start_row + 1
-        
-        # Parse method into steps
-        if method_text:
-            steps = method_text.split('\n')
-            for i, step in enumerate(steps, 1):
-                if step.strip():
-                    # Number the step if not already numbered
-                    if not step.strip()[0].isdigit():
-                        step = f"{i}. {step.strip()}"
-                    ws[f'A{current_row}'] = step
-                    current_row += 1
-        else:
-            ws[f'A{current_row}'] = '1. [TO BE FILLED]'
+        for step in self.method_steps(method_text):
+            ws[f'A{current_row}'] = step
             current_row += 1
         
         return current_row
     
+    @staticmethod
+    def method_steps(method_text):
+        """Method text as numbered step lines (a placeholder step if there is none)."""
+        if not method_text:
+            return ['1. [TO BE FILLED]']
+        
+        steps = []
+        for i, step in enumerate(method_text.split('\n'), 1):
+            if step.strip():
+                # Number the step if not already numbered
+                if not step.strip()[0].isdigit():
+                    step = f"{i}. {step.strip()}"
+                steps.append(step)
+        return steps
+    
+    def fill_footer_section(self, ws, row):
+        """Add the copyright footer."""
+        ws[f'A{row}'] = FOOTER_TEXT
+        ws[f'A{row}'].font = Font(size=8, italic=True)
+    
+    def build_workbook(self, recipe_data, ingredients_data, method_text):
+        """
+        Build a recipe's workbook object by object with openpyxl.
+        
+        convert_recipe writes outputs by cloning the compiled template
+        instead; this is the reference layout the template is compiled from.
+        """
+        wb, ws = self.create_iterum_template()
+        self.fill_header_section(ws, recipe_data)
+        ing_end_row = self.fill_ingredients_section(ws, ingredients_data)
+        method_end_row = self.fill_method_section(ws, method_text, ing_end_row + 3)
+        self.fill_footer_section(ws, method_end_row + 10)
+        return wb
+    
+    def render_workbook(self, recipe_data, ingredients_data, method_text):
+        """A recipe's worksheet XML, rendered from the compiled template (see template.save)."""
+        return self.template.render(
+            self.header_values(recipe_data),
+            [[ingredient.get(field, '') for field in INGREDIENT_FIELDS] for ingredient in ingredients_data],
+            self.method_steps(method_text))
+    
+    @staticmethod
+    def read_rows(file_path):
+        """
+        Cell values of the first sheet as equal-length row lists (None for empty cells).
+        
+        .xlsx files are streamed in read-only mode; other formats go through pandas.
+        """
+        if Path(file_path).suffix.lower() in ('.xlsx', '.xlsm'):
+            wb = load_workbook(file_path, read_only=True, data_only=True)
+            try:
+                rows = [list(row) for row in wb.active.iter_rows(values_only=True)]
+            finally:
+                wb.close()
+        else:
+            df = pd.read_excel(file_path, header=None)
+            rows = [[value if pd.notna(value) else None for value in row]
+                    for row in df.itertuples(index=False, name=None)]
+        
+        while rows and all(value is None for value in rows[-1]):
+            rows.pop()
+        width = max((len(row) for row in rows), default=0)
+        return [row + [None] * (width - len(row)) for row in rows]
+    
     def extract_from_existing_excel(self, file_path):
         """Extract data from existing Excel recipe files."""
         try:
-            df = pd.read_excel(file_path, header=None)
+            rows = self.read_rows(file_path)
             
             recipe_data = {}
             ingredients_data = []
             method_text = ""
+            ingredients_found = False
             
-            # Try to find recipe name
-            for idx, row in df.iterrows():
-                if pd.notna(row[0]):
-                    val = str(row[0]).lower()
-                    if 'recipe name' in val:
-                        recipe_data['title'] = row[1] if pd.notna(row[1]) else Path(file_path).stem
-                    elif 'cuisine' in val:
-                        recipe_data['cuisine'] = row[1] if pd.notna(row[1]) else 'unknown'
-                    elif 'category' in val:
-                        recipe_data['category'] = row[1] if pd.notna(row[1]) else 'recipe'
-                    elif 'submitted by' in val:
-                        recipe_data['submitted_by'] = row[1] if pd.notna(row[1]) else 'Chef'
-                    elif 'number of portions' in val:
-                        try:
-                            recipe_data['servings'] = int(row[1]) if pd.notna(row[1]) else 1
-                        except:
-                            recipe_data['servings'] = 1
-                    elif 'method' in val or 'instructions' in val:
-                        # Start collecting method from next row
-                        method_start = idx + 1
-                        method_lines = []
-                        for m_idx in range(method_start, min(method_start + 20, len(df))):
-                            if m_idx < len(df) and pd.notna(df.iloc[m_idx, 0]):
-                                method_lines.append(str(df.iloc[m_idx, 0]))
-                        method_text = '\n'.join(method_lines)
-            
-            # Try to find ingredients table
-            for idx, row in df.iterrows():
-                if pd.notna(row[0]) and str(row[0]).lower() == 'ingredients':
+            # One pass finds the labelled fields, the method and the ingredients table
+            for idx, row in enumerate(rows):
+                if row[0] is None:
+                    continue
+                val = str(row[0]).lower()
+                
+                if 'recipe name' in val:
+                    recipe_data['title'] = row[1] if row[1] is not None else Path(file_path).stem
+                elif 'cuisine' in val:
+                    recipe_data['cuisine'] = row[1] if row[1] is not None else 'unknown'
+                elif 'category' in val:
+                    recipe_data['category'] = row[1] if row[1] is not None else 'recipe'
+                elif 'submitted by' in val:
+                    recipe_data['submitted_by'] = row[1] if row[1] is not None else 'Chef'
+                elif 'number of portions' in val:
+                    try:
+                        recipe_data['servings'] = int(row[1]) if row[1] is not None else 1
+                    except:
+                        recipe_data['servings'] = 1
+                elif 'method' in val or 'instructions' in val:
+                    # Collect the method from the next rows
+                    method_lines = [str(line[0]) for line in rows[idx + 1:idx + 21] if line[0] is not None]
+                    method_text = '\n'.join(method_lines)
+                
+                if val == 'ingredients' and not ingredients_found:
                     # Found ingredients header, read next rows
-                    for ing_idx in range(idx + 1, min(idx + 30, len(df))):
-                        ing_row = df.iloc[ing_idx]
-                        if pd.notna(ing_row[0]) and str(ing_row[0]).lower() not in ['', 'method', 'instructions']:
-                            ingredient = {
-                                'name': ing_row[0],
-                                'quantity': ing_row[1] if pd.notna(ing_row[1]) else '',
-                                'weight': ing_row[2] if pd.notna(ing_row[2]) else '',
-                                'volume': ing_row[3] if pd.notna(ing_row[3]) else '',
-                                'ap_cost': ing_row[4] if len(ing_row) > 4 and pd.notna(ing_row[4]) else '',
-                                'unit': ing_row[5] if len(ing_row) > 5 and pd.notna(ing_row[5]) else '',
-                                'yield_pct': ing_row[6] if len(ing_row) > 6 and pd.notna(ing_row[6]) else '',
-                                'ep_cost': ing_row[7] if len(ing_row) > 7 and pd.notna(ing_row[7]) else '',
-                                'total_cost': ing_row[8] if len(ing_row) > 8 and pd.notna(ing_row[8]) else '',
-                            }
-                            ingredients_data.append(ingredient)
+                    ingredients_found = True
+                    for ing_row in rows[idx + 1:idx + 30]:
+                        if ing_row[0] is not None and str(ing_row[0]).lower() not in ['', 'method', 'instructions']:
+                            cells = [value if value is not None else '' for value in ing_row[:9]]
+                            cells += [''] * (9 - len(cells))
+                            ingredients_data.append(dict(zip(INGREDIENT_FIELDS, cells)))
                         else:
                             break
-                    break
             
             # If no structured data found, create placeholder
             if not recipe_data.get('title'):
@@ -247,12 +403,23 @@ class IterumRecipeConverter:
             }, [{'name': '[TO BE FILLED]', 'quantity': '', 'weight': '', 'volume': '', 
                  'ap_cost': '', 'unit': '', 'yield_pct': '', 'ep_cost': '', 'total_cost': ''}], ""
     
-    def convert_recipe(self, file_path, recipe_metadata=None):
-        """Convert a single recipe to Iterum format."""
+    def convert_recipe(self, file_path, recipe_metadata=None, timings=None, output_name=None):
+        """
+        Convert a single recipe to Iterum format.
+        
+        Args:
+            file_path: Source recipe file
+            recipe_metadata: Title, cuisine_type and category from the database (optional)
+            timings: Dict to receive seconds spent in each phase (parse, build, save)
+            output_name: File name in the output directory (default: from the title; see
+                output_names for names that stay unique across recipes)
+        """
         print(f"   Converting: {Path(file_path).name}")
+        started = time.perf_counter()
         
         # Extract data from file
         recipe_data, ingredients_data, method_text = self.extract_from_existing_excel(file_path)
+        parsed = time.perf_counter()
         
         # Merge with metadata from database if available
         if recipe_metadata:
@@ -260,73 +427,190 @@ class IterumRecipeConverter:
             recipe_data['category'] = recipe_metadata.get('category', recipe_data.get('category', 'recipe'))
             recipe_data['title'] = recipe_metadata.get('title', recipe_data.get('title'))
         
-        # Create new workbook with template
-        wb, ws = self.create_iterum_template()
-        
-        # Fill sections
-        self.fill_header_section(ws, recipe_data)
-        ing_end_row = self.fill_ingredients_section(ws, ingredients_data)
-        method_end_row = self.fill_method_section(ws, method_text, ing_end_row + 3)
-        
-        # Add copyright footer
-        ws[f'A{method_end_row + 10}'] = 'This file cannot be used or sold as a means of generating revenue without prior permission in writing.'
-        ws[f'A{method_end_row + 10}'].font = Font(size=8, italic=True)
+        # Only the recipe's cells are written; the layout comes from the compiled template
+        sheet = self.render_workbook(recipe_data, ingredients_data, method_text)
         
         # Save
-        output_filename = f"{recipe_data['title']}.xlsx"
-        # Sanitize filename
-        output_filename = "".join(c for c in output_filename if c.isalnum() or c in (' ', '-', '_', '.')).rstrip()
+        output_filename = output_name or f"{self.output_stem(recipe_data['title'])}.xlsx"
         output_path = self.output_dir / output_filename
+        built = time.perf_counter()
         
-        wb.save(output_path)
+        self.template.save(output_path, sheet)
         print(f"   [OK] Saved: {output_filename}")
         
+        if timings is not None:
+            timings.update(parse=parsed - started, build=built - parsed, save=time.perf_counter() - built)
+        
         return output_path
     
-    def convert_all_recipes(self):
-        """Convert all recipes in the library to Iterum format."""
+    def load_manifest(self):
+        """Load {recipe_id: entry} describing what each existing output was built from."""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def save_manifest(self, manifest):
+        """Write the manifest atomically so an interrupted run leaves the previous one intact."""
+        temp_path = self.manifest_path.with_name(f".{MANIFEST_NAME}.{os.getpid()}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(temp_path, self.manifest_path)
+    
+    @staticmethod
+    def is_current(entry, source_hash, metadata, output_path=None):
+        """Whether a manifest entry's output still matches the source, metadata, template and file name."""
+        return bool(
+            entry and source_hash
+            and entry.get('source_hash') == source_hash
+            and entry.get('template_version') == TEMPLATE_VERSION
+            and entry.get('metadata') == metadata
+            and (output_path is None or Path(entry.get('output', '')) == Path(output_path))
+            and Path(entry.get('output', '')).exists()
+        )
+    
+    def convert_all_recipes(self, progress=None, force=False, max_workers=None):
+        """
+        Convert all recipes in the library to Iterum format.
+        
+        Only recipes whose source file, database metadata or the template
+        changed since the last run are rebuilt (see the manifest in the
+        output directory); larger batches are converted in a process pool.
+        
+        Args:
+            progress: Called as progress(recipes_done, recipes_to_convert, title) (optional)
+            force: Rebuild every recipe, ignoring the manifest
+            max_workers: Worker processes (defaults to CPU count; 1 converts in this process)
+        
+        Returns:
+            (output paths rebuilt, [(title, error)]); up-to-date outputs are
+            listed in self.skipped and per-recipe timings in self.timings
+        """
         print("=" * 80)
         print("           RECIPE STANDARDIZER & CONVERTER")
         print("           Converting to Iterum Format for Costing")
         print("=" * 80)
         
         # Get all recipes from database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.db.connection().cursor()
         cursor.execute("SELECT id, title, cuisine_type, category, library_path FROM recipes")
         recipes = cursor.fetchall()
-        conn.close()
         
-        print(f"\nFound {len(recipes)} recipes to convert\n")
+        print(f"\nFound {len(recipes)} recipes\n")
         
-        converted = []
-        errors = []
+        # Decided for the whole library at once, so recipes sharing a title never share a file
+        output_names = self.output_names((row[0], row[1]) for row in recipes)
+        
+        manifest = self.load_manifest()
+        current = {}
+        jobs = []
+        self.skipped = []
+        self.timings = []
         
         for recipe_id, title, cuisine, category, lib_path in recipes:
+            metadata = {
+                'title': title,
+                'cuisine_type': cuisine,
+                'category': category
+            }
             try:
-                metadata = {
-                    'title': title,
-                    'cuisine_type': cuisine,
-                    'category': category
-                }
-                output_path = self.convert_recipe(lib_path, metadata)
-                converted.append(output_path)
-            except Exception as e:
-                print(f"   [ERROR] Error converting {title}: {e}")
-                errors.append((title, str(e)))
+                source_hash = content_hash(Path(lib_path), self.library_path)
+            except (OSError, TypeError):
+                source_hash = None
+            
+            entry = manifest.get(recipe_id)
+            output_path = self.output_dir / output_names[recipe_id]
+            if not force and self.is_current(entry, source_hash, metadata, output_path):
+                current[recipe_id] = entry
+                self.skipped.append(Path(entry['output']))
+            else:
+                jobs.append((recipe_id, lib_path, metadata, source_hash))
+        
+        print(f"Up to date: {len(self.skipped)}   To convert: {len(jobs)}\n")
+        
+        converted = []
+        errors = []
+        titles = {recipe_id: metadata['title'] for recipe_id, _, metadata, _ in jobs}
+        hashes = {recipe_id: source_hash for recipe_id, _, _, source_hash in jobs}
+        metadatas = {recipe_id: metadata for recipe_id, _, metadata, _ in jobs}
+        
+        def collect(outcomes):
+            for index, (recipe_id, output_path, error, timings) in enumerate(outcomes, 1):
+                title = titles[recipe_id]
+                if progress:
+                    progress(index, len(jobs), title)
+                if error:
+                    print(f"   [ERROR] Error converting {title}: {error}")
+                    errors.append((title, error))
+                    continue
+                
+                converted.append(Path(output_path))
+                self.timings.append(dict(timings, title=title))
+                if hashes[recipe_id]:
+                    current[recipe_id] = {
+                        'source_hash': hashes[recipe_id],
+                        'template_version': TEMPLATE_VERSION,
+                        'metadata': metadatas[recipe_id],
+                        'output': output_path,
+                        'converted_date': datetime.now().isoformat(),
+                        'seconds': round(sum(timings.values()), 4)
+                    }
+        
+        work = [(recipe_id, lib_path, metadata, output_names[recipe_id]) for recipe_id, lib_path, metadata, _ in jobs]
+        workers = max_workers or os.cpu_count() or 1
+        try:
+            if len(work) >= PARALLEL_MIN_RECIPES and workers > 1:
+                with ProcessPoolExecutor(max_workers=workers,
+                                         initializer=_init_convert_worker,
+                                         initargs=(str(self.library_path), str(self.output_dir))) as executor:
+                    collect(executor.map(_convert_worker, work, chunksize=4))
+            else:
+                collect(self.convert_job(job) for job in work)
+        finally:
+            # Recipes no longer in the library drop out; finished work is kept even if the run fails
+            self.save_manifest(current)
+        
+        # A recipe renamed to keep names unique leaves its old file behind
+        planned = {str(self.output_dir / name) for name in output_names.values()}
+        for recipe_id, entry in manifest.items():
+            old_output = entry.get('output')
+            if recipe_id in current and old_output and old_output != current[recipe_id]['output'] \
+                    and old_output not in planned:
+                try:
+                    Path(old_output).unlink()
+                except OSError:
+                    pass
+        
+        if progress:
+            progress(len(jobs), len(jobs), 'Done')
         
         # Summary
         print("\n" + "=" * 80)
         print(f"[OK] Successfully converted: {len(converted)} recipes")
+        print(f"[OK] Already up to date: {len(self.skipped)} recipes")
         if errors:
             print(f"[ERROR] Errors: {len(errors)} recipes")
             for title, error in errors:
                 print(f"   - {title}: {error}")
         
+        if self.timings:
+            print("\n" + format_timing_report(self.timings))
+        
         print(f"\nOutput directory: {self.output_dir.absolute()}")
         print("=" * 80)
         
         return converted, errors
+    
+    def convert_job(self, job):
+        """Convert one (recipe_id, lib_path, metadata, output_name) job. Returns (recipe_id, output_path, error, timings)."""
+        recipe_id, lib_path, metadata, output_name = job
+        timings = {}
+        try:
+            output_path = self.convert_recipe(lib_path, metadata, timings=timings, output_name=output_name)
+            return recipe_id, str(output_path), None, timings
+        except Exception as e:
+            return recipe_id, None, str(e), timings
 
 def main():
     print("\n" + "=" * 80)
@@ -341,7 +625,7 @@ def main():
     print("\n" + "=" * 80)
     
     # Check if running non-interactively
-    if len(sys.argv) > 1 and sys.argv[1] == '--auto':
+    if '--auto' in sys.argv[1:]:
         print("\nRunning in automatic mode...")
     else:
         try:
@@ -350,7 +634,7 @@ def main():
             print("\nStarting conversion...")
     
     converter = IterumRecipeConverter()
-    converted, errors = converter.convert_all_recipes()
+    converted, errors = converter.convert_all_recipes(force='--force' in sys.argv[1:])
     
     if converted:
         print("\n" + "=" * 80)
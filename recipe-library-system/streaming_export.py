@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Streaming Export
+Write and read large recipe exports one record at a time (JSON, JSON Lines, gzip, zstd)
+"""
+
+import io
+import re
+import gzip
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# First line of a JSON Lines export carries the export metadata
+HEADER_KEY = 'export_info'
+
+READ_CHUNK_SIZE = 256 * 1024
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Path):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def detect_format(path: Path) -> str:
+    """'jsonl' for .jsonl/.ndjson files (before any compression suffix), else 'json'."""
+    suffixes = [suffix.lower() for suffix in Path(path).suffixes]
+    return 'jsonl' if {'.jsonl', '.ndjson'} & set(suffixes) else 'json'
+
+
+def detect_compression(path: Path) -> Optional[str]:
+    """'gzip' or 'zstd' from the file suffix, else None."""
+    suffix = Path(path).suffix.lower()
+    if suffix in ('.gz', '.gzip'):
+        return 'gzip'
+    if suffix in ('.zst', '.zstd'):
+        return 'zstd'
+    return None
+
+
+def open_text(path: Path, mode: str = 'r', compression: Optional[str] = None) -> TextIO:
+    """
+    Open a possibly compressed text file.
+    
+    When writing, compression comes from the argument or the file suffix.
+    When reading, it is detected from the file's magic bytes.
+    """
+    path = Path(path)
+    
+    if mode == 'r':
+        with open(path, 'rb') as f:
+            magic = f.read(4)
+        if magic.startswith(GZIP_MAGIC):
+            compression = 'gzip'
+        elif magic.startswith(ZSTD_MAGIC):
+            compression = 'zstd'
+        else:
+            compression = None
+    else:
+        compression = compression or detect_compression(path)
+    
+    if compression == 'gzip':
+        return gzip.open(path, mode + 't', encoding='utf-8', compresslevel=6)
+    
+    if compression == 'zstd':
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstd compression requires the zstandard package: pip install zstandard")
+        raw = open(path, mode + 'b')
+        if mode == 'r':
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        else:
+            stream = zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8')
+    
+    if compression is not None:
+        raise ValueError(f"Unknown compression: {compression}")
+    return open(path, mode, encoding='utf-8')
+
+
+def write_records(path: Path, records: Iterable[Dict[str, Any]], header: Optional[Dict[str, Any]] = None,
+                  fmt: Optional[str] = None, compression: Optional[str] = None,
+                  records_key: str = 'recipes', count_key: str = 'total_recipes') -> int:
+    """
+    Stream records to a file without holding them all in memory.
+    
+    JSON: {<header fields>, "recipes": [...], "total_recipes": N}; the count
+    comes last because it is only known once every record is written.
+    JSON Lines: an {"export_info": header} line, then one record per line.
+    
+    Args:
+        path: Output file
+        records: Any iterable of JSON-serializable dicts (datetimes are written as ISO strings)
+        header: Export metadata
+        fmt: 'json' or 'jsonl' (defaults to the file suffix)
+        compression: None, 'gzip' or 'zstd' (defaults to the file suffix)
+    
+    Returns:
+        Number of records written
+    """
+    fmt = fmt or detect_format(path)
+    header = header or {}
+    count = 0
+    
+    with open_text(path, 'w', compression) as f:
+        if fmt == 'jsonl':
+            f.write(json.dumps({HEADER_KEY: header}, ensure_ascii=False, default=_json_default) + '\n')
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, default=_json_default) + '\n')
+                count += 1
+        else:
+            f.write('{\n')
+            for key, value in header.items():
+                f.write(f'  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False, default=_json_default)},\n')
+            f.write(f'  {json.dumps(records_key)}: [')
+            for record in records:
+                text = json.dumps(record, indent=2, ensure_ascii=False, default=_json_default)
+                f.write((',\n    ' if count else '\n    ') + text.replace('\n', '\n    '))
+                count += 1
+            f.write(f'\n  ],\n  {json.dumps(count_key)}: {count}\n}}\n')
+    
+    return count
+
+
+def read_records(path: Path, records_key: str = 'recipes') -> Iterator[Dict[str, Any]]:
+    """
+    Stream records back from a file written by write_records (or any JSON
+    object holding a records array), one at a time.
+    """
+    with open_text(path, 'r') as f:
+        first_line = f.readline()
+        try:
+            first = json.loads(first_line)
+        except json.JSONDecodeError:
+            # Multi-line JSON document: decode the records array incrementally
+            yield from _iter_json_array(first_line, f, records_key)
+            return
+        
+        if isinstance(first, dict) and isinstance(first.get(records_key), list):
+            # A whole JSON document on one line
+            yield from first[records_key]
+            return
+        
+        # JSON Lines
+        if not (isinstance(first, dict) and set(first) == {HEADER_KEY}):
+            yield first
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _iter_json_array(buffer: str, f: TextIO, key: str) -> Iterator[Dict[str, Any]]:
+    """Yield the elements of the array under key, decoding one element at a time."""
+    decoder = json.JSONDecoder()
+    opening = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    
+    # Find the start of the array
+    while True:
+        match = opening.search(buffer)
+        if match:
+            buffer = buffer[match.end():]
+            break
+        chunk = f.read(READ_CHUNK_SIZE)
+        if not chunk:
+            return
+        # Keep a tail in case the key straddles two chunks
+        buffer = buffer[-(len(key) + 64):] + chunk
+    
+    # Decode in place; the buffer is only trimmed when more text is read
+    skip = re.compile(r'[\s,]*')
+    pos = 0
+    eof = False
+    while True:
+        pos = skip.match(buffer, pos).end()
+        if pos < len(buffer):
+            if buffer[pos] == ']':
+                return
+            try:
+                record, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield record
+                continue
+        elif eof:
+            return
+        
+        chunk = f.read(READ_CHUNK_SIZE)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
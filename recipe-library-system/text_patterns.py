@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Text Patterns
+Precompiled regular expressions shared by the extraction hot paths
+"""
+
+import re
+from typing import Iterable, Pattern
+
+
+def word_alternation(words: Iterable[str], flags: int = re.IGNORECASE) -> Pattern:
+    """
+    Compile words into one anchored, word-bounded alternation.
+
+    Alternatives are sorted longest-first so multi-word entries such as
+    "fluid ounces" win over shorter ones that share a prefix.
+    """
+    unique = {}
+    for word in words:
+        unique.setdefault(word.lower() if flags & re.IGNORECASE else word, word)
+    ordered = sorted(unique.values(), key=len, reverse=True)
+    return re.compile(r'^\b(?:' + '|'.join(re.escape(word) for word in ordered) + r')\b', flags)
+
+
+# Recipe metadata (RecipeLibrary)
+COOKING_TIME = [
+    re.compile(r'(\d+)\s*(?:min|minutes?)', re.IGNORECASE),
+    re.compile(r'(\d+)\s*(?:hr|hour|hours?)', re.IGNORECASE),
+    re.compile(r'(\d+)\s*(?:day|days?)', re.IGNORECASE)
+]
+SERVINGS = [
+    re.compile(r'(\d+)\s*(?:servings?|portions?|people)', re.IGNORECASE),
+    re.compile(r'serves\s*(\d+)', re.IGNORECASE),
+    re.compile(r'yield[s]?\s*(\d+)', re.IGNORECASE)
+]
+HTML_TAG = re.compile(r'<[^>]+>')
+INGREDIENTS_HEADING = re.compile(r'#*\s*ingredients?\b')
+INSTRUCTIONS_HEADING = re.compile(r'#*\s*(instructions?|directions?|method|steps?|preparation)\b')
+QUANTITY_LINE = re.compile(r'\d+(?:[./]\d+)?\s*[a-zA-Z]')
+
+# Ingredient lines (IngredientParser)
+INGREDIENT_QUANTITY = re.compile(r'^(\d+\.?\d*|\d+\/\d+|\d+\s+\d+\/\d+)')
+
+# Vendor item names and prices (VendorPriceImporter)
+VENDOR_PACK_WORDS = re.compile(r'\b(case|pack|box|bag|each|ea|ctn|carton)\b', re.IGNORECASE)
+NON_WORD = re.compile(r'[^\w\s]')
+PRICE_NUMBER = re.compile(r'[\d.]+')
@@ -4,13 +4,16 @@ Recipe Source Tracker - Find recipes by date and original location
 Track which restaurant, project, or folder recipes came from
 """
 
-import sqlite3
 import sys
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 import re
 
+from db_connection import get_connection_manager
+
+DB_PATH = 'recipe_library/recipe_library.db'
+
 def get_source_folder(file_path):
     """Extract the immediate parent folder from a file path."""
     try:
@@ -55,8 +58,7 @@ def search_by_date_range(start_date=None, end_date=None, date_field='modified_da
         end_date: End date (YYYY-MM-DD) or None for no limit
         date_field: 'created_date' or 'modified_date'
     """
-    conn = sqlite3.connect('recipe_library/recipe_library.db')
-    cursor = conn.cursor()
+    cursor = get_connection_manager(DB_PATH).connection().cursor()
     
     query = f"SELECT title, file_path, created_date, modified_date, cuisine_type, category FROM recipes"
     conditions = []
@@ -77,7 +79,6 @@ def search_by_date_range(start_date=None, end_date=None, date_field='modified_da
     
     cursor.execute(query, params)
     results = cursor.fetchall()
-    conn.close()
     
     return results
 
@@ -88,24 +89,20 @@ def search_by_location(location_pattern):
     Args:
         location_pattern: Text to search for in file path (e.g., "Restaurant", "Italian Project")
     """
-    conn = sqlite3.connect('recipe_library/recipe_library.db')
-    cursor = conn.cursor()
+    cursor = get_connection_manager(DB_PATH).connection().cursor()
     
     query = "SELECT title, file_path, created_date, modified_date, cuisine_type, category FROM recipes WHERE file_path LIKE ? ORDER BY modified_date DESC"
     cursor.execute(query, (f"%{location_pattern}%",))
     results = cursor.fetchall()
-    conn.close()
     
     return results
 
 def group_by_source():
     """Group all recipes by their source folder/project."""
-    conn = sqlite3.connect('recipe_library/recipe_library.db')
-    cursor = conn.cursor()
+    cursor = get_connection_manager(DB_PATH).connection().cursor()
     
     cursor.execute("SELECT title, file_path, created_date, modified_date, cuisine_type FROM recipes ORDER BY file_path")
     results = cursor.fetchall()
-    conn.close()
     
     # Group by source
     by_source = defaultdict(list)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+UI Dispatch Queue
+Lets worker threads update Tk widgets safely, batched into one update per frame
+"""
+
+import time
+import queue
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import tkinter as tk
+
+# Queued UI updates are applied this often (milliseconds; 50 ms is 20 frames per second)
+FRAME_INTERVAL_MS = 50
+
+# Rates and ETAs average over at least this much elapsed time (seconds)
+MIN_RATE_WINDOW = 1.0
+
+
+def format_duration(seconds: float) -> str:
+    """Seconds as H:MM:SS or M:SS."""
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+@dataclass
+class Progress:
+    """A snapshot of a background task's progress."""
+    done: int
+    total: Optional[int]
+    rate: Optional[float]  # units per second
+    eta: Optional[float]  # seconds remaining
+    message: str = ''
+    
+    def text(self) -> str:
+        """One-line summary, e.g. '42/100 (42%) · 3.1/s · ETA 0:18 · file.docx'."""
+        parts = [f"{self.done}/{self.total} ({self.done * 100 // self.total}%)" if self.total else f"{self.done}"]
+        if self.rate:
+            parts.append(f"{self.rate:.1f}/s")
+        if self.eta is not None:
+            parts.append(f"ETA {format_duration(self.eta)}")
+        if self.message:
+            parts.append(self.message)
+        return " · ".join(parts)
+
+
+class ProgressTracker:
+    """Turns (done, total, message) reports into Progress snapshots with a rate and ETA."""
+    
+    def __init__(self, total: Optional[int] = None):
+        self.total = total
+        self.started = time.monotonic()
+    
+    def update(self, done: int, total: Optional[int] = None, message: Optional[str] = None) -> Progress:
+        """Snapshot for done units finished (total overrides the one given at construction)."""
+        if total is not None:
+            self.total = total
+        elapsed = time.monotonic() - self.started
+        rate = done / elapsed if done and elapsed >= MIN_RATE_WINDOW else None
+        eta = (self.total - done) / rate if rate and self.total else None
+        return Progress(done, self.total, rate, eta, message or '')
+
+
+class UIDispatcher:
+    """
+    Thread-safe queue of UI updates, drained on the Tk thread with root.after.
+    
+    Worker threads call write(), clear(), progress() and call() instead of
+    touching widgets. Once per frame the queue is drained: consecutive
+    writes to a text widget become a single insert, and only the newest
+    progress snapshot per bar is drawn, however many the worker sent.
+    """
+    
+    def __init__(self, root, interval_ms: int = FRAME_INTERVAL_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self._queue: 'queue.Queue[Tuple[str, Any, Any]]' = queue.Queue()
+        self._animating = set()  # indeterminate bars currently running (Tk thread only)
+        self.root.after(self.interval_ms, self._drain)
+    
+    # Worker side (any thread)
+    
+    def write(self, widget, text: str):
+        """Append text to a Text widget (and scroll to it)."""
+        self._queue.put(('write', widget, text))
+    
+    def clear(self, widget):
+        """Delete everything in a Text widget."""
+        self._queue.put(('clear', widget, None))
+    
+    def call(self, func: Callable, *args, **kwargs):
+        """Run func(*args, **kwargs) on the Tk thread, in order with the other updates."""
+        self._queue.put(('call', func, (args, kwargs)))
+    
+    def progress(self, bar, label, progress: Optional[Progress]):
+        """
+        Show a progress snapshot on a ttk.Progressbar and its label.
+        
+        A snapshot without a total keeps the bar indeterminate; None stops
+        the bar and clears the label.
+        """
+        self._queue.put(('progress', (bar, label), progress))
+    
+    def busy(self, bar, label, message: str = ''):
+        """Animate a bar (indeterminate) while work of unknown size runs."""
+        self.progress(bar, label, Progress(0, None, None, None, message))
+    
+    def idle(self, bar, label):
+        """Stop a bar and clear its label."""
+        self.progress(bar, label, None)
+    
+    def progress_callback(self, bar, label, total: Optional[int] = None) -> Callable[..., None]:
+        """A progress(done, total, message) callback for workers that reports to bar and label."""
+        tracker = ProgressTracker(total)
+        
+        def report(done: int, total: Optional[int] = None, message: Optional[str] = None):
+            self.progress(bar, label, tracker.update(done, total, message))
+        
+        return report
+    
+    # Tk side
+    
+    def _drain(self):
+        """Apply everything queued since the last frame, then schedule the next frame."""
+        pending_text: Dict[Any, List[str]] = {}
+        latest_progress: Dict[Tuple[Any, Any], Optional[Progress]] = {}
+        
+        def flush():
+            # Coalesced updates go out before anything queued after them
+            for widget, chunks in pending_text.items():
+                self._apply(self._insert, widget, ''.join(chunks))
+            for (bar, label), progress in latest_progress.items():
+                self._apply(self._show_progress, bar, label, progress)
+            pending_text.clear()
+            latest_progress.clear()
+        
+        try:
+            while True:
+                try:
+                    kind, target, payload = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == 'write':
+                    pending_text.setdefault(target, []).append(payload)
+                elif kind == 'progress':
+                    latest_progress[target] = payload
+                else:
+                    flush()
+                    if kind == 'clear':
+                        self._apply(target.delete, 1.0, tk.END)
+                    else:
+                        args, kwargs = payload
+                        self._apply(target, *args, **kwargs)
+            flush()
+        finally:
+            self.root.after(self.interval_ms, self._drain)
+    
+    @staticmethod
+    def _apply(func: Callable, *args, **kwargs):
+        """Run one update, skipping widgets closed while the worker was still reporting."""
+        try:
+            func(*args, **kwargs)
+        except tk.TclError:
+            pass
+    
+    @staticmethod
+    def _insert(widget, text: str):
+        """Append text to a Text widget and keep the end in view."""
+        widget.insert(tk.END, text)
+        widget.see(tk.END)
+    
+    def _show_progress(self, bar, label, progress: Optional[Progress]):
+        """Draw one progress snapshot."""
+        if progress is None or progress.total:
+            if bar in self._animating:
+                bar.stop()
+                self._animating.discard(bar)
+            if progress is None:
+                bar.config(mode='determinate', value=0)
+            else:
+                bar.config(mode='determinate', maximum=progress.total, value=progress.done)
+        elif bar not in self._animating:
+            bar.config(mode='indeterminate')
+            bar.start()
+            self._animating.add(bar)
+        
+        if label is not None:
+            label.config(text=progress.text() if progress else '')
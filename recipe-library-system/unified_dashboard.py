@@ -9,6 +9,7 @@ from tkinter import ttk, filedialog, messagebox, scrolledtext, simpledialog
 import sys
 import threading
 from pathlib import Path
+from typing import Any, Dict
 import sqlite3
 from datetime import datetime
 import webbrowser
@@ -17,6 +18,13 @@ import webbrowser
 sys.path.insert(0, str(Path(__file__).parent))
 sys.path.insert(0, str(Path(__file__).parent / "RecipeLibrarySystem"))
 
+from recipe_search import MATCH_FILTER, build_match_query, ensure_search_index
+from library_stats import ensure_library_stats, read_library_stats
+from recipe_browse import ensure_browse_indexes, sort_key
+from recipe_completeness import ensure_completeness_cache
+from recipe_card_grid import VirtualCardGrid
+from ui_dispatch import UIDispatcher
+
 try:
     from enhanced_recipe_scanner import EnhancedRecipeScanner
     from missing_info_detector import MissingInfoDetector
@@ -30,6 +38,9 @@ try:
 except ImportError as e:
     print(f"Warning: Could not import some modules: {e}")
 
+# Columns a recipe card shows (the browse tab keeps these for every recipe in memory)
+CARD_COLUMNS = ('id', 'title', 'cuisine_type', 'category', 'difficulty', 'modified_date')
+
 
 class UnifiedDashboard:
     """Main desktop dashboard application."""
@@ -52,6 +63,19 @@ class UnifiedDashboard:
         self.crawler = None
         self.ingredient_db = IngredientDatabase()
         
+        # Background threads update widgets only through this queue
+        self.ui = UIDispatcher(self.root)
+        
+        if self.db_path.exists():
+            # Quick search, the stats panel and paged browsing need their tables on older libraries too
+            conn = sqlite3.connect(self.db_path)
+            ensure_search_index(conn.cursor())
+            ensure_library_stats(conn.cursor())
+            ensure_completeness_cache(conn.cursor())
+            ensure_browse_indexes(conn.cursor())
+            conn.commit()
+            conn.close()
+        
         self.setup_ui()
         self.refresh_stats()
         
@@ -149,6 +173,8 @@ class UnifiedDashboard:
         # Progress
         self.scan_progress = ttk.Progressbar(frame, mode='indeterminate')
         self.scan_progress.pack(fill=tk.X, pady=5)
+        self.scan_progress_label = ttk.Label(frame, text="", font=("Arial", 9))
+        self.scan_progress_label.pack(anchor=tk.W)
         
         # Results
         results_frame = ttk.LabelFrame(frame, text="Results", padding="10")
@@ -253,6 +279,8 @@ class UnifiedDashboard:
         # Progress
         self.convert_progress = ttk.Progressbar(frame, mode='indeterminate')
         self.convert_progress.pack(fill=tk.X, pady=5)
+        self.convert_progress_label = ttk.Label(frame, text="", font=("Arial", 9))
+        self.convert_progress_label.pack(anchor=tk.W)
         
         # Results
         results_frame = ttk.LabelFrame(frame, text="Conversion Results", padding="10")
@@ -297,6 +325,8 @@ class UnifiedDashboard:
         # Progress
         self.scrape_progress = ttk.Progressbar(frame, mode='indeterminate')
         self.scrape_progress.pack(fill=tk.X, pady=5)
+        self.scrape_progress_label = ttk.Label(frame, text="", font=("Arial", 9))
+        self.scrape_progress_label.pack(anchor=tk.W)
         
         # Results
         results_frame = ttk.LabelFrame(frame, text="Scraping Results", padding="10")
@@ -353,6 +383,8 @@ class UnifiedDashboard:
         # Progress
         self.crawl_progress = ttk.Progressbar(frame, mode='indeterminate')
         self.crawl_progress.pack(fill=tk.X, pady=5)
+        self.crawl_progress_label = ttk.Label(frame, text="", font=("Arial", 9))
+        self.crawl_progress_label.pack(anchor=tk.W)
         
         # Results
         results_frame = ttk.LabelFrame(frame, text="Crawling Results", padding="10")
@@ -411,40 +443,18 @@ class UnifiedDashboard:
         ttk.Button(filter_row, text="🔄 Refresh", 
                   command=self.load_recipes).pack(side=tk.RIGHT, padx=5)
         
-        # Recipe cards container with scrollbar
+        # Recipe cards: only the cards in view are created, and they are reused on scroll
         cards_container = ttk.Frame(frame)
         cards_container.pack(fill=tk.BOTH, expand=True)
         
-        # Canvas for scrolling
-        canvas = tk.Canvas(cards_container, bg='#f5f5f5', highlightthickness=0)
-        scrollbar = ttk.Scrollbar(cards_container, orient=tk.VERTICAL, command=canvas.yview)
-        self.recipe_cards_frame = ttk.Frame(canvas)
-        
-        scrollable_frame = canvas.create_window((0, 0), window=self.recipe_cards_frame, anchor="nw")
-        
-        def configure_scroll_region(event):
-            canvas.configure(scrollregion=canvas.bbox("all"))
-        
-        def configure_canvas_width(event):
-            canvas_width = event.width
-            canvas.itemconfig(scrollable_frame, width=canvas_width)
-        
-        self.recipe_cards_frame.bind("<Configure>", configure_scroll_region)
-        canvas.bind("<Configure>", configure_canvas_width)
-        
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.recipe_grid = VirtualCardGrid(cards_container, on_view=self.view_recipe_by_id)
+        self.recipe_rows = []  # (id, title, cuisine, category, difficulty, modified), newest first
         
         # Mouse wheel scrolling
         def on_mousewheel(event):
-            canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+            self.recipe_grid.scroll(int(-1 * (event.delta / 120)))
         
-        canvas.bind_all("<MouseWheel>", on_mousewheel)
-        
-        self.recipe_cards_canvas = canvas
-        self.recipe_cards = {}  # Store card widgets
+        self.recipe_grid.canvas.bind_all("<MouseWheel>", on_mousewheel)
         
         # Load recipes
         self.load_recipes()
@@ -482,26 +492,14 @@ class UnifiedDashboard:
                 stats_text = "No library database found.\n\nScan a directory to create your library."
             else:
                 conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                # Total recipes
-                cursor.execute("SELECT COUNT(*) FROM recipes")
-                total = cursor.fetchone()[0]
-                
-                # By cuisine
-                cursor.execute("SELECT cuisine_type, COUNT(*) FROM recipes GROUP BY cuisine_type ORDER BY COUNT(*) DESC")
-                cuisines = cursor.fetchall()
-                
-                # By category
-                cursor.execute("SELECT category, COUNT(*) FROM recipes GROUP BY category")
-                categories = cursor.fetchall()
-                
-                # By difficulty
-                cursor.execute("SELECT difficulty, COUNT(*) FROM recipes GROUP BY difficulty")
-                difficulties = cursor.fetchall()
-                
+                stats = read_library_stats(conn.cursor())
                 conn.close()
                 
+                total = stats['total_recipes']
+                cuisines = list(stats['by_cuisine'].items())
+                categories = list(stats['by_category'].items())
+                difficulties = list(stats['by_difficulty'].items())
+                
                 stats_text = f"📊 Library Statistics\n{'='*30}\n\n"
                 stats_text += f"Total Recipes: {total}\n\n"
                 
@@ -535,38 +533,42 @@ class UnifiedDashboard:
             messagebox.showwarning("Warning", "Please select a directory to scan")
             return
         
+        recursive = self.recursive_var.get()
+        ui = self.ui
+        
         def do_scan():
             try:
-                self.scan_progress.start()
-                self.scan_results.delete(1.0, tk.END)
-                self.scan_results.insert(tk.END, f"Scanning {directory}...\n\n")
+                ui.busy(self.scan_progress, self.scan_progress_label, "Finding recipe files...")
+                ui.clear(self.scan_results)
+                ui.write(self.scan_results, f"Scanning {directory}...\n\n")
                 
                 if not self.scanner:
                     self.scanner = EnhancedRecipeScanner()
                 
                 result = self.scanner.scan_directory_thoroughly(
                     directory, 
-                    recursive=self.recursive_var.get()
+                    recursive=recursive,
+                    progress=ui.progress_callback(self.scan_progress, self.scan_progress_label)
                 )
                 
-                self.scan_results.insert(tk.END, f"Scan complete!\n\n")
-                self.scan_results.insert(tk.END, f"Files found: {result['total_files']}\n")
-                self.scan_results.insert(tk.END, f"Recipe files: {result['recipe_files_found']}\n")
-                self.scan_results.insert(tk.END, f"Recipes imported: {result['recipes_imported']}\n\n")
+                ui.write(self.scan_results, f"Scan complete!\n\n")
+                ui.write(self.scan_results, f"Files found: {result['total_files']}\n")
+                ui.write(self.scan_results, f"Recipe files: {result['recipe_files_found']}\n")
+                ui.write(self.scan_results, f"Recipes imported: {result['recipes_imported']}\n\n")
                 
                 if result['imported_recipes']:
-                    self.scan_results.insert(tk.END, "Imported recipes:\n")
+                    ui.write(self.scan_results, "Imported recipes:\n")
                     for recipe in result['imported_recipes']:
-                        self.scan_results.insert(tk.END, f"  • {recipe['title']}\n")
+                        ui.write(self.scan_results, f"  • {recipe['title']}\n")
                 
-                self.scan_progress.stop()
-                self.refresh_stats()
-                self.load_recipes()
-                messagebox.showinfo("Success", f"Imported {result['recipes_imported']} recipes!")
+                ui.idle(self.scan_progress, self.scan_progress_label)
+                ui.call(self.refresh_stats)
+                ui.call(self.load_recipes)
+                ui.call(messagebox.showinfo, "Success", f"Imported {result['recipes_imported']} recipes!")
                 
             except Exception as e:
-                self.scan_progress.stop()
-                messagebox.showerror("Error", f"Scan failed: {e}")
+                ui.idle(self.scan_progress, self.scan_progress_label)
+                ui.call(messagebox.showerror, "Error", f"Scan failed: {e}")
         
         threading.Thread(target=do_scan, daemon=True).start()
     
@@ -649,11 +651,13 @@ class UnifiedDashboard:
             messagebox.showwarning("Warning", "Please select at least one recipe to analyze.")
             return
         
+        ui = self.ui
+        
         def do_analyze():
             try:
-                self.convert_progress.start()
-                self.convert_results.delete(1.0, tk.END)
-                self.convert_results.insert(tk.END, f"Analyzing {len(selected)} recipes...\n\n")
+                report = ui.progress_callback(self.convert_progress, self.convert_progress_label, len(selected))
+                ui.clear(self.convert_results)
+                ui.write(self.convert_results, f"Analyzing {len(selected)} recipes...\n\n")
                 
                 if not hasattr(self, 'detector') or not self.detector:
                     from missing_info_detector import MissingInfoDetector
@@ -670,21 +674,22 @@ class UnifiedDashboard:
                         missing_count = len(analysis.get('missing_fields', []))
                         completeness = analysis.get('completeness_score', 0)
                         
-                        self.convert_results.insert(tk.END, 
+                        ui.write(self.convert_results,
                             f"{i}. {data['title']}: {missing_count} missing fields, "
                             f"{completeness:.1f}% complete\n")
+                    report(i, len(selected), data['title'])
                 
-                self.convert_progress.stop()
+                ui.idle(self.convert_progress, self.convert_progress_label)
                 
                 # Update UI to show missing info
                 if selected:
-                    self.show_recipe_missing_info(selected[0])
+                    ui.call(self.show_recipe_missing_info, selected[0])
                 
-                messagebox.showinfo("Success", f"Analyzed {len(selected)} recipes!")
+                ui.call(messagebox.showinfo, "Success", f"Analyzed {len(selected)} recipes!")
                 
             except Exception as e:
-                self.convert_progress.stop()
-                messagebox.showerror("Error", f"Analysis failed: {e}")
+                ui.idle(self.convert_progress, self.convert_progress_label)
+                ui.call(messagebox.showerror, "Error", f"Analysis failed: {e}")
         
         threading.Thread(target=do_analyze, daemon=True).start()
     
@@ -811,11 +816,13 @@ class UnifiedDashboard:
         if not messagebox.askyesno("Confirm Conversion", confirm_text):
             return
         
+        ui = self.ui
+        
         def do_convert():
             try:
-                self.convert_progress.start()
-                self.convert_results.delete(1.0, tk.END)
-                self.convert_results.insert(tk.END, f"Converting {len(selected)} recipes...\n\n")
+                report = ui.progress_callback(self.convert_progress, self.convert_progress_label, len(selected))
+                ui.clear(self.convert_results)
+                ui.write(self.convert_results, f"Converting {len(selected)} recipes...\n\n")
                 
                 if not self.converter:
                     self.converter = IterumRecipeConverter()
@@ -823,6 +830,9 @@ class UnifiedDashboard:
                 success_count = 0
                 failed_count = 0
                 
+                # Same names as a full conversion, so recipes sharing a title get separate files
+                output_names = self.converter.library_output_names()
+                
                 for i, recipe_id in enumerate(selected, 1):
                     try:
                         data = self.recipe_checkboxes[recipe_id]
@@ -860,29 +870,32 @@ class UnifiedDashboard:
                                         if section == 'header':
                                             metadata[field] = value
                             
-                            self.converter.convert_recipe(str(file_path), metadata)
+                            self.converter.convert_recipe(str(file_path), metadata,
+                                                          output_name=output_names.get(recipe_id))
                             success_count += 1
-                            self.convert_results.insert(tk.END, f"{i}. ✓ {data['title']}\n")
+                            ui.write(self.convert_results, f"{i}. ✓ {data['title']}\n")
                         else:
                             failed_count += 1
-                            self.convert_results.insert(tk.END, f"{i}. ✗ {data['title']} (file not found)\n")
+                            ui.write(self.convert_results, f"{i}. ✗ {data['title']} (file not found)\n")
                             
                     except Exception as e:
                         failed_count += 1
                         data = self.recipe_checkboxes[recipe_id]
-                        self.convert_results.insert(tk.END, f"{i}. ✗ {data['title']}: {str(e)}\n")
+                        ui.write(self.convert_results, f"{i}. ✗ {data['title']}: {str(e)}\n")
+                    
+                    report(i, len(selected), self.recipe_checkboxes[recipe_id]['title'])
                 
-                self.convert_results.insert(tk.END, f"\nConversion complete!\n")
-                self.convert_results.insert(tk.END, f"Success: {success_count}, Failed: {failed_count}\n")
-                self.convert_results.insert(tk.END, f"Files saved to: {self.converted_path}\n")
+                ui.write(self.convert_results, f"\nConversion complete!\n")
+                ui.write(self.convert_results, f"Success: {success_count}, Failed: {failed_count}\n")
+                ui.write(self.convert_results, f"Files saved to: {self.converted_path}\n")
                 
-                self.convert_progress.stop()
-                messagebox.showinfo("Success", 
-                    f"Converted {success_count} recipe(s)!\n{failed_count} failed.")
+                ui.idle(self.convert_progress, self.convert_progress_label)
+                ui.call(messagebox.showinfo, "Success",
+                        f"Converted {success_count} recipe(s)!\n{failed_count} failed.")
                 
             except Exception as e:
-                self.convert_progress.stop()
-                messagebox.showerror("Error", f"Conversion failed: {e}")
+                ui.idle(self.convert_progress, self.convert_progress_label)
+                ui.call(messagebox.showerror, "Error", f"Conversion failed: {e}")
         
         threading.Thread(target=do_convert, daemon=True).start()
     
@@ -893,11 +906,13 @@ class UnifiedDashboard:
             messagebox.showwarning("Warning", "Please enter a recipe URL")
             return
         
+        ui = self.ui
+        
         def do_scrape():
             try:
-                self.scrape_progress.start()
-                self.scrape_results.delete(1.0, tk.END)
-                self.scrape_results.insert(tk.END, f"Scraping {url}...\n\n")
+                ui.busy(self.scrape_progress, self.scrape_progress_label, url)
+                ui.clear(self.scrape_results)
+                ui.write(self.scrape_results, f"Scraping {url}...\n\n")
                 
                 if not self.scraper:
                     self.scraper = WebRecipeScraper()
@@ -905,19 +920,19 @@ class UnifiedDashboard:
                 recipe_entry = self.scraper.scrape_and_import(url)
                 
                 if recipe_entry:
-                    self.scrape_results.insert(tk.END, f"Successfully scraped: {recipe_entry.title}\n")
-                    self.scrape_results.insert(tk.END, f"ID: {recipe_entry.id}\n")
-                    self.scrape_progress.stop()
-                    self.refresh_stats()
-                    self.load_recipes()
-                    messagebox.showinfo("Success", f"Recipe '{recipe_entry.title}' imported!")
+                    ui.write(self.scrape_results, f"Successfully scraped: {recipe_entry.title}\n")
+                    ui.write(self.scrape_results, f"ID: {recipe_entry.id}\n")
+                    ui.idle(self.scrape_progress, self.scrape_progress_label)
+                    ui.call(self.refresh_stats)
+                    ui.call(self.load_recipes)
+                    ui.call(messagebox.showinfo, "Success", f"Recipe '{recipe_entry.title}' imported!")
                 else:
-                    self.scrape_progress.stop()
-                    messagebox.showerror("Error", "Failed to scrape recipe from URL")
+                    ui.idle(self.scrape_progress, self.scrape_progress_label)
+                    ui.call(messagebox.showerror, "Error", "Failed to scrape recipe from URL")
                     
             except Exception as e:
-                self.scrape_progress.stop()
-                messagebox.showerror("Error", f"Scraping failed: {e}")
+                ui.idle(self.scrape_progress, self.scrape_progress_label)
+                ui.call(messagebox.showerror, "Error", f"Scraping failed: {e}")
         
         threading.Thread(target=do_scrape, daemon=True).start()
     
@@ -930,33 +945,35 @@ class UnifiedDashboard:
         
         urls = [url.strip() for url in urls_text.split('\n') if url.strip()]
         
+        ui = self.ui
+        
         def do_scrape():
             try:
-                self.scrape_progress.start()
-                self.scrape_results.delete(1.0, tk.END)
-                self.scrape_results.insert(tk.END, f"Scraping {len(urls)} recipes...\n\n")
+                ui.clear(self.scrape_results)
+                ui.write(self.scrape_results, f"Scraping {len(urls)} recipes...\n\n")
                 
                 if not self.scraper:
                     self.scraper = WebRecipeScraper()
                 
-                results = self.scraper.scrape_multiple(urls)
+                results = self.scraper.scrape_multiple(
+                    urls, progress=ui.progress_callback(self.scrape_progress, self.scrape_progress_label, len(urls)))
                 
-                self.scrape_results.insert(tk.END, f"Successfully scraped: {len(results['success'])}\n")
-                self.scrape_results.insert(tk.END, f"Failed: {len(results['failed'])}\n\n")
+                ui.write(self.scrape_results, f"Successfully scraped: {len(results['success'])}\n")
+                ui.write(self.scrape_results, f"Failed: {len(results['failed'])}\n\n")
                 
                 if results['success']:
-                    self.scrape_results.insert(tk.END, "Successfully scraped:\n")
+                    ui.write(self.scrape_results, "Successfully scraped:\n")
                     for item in results['success']:
-                        self.scrape_results.insert(tk.END, f"  • {item['title']}\n")
+                        ui.write(self.scrape_results, f"  • {item['title']}\n")
                 
-                self.scrape_progress.stop()
-                self.refresh_stats()
-                self.load_recipes()
-                messagebox.showinfo("Success", f"Scraped {len(results['success'])} recipes!")
+                ui.idle(self.scrape_progress, self.scrape_progress_label)
+                ui.call(self.refresh_stats)
+                ui.call(self.load_recipes)
+                ui.call(messagebox.showinfo, "Success", f"Scraped {len(results['success'])} recipes!")
                 
             except Exception as e:
-                self.scrape_progress.stop()
-                messagebox.showerror("Error", f"Scraping failed: {e}")
+                ui.idle(self.scrape_progress, self.scrape_progress_label)
+                ui.call(messagebox.showerror, "Error", f"Scraping failed: {e}")
         
         threading.Thread(target=do_scrape, daemon=True).start()
     
@@ -975,62 +992,58 @@ class UnifiedDashboard:
             messagebox.showerror("Error", "Invalid options. Please check max pages and delay values.")
             return
         
+        ui = self.ui
+        
         def do_crawl():
             try:
-                self.crawl_progress.start()
-                self.crawl_results.delete(1.0, tk.END)
-                self.crawl_results.insert(tk.END, f"Crawling {url}...\nThis may take several minutes.\n\n")
+                report = ui.progress_callback(self.crawl_progress, self.crawl_progress_label, max_pages)
+                ui.busy(self.crawl_progress, self.crawl_progress_label, "Reading robots.txt and sitemaps...")
+                ui.clear(self.crawl_results)
+                ui.write(self.crawl_results, f"Crawling {url}...\nThis may take several minutes.\n\n")
                 
                 if not self.crawler:
                     self.crawler = WebsiteRecipeCrawler(
                         base_url=url,
                         max_pages=max_pages,
-                        delay=delay
+                        delay=delay,
+                        progress=report
                     )
                 else:
                     self.crawler.base_url = url
                     self.crawler.max_pages = max_pages
                     self.crawler.delay = delay
+                    self.crawler.progress = report
                 
                 results = self.crawler.crawl_and_export(format=format_type)
                 
                 if results['success']:
-                    self.crawl_results.insert(tk.END, f"Crawl complete!\n\n")
-                    self.crawl_results.insert(tk.END, f"Pages visited: {results['crawl_results']['total_pages_visited']}\n")
-                    self.crawl_results.insert(tk.END, f"Recipes found: {results['crawl_results']['recipes_found']}\n")
-                    self.crawl_results.insert(tk.END, f"Recipes scraped: {results['recipes_count']}\n")
-                    self.crawl_results.insert(tk.END, f"Output file: {results['output_file']}\n")
+                    ui.write(self.crawl_results, f"Crawl complete!\n\n")
+                    ui.write(self.crawl_results, f"Pages visited: {results['crawl_results']['total_pages_visited']}\n")
+                    ui.write(self.crawl_results, f"Recipes found: {results['crawl_results']['recipes_found']}\n")
+                    ui.write(self.crawl_results, f"Recipes scraped: {results['recipes_count']}\n")
+                    ui.write(self.crawl_results, f"Output file: {results['output_file']}\n")
                     
-                    self.crawl_progress.stop()
-                    self.refresh_stats()
-                    self.load_recipes()
-                    messagebox.showinfo("Success", f"Found and scraped {results['recipes_count']} recipes!")
+                    ui.idle(self.crawl_progress, self.crawl_progress_label)
+                    ui.call(self.refresh_stats)
+                    ui.call(self.load_recipes)
+                    ui.call(messagebox.showinfo, "Success", f"Found and scraped {results['recipes_count']} recipes!")
                 else:
-                    self.crawl_progress.stop()
-                    messagebox.showerror("Error", results.get('error', 'Crawl failed'))
+                    ui.idle(self.crawl_progress, self.crawl_progress_label)
+                    ui.call(messagebox.showerror, "Error", results.get('error', 'Crawl failed'))
                     
             except Exception as e:
-                self.crawl_progress.stop()
-                messagebox.showerror("Error", f"Crawling failed: {e}")
+                ui.idle(self.crawl_progress, self.crawl_progress_label)
+                ui.call(messagebox.showerror, "Error", f"Crawling failed: {e}")
         
         threading.Thread(target=do_crawl, daemon=True).start()
     
     def load_recipes(self):
-        """Load recipes from database and display as cards."""
+        """Load the recipe list from the database and show it in the card grid."""
         try:
-            # Clear existing cards
-            if hasattr(self, 'recipe_cards_frame'):
-                for widget in self.recipe_cards_frame.winfo_children():
-                    widget.destroy()
-                if hasattr(self, 'recipe_cards'):
-                    self.recipe_cards.clear()
-            
             if not self.db_path.exists():
-                if hasattr(self, 'recipe_cards_frame'):
-                    no_data_label = ttk.Label(self.recipe_cards_frame, 
-                                            text="No recipes found. Scan a directory to get started.",
-                                            font=("Arial", 11))
-                    no_data_label.pack(pady=50)
+                self.recipe_rows = []
+                if hasattr(self, 'recipe_grid'):
+                    self.recipe_grid.set_items([], "No recipes found. Scan a directory to get started.")
                 if hasattr(self, 'recipe_count_label'):
                     self.recipe_count_label.config(text="")
                 return
@@ -1039,8 +1052,7 @@ class UnifiedDashboard:
             cursor = conn.cursor()
             
             # Get unique cuisines for filter
-            cursor.execute("SELECT DISTINCT cuisine_type FROM recipes WHERE cuisine_type IS NOT NULL")
-            cuisines = [row[0] for row in cursor.fetchall()]
+            cuisines = [cuisine for cuisine in read_library_stats(cursor)['by_cuisine'] if cuisine is not None]
             if hasattr(self, 'cuisine_filter_var'):
                 # Update cuisine filter dropdown
                 for widget in self.root.winfo_children():
@@ -1049,36 +1061,16 @@ class UnifiedDashboard:
                             tab = widget.nametowidget(tab_id)
                             self._update_cuisine_filter(tab, cuisines)
             
-            cursor.execute("""
-                SELECT id, title, cuisine_type, category, difficulty, modified_date
+            # Only the fields a card shows; filtering works on this list in memory
+            cursor.execute(f"""
+                SELECT {', '.join(CARD_COLUMNS)}
                 FROM recipes
-                ORDER BY modified_date DESC
+                ORDER BY {sort_key('date')} DESC, id DESC
             """)
-            
-            recipes = cursor.fetchall()
+            self.recipe_rows = cursor.fetchall()
             conn.close()
             
-            # Update count
-            if hasattr(self, 'recipe_count_label'):
-                self.recipe_count_label.config(text=f"({len(recipes)} recipes)")
-            
-            # Create cards in grid layout
-            if hasattr(self, 'recipe_cards_frame'):
-                cards_per_row = 3
-                row = 0
-                col = 0
-                
-                for recipe_id, title, cuisine, category, difficulty, modified in recipes:
-                    self.create_recipe_card(recipe_id, title, cuisine, category, difficulty, modified, row, col)
-                    col += 1
-                    if col >= cards_per_row:
-                        col = 0
-                        row += 1
-                
-                # Update scroll region
-                self.recipe_cards_frame.update_idletasks()
-                if hasattr(self, 'recipe_cards_canvas'):
-                    self.recipe_cards_canvas.configure(scrollregion=self.recipe_cards_canvas.bbox("all"))
+            self.filter_recipes()
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load recipes: {e}")
@@ -1096,100 +1088,6 @@ class UnifiedDashboard:
             if isinstance(widget, (ttk.Frame, tk.Frame, ttk.LabelFrame)):
                 self._update_cuisine_filter(widget, cuisines)
     
-    def create_recipe_card(self, recipe_id, title, cuisine, category, difficulty, modified, row, col):
-        """Create a recipe card widget."""
-        if not hasattr(self, 'recipe_cards_frame'):
-            return
-            
-        # Card frame with styling
-        card = tk.Frame(self.recipe_cards_frame, bg='white', relief=tk.RAISED, bd=1)
-        card.grid(row=row, column=col, padx=10, pady=10, sticky='nsew')
-        card.config(highlightbackground='#e0e0e0', highlightthickness=1)
-        
-        # Configure grid weights
-        self.recipe_cards_frame.columnconfigure(col, weight=1)
-        
-        # Card content
-        content_frame = tk.Frame(card, bg='white', padx=15, pady=15)
-        content_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # Title
-        title_label = tk.Label(content_frame, text=title or 'Untitled', 
-                              font=("Arial", 12, "bold"), bg='white', 
-                              fg='#2c3e50', anchor='w', wraplength=200)
-        title_label.pack(fill=tk.X, pady=(0, 10))
-        
-        # Badges row
-        badges_frame = tk.Frame(content_frame, bg='white')
-        badges_frame.pack(fill=tk.X, pady=(0, 10))
-        
-        # Cuisine badge
-        if cuisine:
-            cuisine_bg = '#e8f5e9'
-            cuisine_fg = '#2e7d32'
-            cuisine_badge = tk.Label(badges_frame, text=f"🌍 {cuisine}", 
-                                    font=("Arial", 8), bg=cuisine_bg, fg=cuisine_fg,
-                                    padx=8, pady=3, relief=tk.FLAT)
-            cuisine_badge.pack(side=tk.LEFT, padx=(0, 5))
-        
-        # Difficulty badge
-        if difficulty:
-            diff_colors = {
-                'easy': ('#e3f2fd', '#1976d2'),
-                'medium': ('#fff3e0', '#f57c00'),
-                'hard': ('#ffebee', '#c62828')
-            }
-            diff_bg, diff_fg = diff_colors.get(difficulty.lower(), ('#f5f5f5', '#757575'))
-            difficulty_badge = tk.Label(badges_frame, text=f"📊 {difficulty.title()}", 
-                                       font=("Arial", 8), bg=diff_bg, fg=diff_fg,
-                                       padx=8, pady=3, relief=tk.FLAT)
-            difficulty_badge.pack(side=tk.LEFT)
-        
-        # Category (if available)
-        if category:
-            category_label = tk.Label(content_frame, text=f"Category: {category}", 
-                                     font=("Arial", 8), bg='white', fg='#757575',
-                                     anchor='w')
-            category_label.pack(fill=tk.X, pady=(0, 5))
-        
-        # Modified date
-        modified_str = modified[:10] if modified else 'Unknown'
-        date_label = tk.Label(content_frame, text=f"📅 {modified_str}", 
-                            font=("Arial", 8), bg='white', fg='#9e9e9e',
-                            anchor='w')
-        date_label.pack(fill=tk.X, pady=(0, 10))
-        
-        # View button
-        view_btn = tk.Button(content_frame, text="👁️ View Recipe", 
-                            font=("Arial", 9), bg='#2196f3', fg='white',
-                            relief=tk.FLAT, padx=15, pady=5,
-                            cursor='hand2',
-                            command=lambda rid=recipe_id: self.view_recipe_by_id(rid))
-        view_btn.pack(fill=tk.X)
-        
-        # Hover effect
-        def on_enter(e):
-            card.config(highlightbackground='#2196f3', highlightthickness=2)
-        
-        def on_leave(e):
-            card.config(highlightbackground='#e0e0e0', highlightthickness=1)
-        
-        card.bind("<Enter>", on_enter)
-        card.bind("<Leave>", on_leave)
-        for widget in [content_frame, title_label, badges_frame]:
-            widget.bind("<Enter>", on_enter)
-            widget.bind("<Leave>", on_leave)
-        
-        if not hasattr(self, 'recipe_cards'):
-            self.recipe_cards = {}
-        self.recipe_cards[recipe_id] = {
-            'card': card,
-            'title': title or 'Untitled',
-            'cuisine': cuisine,
-            'category': category,
-            'difficulty': difficulty
-        }
-    
     def view_recipe_by_id(self, recipe_id):
         """View recipe by ID (for card clicks)."""
         try:
@@ -1212,68 +1110,39 @@ class UnifiedDashboard:
             messagebox.showerror("Error", f"Failed to open recipe: {e}")
     
     def filter_recipes(self):
-        """Filter recipes based on search and filters."""
+        """Filter the loaded recipes by search text, cuisine and difficulty."""
         try:
-            # Clear existing cards
-            if hasattr(self, 'recipe_cards_frame'):
-                for widget in self.recipe_cards_frame.winfo_children():
-                    widget.destroy()
-                if hasattr(self, 'recipe_cards'):
-                    self.recipe_cards.clear()
-            
-            if not self.db_path.exists():
+            if not hasattr(self, 'recipe_grid'):
                 return
             
             search_term = self.search_var.get().lower() if hasattr(self, 'search_var') else ""
             cuisine_filter = self.cuisine_filter_var.get() if hasattr(self, 'cuisine_filter_var') else "All"
             difficulty_filter = self.difficulty_filter_var.get() if hasattr(self, 'difficulty_filter_var') else "All"
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            query = "SELECT id, title, cuisine_type, category, difficulty, modified_date FROM recipes WHERE 1=1"
-            params = []
+            recipes = self.recipe_rows
             
-            if search_term:
-                query += " AND (LOWER(title) LIKE ? OR LOWER(cuisine_type) LIKE ? OR LOWER(category) LIKE ?)"
-                search_pattern = f"%{search_term}%"
-                params.extend([search_pattern, search_pattern, search_pattern])
+            match = build_match_query(search_term)
+            if match and self.db_path.exists():
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                cursor.execute(f"SELECT id FROM recipes WHERE {MATCH_FILTER}", (match,))
+                matching_ids = {row[0] for row in cursor.fetchall()}
+                conn.close()
+                recipes = [recipe for recipe in recipes if recipe[0] in matching_ids]
             
             if cuisine_filter != "All":
-                query += " AND cuisine_type = ?"
-                params.append(cuisine_filter)
+                recipes = [recipe for recipe in recipes if recipe[2] == cuisine_filter]
             
             if difficulty_filter != "All":
-                query += " AND LOWER(difficulty) = ?"
-                params.append(difficulty_filter.lower())
-            
-            query += " ORDER BY modified_date DESC"
-            
-            cursor.execute(query, params)
-            recipes = cursor.fetchall()
-            conn.close()
+                recipes = [recipe for recipe in recipes if (recipe[4] or '').lower() == difficulty_filter.lower()]
             
             # Update count
             if hasattr(self, 'recipe_count_label'):
                 self.recipe_count_label.config(text=f"({len(recipes)} recipes)")
             
-            # Create filtered cards
-            if hasattr(self, 'recipe_cards_frame'):
-                cards_per_row = 3
-                row = 0
-                col = 0
-                
-                for recipe_id, title, cuisine, category, difficulty, modified in recipes:
-                    self.create_recipe_card(recipe_id, title, cuisine, category, difficulty, modified, row, col)
-                    col += 1
-                    if col >= cards_per_row:
-                        col = 0
-                        row += 1
-                
-                # Update scroll region
-                self.recipe_cards_frame.update_idletasks()
-                if hasattr(self, 'recipe_cards_canvas'):
-                    self.recipe_cards_canvas.configure(scrollregion=self.recipe_cards_canvas.bbox("all"))
+            # The grid rebinds its existing cards to the new list
+            self.recipe_grid.set_items(recipes, "No recipes match these filters." if self.recipe_rows else
+                                       "No recipes found. Scan a directory to get started.")
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to filter recipes: {e}")
@@ -1835,58 +1704,59 @@ class UnifiedDashboard:
         progress_label = ttk.Label(progress_dialog, text="Scraping ingredient information...")
         progress_label.pack(pady=20)
         
+        def show_result(result):
+            progress_dialog.destroy()
+            
+            if result.get('success'):
+                # Populate form fields
+                if 'name' in result and not name_var.get():
+                    name_var.set(result['name'])
+                
+                if 'default_unit' in result:
+                    unit_var.set(result['default_unit'])
+                
+                if 'typical_ap_cost' in result:
+                    cost_var.set(str(result['typical_ap_cost']))
+                
+                if 'cost_unit' in result:
+                    cost_unit_var.set(result['cost_unit'])
+                
+                if 'storage_notes' in result and not storage_var.get():
+                    storage_var.set(result['storage_notes'])
+                
+                if 'notes' in result:
+                    current_notes = notes_text.get(1.0, tk.END).strip()
+                    if current_notes:
+                        notes_text.delete(1.0, tk.END)
+                        notes_text.insert(1.0, f"{current_notes}\n\n{result['notes']}")
+                    else:
+                        notes_text.delete(1.0, tk.END)
+                        notes_text.insert(1.0, result['notes'])
+                
+                # Update URL if it was modified
+                url_var.set(result.get('source_url', url))
+                
+                # Show success message with details
+                details = f"✅ Scraped successfully!\n\n"
+                details += f"Name: {result.get('name', 'N/A')}\n"
+                details += f"Price: {result.get('typical_ap_cost', 'N/A')} {result.get('cost_unit', '')}\n"
+                details += f"Unit: {result.get('default_unit', 'N/A')}\n"
+                if 'storage_notes' in result:
+                    details += f"Storage: {result['storage_notes'][:50]}...\n"
+                
+                messagebox.showinfo("Scraping Complete", details)
+            else:
+                messagebox.showerror("Scraping Failed", 
+                                    f"Could not scrape ingredient information:\n{result.get('error', 'Unknown error')}")
+        
         def do_scrape():
             try:
                 scraper = IngredientWebScraper()
                 result = scraper.scrape_ingredient_info(url)
-                
-                progress_dialog.destroy()
-                
-                if result.get('success'):
-                    # Populate form fields
-                    if 'name' in result and not name_var.get():
-                        name_var.set(result['name'])
-                    
-                    if 'default_unit' in result:
-                        unit_var.set(result['default_unit'])
-                    
-                    if 'typical_ap_cost' in result:
-                        cost_var.set(str(result['typical_ap_cost']))
-                    
-                    if 'cost_unit' in result:
-                        cost_unit_var.set(result['cost_unit'])
-                    
-                    if 'storage_notes' in result and not storage_var.get():
-                        storage_var.set(result['storage_notes'])
-                    
-                    if 'notes' in result:
-                        current_notes = notes_text.get(1.0, tk.END).strip()
-                        if current_notes:
-                            notes_text.delete(1.0, tk.END)
-                            notes_text.insert(1.0, f"{current_notes}\n\n{result['notes']}")
-                        else:
-                            notes_text.delete(1.0, tk.END)
-                            notes_text.insert(1.0, result['notes'])
-                    
-                    # Update URL if it was modified
-                    url_var.set(result.get('source_url', url))
-                    
-                    # Show success message with details
-                    details = f"✅ Scraped successfully!\n\n"
-                    details += f"Name: {result.get('name', 'N/A')}\n"
-                    details += f"Price: {result.get('typical_ap_cost', 'N/A')} {result.get('cost_unit', '')}\n"
-                    details += f"Unit: {result.get('default_unit', 'N/A')}\n"
-                    if 'storage_notes' in result:
-                        details += f"Storage: {result['storage_notes'][:50]}...\n"
-                    
-                    messagebox.showinfo("Scraping Complete", details)
-                else:
-                    messagebox.showerror("Scraping Failed", 
-                                        f"Could not scrape ingredient information:\n{result.get('error', 'Unknown error')}")
-            
+                self.ui.call(show_result, result)
             except Exception as e:
-                progress_dialog.destroy()
-                messagebox.showerror("Error", f"Scraping failed: {e}")
+                self.ui.call(progress_dialog.destroy)
+                self.ui.call(messagebox.showerror, "Error", f"Scraping failed: {e}")
         
         # Run in thread
         threading.Thread(target=do_scrape, daemon=True).start()
@@ -2280,26 +2150,27 @@ class UnifiedDashboard:
                 skipped = 0
                 errors = []
                 
+                # Check existing vendors once, then write all new prices in one transaction
+                existing = {v['vendor_name'].lower() for v in self.ingredient_db.get_vendor_prices(ingredient_id)}
+                rows = []
                 for item in parsed_data:
-                    try:
-                        # Check if vendor already exists
-                        existing_vendors = self.ingredient_db.get_vendor_prices(ingredient_id)
-                        if any(v['vendor_name'].lower() == item['vendor_name'].lower() 
-                              for v in existing_vendors):
-                            skipped += 1
-                            continue
-                        
-                        self.ingredient_db.add_vendor_price(
-                            ingredient_id,
-                            item['vendor_name'],
-                            item['price'],
-                            item['unit'],
-                            item['url'],
-                            f"Pasted from clipboard"
-                        )
-                        added += 1
-                    except Exception as e:
-                        errors.append(f"{item['vendor_name']}: {str(e)}")
+                    if item['vendor_name'].lower() in existing:
+                        skipped += 1
+                        continue
+                    existing.add(item['vendor_name'].lower())
+                    rows.append({
+                        'ingredient_id': ingredient_id,
+                        'vendor_name': item['vendor_name'],
+                        'ap_cost': item['price'],
+                        'cost_unit': item['unit'],
+                        'vendor_url': item['url'],
+                        'notes': "Pasted from clipboard"
+                    })
+                
+                try:
+                    added = self.ingredient_db.upsert_vendor_prices(rows)
+                except Exception as e:
+                    errors.extend(f"{row['vendor_name']}: {str(e)}" for row in rows)
                 
                 preview_dialog.destroy()
                 
@@ -2373,6 +2244,70 @@ class UnifiedDashboard:
             "No = Import directly (updates costs)"
         )
         
+        def show_preview(preview_text):
+            # Show in a scrollable dialog
+            preview_dialog = tk.Toplevel(self.root)
+            preview_dialog.title("Import Preview")
+            preview_dialog.geometry("600x500")
+            
+            text_widget = scrolledtext.ScrolledText(preview_dialog, wrap=tk.WORD)
+            text_widget.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+            text_widget.insert(1.0, preview_text)
+            text_widget.config(state=tk.DISABLED)
+            
+            ttk.Button(preview_dialog, text="Close", 
+                      command=preview_dialog.destroy).pack(pady=10)
+        
+        def review_matches(importer, items):
+            # Fuzzy matches are only remembered as vendor aliases once the user accepts them
+            review_dialog = tk.Toplevel(self.root)
+            review_dialog.title("Confirm Matches")
+            review_dialog.geometry("650x450")
+            
+            ttk.Label(review_dialog, text=f"Select the {len(items)} fuzzy matches to remember for this vendor:",
+                     font=("Arial", 10, "bold")).pack(pady=10)
+            
+            review_frame = ttk.Frame(review_dialog, padding="10")
+            review_frame.pack(fill=tk.BOTH, expand=True)
+            
+            review_tree = ttk.Treeview(review_frame, columns=('Item', 'Ingredient', 'Confidence'),
+                                      show='headings', height=12, selectmode='extended')
+            review_tree.heading('Item', text='Vendor Item')
+            review_tree.heading('Ingredient', text='Matched Ingredient')
+            review_tree.heading('Confidence', text='Confidence')
+            review_tree.column('Item', width=250)
+            review_tree.column('Ingredient', width=250)
+            review_tree.column('Confidence', width=90)
+            
+            scrollbar = ttk.Scrollbar(review_frame, orient=tk.VERTICAL, command=review_tree.yview)
+            review_tree.configure(yscrollcommand=scrollbar.set)
+            review_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            
+            for index, item in enumerate(items):
+                review_tree.insert('', tk.END, iid=str(index), values=(
+                    item['vendor_name'],
+                    item['ingredient_name'],
+                    f"{item['match_confidence']:.0%}"
+                ))
+            
+            def confirm_selected():
+                accepted = [items[int(iid)] for iid in review_tree.selection()]
+                try:
+                    importer.confirm_matches(accepted)
+                except Exception as e:
+                    messagebox.showerror("Error", f"Could not save matches: {e}")
+                    return
+                review_dialog.destroy()
+                messagebox.showinfo("Matches Saved", f"Remembered {len(accepted)} matches.")
+            
+            button_frame = ttk.Frame(review_dialog)
+            button_frame.pack(pady=10)
+            ttk.Button(button_frame, text="Confirm Selected",
+                      command=confirm_selected).pack(side=tk.LEFT, padx=5)
+            ttk.Button(button_frame, text="Skip",
+                      command=review_dialog.destroy).pack(side=tk.LEFT, padx=5)
+        
         def do_import():
             try:
                 importer = VendorPriceImporter(self.ingredient_db)
@@ -2395,20 +2330,9 @@ class UnifiedDashboard:
                         preview_text += f"\nTotal rows in file: {result['total_rows_in_file']}\n"
                         preview_text += "\nClick 'Import Vendor Prices' again and choose 'No' to import."
                         
-                        # Show in a scrollable dialog
-                        preview_dialog = tk.Toplevel(self.root)
-                        preview_dialog.title("Import Preview")
-                        preview_dialog.geometry("600x500")
-                        
-                        text_widget = scrolledtext.ScrolledText(preview_dialog, wrap=tk.WORD)
-                        text_widget.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-                        text_widget.insert(1.0, preview_text)
-                        text_widget.config(state=tk.DISABLED)
-                        
-                        ttk.Button(preview_dialog, text="Close", 
-                                  command=preview_dialog.destroy).pack(pady=10)
+                        self.ui.call(show_preview, preview_text)
                     else:
-                        messagebox.showerror("Preview Failed", result['error'])
+                        self.ui.call(messagebox.showerror, "Preview Failed", result['error'])
                 else:
                     # Actual import
                     result = importer.import_from_excel(file_path, vendor_name, auto_match=True)
@@ -2425,15 +2349,18 @@ class UnifiedDashboard:
                             success_text += f"\n⚠️ {result['unmatched']} items could not be automatically matched."
                             success_text += "\nYou can add them manually in the ingredient database."
                         
-                        messagebox.showinfo("Import Complete", success_text)
+                        self.ui.call(messagebox.showinfo, "Import Complete", success_text)
                         
                         # Refresh ingredient list
-                        self.search_ingredients()
+                        self.ui.call(self.search_ingredients)
+                        
+                        if result['to_confirm']:
+                            self.ui.call(review_matches, importer, result['to_confirm'])
                     else:
-                        messagebox.showerror("Import Failed", result['error'])
+                        self.ui.call(messagebox.showerror, "Import Failed", result['error'])
                         
             except Exception as e:
-                messagebox.showerror("Error", f"Import failed: {e}")
+                self.ui.call(messagebox.showerror, "Error", f"Import failed: {e}")
         
         # Run in thread to avoid blocking
         threading.Thread(target=do_import, daemon=True).start()
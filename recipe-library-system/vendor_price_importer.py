@@ -6,7 +6,9 @@ Import vendor price lists from Excel files or websites and update ingredient cos
 
 import sys
 import re
+import time
 import pandas as pd
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
@@ -22,6 +24,8 @@ except ImportError:
 # Add local modules
 sys.path.insert(0, str(Path(__file__).parent))
 from ingredient_database import IngredientDatabase
+from ingredient_matcher import IngredientMatcher
+from text_patterns import PRICE_NUMBER
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -34,6 +38,7 @@ class VendorPriceImporter:
         self.ingredient_db = ingredient_db or IngredientDatabase()
         self.vendor_name = ""
         self.import_date = datetime.now().isoformat()
+        self.matcher: Optional[IngredientMatcher] = None
     
     def import_from_excel(self, file_path: str, vendor_name: str = "", 
                          auto_match: bool = True) -> Dict[str, Any]:
@@ -63,21 +68,26 @@ class VendorPriceImporter:
         self.vendor_name = vendor_name
         
         try:
+            timings: Dict[str, float] = {}
+            stats: Dict[str, int] = {}
+            
             # Try to read Excel file
             logger.info(f"Reading Excel file: {file_path}")
             
             # Try different sheet names or first sheet
-            try:
-                df = pd.read_excel(file_path, sheet_name=0)
-            except:
-                # Try reading all sheets
-                excel_file = pd.ExcelFile(file_path)
-                df = pd.read_excel(excel_file, sheet_name=excel_file.sheet_names[0])
+            with self._timed(timings, 'read'):
+                try:
+                    df = pd.read_excel(file_path, sheet_name=0)
+                except:
+                    # Try reading all sheets
+                    excel_file = pd.ExcelFile(file_path)
+                    df = pd.read_excel(excel_file, sheet_name=excel_file.sheet_names[0])
             
             logger.info(f"Found {len(df)} rows in Excel file")
             
             # Detect column structure
-            column_map = self._detect_columns(df)
+            with self._timed(timings, 'detect'):
+                column_map = self._detect_columns(df)
             
             if not column_map:
                 return {
@@ -86,32 +96,40 @@ class VendorPriceImporter:
                 }
             
             # Parse prices
-            parsed_items = self._parse_excel_data(df, column_map)
+            with self._timed(timings, 'parse'):
+                parsed_items = self._parse_excel_data(df, column_map, timings, stats)
             
             # Match to ingredient database
             matched_items = []
             unmatched_items = []
             
-            for item in parsed_items:
+            with self._timed(timings, 'match'):
                 if auto_match:
-                    match_result = self._match_to_ingredient(item)
+                    self.matcher = IngredientMatcher.from_database(self.ingredient_db, vendor_name)
+                    match_results = self.matcher.match_many([item['vendor_name'] for item in parsed_items],
+                                                            [item.get('code') for item in parsed_items])
+                else:
+                    match_results = [{'matched': False} for _ in parsed_items]
+                
+                for item, match_result in zip(parsed_items, match_results):
                     if match_result['matched']:
                         item['ingredient_id'] = match_result['ingredient_id']
                         item['ingredient_name'] = match_result['ingredient_name']
+                        item['match_confidence'] = match_result['confidence']
                         matched_items.append(item)
                     else:
                         unmatched_items.append(item)
-                else:
-                    unmatched_items.append(item)
             
             # Update ingredient costs for matched items
             updated_count = 0
-            for item in matched_items:
+            with self._timed(timings, 'update'):
                 try:
-                    self._update_ingredient_cost(item)
-                    updated_count += 1
+                    updated_count = self._update_ingredient_costs(matched_items)
                 except Exception as e:
-                    logger.warning(f"Failed to update {item.get('ingredient_name')}: {e}")
+                    logger.warning(f"Failed to update vendor prices: {e}")
+            
+            logger.info("Import phases (s): " + ", ".join(f"{phase}={value}" for phase, value in timings.items()))
+            logger.info(f"Prices parsed row by row: {stats.get('fallback_rows', 0)}")
             
             return {
                 'success': True,
@@ -121,7 +139,11 @@ class VendorPriceImporter:
                 'unmatched': len(unmatched_items),
                 'updated': updated_count,
                 'matched_items': matched_items[:20],  # First 20 for preview
-                'unmatched_items': unmatched_items[:20]  # First 20 for preview
+                'unmatched_items': unmatched_items[:20],  # First 20 for preview
+                # Fuzzy matches the user can accept with confirm_matches (aliases match at 1.0)
+                'to_confirm': [item for item in matched_items if item['match_confidence'] < 1.0],
+                'timings': timings,
+                'stats': stats
             }
             
         except Exception as e:
@@ -229,35 +251,51 @@ class VendorPriceImporter:
         
         return None
     
-    def _parse_excel_data(self, df: pd.DataFrame, column_map: Dict[str, str]) -> List[Dict[str, Any]]:
-        """Parse Excel data into structured format."""
-        items = []
+    def _parse_excel_data(self, df: pd.DataFrame, column_map: Dict[str, str],
+                          timings: Optional[Dict[str, float]] = None,
+                          stats: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
+        """
+        Parse Excel data into structured format.
         
-        for idx, row in df.iterrows():
-            try:
-                # Get item name
-                item_name = str(row[column_map['name']]).strip()
-                if not item_name or item_name.lower() in ['nan', 'none', '']:
-                    continue
-                
-                # Get price
-                price = row[column_map['price']]
-                if pd.isna(price):
-                    continue
-                
-                # Convert to float
-                try:
-                    price = float(price)
-                    if price <= 0:
-                        continue
-                except (ValueError, TypeError):
-                    # Try to extract number from string
-                    price_match = re.search(r'[\d.]+', str(price))
-                    if price_match:
-                        price = float(price_match.group())
-                    else:
-                        continue
-                
+        Columns are cleaned in bulk; only prices that to_numeric rejects
+        (e.g. "$12.50/cs") fall back to row-wise parsing. Seconds per phase
+        go into timings; the number of fallback rows goes into
+        stats['fallback_rows'].
+        """
+        timings = timings if timings is not None else {}
+        stats = stats if stats is not None else {}
+        
+        with self._timed(timings, 'parse_names'):
+            names = self._clean_text_column(df[column_map['name']])
+            has_name = names.notna()
+        
+        with self._timed(timings, 'parse_prices'):
+            raw_prices = df[column_map['price']]
+            prices = pd.to_numeric(raw_prices, errors='coerce').astype(float)
+            keep = (has_name & (prices > 0)).to_numpy(copy=True)
+            rejected = (has_name & raw_prices.notna() & prices.isna()).to_numpy().nonzero()[0]
+            prices = prices.to_numpy(copy=True)
+        
+        with self._timed(timings, 'parse_fallback'):
+            raw_values = raw_prices.to_numpy(dtype=object)
+            for pos in rejected:
+                price = self._parse_price_value(raw_values[pos])
+                if price is not None:
+                    prices[pos] = price
+                    keep[pos] = True
+            stats['fallback_rows'] = len(rejected)
+        
+        with self._timed(timings, 'parse_columns'):
+            rows = keep.nonzero()[0]
+            optional = {
+                key: self._clean_text_column(df[column_map[key]]).to_numpy(dtype=object)[rows].tolist()
+                for key in ('unit', 'code', 'category') if key in column_map
+            }
+        
+        with self._timed(timings, 'parse_build'):
+            items = []
+            for i, (item_name, price) in enumerate(zip(names.to_numpy(dtype=object)[rows].tolist(),
+                                                       prices[rows].tolist())):
                 item = {
                     'vendor_name': item_name,
                     'price': price,
@@ -265,139 +303,90 @@ class VendorPriceImporter:
                     'import_date': self.import_date
                 }
                 
-                # Get unit if available
-                if 'unit' in column_map:
-                    unit = str(row[column_map['unit']]).strip()
-                    if unit and unit.lower() not in ['nan', 'none', '']:
-                        item['unit'] = unit
-                
-                # Get code if available
-                if 'code' in column_map:
-                    code = str(row[column_map['code']]).strip()
-                    if code and code.lower() not in ['nan', 'none', '']:
-                        item['code'] = code
-                
-                # Get category if available
-                if 'category' in column_map:
-                    category = str(row[column_map['category']]).strip()
-                    if category and category.lower() not in ['nan', 'none', '']:
-                        item['category'] = category
+                # Unit, code and category if available
+                for key, values in optional.items():
+                    if values[i] is not None:
+                        item[key] = values[i]
                 
                 items.append(item)
-                
-            except Exception as e:
-                logger.debug(f"Error parsing row {idx}: {e}")
-                continue
         
         return items
     
-    def _match_to_ingredient(self, item: Dict[str, Any]) -> Dict[str, Any]:
-        """Match vendor item to ingredient in database."""
-        vendor_name = item['vendor_name'].lower()
-        
-        # Try exact match first
+    def _clean_text_column(self, column: pd.Series) -> pd.Series:
+        """Strip a column to text; blanks and nan/none placeholders become None."""
+        text = column.astype(str).str.strip()
+        valid = text.notna() & text.ne('') & ~text.str.lower().isin(['nan', 'none'])
+        return text.astype(object).where(valid, None)
+    
+    def _parse_price_value(self, value: Any) -> Optional[float]:
+        """Row-wise price parsing for values to_numeric rejects."""
         try:
-            ingredient = self.ingredient_db.get_ingredient_by_name(vendor_name)
-            if ingredient:
-                return {
-                    'matched': True,
-                    'ingredient_id': ingredient['id'],
-                    'ingredient_name': ingredient['name'],
-                    'confidence': 1.0
-                }
-        except:
-            pass
-        
-        # Try fuzzy matching
-        # Search for similar names
-        search_terms = self._extract_search_terms(vendor_name)
-        
-        best_match = None
-        best_score = 0.0
-        
-        for term in search_terms:
-            results = self.ingredient_db.search_ingredients(term)
-            for ingredient in results:
-                score = self._calculate_similarity(vendor_name, ingredient['name'].lower())
-                if score > best_score and score > 0.7:  # 70% similarity threshold
-                    best_score = score
-                    best_match = ingredient
-        
-        if best_match:
-            return {
-                'matched': True,
-                'ingredient_id': best_match['id'],
-                'ingredient_name': best_match['name'],
-                'confidence': best_score
-            }
-        
-        return {
-            'matched': False,
-            'confidence': 0.0
-        }
+            price = float(value)
+            if price <= 0:
+                return None
+            return price
+        except (ValueError, TypeError):
+            # Try to extract number from string
+            price_match = PRICE_NUMBER.search(str(value))
+            if not price_match:
+                return None
+            try:
+                return float(price_match.group())
+            except ValueError:
+                return None
     
-    def _extract_search_terms(self, text: str) -> List[str]:
-        """Extract search terms from vendor item name."""
-        # Remove common vendor prefixes/suffixes
-        text = re.sub(r'\b(case|pack|box|bag|each|ea|ctn|carton)\b', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'\d+', '', text)  # Remove numbers
-        text = re.sub(r'[^\w\s]', ' ', text)  # Remove special chars
-        text = ' '.join(text.split())  # Normalize whitespace
-        
-        # Split into words
-        words = text.split()
-        
-        # Return key terms (longer words first)
-        words.sort(key=len, reverse=True)
-        return words[:3]  # Top 3 terms
+    @staticmethod
+    @contextmanager
+    def _timed(timings: Dict[str, float], phase: str):
+        """Record how long a phase takes, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings[phase] = round(time.perf_counter() - start, 4)
     
-    def _calculate_similarity(self, str1: str, str2: str) -> float:
-        """Calculate similarity between two strings (simple implementation)."""
-        # Simple word overlap
-        words1 = set(str1.split())
-        words2 = set(str2.split())
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        if not union:
-            return 0.0
-        
-        return len(intersection) / len(union)
+    def _match_to_ingredient(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Match vendor item to ingredient in database."""
+        if self.matcher is None:
+            self.matcher = IngredientMatcher.from_database(self.ingredient_db, self.vendor_name)
+        return self.matcher.match(item['vendor_name'], item.get('code'))
     
-    def _update_ingredient_cost(self, item: Dict[str, Any]):
-        """Update ingredient cost in database - adds to vendor prices."""
-        ingredient_id = item['ingredient_id']
-        ingredient = self.ingredient_db.get_ingredient(ingredient_id)
-        
-        if not ingredient:
-            return
-        
-        # Get unit from item or use ingredient default
-        unit = item.get('unit') or ingredient['default_unit']
-        vendor_name = item['vendor']
-        
-        # Add/update vendor price (this handles multiple vendors)
-        self.ingredient_db.add_vendor_price(
-            ingredient_id=ingredient_id,
-            vendor_name=vendor_name,
-            ap_cost=item['price'],
-            cost_unit=unit,
-            vendor_url=None,  # Could extract from item if available
-            notes=f"Imported from {vendor_name} price list"
-        )
+    def confirm_match(self, item: Dict[str, Any], ingredient_id: int):
+        """Remember a vendor item as this ingredient so later imports match it instantly."""
+        self.confirm_matches([dict(item, ingredient_id=ingredient_id)])
+    
+    def confirm_matches(self, items: List[Dict[str, Any]]):
+        """
+        Remember matches the user has accepted (e.g. reviewed import results).
         
-        # Also update cost history
-        self._add_cost_history(ingredient['name'], item['price'], unit, vendor_name)
+        Only confirmed matches become vendor aliases; automatic matches keep
+        their own confidence and are scored again on the next import.
+        """
+        by_vendor: Dict[str, Dict[str, int]] = {}
+        for item in items:
+            aliases = by_vendor.setdefault(item.get('vendor') or self.vendor_name, {})
+            for key in IngredientMatcher.alias_keys(item['vendor_name'], item.get('code')):
+                aliases[key] = item['ingredient_id']
+        
+        for vendor, aliases in by_vendor.items():
+            self.ingredient_db.save_vendor_aliases(vendor, aliases)
+            if self.matcher is not None and vendor == self.vendor_name:
+                self.matcher.aliases.update(aliases)
     
-    def _add_cost_history(self, ingredient_name: str, cost: float, unit: str, vendor: str):
-        """Add entry to cost history."""
-        # This would integrate with cost history if we have that table
-        # For now, just log it
-        logger.info(f"Updated cost for {ingredient_name}: ${cost:.2f}/{unit} from {vendor}")
+    def _update_ingredient_costs(self, items: List[Dict[str, Any]]) -> int:
+        """Update ingredient costs in database - adds to vendor prices and cost history."""
+        # One upsert for the whole list; a missing unit falls back to the ingredient default
+        updated = self.ingredient_db.upsert_vendor_prices([{
+            'ingredient_id': item['ingredient_id'],
+            'vendor_name': item['vendor'],
+            'ap_cost': item['price'],
+            'cost_unit': item.get('unit'),
+            'vendor_url': None,  # Could extract from item if available
+            'notes': f"Imported from {item['vendor']} price list"
+        } for item in items])
+        
+        logger.info(f"Updated {updated} vendor prices from {self.vendor_name}")
+        return updated
     
     def import_from_website(self, url: str, vendor_name: str = "") -> Dict[str, Any]:
         """
@@ -482,6 +471,9 @@ def main():
                        help='Preview import without updating')
     parser.add_argument('--no-auto-match', action='store_true',
                        help='Do not automatically match to ingredients')
+    parser.add_argument('--confirm', action='store_true',
+                       help='Review fuzzy matches after importing; accepted ones are matched '
+                            'instantly in later imports from this vendor')
     
     args = parser.parse_args()
     
@@ -522,6 +514,17 @@ def main():
             if result['unmatched'] > 0:
                 print(f"\n⚠️  {result['unmatched']} items could not be matched to ingredients")
                 print("   Consider adding them manually or improving matching")
+            
+            if args.confirm and result['to_confirm']:
+                print(f"\n🔎 Review {len(result['to_confirm'])} fuzzy matches (y = remember, Enter = skip):")
+                accepted = []
+                for item in result['to_confirm']:
+                    answer = input(f"  {item['vendor_name']} -> {item['ingredient_name']} "
+                                   f"({item['match_confidence']:.0%})? [y/N] ")
+                    if answer.strip().lower() in ('y', 'yes'):
+                        accepted.append(item)
+                importer.confirm_matches(accepted)
+                print(f"   Remembered {len(accepted)} matches for {result['vendor']}")
         else:
             print(f"❌ Import failed: {result['error']}")
 
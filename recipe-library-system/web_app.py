@@ -5,12 +5,19 @@ Beautiful, professional UI accessible from any browser
 """
 
 from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, flash
-import sqlite3
 import json
 from pathlib import Path
 from datetime import datetime
 import os
 
+from db_connection import get_connection_manager
+from recipe_search import build_match_query, ensure_search_index, ranked_search, snippet_html
+from library_stats import ensure_library_stats, read_library_stats
+from recipe_browse import (InvalidCursor, MAX_PAGE_SIZE, PAGE_SIZE, browse_page,
+                           build_browse_filters, ensure_browse_indexes, search_page)
+from recipe_completeness import ensure_completeness_cache
+from job_queue import JobQueue, create_jobs_blueprint, job_accepted
+
 app = Flask(__name__)
 app.secret_key = 'recipe-manager-secret-key-change-this'
 
@@ -19,41 +26,35 @@ LIBRARY_PATH = Path("recipe_library")
 DB_PATH = LIBRARY_PATH / "recipe_library.db"
 CONVERTED_PATH = Path("converted_iterum")
 
+db = get_connection_manager(DB_PATH)
+
+# Organizing, converting and Drive sync run as background jobs
+jobs = JobQueue(LIBRARY_PATH / "jobs.db")
+app.register_blueprint(create_jobs_blueprint(jobs))
+
+if DB_PATH.exists():
+    # Libraries created before full-text search, the stats table, the completeness
+    # column or the browse indexes need them built once
+    with db.batch() as conn:
+        ensure_search_index(conn.cursor())
+        ensure_library_stats(conn.cursor())
+        ensure_completeness_cache(conn.cursor())
+        ensure_browse_indexes(conn.cursor())
+
 def get_db_connection():
-    """Get database connection."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Get this thread's pooled database connection."""
+    return db.connection()
+
+@app.teardown_appcontext
+def release_db_connection(exception=None):
+    """Return the request's connection to the pool."""
+    db.release()
 
 def get_library_stats():
-    """Get library statistics."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Total recipes
-    cursor.execute("SELECT COUNT(*) as count FROM recipes")
-    total = cursor.fetchone()['count']
-    
-    # By cuisine
-    cursor.execute("SELECT cuisine_type, COUNT(*) as count FROM recipes GROUP BY cuisine_type ORDER BY count DESC")
-    by_cuisine = {row['cuisine_type']: row['count'] for row in cursor.fetchall()}
-    
-    # By category
-    cursor.execute("SELECT category, COUNT(*) as count FROM recipes GROUP BY category")
-    by_category = {row['category']: row['count'] for row in cursor.fetchall()}
-    
-    # By difficulty
-    cursor.execute("SELECT difficulty, COUNT(*) as count FROM recipes GROUP BY difficulty")
-    by_difficulty = {row['difficulty']: row['count'] for row in cursor.fetchall()}
-    
-    conn.close()
-    
-    return {
-        'total': total,
-        'by_cuisine': by_cuisine,
-        'by_category': by_category,
-        'by_difficulty': by_difficulty
-    }
+    """Get library statistics (read from the trigger-maintained summary table)."""
+    stats = read_library_stats(get_db_connection().cursor())
+    stats['total'] = stats['total_recipes']
+    return stats
 
 @app.route('/')
 def index():
@@ -65,7 +66,6 @@ def index():
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM recipes ORDER BY modified_date DESC LIMIT 6")
     recent_recipes = cursor.fetchall()
-    conn.close()
     
     return render_template('index.html', stats=stats, recent_recipes=recent_recipes)
 
@@ -78,44 +78,36 @@ def recipes():
     difficulty = request.args.get('difficulty', '')
     search = request.args.get('search', '')
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    query = "SELECT * FROM recipes WHERE 1=1"
-    params = []
-    
-    if cuisine and cuisine != 'all':
-        query += " AND cuisine_type = ?"
-        params.append(cuisine)
+    after = request.args.get('cursor') or None
     
-    if category and category != 'all':
-        query += " AND category = ?"
-        params.append(category)
-    
-    if difficulty and difficulty != 'all':
-        query += " AND difficulty = ?"
-        params.append(difficulty)
-    
-    if search:
-        query += " AND (title LIKE ? OR content_preview LIKE ?)"
-        params.extend([f'%{search}%', f'%{search}%'])
-    
-    query += " ORDER BY title"
-    
-    cursor.execute(query, params)
-    all_recipes = cursor.fetchall()
-    conn.close()
+    filters, params = build_browse_filters(cuisine, category, difficulty)
+    cursor = get_db_connection().cursor()
+    snippets = {}
+    try:
+        if build_match_query(search):
+            # Searches list the best matches first, with the matching text highlighted
+            all_recipes, next_cursor = search_page(cursor, search, filters, params, after=after)
+            snippets = {recipe['id']: snippet_html(recipe['snippet']) for recipe in all_recipes}
+        else:
+            all_recipes, next_cursor = browse_page(cursor, filters, params, sort='title', after=after)
+    except InvalidCursor:
+        # A stale or mangled cursor starts the listing over
+        return redirect(url_for('recipes', cuisine=cuisine, category=category, difficulty=difficulty,
+                                search=search))
     
     # Get filter options
     stats = get_library_stats()
     
     return render_template('recipes.html', 
                          recipes=all_recipes, 
+                         snippets=snippets,
                          stats=stats,
                          current_cuisine=cuisine,
                          current_category=category,
                          current_difficulty=difficulty,
-                         current_search=search)
+                         current_search=search,
+                         next_cursor=next_cursor,
+                         is_first_page=after is None)
 
 @app.route('/recipe/<recipe_id>')
 def recipe_detail(recipe_id):
@@ -124,7 +116,6 @@ def recipe_detail(recipe_id):
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM recipes WHERE id = ?", (recipe_id,))
     recipe = cursor.fetchone()
-    conn.close()
     
     if not recipe:
         flash('Recipe not found', 'error')
@@ -137,9 +128,27 @@ def organize():
     """Organize recipes page."""
     return render_template('organize.html')
 
+def run_organize(job, folder_path):
+    """Job: scan a folder and import its recipes into the library."""
+    # Import and run organizer
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent / "RecipeLibrarySystem"))
+    from recipe_library_system import RecipeLibrary
+    
+    library = RecipeLibrary(source_folder=folder_path)
+    recipes = library.scan_and_import(progress=job.progress_callback)
+    
+    return {
+        'success': True,
+        'count': len(recipes),
+        'recipes': [{'title': r.title, 'cuisine': r.cuisine_type} for r in recipes]
+    }
+
+jobs.register('organize', run_organize)
+
 @app.route('/api/organize', methods=['POST'])
 def api_organize():
-    """API endpoint to organize recipes."""
+    """API endpoint to organize recipes (returns a job id)."""
     data = request.json
     folder_path = data.get('folder_path', '')
     mode = data.get('mode', 'copy')  # copy or move
@@ -147,22 +156,7 @@ def api_organize():
     if not folder_path or not Path(folder_path).exists():
         return jsonify({'success': False, 'error': 'Invalid folder path'})
     
-    try:
-        # Import and run organizer
-        import sys
-        sys.path.insert(0, str(Path(__file__).parent / "RecipeLibrarySystem"))
-        from recipe_library_system import RecipeLibrary
-        
-        library = RecipeLibrary(source_folder=folder_path)
-        recipes = library.scan_and_import()
-        
-        return jsonify({
-            'success': True,
-            'count': len(recipes),
-            'recipes': [{'title': r.title, 'cuisine': r.cuisine_type} for r in recipes]
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+    return job_accepted(jobs.submit('organize', folder_path=folder_path))
 
 @app.route('/convert')
 def convert():
@@ -170,60 +164,62 @@ def convert():
     stats = get_library_stats()
     return render_template('convert.html', stats=stats)
 
+def run_convert(job):
+    """Job: convert all recipes to Iterum format."""
+    from standardize_recipes import IterumRecipeConverter
+    
+    converter = IterumRecipeConverter()
+    converted, errors = converter.convert_all_recipes(progress=job.progress_callback)
+    
+    return {
+        'success': True,
+        'converted': len(converted),
+        'skipped': len(converter.skipped),
+        'errors': len(errors),
+        'error_details': [{'title': t, 'error': e} for t, e in errors]
+    }
+
+jobs.register('convert', run_convert)
+
 @app.route('/api/convert', methods=['POST'])
 def api_convert():
-    """API endpoint to convert recipes to Iterum format."""
-    try:
-        from standardize_recipes import IterumRecipeConverter
-        
-        converter = IterumRecipeConverter()
-        converted, errors = converter.convert_all_recipes()
-        
-        return jsonify({
-            'success': True,
-            'converted': len(converted),
-            'errors': len(errors),
-            'error_details': [{'title': t, 'error': e} for t, e in errors]
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+    """API endpoint to convert recipes to Iterum format (returns a job id)."""
+    return job_accepted(jobs.submit('convert'))
 
 @app.route('/sync')
 def sync():
     """Google Drive sync page."""
     return render_template('sync.html')
 
+# action: (GoogleDriveRecipeManager method, message when done)
+SYNC_ACTIONS = {
+    'upload': ('upload_all_recipes', 'Recipes uploaded to Google Drive'),
+    'sync_to': ('sync_to_drive', 'Synced to Google Drive'),
+    'sync_from': ('sync_from_drive', 'Synced from Google Drive'),
+    'backup': ('create_backup', 'Backup created'),
+}
+
+def run_sync(job, action):
+    """Job: run a Google Drive sync action."""
+    from google_drive_integration import GoogleDriveRecipeManager
+    
+    method, message = SYNC_ACTIONS[action]
+    job.progress(0, None, f"Running {action.replace('_', ' ')}...")
+    manager = GoogleDriveRecipeManager()
+    getattr(manager, method)()
+    return {'success': True, 'message': message}
+
+jobs.register('sync', run_sync)
+
 @app.route('/api/sync', methods=['POST'])
 def api_sync():
-    """API endpoint for Google Drive sync."""
+    """API endpoint for Google Drive sync (returns a job id)."""
     action = request.json.get('action', '')
     
-    try:
-        from google_drive_integration import GoogleDriveRecipeManager
-        
-        manager = GoogleDriveRecipeManager()
-        
-        if action == 'upload':
-            manager.upload_all_recipes()
-            return jsonify({'success': True, 'message': 'Recipes uploaded to Google Drive'})
-        
-        elif action == 'sync_to':
-            manager.sync_to_drive()
-            return jsonify({'success': True, 'message': 'Synced to Google Drive'})
-        
-        elif action == 'sync_from':
-            manager.sync_from_drive()
-            return jsonify({'success': True, 'message': 'Synced from Google Drive'})
-        
-        elif action == 'backup':
-            manager.create_backup()
-            return jsonify({'success': True, 'message': 'Backup created'})
-        
-        else:
-            return jsonify({'success': False, 'error': 'Invalid action'})
+    if action not in SYNC_ACTIONS:
+        return jsonify({'success': False, 'error': 'Invalid action'})
     
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+    return job_accepted(jobs.submit('sync', action=action))
 
 @app.route('/track')
 def track():
@@ -244,8 +240,6 @@ def track():
             sources[source] = []
         sources[source].append(path.name)
     
-    conn.close()
-    
     return render_template('track.html', sources=sources)
 
 @app.route('/statistics')
@@ -256,22 +250,15 @@ def statistics():
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    # Get all recipes for detailed analysis
-    cursor.execute("SELECT * FROM recipes")
-    all_recipes = cursor.fetchall()
-    
-    # Calculate additional stats
-    total_size = sum(r['file_size'] for r in all_recipes if r['file_size'])
+    total_size = stats['total_size']
     
-    # Top cuisines
-    top_cuisines = sorted(stats['by_cuisine'].items(), key=lambda x: x[1], reverse=True)[:5]
+    # Top cuisines (by_cuisine is already ordered by count)
+    top_cuisines = list(stats['by_cuisine'].items())[:5]
     
     # Recent additions
     cursor.execute("SELECT * FROM recipes ORDER BY created_date DESC LIMIT 10")
     recent = cursor.fetchall()
     
-    conn.close()
-    
     return render_template('statistics.html', 
                          stats=stats,
                          total_size=total_size,
@@ -283,6 +270,24 @@ def settings():
     """Settings page."""
     return render_template('settings.html')
 
+@app.route('/api/recipes', methods=['GET'])
+def api_recipes():
+    """API endpoint for browsing recipes a page at a time (pass next_cursor back as ?cursor=)."""
+    filters, params = build_browse_filters(request.args.get('cuisine', ''), request.args.get('category', ''),
+                                           request.args.get('difficulty', ''), request.args.get('search', ''),
+                                           request.args.get('min_completeness', type=float),
+                                           request.args.get('max_completeness', type=float))
+    try:
+        limit = min(max(int(request.args.get('limit', PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        rows, next_cursor = browse_page(get_db_connection().cursor(), filters, params,
+                                        sort=request.args.get('sort', 'title'),
+                                        order=request.args.get('order', 'asc'),
+                                        after=request.args.get('cursor') or None, limit=limit)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    return jsonify({'success': True, 'recipes': [dict(row) for row in rows], 'next_cursor': next_cursor})
+
 @app.route('/api/search', methods=['GET'])
 def api_search():
     """API endpoint for quick search."""
@@ -293,15 +298,11 @@ def api_search():
     
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("""
-        SELECT id, title, cuisine_type, category 
-        FROM recipes 
-        WHERE title LIKE ? OR content_preview LIKE ?
-        LIMIT 10
-    """, (f'%{query}%', f'%{query}%'))
-    
-    results = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+    rows = ranked_search(cursor, query,
+                         columns="recipes.id, recipes.title, recipes.cuisine_type, recipes.category",
+                         limit=10)
+    
+    results = [dict(row) for row in rows]
     
     return jsonify({'results': results})
 
@@ -10,7 +10,7 @@ import re
 import json
 import hashlib
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 from datetime import datetime
 from urllib.parse import urlparse, urljoin
 import logging
@@ -26,6 +26,10 @@ except ImportError:
 # Add RecipeLibrarySystem to path
 sys.path.insert(0, str(Path(__file__).parent / "RecipeLibrarySystem"))
 from recipe_library_system import RecipeLibrary, RecipeEntry
+sys.path.insert(0, str(Path(__file__).parent))
+from http_cache import HttpCache
+from http_client import HttpClient, get_http_client
+from json_ld import find_json_ld_recipe, find_schema_object
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -34,8 +38,14 @@ logger = logging.getLogger(__name__)
 class WebRecipeScraper:
     """Scrape recipes from websites and import to library."""
     
-    def __init__(self, library_path: str = "recipe_library"):
+    def __init__(self, library_path: str = "recipe_library", http_client: Optional[HttpClient] = None):
+        """
+        Args:
+            library_path: Recipe library folder
+            http_client: HTTP client to fetch with (default: the shared client)
+        """
         self.library_path = Path(library_path)
+        self.client = http_client or get_http_client()
         self.library_path.mkdir(exist_ok=True)
         self.library = RecipeLibrary(library_path=library_path)
         
@@ -65,25 +75,10 @@ class WebRecipeScraper:
             logger.info(f"Scraping recipe from: {url}")
             
             # Fetch the page
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.client.get(url, headers=self.headers)
             response.raise_for_status()
             
-            # Parse HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Try different extraction methods
-            recipe_data = None
-            
-            # Method 1: Schema.org JSON-LD (most reliable)
-            recipe_data = self._extract_schema_org(soup, url)
-            
-            # Method 2: Schema.org microdata
-            if not recipe_data:
-                recipe_data = self._extract_microdata(soup, url)
-            
-            # Method 3: Common HTML patterns
-            if not recipe_data:
-                recipe_data = self._extract_html_patterns(soup, url)
+            recipe_data = self.extract_recipe_from_html(response.content, url)
             
             if recipe_data:
                 logger.info(f"Successfully extracted recipe: {recipe_data.get('title', 'Unknown')}")
@@ -99,6 +94,53 @@ class WebRecipeScraper:
             logger.error(f"Error scraping recipe from {url}: {e}")
             return None
     
+    def extract_recipe_from_html(self, html: bytes, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Extract a recipe from raw page bytes.
+        
+        Tries the JSON-LD fast path first and only builds a DOM for pages
+        without a usable schema.org Recipe block.
+        """
+        recipe_data = self.extract_json_ld(html, url)
+        if recipe_data:
+            return recipe_data
+        return self.extract_recipe(BeautifulSoup(html, 'html.parser'), url)
+    
+    def extract_json_ld(self, html: bytes, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Fast path: the recipe from the page's JSON-LD blocks, found by
+        scanning the bytes for script tags instead of parsing the page.
+        
+        Returns:
+            Recipe data, or None if the page has no JSON-LD Recipe (or isn't UTF-8)
+        """
+        try:
+            data = find_json_ld_recipe(html)
+            return self._parse_schema_recipe(data, url) if data is not None else None
+        except Exception as e:
+            logger.debug(f"JSON-LD fast path failed for {url}: {e}")
+            return None
+    
+    def extract_recipe(self, soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Extract a recipe from an already-parsed page.
+        
+        Used by scrape_recipe and by the website crawler, which hands over
+        the document it fetched so each page is downloaded and parsed once.
+        """
+        # Method 1: Schema.org JSON-LD (most reliable)
+        recipe_data = self._extract_schema_org(soup, url)
+        
+        # Method 2: Schema.org microdata
+        if not recipe_data:
+            recipe_data = self._extract_microdata(soup, url)
+        
+        # Method 3: Common HTML patterns
+        if not recipe_data:
+            recipe_data = self._extract_html_patterns(soup, url)
+        
+        return recipe_data
+    
     def _extract_schema_org(self, soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]:
         """Extract recipe from Schema.org JSON-LD markup."""
         try:
@@ -109,20 +151,11 @@ class WebRecipeScraper:
                 try:
                     data = json.loads(script.string)
                     
-                    # Handle both single objects and arrays
-                    if isinstance(data, list):
-                        for item in data:
-                            if item.get('@type') == 'Recipe' or 'Recipe' in item.get('@type', []):
-                                return self._parse_schema_recipe(item, url)
-                    elif isinstance(data, dict):
-                        if data.get('@type') == 'Recipe' or 'Recipe' in data.get('@type', []):
-                            return self._parse_schema_recipe(data, url)
-                        # Check for @graph
-                        if '@graph' in data:
-                            for item in data['@graph']:
-                                if item.get('@type') == 'Recipe' or 'Recipe' in item.get('@type', []):
-                                    return self._parse_schema_recipe(item, url)
-                except json.JSONDecodeError:
+                    # Single objects, arrays and @graph
+                    recipe = find_schema_object(data)
+                    if recipe is not None:
+                        return self._parse_schema_recipe(recipe, url)
+                except (json.JSONDecodeError, TypeError):
                     continue
                     
         except Exception as e:
@@ -347,17 +380,17 @@ class WebRecipeScraper:
             recipe_entry = self.library.analyze_and_import_file(library_file_path)
             
             if recipe_entry:
+                # The library keeps its own content-addressed copy
+                if Path(recipe_entry.library_path) != library_file_path:
+                    library_file_path.unlink()
+                
                 # Update with URL source in database
-                import sqlite3
-                conn = sqlite3.connect(self.library.db_path)
-                cursor = conn.cursor()
-                cursor.execute("""
-                    UPDATE recipes 
-                    SET file_path = ? 
-                    WHERE id = ?
-                """, (source_url, recipe_entry.id))
-                conn.commit()
-                conn.close()
+                with self.library.db.batch() as conn:
+                    conn.execute("""
+                        UPDATE recipes 
+                        SET file_path = ? 
+                        WHERE id = ?
+                    """, (source_url, recipe_entry.id))
                 
                 return recipe_entry
             
@@ -417,15 +450,24 @@ class WebRecipeScraper:
         
         return None
     
-    def scrape_multiple(self, urls: List[str]) -> Dict[str, Any]:
-        """Scrape multiple recipes from URLs."""
+    def scrape_multiple(self, urls: List[str],
+                        progress: Optional[Callable[[int, int, str], None]] = None) -> Dict[str, Any]:
+        """
+        Scrape multiple recipes from URLs.
+        
+        Args:
+            urls: Recipe page URLs
+            progress: Called as progress(urls_done, total_urls, url) (optional)
+        """
         results = {
             'success': [],
             'failed': [],
             'total': len(urls)
         }
         
-        for url in urls:
+        for index, url in enumerate(urls):
+            if progress:
+                progress(index, len(urls), url)
             try:
                 recipe_entry = self.scrape_and_import(url)
                 if recipe_entry:
@@ -445,6 +487,9 @@ class WebRecipeScraper:
                     'reason': str(e)
                 })
         
+        if progress:
+            progress(len(urls), len(urls), 'Done')
+        
         return results
 
 
@@ -456,10 +501,17 @@ def main():
     parser.add_argument('url', nargs='?', help='URL of recipe to scrape')
     parser.add_argument('--file', '-f', help='File containing URLs (one per line)')
     parser.add_argument('--library', '-l', default='recipe_library', help='Library path')
+    parser.add_argument('--cache-dir', help='Cache downloaded pages in this folder')
+    parser.add_argument('--offline', action='store_true',
+                       help='Only replay pages from the cache (implies --cache-dir http_cache)')
     
     args = parser.parse_args()
     
-    scraper = WebRecipeScraper(library_path=args.library)
+    http_client = None
+    if args.cache_dir or args.offline:
+        http_client = HttpClient(cache=HttpCache(args.cache_dir or 'http_cache', offline=args.offline))
+    
+    scraper = WebRecipeScraper(library_path=args.library, http_client=http_client)
     
     if args.file:
         # Read URLs from file
@@ -4,12 +4,18 @@ Website Recipe Crawler
 Crawls an entire website to find all recipe pages, extracts recipes, and exports to JSON or PDF
 """
 
+import os
 import sys
 import re
 import json
 import time
+import asyncio
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Any
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Any
 from datetime import datetime
 from urllib.parse import urlparse, urljoin, urlunparse
 from urllib.robotparser import RobotFileParser
@@ -37,32 +43,87 @@ except ImportError:
 # Import the web scraper
 sys.path.insert(0, str(Path(__file__).parent))
 from web_recipe_scraper import WebRecipeScraper
+from streaming_export import write_records
+from http_cache import HttpCache
+from http_client import HttpClient
+from crawl_frontier import (CrawlFrontier, VISITED_STATES, QUEUED, DONE, RECIPE, FAILED, BLOCKED,
+                            EXTRACTION_FAILED)
+from sitemap_discovery import DEFAULT_SITEMAP_PATHS, iter_sitemap_urls
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How often an idle worker checks whether other processes queued new pages (seconds)
+PENDING_POLL_SECONDS = 1.0
+
+# Recipe pages listed in sitemaps are crawled before anything found by following links
+SITEMAP_PRIORITY = 2
+
+
+class HostScheduler:
+    """
+    Per-host politeness for the async crawl engine.
+    
+    Allows at most `limit` requests in flight per host. Spacing between
+    requests is left to the HTTP client's per-host rate limiter.
+    """
+    
+    def __init__(self, limit: int = 1):
+        self.limit = max(1, limit)
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+    
+    @asynccontextmanager
+    async def slot(self, host: str):
+        """Hold one of host's request slots."""
+        async with self._slots.setdefault(host, asyncio.Semaphore(self.limit)):
+            yield
+
 
 class WebsiteRecipeCrawler:
     """Crawl a website to find and extract all recipes."""
     
-    def __init__(self, base_url: str, max_pages: int = 100, delay: float = 1.0):
+    def __init__(self, base_url: str, max_pages: int = 100, delay: float = 1.0,
+                 concurrency: int = 1, per_host_limit: Optional[int] = None,
+                 http_cache: Optional[HttpCache] = None, http_client: Optional[HttpClient] = None,
+                 state_db: Optional[str] = None, use_sitemaps: bool = True,
+                 progress: Optional[Callable[[int, int, str], None]] = None, run_id: Optional[str] = None):
         """
         Initialize the crawler.
         
         Args:
             base_url: Base URL of the website to crawl
-            max_pages: Maximum number of pages to crawl
-            delay: Delay between requests (seconds)
+            max_pages: Maximum number of pages to crawl in this run (pages visited by earlier runs on the same state_db don't count)
+            delay: Minimum time between requests to a host (seconds); the client slows down further if the server struggles
+            concurrency: Number of concurrent crawl workers (1 = sequential crawl)
+            per_host_limit: Maximum requests in flight per host (default: concurrency)
+            http_cache: On-disk response cache (None downloads every time); ignored when http_client is given
+            http_client: Shared HTTP client (its rate is set from delay when crawling)
+            state_db: SQLite file for the crawl frontier; reuse it to resume a crawl or to run
+                several crawler processes on one site (default: a temporary file)
+            use_sitemaps: Seed the frontier with recipe URLs from the site's sitemaps; with a
+                reused state_db, only recipes whose sitemap lastmod changed are crawled again
+            progress: Called as progress(pages_visited, max_pages, url) after each page
+            run_id: Crawler processes started with the same run_id on one state_db share
+                a single max_pages budget (default: this crawler has its own)
         """
         self.base_url = base_url.rstrip('/')
         self.parsed_base = urlparse(self.base_url)
         self.max_pages = max_pages
         self.delay = delay
-        
-        # Track visited URLs
-        self.visited_urls: Set[str] = set()
-        self.recipe_urls: List[str] = []
-        self.failed_urls: List[Dict[str, str]] = []
+        self.concurrency = max(1, concurrency)
+        self.per_host_limit = per_host_limit
+        self.use_sitemaps = use_sitemaps
+        self.progress = progress
+        self.sitemap_stats: Dict[str, int] = {}
+        self.parse_workers = min(self.concurrency, os.cpu_count() or 1)
+        
+        # Every discovered URL, its state and any extracted recipe live in the frontier database
+        self._state_dir = None
+        if state_db is None:
+            self._state_dir = tempfile.TemporaryDirectory(prefix='crawl_', ignore_cleanup_errors=True)
+            state_db = str(Path(self._state_dir.name) / 'frontier.db')
+        self.frontier = CrawlFrontier(state_db, run_id=run_id)
+        self._stop = threading.Event()
         
         # User agent
         self.headers = {
@@ -90,8 +151,13 @@ class WebsiteRecipeCrawler:
             'yield',
         ]
         
+        # One keep-alive client for crawling and scraping
+        self.client = http_client or HttpClient(headers=self.headers, cache=http_cache,
+                                                pool_size=max(10, self.concurrency))
+        self.client.set_rate(self._request_rate())
+        
         # Initialize scraper
-        self.scraper = WebRecipeScraper()
+        self.scraper = WebRecipeScraper(http_client=self.client)
         
         # Check robots.txt
         self.robots_parser = self._check_robots_txt()
@@ -100,9 +166,16 @@ class WebsiteRecipeCrawler:
         """Check and parse robots.txt if available."""
         try:
             robots_url = urljoin(self.base_url, '/robots.txt')
-            rp = RobotFileParser()
-            rp.set_url(robots_url)
-            rp.read()
+            rp = RobotFileParser(robots_url)
+            # Fetched like any other page (so it is cached), then parsed with RobotFileParser.read's rules
+            response = self.client.get(robots_url, headers=self.headers)
+            if response.status_code in (401, 403):
+                rp.disallow_all = True
+            elif 400 <= response.status_code < 500:
+                rp.allow_all = True
+            else:
+                response.raise_for_status()
+                rp.parse(response.text.splitlines())
             return rp
         except Exception as e:
             logger.debug(f"Could not parse robots.txt: {e}")
@@ -178,107 +251,286 @@ class WebsiteRecipeCrawler:
         
         return links
     
+    @property
+    def visited_urls(self) -> Set[str]:
+        return set(self.frontier.urls(*VISITED_STATES))
+    
+    @property
+    def recipe_urls(self) -> List[str]:
+        return self.frontier.urls(RECIPE)
+    
+    @property
+    def failed_urls(self) -> List[Dict[str, str]]:
+        return self.frontier.failures()
+    
+    def pause(self):
+        """Stop handing out new pages; pages in flight finish and the rest stay queued in the frontier."""
+        self._stop.set()
+    
+    def _start_crawl(self):
+        """Seed the frontier with the base URL (and sitemap recipe URLs)."""
+        self._stop.clear()
+        self.client.set_rate(self._request_rate())
+        if self.use_sitemaps:
+            self._seed_from_sitemaps()
+        self.frontier.add([self.base_url])
+    
+    def _sitemap_urls(self) -> List[str]:
+        """Sitemaps listed in robots.txt, or the conventional locations."""
+        listed = self.robots_parser.site_maps() if self.robots_parser else None
+        return listed or [urljoin(self.base_url, path) for path in DEFAULT_SITEMAP_PATHS]
+    
+    def _seed_from_sitemaps(self):
+        """
+        Queue the recipe pages listed in the site's sitemaps ahead of
+        link-following. A page counts as a recipe if its URL looks like one
+        or it is listed in a recipe sitemap (e.g. /recipe-sitemap.xml).
+        Pages crawled before are requeued only if their lastmod changed.
+        """
+        listed = 0
+        recipes = []
+        for url, lastmod, sitemap_url in iter_sitemap_urls(self._sitemap_urls(), self._fetch):
+            listed += 1
+            if self._is_same_domain(url) and (self._is_recipe_url(url) or
+                                              self._is_recipe_url(urlparse(sitemap_url).path)):
+                recipes.append((url, lastmod))
+        
+        if not listed:
+            logger.info("No sitemap found; discovering recipes by following links")
+            return
+        
+        added, changed = self.frontier.add_from_sitemap(recipes, SITEMAP_PRIORITY)
+        self.sitemap_stats = {'listed': listed, 'recipes': len(recipes), 'new': added, 'changed': changed}
+        logger.info(f"Sitemaps: {listed} URLs, {len(recipes)} recipe pages "
+                    f"({added} new, {changed} changed since last crawl)")
+    
+    def _is_blocked(self, url: str) -> bool:
+        if self.robots_parser and not self.robots_parser.can_fetch(self.headers['User-Agent'], url):
+            logger.debug(f"Skipping {url} (blocked by robots.txt)")
+            self.frontier.finish(url, BLOCKED)
+            return True
+        return False
+    
+    def _crawl_finished(self) -> bool:
+        """No page can be claimed now: stop unless other workers may still queue links."""
+        return self.frontier.run_visited_count() >= self.max_pages or not self.frontier.has_pending()
+    
+    def _request_rate(self) -> Optional[float]:
+        """Per-host requests per second allowed by delay (None = unpaced)."""
+        return 1.0 / self.delay if self.delay > 0 else None
+    
+    def _fetch(self, url: str) -> bytes:
+        """Download a page (blocking)."""
+        response = self.client.get(url, headers=self.headers)
+        response.raise_for_status()
+        return response.content
+    
+    def _parse_page(self, content: bytes, url: str) -> Tuple[bool, List[str], Optional[Dict[str, Any]]]:
+        """
+        Parse a page, classify it and extract the recipe from recipe pages
+        (CPU-bound; runs in a worker thread in async mode).
+        
+        Pages with a JSON-LD Recipe are handled without building a DOM.
+        
+        Returns:
+            (is_recipe, links to follow, recipe data); recipe pages are not expanded
+        """
+        recipe_data = self.scraper.extract_json_ld(content, url)
+        if recipe_data:
+            return True, [], recipe_data
+        
+        soup = BeautifulSoup(content, 'html.parser')
+        
+        if self._is_recipe_page(soup, url):
+            return True, [], self.scraper.extract_recipe(soup, url)
+        
+        return False, self._extract_links(soup, url), None
+    
+    def _record_page(self, url: str, depth: int, is_recipe: bool, links: List[str],
+                     recipe_data: Optional[Dict[str, Any]]):
+        """Store a recipe page's recipe, or queue the links found on it (recipe-looking links first)."""
+        if is_recipe:
+            logger.info(f"  ✓ Found recipe: {url}")
+            self.frontier.finish(url, RECIPE, recipe=recipe_data,
+                                 error=None if recipe_data else EXTRACTION_FAILED)
+        else:
+            prioritized = [(link, 1 if self._is_recipe_url(link) else 0) for link in links]
+            self.frontier.finish(url, DONE, prioritized, depth)
+        self._report_progress(url)
+    
+    def _record_failure(self, url: str, error: Exception):
+        if isinstance(error, requests.RequestException):
+            logger.warning(f"  ✗ Error fetching {url}: {error}")
+        else:
+            logger.error(f"  ✗ Error processing {url}: {error}")
+        self.frontier.finish(url, FAILED, error=str(error))
+        self._report_progress(url)
+    
+    def _report_progress(self, url: str):
+        if self.progress:
+            try:
+                self.progress(self.frontier.run_visited_count(), self.max_pages, url)
+            except Exception as e:
+                logger.debug(f"Progress callback failed: {e}")
+    
     def crawl(self) -> Dict[str, Any]:
         """
         Crawl the website to find all recipe pages.
         
+        Uses the async engine (crawl_async) when concurrency > 1. Progress
+        is kept in the frontier, so a stopped crawl resumes from its
+        state_db, and extracted recipes are written there as they're found.
+        
         Returns:
             Dictionary with crawl results
         """
+        if self.concurrency > 1:
+            return asyncio.run(self.crawl_async())
+        
         logger.info(f"Starting crawl of {self.base_url}")
         logger.info(f"Max pages: {self.max_pages}, Delay: {self.delay}s")
         
         # Start with base URL
-        urls_to_visit = [self.base_url]
+        self._start_crawl()
         
-        while urls_to_visit and len(self.visited_urls) < self.max_pages:
-            current_url = urls_to_visit.pop(0)
-            
-            # Skip if already visited
-            if current_url in self.visited_urls:
-                continue
-            
-            # Check robots.txt
-            if self.robots_parser and not self.robots_parser.can_fetch(self.headers['User-Agent'], current_url):
-                logger.debug(f"Skipping {current_url} (blocked by robots.txt)")
-                continue
-            
-            # Mark as visited
-            self.visited_urls.add(current_url)
+        try:
+            while not self._stop.is_set():
+                claimed = self.frontier.claim(1, self.max_pages)
+                if not claimed:
+                    if self._crawl_finished():
+                        break
+                    # Another process is still crawling and may queue more links
+                    time.sleep(PENDING_POLL_SECONDS)
+                    continue
+                
+                current_url, depth = claimed[0]
+                if self._is_blocked(current_url):
+                    continue
+                
+                try:
+                    logger.info(f"Crawling: {current_url} ({self.frontier.run_visited_count()}/{self.max_pages})")
+                    
+                    content = self._fetch(current_url)
+                    self._record_page(current_url, depth, *self._parse_page(content, current_url))
+                
+                except Exception as e:
+                    self._record_failure(current_url, e)
+        finally:
+            self.frontier.release()
+        
+        return self._crawl_summary()
+    
+    async def crawl_async(self) -> Dict[str, Any]:
+        """
+        Crawl with a pool of concurrent workers.
+        
+        Blocking fetches run in a thread pool sized to the worker count and
+        HTML parsing in a separate pool, so the event loop only schedules.
+        A HostScheduler caps requests in flight per host and the client's
+        rate limiter keeps them `delay` apart. max_pages and robots.txt
+        apply as in crawl().
+        
+        Returns:
+            Dictionary with crawl results
+        """
+        logger.info(f"Starting async crawl of {self.base_url}")
+        logger.info(f"Max pages: {self.max_pages}, Delay: {self.delay}s, Workers: {self.concurrency}")
+        
+        self._start_crawl()
+        self._in_flight = 0
+        self._frontier_ready = asyncio.Condition()
+        scheduler = HostScheduler(self.per_host_limit or self.concurrency)
+        
+        try:
+            with ThreadPoolExecutor(self.concurrency, thread_name_prefix='crawl-fetch') as fetch_pool, \
+                    ThreadPoolExecutor(self.parse_workers, thread_name_prefix='crawl-parse') as parse_pool:
+                await asyncio.gather(*(self._crawl_worker(scheduler, fetch_pool, parse_pool)
+                                       for _ in range(self.concurrency)))
+        finally:
+            self.frontier.release()
+        
+        return self._crawl_summary()
+    
+    async def _claim_url(self) -> Optional[Tuple[str, int]]:
+        """Take the next page to crawl, waiting while other workers may still add links."""
+        async with self._frontier_ready:
+            while not self._stop.is_set():
+                claimed = self.frontier.claim(1, self.max_pages)
+                if claimed:
+                    self._in_flight += 1
+                    return claimed[0]
+                if self._crawl_finished():
+                    return None
+                # Woken by this process's workers, or poll for other processes
+                try:
+                    await asyncio.wait_for(self._frontier_ready.wait(), PENDING_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+            return None
+    
+    async def _crawl_worker(self, scheduler: 'HostScheduler', fetch_pool: ThreadPoolExecutor,
+                            parse_pool: ThreadPoolExecutor):
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            claimed = await self._claim_url()
+            if claimed is None:
+                return
             
+            current_url, depth = claimed
             try:
-                logger.info(f"Crawling: {current_url} ({len(self.visited_urls)}/{self.max_pages})")
-                
-                # Fetch page
-                response = requests.get(current_url, headers=self.headers, timeout=10)
-                response.raise_for_status()
+                if self._is_blocked(current_url):
+                    continue
                 
-                # Parse HTML
-                soup = BeautifulSoup(response.content, 'html.parser')
+                logger.info(f"Crawling: {current_url} ({self.frontier.run_visited_count()}/{self.max_pages})")
                 
-                # Check if this is a recipe page
-                if self._is_recipe_page(soup, current_url):
-                    logger.info(f"  ✓ Found recipe: {current_url}")
-                    self.recipe_urls.append(current_url)
-                else:
-                    # Extract links to continue crawling
-                    links = self._extract_links(soup, current_url)
-                    
-                    # Prioritize recipe URLs
-                    recipe_links = [link for link in links if self._is_recipe_url(link)]
-                    other_links = [link for link in links if link not in recipe_links]
-                    
-                    # Add recipe links first, then others
-                    for link in recipe_links + other_links:
-                        if link not in self.visited_urls and link not in urls_to_visit:
-                            urls_to_visit.append(link)
+                async with scheduler.slot(urlparse(current_url).netloc):
+                    content = await loop.run_in_executor(fetch_pool, self._fetch, current_url)
                 
-                # Respect delay
-                if self.delay > 0:
-                    time.sleep(self.delay)
-                    
-            except requests.RequestException as e:
-                logger.warning(f"  ✗ Error fetching {current_url}: {e}")
-                self.failed_urls.append({'url': current_url, 'error': str(e)})
+                page = await loop.run_in_executor(parse_pool, self._parse_page, content, current_url)
+                self._record_page(current_url, depth, *page)
+            
             except Exception as e:
-                logger.error(f"  ✗ Error processing {current_url}: {e}")
-                self.failed_urls.append({'url': current_url, 'error': str(e)})
-        
-        logger.info(f"\nCrawl complete!")
-        logger.info(f"  Visited: {len(self.visited_urls)} pages")
-        logger.info(f"  Found: {len(self.recipe_urls)} recipe pages")
-        logger.info(f"  Failed: {len(self.failed_urls)} pages")
+                self._record_failure(current_url, e)
+            finally:
+                async with self._frontier_ready:
+                    self._in_flight -= 1
+                    self._frontier_ready.notify_all()
+    
+    def _crawl_summary(self) -> Dict[str, Any]:
+        counts = self.frontier.counts()
+        visited = sum(counts.get(state, 0) for state in VISITED_STATES)
+        visited_this_run = self.frontier.run_visited_count()
+        recipe_urls = self.recipe_urls
+        failed_urls = self.failed_urls
+        
+        logger.info(f"\nCrawl {'paused' if self._stop.is_set() else 'complete'}!")
+        logger.info(f"  Visited: {visited} pages ({visited_this_run} in this run)")
+        logger.info(f"  Found: {len(recipe_urls)} recipe pages")
+        logger.info(f"  Failed: {len(failed_urls)} pages")
+        logger.info(f"  Still queued: {counts.get(QUEUED, 0)} pages")
+        self.client.log_stats()
         
         return {
             'base_url': self.base_url,
-            'total_pages_visited': len(self.visited_urls),
-            'recipes_found': len(self.recipe_urls),
-            'failed_pages': len(self.failed_urls),
-            'recipe_urls': self.recipe_urls,
-            'failed_urls': self.failed_urls
+            'total_pages_visited': visited,
+            'pages_visited_this_run': visited_this_run,
+            'recipes_found': len(recipe_urls),
+            'failed_pages': len(failed_urls),
+            'pages_queued': counts.get(QUEUED, 0),
+            'sitemap': self.sitemap_stats,
+            'recipe_urls': recipe_urls,
+            'failed_urls': failed_urls
         }
     
     def scrape_all_recipes(self) -> List[Dict[str, Any]]:
-        """Scrape all found recipe URLs."""
-        logger.info(f"\nScraping {len(self.recipe_urls)} recipes...")
+        """
+        Collect the recipes extracted during the crawl.
         
-        recipes = []
-        for i, url in enumerate(self.recipe_urls, 1):
-            logger.info(f"Scraping {i}/{len(self.recipe_urls)}: {url}")
-            
-            recipe_data = self.scraper.scrape_recipe(url)
-            if recipe_data:
-                recipe_data['source_url'] = url
-                recipe_data['scraped_date'] = datetime.now().isoformat()
-                recipes.append(recipe_data)
-                logger.info(f"  ✓ Success: {recipe_data.get('title', 'Unknown')}")
-            else:
-                logger.warning(f"  ✗ Failed to scrape: {url}")
-                self.failed_urls.append({'url': url, 'error': 'Could not extract recipe data'})
-            
-            # Respect delay
-            if self.delay > 0:
-                time.sleep(self.delay)
+        Recipes are read back from the frontier; use frontier.iter_recipes()
+        to stream them instead of building a list.
+        """
+        recipes = list(self.frontier.iter_recipes())
         
         logger.info(f"\nScraping complete!")
         logger.info(f"  Successfully scraped: {len(recipes)} recipes")
@@ -286,29 +538,30 @@ class WebsiteRecipeCrawler:
         
         return recipes
     
-    def export_to_json(self, recipes: List[Dict[str, Any]], output_file: str = None) -> str:
-        """Export recipes to JSON file."""
+    def export_to_json(self, recipes: Iterable[Dict[str, Any]], output_file: str = None,
+                       fmt: Optional[str] = None) -> str:
+        """
+        Export recipes to a JSON or JSON Lines file, writing one recipe at a time.
+        
+        Format and compression follow the file name (.json, .jsonl, plus .gz
+        or .zst) unless fmt is given.
+        """
         if output_file is None:
             domain = self.parsed_base.netloc.replace('.', '_')
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            output_file = f"recipes_{domain}_{timestamp}.json"
+            output_file = f"recipes_{domain}_{timestamp}.{fmt or 'json'}"
         
         output_path = Path(output_file)
         
-        export_data = {
-            'export_info': {
-                'base_url': self.base_url,
-                'export_date': datetime.now().isoformat(),
-                'total_recipes': len(recipes),
-                'crawler_version': '1.0'
-            },
-            'recipes': recipes
+        header = {
+            'base_url': self.base_url,
+            'export_date': datetime.now().isoformat(),
+            'crawler_version': '1.0'
         }
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
+        count = write_records(output_path, recipes, header, fmt)
         
-        logger.info(f"Exported {len(recipes)} recipes to: {output_path}")
+        logger.info(f"Exported {count} recipes to: {output_path}")
         return str(output_path)
     
     def export_to_pdf(self, recipes: List[Dict[str, Any]], output_file: str = None) -> Optional[str]:
@@ -416,7 +669,7 @@ class WebsiteRecipeCrawler:
         Complete workflow: crawl, scrape, and export.
         
         Args:
-            format: Export format ('json' or 'pdf')
+            format: Export format ('json', 'jsonl' or 'pdf')
             output_file: Output file path (optional)
         
         Returns:
@@ -425,7 +678,7 @@ class WebsiteRecipeCrawler:
         # Step 1: Crawl website
         crawl_results = self.crawl()
         
-        if not self.recipe_urls:
+        if not crawl_results['recipes_found']:
             logger.warning("No recipes found on website!")
             return {
                 'success': False,
@@ -433,10 +686,10 @@ class WebsiteRecipeCrawler:
                 'crawl_results': crawl_results
             }
         
-        # Step 2: Scrape all recipes
-        recipes = self.scrape_all_recipes()
+        # Step 2: Recipes were extracted while crawling
+        recipe_count = self.frontier.recipe_count()
         
-        if not recipes:
+        if not recipe_count:
             logger.warning("No recipes successfully scraped!")
             return {
                 'success': False,
@@ -445,10 +698,11 @@ class WebsiteRecipeCrawler:
                 'recipes': []
             }
         
-        # Step 3: Export
-        if format.lower() == 'json':
-            output_path = self.export_to_json(recipes, output_file)
+        # Step 3: Export (JSON streams straight from the frontier)
+        if format.lower() in ('json', 'jsonl'):
+            output_path = self.export_to_json(self.frontier.iter_recipes(), output_file, format.lower())
         elif format.lower() == 'pdf':
+            recipes = self.scrape_all_recipes()
             output_path = self.export_to_pdf(recipes, output_file)
             if not output_path:
                 return {
@@ -462,14 +716,14 @@ class WebsiteRecipeCrawler:
                 'success': False,
                 'error': f'Unknown format: {format}',
                 'crawl_results': crawl_results,
-                'recipes': recipes
+                'recipes': self.scrape_all_recipes()
             }
         
         return {
             'success': True,
             'output_file': output_path,
             'crawl_results': crawl_results,
-            'recipes_count': len(recipes),
+            'recipes_count': recipe_count,
             'format': format
         }
 
@@ -480,13 +734,29 @@ def main():
     
     parser = argparse.ArgumentParser(description='Crawl website and extract all recipes')
     parser.add_argument('url', help='Base URL of website to crawl')
-    parser.add_argument('--format', '-f', choices=['json', 'pdf'], default='json',
+    parser.add_argument('--format', '-f', choices=['json', 'jsonl', 'pdf'], default='json',
                        help='Export format (default: json)')
-    parser.add_argument('--output', '-o', help='Output file path')
+    parser.add_argument('--output', '-o', help='Output file path (add .gz or .zst to compress JSON)')
     parser.add_argument('--max-pages', '-m', type=int, default=100,
                        help='Maximum pages to crawl (default: 100)')
     parser.add_argument('--delay', '-d', type=float, default=1.0,
                        help='Delay between requests in seconds (default: 1.0)')
+    parser.add_argument('--concurrency', '-c', type=int, default=1,
+                       help='Concurrent crawl workers; delay then applies per host (default: 1)')
+    parser.add_argument('--cache-dir', help='Cache downloaded pages in this folder')
+    parser.add_argument('--offline', action='store_true',
+                       help='Only replay pages from the cache (implies --cache-dir http_cache)')
+    parser.add_argument('--state-db',
+                       help='Keep crawl state in this SQLite file; rerun with it to resume, '
+                            'or start several crawlers on it to share the work')
+    parser.add_argument('--run-id',
+                       help='Crawlers started with the same run id on one --state-db share '
+                            'a single --max-pages budget (default: each crawler has its own)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Requeue pages left in progress by a crawler that was killed '
+                            '(only when no other crawler is using --state-db)')
+    parser.add_argument('--no-sitemaps', action='store_true',
+                       help='Ignore sitemaps and find recipes only by following links')
     parser.add_argument('--crawl-only', action='store_true',
                        help='Only crawl, do not scrape recipes')
     
@@ -497,15 +767,29 @@ def main():
     print(f"URL: {args.url}")
     print(f"Max pages: {args.max_pages}")
     print(f"Delay: {args.delay}s")
+    print(f"Workers: {args.concurrency}")
     print(f"Format: {args.format}")
     print("=" * 60 + "\n")
     
+    http_cache = None
+    if args.cache_dir or args.offline:
+        http_cache = HttpCache(args.cache_dir or 'http_cache', offline=args.offline)
+    
     crawler = WebsiteRecipeCrawler(
         base_url=args.url,
         max_pages=args.max_pages,
-        delay=args.delay
+        delay=args.delay,
+        concurrency=args.concurrency,
+        http_cache=http_cache,
+        state_db=args.state_db,
+        use_sitemaps=not args.no_sitemaps,
+        run_id=args.run_id
     )
     
+    if args.resume:
+        requeued = crawler.frontier.release(all_workers=True)
+        print(f"Requeued {requeued} unfinished pages")
+    
     if args.crawl_only:
         results = crawler.crawl()
         print(f"\n✓ Found {len(crawler.recipe_urls)} recipe pages")